@@ -346,6 +346,534 @@ class SchedulerBenchmark(Benchmark):
         self.scheduler.schedule(self.task, self.nodes)
 
 
+class HashRingBenchmark(Benchmark):
+    """Benchmark key lookups on a DHT hash ring; records load balance in metadata."""
+
+    MODES = ("ring", "jump", "rendezvous")
+
+    def __init__(
+        self,
+        mode: str = "ring",
+        node_count: int = 200,
+        key_count: int = 10000,
+        iterations: int = 20,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown hash ring mode: {mode}")
+        super().__init__(
+            name=f"hash_ring_{mode}", iterations=iterations, warmup=2, measure_memory=False
+        )
+        self.mode = mode
+        self.node_count = node_count
+        self.key_count = key_count
+
+    def setup(self):
+        from legacy.p2p_network.dht_replication import (
+            ConsistentHashRing,
+            JumpHashRing,
+            RendezvousHashRing,
+        )
+
+        node_ids = [f"node-{i}" for i in range(self.node_count)]
+        if self.mode == "ring":
+            self.ring = ConsistentHashRing()
+            for node_id in node_ids:
+                self.ring.add_node(node_id)
+        elif self.mode == "jump":
+            self.ring = JumpHashRing(node_ids)
+        else:
+            self.ring = RendezvousHashRing(node_ids)
+
+        self.keys = [f"key-{i}" for i in range(self.key_count)]
+
+    def run_iteration(self):
+        get_node = self.ring.get_node
+        for key in self.keys:
+            get_node(key)
+
+    def run(self) -> BenchmarkResult:
+        result = super().run()
+        if result.success:
+            counts: dict[str, int] = {}
+            for key in self.keys:
+                node = self.ring.get_node(key)
+                counts[node] = counts.get(node, 0) + 1
+            loads = list(counts.values()) + [0] * (self.node_count - len(counts))
+            mean = statistics.mean(loads)
+            result.metadata = {
+                "nodes": self.node_count,
+                "keys": self.key_count,
+                "lookup_us": result.avg_time / self.key_count * 1e6,
+                "load_max_over_mean": max(loads) / mean if mean else 0,
+                "load_stdev_over_mean": statistics.pstdev(loads) / mean if mean else 0,
+            }
+        return result
+
+
+class QueueThroughputBenchmark(Benchmark):
+    """Benchmark publish + drain throughput of the in-memory queue backends."""
+
+    MODES = ("message", "message_batch", "task", "task_batch")
+
+    def __init__(
+        self,
+        mode: str = "message",
+        message_count: int = 1_000_000,
+        batch_size: int = 1000,
+        iterations: int = 3,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown queue mode: {mode}")
+        super().__init__(
+            name=f"queue_throughput_{mode}", iterations=iterations, warmup=1, measure_memory=False
+        )
+        self.mode = mode
+        self.message_count = message_count
+        self.batch_size = batch_size
+
+    def setup(self):
+        if self.mode.startswith("message"):
+            from legacy.message_queue import MemoryQueueBackend, Message
+
+            self.backend_cls = MemoryQueueBackend
+            self.items = [Message(topic="bench", payload=i) for i in range(self.message_count)]
+        else:
+            from legacy.task_queue import MemoryQueueBackend, Task
+
+            self.backend_cls = MemoryQueueBackend
+            self.items = [
+                Task(id=str(i), name="bench", priority=i % 4) for i in range(self.message_count)
+            ]
+
+    def run_iteration(self):
+        backend = self.backend_cls(max_size=self.message_count)
+        batch = self.batch_size
+        if self.mode == "message":
+            for message in self.items:
+                backend.publish(message)
+            while backend.consume("bench") is not None:
+                pass
+        elif self.mode == "message_batch":
+            for i in range(0, len(self.items), batch):
+                backend.publish_many(self.items[i : i + batch])
+            while backend.consume_batch("bench", batch):
+                pass
+        elif self.mode == "task":
+            for task in self.items:
+                backend.enqueue(task)
+            while backend.dequeue() is not None:
+                pass
+        else:
+            for i in range(0, len(self.items), batch):
+                backend.enqueue_many(self.items[i : i + batch])
+            while backend.dequeue_batch(batch):
+                pass
+
+    def run(self) -> BenchmarkResult:
+        result = super().run()
+        if result.success:
+            result.metadata = {
+                "messages": self.message_count,
+                "messages_per_second": self.message_count / result.avg_time,
+            }
+        return result
+
+
+class SerializationBenchmark(Benchmark):
+    """Benchmark an encode + decode round trip; records encoded size and throughput."""
+
+    FORMATS = ("binary", "json", "pickle", "msgpack")
+    PAYLOADS = ("records", "floats", "array")
+
+    def __init__(self, format: str = "binary", payload: str = "records", iterations: int = 20):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown serialization format: {format}")
+        if payload not in self.PAYLOADS:
+            raise ValueError(f"Unknown serialization payload: {payload}")
+        super().__init__(
+            name=f"serialize_{format}_{payload}",
+            iterations=iterations,
+            warmup=2,
+            measure_memory=False,
+        )
+        self.format = format
+        self.payload = payload
+
+    def setup(self):
+        import pickle
+        from array import array
+
+        from serializer import BinarySerializer, JSONSerializer, MessagePackSerializer
+
+        if self.payload == "records":
+            self.data = [
+                {"id": i, "name": f"task-{i}", "score": i / 7, "ok": i % 2 == 0, "tags": ["a", "b"]}
+                for i in range(10000)
+            ]
+        elif self.payload == "floats":
+            self.data = {"values": [i / 3 for i in range(200000)]}
+        else:
+            self.data = {"values": array("d", (i / 3 for i in range(200000)))}
+
+        if self.format == "binary":
+            serializer = BinarySerializer()
+            self.encode, self.decode = serializer.serialize, serializer.deserialize
+        elif self.format == "json":
+            serializer = JSONSerializer()
+            if self.payload == "array":
+                self.data = {"values": self.data["values"].tolist()}
+            self.encode, self.decode = serializer.serialize, serializer.deserialize
+        elif self.format == "pickle":
+            self.encode = lambda obj: pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+            self.decode = pickle.loads
+        else:
+            serializer = MessagePackSerializer()
+            serializer._ensure_msgpack()
+            if self.payload == "array":
+                self.data = {"values": self.data["values"].tolist()}
+            self.encode, self.decode = serializer.serialize, serializer.deserialize
+
+        self.encoded_size = len(self.encode(self.data))
+
+    def run_iteration(self):
+        self.decode(self.encode(self.data))
+
+    def run(self) -> BenchmarkResult:
+        result = super().run()
+        if result.success:
+            result.metadata = {
+                "encoded_bytes": self.encoded_size,
+                "round_trip_mb_per_second": self.encoded_size / result.avg_time / 1024 / 1024,
+            }
+        return result
+
+
+class ApiPayloadBenchmark(Benchmark):
+    """Benchmark scheduler API responses end to end: negotiated encode, wire size, client parse."""
+
+    FORMATS = ("json", "msgpack")
+    ENCODINGS = ("identity", "gzip", "zstd")
+    ENDPOINTS = ("results", "nodes")
+
+    def __init__(
+        self,
+        format: str = "json",
+        encoding: str = "identity",
+        endpoint: str = "results",
+        iterations: int = 20,
+    ):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown payload format: {format}")
+        if encoding not in self.ENCODINGS:
+            raise ValueError(f"Unknown content encoding: {encoding}")
+        if endpoint not in self.ENDPOINTS:
+            raise ValueError(f"Unknown endpoint payload: {endpoint}")
+        super().__init__(
+            name=f"api_payload_{endpoint}_{format}_{encoding}",
+            iterations=iterations,
+            warmup=2,
+            measure_memory=False,
+        )
+        self.format = format
+        self.encoding = encoding
+        self.endpoint = endpoint
+
+    def setup(self):
+        from serializer.http import (
+            JSON_CONTENT_TYPE,
+            MSGPACK_CONTENT_TYPE,
+            ZSTD_AVAILABLE,
+            decode_body,
+            encode_response,
+            msgpack_available,
+        )
+
+        if self.format == "msgpack" and not msgpack_available():
+            raise RuntimeError("MessagePack support requires msgpack package")
+        if self.encoding == "zstd" and not ZSTD_AVAILABLE:
+            raise RuntimeError("zstd support requires zstandard package")
+
+        if self.endpoint == "results":
+            results = [
+                {
+                    "task_id": i,
+                    "result": f"sum={i * 31}; rows={i % 97}; status=ok",
+                    "result_digest": f"{i:064x}",
+                    "result_size": 32,
+                    "completed_at": 1_700_000_000.0 + i,
+                    "assigned_node": f"node-{i % 50}",
+                    "user_id": f"user-{i % 7}",
+                }
+                for i in range(1000)
+            ]
+            self.payload = {
+                "count": len(results),
+                "results": results,
+                "next_cursor": 1000,
+                "has_more": False,
+                "watermark": 1_700_000_999.0,
+            }
+        else:
+            nodes = [
+                {
+                    "node_id": f"node-{i}",
+                    "capacity": {"cpu": 8.0, "memory": 16384, "disk": 51200},
+                    "tags": {"platform": "Linux", "gpu": i % 4 == 0, "user_id": f"user-{i}"},
+                    "registered_at": 1_700_000_000.0,
+                    "last_heartbeat": 1_700_000_100.0 + i,
+                    "current_load": {"cpu_usage": 12.5, "memory_usage": 40.0},
+                    "available_resources": {"cpu": 7.0, "memory": 9830},
+                    "is_idle": True,
+                    "is_available": True,
+                    "status": "online_available",
+                }
+                for i in range(200)
+            ]
+            self.payload = {"count": len(nodes), "nodes": nodes, "online_only": False}
+
+        self.accept = MSGPACK_CONTENT_TYPE if self.format == "msgpack" else JSON_CONTENT_TYPE
+        self.accept_encoding = None if self.encoding == "identity" else self.encoding
+        self.encode = lambda: encode_response(self.payload, self.accept, self.accept_encoding)
+        self.decode = lambda e: decode_body(e.body, e.content_type, e.content_encoding)
+
+    def run_iteration(self):
+        self.decode(self.encode())
+
+    def run(self) -> BenchmarkResult:
+        result = super().run()
+        if result.success:
+            import timeit
+
+            from serializer.http import encode_response
+
+            encoded = self.encode()
+            parse_seconds = min(timeit.repeat(lambda: self.decode(encoded), number=1, repeat=5))
+            raw = encode_response(self.payload, self.accept)
+            result.metadata = {
+                "content_type": encoded.content_type,
+                "content_encoding": encoded.content_encoding or "identity",
+                "body_bytes": len(raw.body),
+                "wire_bytes": len(encoded.body),
+                "client_parse_ms": parse_seconds * 1000,
+            }
+        return result
+
+
+class DAGMakespanBenchmark(Benchmark):
+    """Benchmark DAG makespan with stage barriers vs pipelined critical-path scheduling.
+
+    The synthetic DAG has a three-stage narrow pipeline with skewed partition
+    durations (one straggler per stage) next to an independent long chain, run
+    with fewer slots than ready chunks. Chunks sleep for ``duration * time_unit``.
+    """
+
+    MODES = ("barrier", "pipelined")
+
+    def __init__(
+        self,
+        mode: str = "pipelined",
+        partitions: int = 8,
+        max_concurrent_chunks: int = 4,
+        time_unit: float = 0.01,
+        iterations: int = 5,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown DAG scheduling mode: {mode}")
+        super().__init__(
+            name=f"dag_makespan_{mode}", iterations=iterations, warmup=1, measure_memory=False
+        )
+        self.mode = mode
+        self.partitions = partitions
+        self.max_concurrent_chunks = max_concurrent_chunks
+        self.time_unit = time_unit
+
+    def setup(self):
+        self.loop = asyncio.new_event_loop()
+
+    def _build(self):
+        from legacy.distributed_task_v2.dag_engine import DAGBuilder, DependencyType
+
+        n = self.partitions
+        builder = DAGBuilder("bench-dag", "Synthetic DAG")
+        previous = None
+        for s, stage_id in enumerate(("extract", "transform", "load")):
+            # Straggler partition moves each stage so barriers pay for every one of them
+            durations = [6.0 if i == (s * 3) % n else 1.0 for i in range(n)]
+            builder.add_stage(
+                stage_id=stage_id,
+                name=stage_id,
+                code_template="result = work(data)",
+                data=durations,
+                dependencies=[previous] if previous else [],
+                dependency_type=DependencyType.NARROW,
+                partition_count=n,
+            )
+            previous = stage_id
+        builder.add_stage("side-1", "side-1", "result = work(data)", data=[8.0], partition_count=1)
+        builder.add_stage(
+            "side-2",
+            "side-2",
+            "result = work(data)",
+            data=[8.0],
+            dependencies=["side-1"],
+            partition_count=1,
+        )
+        return builder.build()
+
+    def run_iteration(self):
+        from legacy.distributed_task_v2.dag_engine import DAGExecutionEngine
+
+        unit = self.time_unit
+
+        async def submit(code, data):
+            await asyncio.sleep(sum(data) * unit)
+            return "done"
+
+        async def check_status(task_id):
+            return "completed", task_id
+
+        engine = DAGExecutionEngine(
+            submit_func=submit,
+            check_status_func=check_status,
+            max_concurrent_chunks=self.max_concurrent_chunks,
+            pipelined=self.mode == "pipelined",
+            chunk_cost_func=lambda chunk: sum(chunk.data),
+        )
+        task = self._build()
+        engine.submit_task(task)
+        if not self.loop.run_until_complete(engine.execute_task(task.task_id)):
+            raise RuntimeError(task.error or "DAG execution failed")
+
+    def run(self) -> BenchmarkResult:
+        result = super().run()
+        if result.success:
+            result.metadata = {
+                "partitions": self.partitions,
+                "slots": self.max_concurrent_chunks,
+                "makespan_units": result.avg_time / self.time_unit,
+            }
+        return result
+
+    def teardown(self):
+        self.loop.close()
+
+
+class RedisRepositoryBenchmark(Benchmark):
+    """Benchmark paginated list queries on the Redis task/node repositories.
+
+    Requires a Redis server at ``REDIS_URL``; seeds its own key prefix and
+    removes it in teardown.
+    """
+
+    QUERIES = (
+        "list_all",
+        "list_by_user",
+        "list_by_status",
+        "page_walk",
+        "list_online",
+        "list_idle",
+    )
+
+    def __init__(
+        self,
+        query: str = "list_all",
+        task_count: int = 100_000,
+        node_count: int = 1_000,
+        page_size: int = 100,
+        iterations: int = 50,
+        redis_url: Optional[str] = None,
+    ):
+        if query not in self.QUERIES:
+            raise ValueError(f"Unknown repository query: {query}")
+        super().__init__(
+            name=f"redis_repo_{query}", iterations=iterations, warmup=5, measure_memory=False
+        )
+        self.query = query
+        self.task_count = task_count
+        self.node_count = node_count
+        self.page_size = page_size
+        self.redis_url = redis_url or os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+    def setup(self):
+        from src.core.entities import Node, NodeStatus, Task, TaskStatus
+        from src.infrastructure.repositories import RedisNodeRepository, RedisTaskRepository
+
+        prefix = f"bench:{os.getpid()}:{self.query}:"
+        self.loop = asyncio.new_event_loop()
+        self.tasks = RedisTaskRepository(self.redis_url, key_prefix=f"{prefix}task:")
+        self.nodes = RedisNodeRepository(self.redis_url, key_prefix=f"{prefix}node:")
+        self.prefix = prefix
+        self.status = TaskStatus.COMPLETED
+
+        statuses = list(TaskStatus)
+        node_statuses = [NodeStatus.ONLINE, NodeStatus.IDLE, NodeStatus.BUSY, NodeStatus.OFFLINE]
+        base = datetime(2024, 1, 1).timestamp()
+
+        async def seed():
+            client = await self.tasks._get_client()
+            for start in range(0, self.task_count, 1000):
+                async with client.pipeline(transaction=False) as pipe:
+                    for i in range(start, min(start + 1000, self.task_count)):
+                        task = Task(
+                            task_id=f"task-{i}",
+                            code="pass",
+                            status=statuses[i % len(statuses)],
+                            user_id=f"user-{i % 100}",
+                            created_at=datetime.fromtimestamp(base + i),
+                        )
+                        self.tasks._write_commands(pipe, task)
+                    await pipe.execute()
+            async with client.pipeline(transaction=False) as pipe:
+                for i in range(self.node_count):
+                    status = node_statuses[i % len(node_statuses)]
+                    node = Node(
+                        node_id=f"node-{i}",
+                        status=status,
+                        is_idle=status == NodeStatus.IDLE,
+                        registered_at=datetime.fromtimestamp(base + i),
+                    )
+                    self.nodes._write_commands(pipe, node)
+                await pipe.execute()
+
+        self.loop.run_until_complete(seed())
+
+    async def _query(self):
+        if self.query == "list_all":
+            return await self.tasks.list_all(self.page_size)
+        if self.query == "list_by_user":
+            return await self.tasks.list_by_user("user-7", self.page_size)
+        if self.query == "list_by_status":
+            return await self.tasks.list_by_status(self.status, self.page_size)
+        if self.query == "page_walk":
+            cursor = None
+            for _ in range(10):
+                _, cursor = await self.tasks.page_all(self.page_size, cursor)
+            return cursor
+        if self.query == "list_online":
+            return await self.nodes.list_online(self.page_size)
+        return await self.nodes.list_idle(self.page_size)
+
+    def run_iteration(self):
+        self.loop.run_until_complete(self._query())
+
+    def teardown(self):
+        async def cleanup():
+            client = await self.tasks._get_client()
+            batch = []
+            async for key in client.scan_iter(match=f"{self.prefix}*", count=1000):
+                batch.append(key)
+                if len(batch) >= 1000:
+                    await client.unlink(*batch)
+                    batch = []
+            if batch:
+                await client.unlink(*batch)
+            await self.tasks.close()
+            await self.nodes.close()
+
+        self.loop.run_until_complete(cleanup())
+        self.loop.close()
+
+
 def run_all_benchmarks(output_dir: str = "benchmark_results") -> BenchmarkSuite:
     """Run all predefined benchmarks."""
     runner = BenchmarkRunner(output_dir)
@@ -355,7 +883,25 @@ def run_all_benchmarks(output_dir: str = "benchmark_results") -> BenchmarkSuite:
         TaskSubmissionBenchmark(iterations=200),
         SandboxExecutionBenchmark(iterations=100),
         SchedulerBenchmark(iterations=500),
+        *(HashRingBenchmark(mode=mode) for mode in HashRingBenchmark.MODES),
+        *(QueueThroughputBenchmark(mode=mode) for mode in QueueThroughputBenchmark.MODES),
+        *(DAGMakespanBenchmark(mode=mode) for mode in DAGMakespanBenchmark.MODES),
+        *(
+            SerializationBenchmark(format=format, payload=payload)
+            for format in SerializationBenchmark.FORMATS
+            for payload in SerializationBenchmark.PAYLOADS
+        ),
+        *(
+            ApiPayloadBenchmark(format=format, encoding=encoding, endpoint=endpoint)
+            for endpoint in ApiPayloadBenchmark.ENDPOINTS
+            for format in ApiPayloadBenchmark.FORMATS
+            for encoding in ApiPayloadBenchmark.ENCODINGS
+        ),
     ]
+    if os.environ.get("REDIS_URL"):
+        benchmarks.extend(
+            RedisRepositoryBenchmark(query=query) for query in RedisRepositoryBenchmark.QUERIES
+        )
 
     suite = runner.run_suite(
         name="idle_accelerator_full",
@@ -4,6 +4,12 @@ Task Checkpoint and Recovery Module.
 This module provides checkpointing capabilities for long-running tasks,
 enabling recovery from failures and resumption of interrupted work.
 
+Security: checkpoint state is stored with pickle and restored with
+``pickle.loads``, which can run arbitrary code. Only load checkpoint
+directories that this process (or another trusted one) wrote; never point
+:class:`CheckpointStorage` at files from an untrusted source. Older JSON
+checkpoints, which are still readable, did not carry this risk.
+
 Architecture Reference:
 - Spark Checkpointing: https://spark.apache.org/docs/latest/streaming-programming-guide.html#checkpointing
 - Ray Checkpointing: https://docs.ray.io/en/latest/ray-core/actors/actor-checkpointing.html
@@ -11,11 +17,19 @@ Architecture Reference:
 
 import hashlib
 import json
+import mmap
+import os
+import pickle
+import struct
+import tempfile
 import threading
 import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Any, Callable, Generic, Optional, TypeVar
+from typing import Any, BinaryIO, Callable, Generic, Optional, TypeVar
 
 T = TypeVar("T")
 
@@ -63,12 +77,51 @@ class CheckpointData(Generic[T]):
 
 
 class CheckpointStorage:
-    """Storage backend for checkpoints."""
+    """
+    Storage backend for checkpoints.
+
+    Checkpoints are written in a binary container. The state is pickled with
+    protocol 5, and large contiguous buffers (NumPy arrays, bytearrays) are
+    written out-of-band as separate, 64-byte aligned segments. Files at least
+    ``mmap_threshold`` bytes long are memory-mapped copy-on-write when loaded.
+    Restored arrays then share pages with the file and are read lazily, not
+    parsed up front.
+
+    When the state is a dict, each top-level entry is pickled and hashed on
+    its own. A checkpoint stores only the entries that differ from the task's
+    last full checkpoint (its base) and records the base id. If the changed
+    entries exceed ``max_delta_ratio`` of the full size, a new full checkpoint
+    is written instead. Restoring a delta reads at most two files.
+
+    With ``async_writes`` the state is serialized, and its buffers copied,
+    before ``save`` returns. Disk writes then run on a background thread.
+    Every file is written to a temporary name and renamed into place, and the
+    ``.meta`` file goes last, so a listed checkpoint is always complete.
+    Reads of a task wait for its pending writes; ``flush`` waits for all.
+
+    Checkpoints written by the older JSON format can still be loaded.
+    """
 
-    def __init__(self, base_path: str = "checkpoints"):
+    def __init__(
+        self,
+        base_path: str = "checkpoints",
+        async_writes: bool = False,
+        max_delta_ratio: float = 0.5,
+        mmap_threshold: int = 1024 * 1024,
+    ):
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self.max_delta_ratio = max_delta_ratio
+        self.mmap_threshold = mmap_threshold
         self._lock = threading.Lock()
+        # task_id -> (base checkpoint id, base size, {state key: part digest})
+        self._bases: dict[str, tuple[str, int, dict[Any, str]]] = {}
+        self._pending: dict[str, list[Future]] = {}
+        self._executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint-writer")
+            if async_writes
+            else None
+        )
 
     def _get_checkpoint_path(self, task_id: str, checkpoint_id: str) -> Path:
         """Get the file path for a checkpoint."""
@@ -82,55 +135,209 @@ class CheckpointStorage:
         task_dir.mkdir(parents=True, exist_ok=True)
         return task_dir / f"{checkpoint_id}.meta"
 
-    def save(self, checkpoint: CheckpointData) -> CheckpointMetadata:
-        """Save a checkpoint to storage."""
-        checkpoint_path = self._get_checkpoint_path(checkpoint.task_id, checkpoint.checkpoint_id)
-        metadata_path = self._get_metadata_path(checkpoint.task_id, checkpoint.checkpoint_id)
+    def save(
+        self, checkpoint: CheckpointData, keep_count: Optional[int] = None
+    ) -> CheckpointMetadata:
+        """
+        Save a checkpoint to storage.
+
+        Args:
+            checkpoint: The checkpoint to save.
+            keep_count: If given, prune older checkpoints after the write (in
+                the background too when writes are asynchronous).
+        """
+        task_id = checkpoint.task_id
+        state = checkpoint.state
+        copy_buffers = self._executor is not None
+
+        if isinstance(state, dict):
+            parts = [_pickle_part((key, value), copy_buffers) for key, value in state.items()]
+            digests = {key: part[2] for key, part in zip(state, parts)}
+        else:
+            parts = [_pickle_part(state, copy_buffers)]
+            digests = None
+        full_size = sum(part[3] for part in parts)
 
         with self._lock:
-            serialized = json.dumps(checkpoint.to_dict(), ensure_ascii=True).encode("utf-8")
-            checksum = hashlib.sha256(serialized).hexdigest()[:16]
+            base = self._bases.get(task_id)
+            kind, base_id = "full", None
+            if digests is not None and base is not None and base[0] != checkpoint.checkpoint_id:
+                changed = [part for key, part in zip(state, parts) if base[2].get(key) != part[2]]
+                if sum(part[3] for part in changed) <= self.max_delta_ratio * base[1]:
+                    kind, base_id, parts = "delta", base[0], changed
+            if kind == "full":
+                if digests is None:
+                    self._bases.pop(task_id, None)
+                else:
+                    self._bases[task_id] = (checkpoint.checkpoint_id, full_size, digests)
+
+        header = {
+            "checkpoint_id": checkpoint.checkpoint_id,
+            "task_id": task_id,
+            "stage": checkpoint.stage,
+            "variables": checkpoint.variables,
+            "created_at": checkpoint.created_at,
+            "keys": list(state) if kind == "delta" else None,
+            "dict_state": digests is not None,
+        }
+        parts.insert(0, _pickle_part(header, copy_buffers))
+        layout, size = _layout(kind, base_id, parts)
+
+        checksum = hashlib.blake2b(digest_size=8)
+        for part in parts:
+            checksum.update(part[2].encode())
 
-            with open(checkpoint_path, "wb") as f:
-                f.write(serialized)
+        metadata = CheckpointMetadata(
+            checkpoint_id=checkpoint.checkpoint_id,
+            task_id=task_id,
+            stage=checkpoint.stage,
+            timestamp=time.time(),
+            size_bytes=size,
+            checksum=checksum.hexdigest(),
+            metadata={"format": "binary", "kind": kind, "base": base_id},
+        )
 
-            metadata = CheckpointMetadata(
-                checkpoint_id=checkpoint.checkpoint_id,
-                task_id=checkpoint.task_id,
-                stage=checkpoint.stage,
-                timestamp=time.time(),
-                size_bytes=len(serialized),
-                checksum=checksum,
-            )
+        def write() -> None:
+            try:
+                self._write(metadata, layout, parts)
+            except Exception:
+                with self._lock:
+                    if self._bases.get(task_id, ("",))[0] == checkpoint.checkpoint_id:
+                        del self._bases[task_id]
+                raise
+            if keep_count is not None:
+                self._cleanup(task_id, keep_count)
+
+        if self._executor is None:
+            write()
+        else:
+            future = self._executor.submit(write)
+            with self._lock:
+                pending = self._pending.setdefault(task_id, [])
+                pending[:] = [f for f in pending if not f.done() or f.exception()]
+                pending.append(future)
 
-            with open(metadata_path, "w") as f:
-                json.dump(metadata.to_dict(), f, indent=2)
+        return metadata
 
-            return metadata
+    def _write(
+        self,
+        metadata: CheckpointMetadata,
+        layout: bytes,
+        parts: list[tuple[bytes, list[memoryview], str, int]],
+    ) -> None:
+        """Write the checkpoint file, then its metadata, each atomically."""
+        checkpoint_path = self._get_checkpoint_path(metadata.task_id, metadata.checkpoint_id)
+        metadata_path = self._get_metadata_path(metadata.task_id, metadata.checkpoint_id)
+
+        with _atomic_writer(checkpoint_path) as f:
+            f.write(layout)
+            position = len(layout)
+            for payload, buffers, _, _ in parts:
+                for segment in (payload, *buffers):
+                    f.write(b"\0" * (_align(position) - position))
+                    position = _align(position)
+                    f.write(segment)
+                    position += len(segment)
+
+        with _atomic_writer(metadata_path) as f:
+            f.write(json.dumps(metadata.to_dict(), indent=2).encode("utf-8"))
+
+    def _wait(self, task_id: Optional[str] = None) -> None:
+        """Wait for pending background writes of one task, or of all tasks."""
+        with self._lock:
+            if task_id is None:
+                futures = [f for pending in self._pending.values() for f in pending]
+                self._pending.clear()
+            else:
+                futures = self._pending.pop(task_id, [])
+        for future in futures:
+            future.result()
+
+    def flush(self) -> None:
+        """Wait until all background writes have finished."""
+        self._wait()
+
+    def close(self) -> None:
+        """Flush pending writes and stop the background writer."""
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
 
     def load(self, task_id: str, checkpoint_id: str) -> Optional[CheckpointData]:
         """Load a checkpoint from storage."""
-        checkpoint_path = self._get_checkpoint_path(task_id, checkpoint_id)
-        self._get_metadata_path(task_id, checkpoint_id)
+        self._wait(task_id)
+
+        record = self._read(task_id, checkpoint_id)
+        if record is None:
+            return None
+
+        header, base_id, parts = record
+        if base_id is not None:
+            base = self._read(task_id, base_id)
+            if base is None:
+                raise FileNotFoundError(
+                    f"Base checkpoint {base_id} of {task_id}/{checkpoint_id} is missing"
+                )
+            base_parts = dict(base[2])
+            changed = dict(parts)
+            state = {
+                key: changed[key] if key in changed else base_parts[key] for key in header["keys"]
+            }
+        elif header.get("dict_state"):
+            state = dict(parts)
+        else:
+            state = parts[0]
+
+        return CheckpointData(
+            checkpoint_id=header["checkpoint_id"],
+            task_id=header["task_id"],
+            stage=header["stage"],
+            state=state,
+            variables=header.get("variables", {}),
+            created_at=header.get("created_at", time.time()),
+        )
 
-        with self._lock:
-            if not checkpoint_path.exists():
-                return None
+    def _read(
+        self, task_id: str, checkpoint_id: str
+    ) -> Optional[tuple[dict[str, Any], Optional[str], list[Any]]]:
+        """Read one checkpoint file: (header, base id, unpickled parts)."""
+        checkpoint_path = self._get_checkpoint_path(task_id, checkpoint_id)
 
+        try:
             with open(checkpoint_path, "rb") as f:
-                data = json.load(f)
-
-            return CheckpointData(
-                checkpoint_id=data["checkpoint_id"],
-                task_id=data["task_id"],
-                stage=data["stage"],
-                state=data["state"],
-                variables=data.get("variables", {}),
-                created_at=data.get("created_at", time.time()),
-            )
+                size = os.fstat(f.fileno()).st_size
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    f.seek(0)
+                    data = json.load(f)
+                    return data, None, [data["state"]]
+
+                if size >= self.mmap_threshold:
+                    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+                else:
+                    f.seek(0)
+                    buffer = bytearray(size)
+                    f.readinto(buffer)
+        except FileNotFoundError:
+            return None
+
+        view = memoryview(buffer)
+        (layout_len,) = _LENGTH.unpack_from(view, len(_MAGIC))
+        offset = len(_MAGIC) + _LENGTH.size
+        layout = json.loads(bytes(view[offset : offset + layout_len]))
+
+        parts = []
+        for segments in layout["parts"]:
+            payload, *buffers = (view[start : start + length] for start, length in segments)
+            parts.append(pickle.loads(payload, buffers=buffers))
+
+        return parts[0], layout["base"], parts[1:]
 
     def list_checkpoints(self, task_id: str) -> list[CheckpointMetadata]:
         """List all checkpoints for a task."""
+        self._wait(task_id)
+        return self._list(task_id)
+
+    def _list(self, task_id: str) -> list[CheckpointMetadata]:
         task_dir = self.base_path / task_id
 
         if not task_dir.exists():
@@ -152,34 +359,116 @@ class CheckpointStorage:
 
     def delete(self, task_id: str, checkpoint_id: str) -> bool:
         """Delete a checkpoint."""
+        self._wait(task_id)
+        return self._delete(task_id, checkpoint_id)
+
+    def _delete(self, task_id: str, checkpoint_id: str) -> bool:
         checkpoint_path = self._get_checkpoint_path(task_id, checkpoint_id)
         metadata_path = self._get_metadata_path(task_id, checkpoint_id)
 
         with self._lock:
             deleted = False
 
-            if checkpoint_path.exists():
-                checkpoint_path.unlink()
-                deleted = True
+            if self._bases.get(task_id, ("",))[0] == checkpoint_id:
+                del self._bases[task_id]
 
             if metadata_path.exists():
                 metadata_path.unlink()
                 deleted = True
 
+            if checkpoint_path.exists():
+                checkpoint_path.unlink()
+                deleted = True
+
             return deleted
 
     def cleanup_old(self, task_id: str, keep_count: int = 5) -> int:
-        """Clean up old checkpoints, keeping only the latest N."""
-        checkpoints = self.list_checkpoints(task_id)
+        """Clean up old checkpoints, keeping only the latest N (and their bases)."""
+        self._wait(task_id)
+        return self._cleanup(task_id, keep_count)
+
+    def _cleanup(self, task_id: str, keep_count: int) -> int:
+        checkpoints = self._list(task_id)
+        kept = checkpoints[:keep_count]
+        needed = {c.checkpoint_id for c in kept} | {
+            c.metadata.get("base") for c in kept if c.metadata.get("base")
+        }
 
         deleted_count = 0
         for checkpoint in checkpoints[keep_count:]:
-            if self.delete(task_id, checkpoint.checkpoint_id):
+            if checkpoint.checkpoint_id in needed:
+                continue
+            if self._delete(task_id, checkpoint.checkpoint_id):
                 deleted_count += 1
 
         return deleted_count
 
 
+_MAGIC = b"CKPT\x01\n"
+_LENGTH = struct.Struct("<I")
+_ALIGNMENT = 64
+
+
+def _align(position: int) -> int:
+    return -(-position // _ALIGNMENT) * _ALIGNMENT
+
+
+def _pickle_part(obj: Any, copy_buffers: bool) -> tuple[bytes, list[memoryview], str, int]:
+    """Pickle one object: (payload, out-of-band buffers, digest, total size)."""
+    buffers: list[pickle.PickleBuffer] = []
+    payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+
+    raws = [buffer.raw() for buffer in buffers]
+    if copy_buffers:
+        raws = [memoryview(bytes(raw)) for raw in raws]
+
+    digest = hashlib.blake2b(payload, digest_size=16)
+    for raw in raws:
+        digest.update(raw)
+    return payload, raws, digest.hexdigest(), len(payload) + sum(r.nbytes for r in raws)
+
+
+def _layout(
+    kind: str, base_id: Optional[str], parts: list[tuple[bytes, list[memoryview], str, int]]
+) -> tuple[bytes, int]:
+    """Build the file header; returns (header bytes, file size)."""
+    sizes = [[len(payload)] + [raw.nbytes for raw in raws] for payload, raws, _, _ in parts]
+
+    # Segment offsets depend on the header length, which depends on the offsets.
+    layout_len = 0
+    while True:
+        position = _align(len(_MAGIC) + _LENGTH.size + layout_len)
+        segments = []
+        for part_sizes in sizes:
+            part_segments = []
+            for length in part_sizes:
+                position = _align(position)
+                part_segments.append([position, length])
+                position += length
+            segments.append(part_segments)
+        encoded = json.dumps({"kind": kind, "base": base_id, "parts": segments}).encode()
+        if len(encoded) <= layout_len:
+            encoded = encoded.ljust(layout_len)
+            break
+        layout_len = len(encoded)
+
+    header = _MAGIC + _LENGTH.pack(layout_len) + encoded
+    return header, position
+
+
+@contextmanager
+def _atomic_writer(path: Path) -> Iterator[BinaryIO]:
+    """Write to a temporary file next to ``path`` and rename it into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
 class CheckpointManager:
     """
     Manager for task checkpointing.
@@ -230,12 +519,9 @@ class CheckpointManager:
             variables=variables or {},
         )
 
-        metadata = self.storage.save(checkpoint)
-
-        if self.auto_cleanup:
-            self.storage.cleanup_old(task_id, self.keep_count)
-
-        return metadata
+        return self.storage.save(
+            checkpoint, keep_count=self.keep_count if self.auto_cleanup else None
+        )
 
     def restore(
         self, task_id: str, checkpoint_id: Optional[str] = None
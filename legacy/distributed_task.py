@@ -2,6 +2,10 @@
 """
 分布式任务处理模块
 支持多节点协作处理大型任务
+
+自适应分片（adaptive=True）：先提交一个探测分片，按实测的单条耗时
+（ResourceEstimator 拟合）切分剩余数据，使每个分片运行约 target_chunk_seconds；
+数据切完后若仍有空闲并行槽位，拆分尚未开始执行的分片。
 """
 
 import hashlib
@@ -14,6 +18,9 @@ from typing import Any, Optional
 
 import requests
 
+from legacy.resource_estimator import ChunkSizer
+from serializer.http import decode_response
+
 
 @dataclass
 class TaskChunk:
@@ -58,6 +65,10 @@ class DistributedTask:
     created_at: float = None
     started_at: float = None
     completed_at: float = None
+    adaptive: bool = False  # 自适应分片，chunk_size 作为探测分片大小
+    target_chunk_seconds: float = 10.0  # 自适应模式下每个分片的目标运行时间
+    next_offset: int = 0  # 自适应模式下尚未切分数据的起点
+    next_chunk_index: int = 0
 
     def __post_init__(self):
         if self.created_at is None:
@@ -69,11 +80,20 @@ class DistributedTask:
 class DistributedTaskManager:
     """分布式任务管理器"""
 
-    def __init__(self, scheduler_url: str = "http://localhost:8000"):
+    def __init__(
+        self,
+        scheduler_url: str = "http://localhost:8000",
+        chunk_sizer: Optional[ChunkSizer] = None,
+        poll_interval: float = 1.0,
+    ):
         self.scheduler_url = scheduler_url
         self.tasks: dict[str, DistributedTask] = {}
         self.chunk_results: dict[str, Any] = {}
         self.lock = threading.Lock()
+        # 分片耗时记录与大小估计，按任务名区分任务类型
+        self.chunk_sizer = chunk_sizer or ChunkSizer()
+        self.poll_interval = poll_interval
+        self._adaptive_items: dict[str, list[Any]] = {}
 
     def submit_distributed_task(
         self,
@@ -84,6 +104,8 @@ class DistributedTaskManager:
         chunk_size: int = 10,
         max_parallel_chunks: int = 5,
         merge_code: str = None,
+        adaptive: bool = False,
+        target_chunk_seconds: float = 10.0,
     ) -> str:
         """提交分布式任务"""
         # 生成任务ID
@@ -99,6 +121,8 @@ class DistributedTaskManager:
             chunk_size=chunk_size,
             max_parallel_chunks=max_parallel_chunks,
             merge_code=merge_code,
+            adaptive=adaptive,
+            target_chunk_seconds=target_chunk_seconds,
         )
 
         with self.lock:
@@ -115,7 +139,13 @@ class DistributedTaskManager:
 
             try:
                 # 根据数据类型分片
-                if isinstance(task.data, list):
+                if task.adaptive and isinstance(task.data, (list, dict)):
+                    # 先只切探测分片，其余在执行时按实测耗时切分
+                    items = task.data if isinstance(task.data, list) else list(task.data.items())
+                    self._adaptive_items[task_id] = items
+                    task.next_offset = 0
+                    chunks = [self._cut_adaptive_chunk(task, task.chunk_size)]
+                elif isinstance(task.data, list):
                     chunks = self._chunk_list_data(task)
                 elif isinstance(task.data, dict):
                     chunks = self._chunk_dict_data(task)
@@ -145,16 +175,14 @@ class DistributedTaskManager:
             task.started_at = time.time()
 
         try:
-            # 提交所有分片任务到调度中心
-            submitted_chunks = []
-            for chunk in task.chunks:
-                chunk_task_id = self._submit_chunk_to_scheduler(chunk)
-                if chunk_task_id:
-                    chunk.assigned_at = time.time()
-                    submitted_chunks.append((chunk, chunk_task_id))
+            if task.adaptive and task.task_id in self._adaptive_items:
+                self._execute_adaptive(task)
+                submitted_chunks = []
+            else:
+                submitted_chunks = self._submit_all_chunks(task)
 
             # 等待所有分片完成
-            completed_chunks = 0
+            completed_chunks = sum(1 for c in task.chunks if c.status in ("completed", "failed"))
             total_chunks = len(task.chunks)
 
             while completed_chunks < total_chunks:
@@ -172,7 +200,7 @@ class DistributedTaskManager:
                             chunk.error = result
                             completed_chunks += 1
 
-                time.sleep(1)  # 避免频繁查询
+                time.sleep(self.poll_interval)  # 避免频繁查询
 
             # 合并结果
             if self._merge_chunk_results(task):
@@ -189,6 +217,139 @@ class DistributedTaskManager:
                 task.status = "failed"
                 task.error = str(e)
             return False
+        finally:
+            self._adaptive_items.pop(task.task_id, None)
+
+    def _submit_all_chunks(self, task: DistributedTask) -> list[tuple[TaskChunk, str]]:
+        """一次性提交所有分片，提交失败的分片标记为失败"""
+        submitted_chunks = []
+        for chunk in task.chunks:
+            chunk_task_id = self._submit_chunk_to_scheduler(chunk)
+            if chunk_task_id:
+                chunk.assigned_at = time.time()
+                submitted_chunks.append((chunk, chunk_task_id))
+            else:
+                chunk.status = "failed"
+                chunk.error = "提交分片失败"
+        return submitted_chunks
+
+    def _execute_adaptive(self, task: DistributedTask):
+        """
+        自适应执行：边执行边切分
+
+        - 没有该任务类型的耗时记录时，先等探测分片完成
+        - 之后按刚空闲节点的实测耗时切分下一个分片
+        - 数据切完且有空闲并行槽位时，拆分仍在排队的最大分片
+        """
+        in_flight: dict[str, TaskChunk] = {}
+        queued: set[str] = set()
+        last_node = None
+
+        for chunk in task.chunks:
+            self._submit_adaptive_chunk(chunk, in_flight)
+
+        while in_flight or self._has_unchunked_data(task):
+            while len(in_flight) < task.max_parallel_chunks and self._has_unchunked_data(task):
+                size = self.chunk_sizer.items_per_chunk(
+                    task.name, last_node, target_seconds=task.target_chunk_seconds
+                )
+                if size is None and in_flight:
+                    break  # 等待探测分片的测量结果
+                chunk = self._cut_adaptive_chunk(task, size or task.chunk_size)
+                task.chunks.append(chunk)
+                self._submit_adaptive_chunk(chunk, in_flight)
+
+            queued.clear()
+            for scheduler_task_id, chunk in list(in_flight.items()):
+                info = self._get_scheduler_task_info(scheduler_task_id)
+                status = info.get("status") if info else "failed"
+
+                if status == "completed":
+                    del in_flight[scheduler_task_id]
+                    chunk.status = "completed"
+                    chunk.completed_at = time.time()
+                    chunk.result = info.get("result", "")
+                    last_node = info.get("assigned_node")
+                    started = info.get("assigned_at") or chunk.assigned_at
+                    finished = info.get("completed_at") or chunk.completed_at
+                    self.chunk_sizer.record(
+                        task.name, len(chunk.data), max(0.0, finished - started), last_node
+                    )
+                elif status in ("failed", "deleted"):
+                    del in_flight[scheduler_task_id]
+                    chunk.status = "failed"
+                    chunk.error = info.get("result") if info else "查询分片状态失败"
+                elif status == "pending":
+                    queued.add(scheduler_task_id)
+
+            if not self._has_unchunked_data(task) and len(in_flight) < task.max_parallel_chunks:
+                self._split_queued_chunk(task, in_flight, queued)
+
+            if in_flight:
+                time.sleep(self.poll_interval)
+
+    def _split_queued_chunk(
+        self, task: DistributedTask, in_flight: dict[str, TaskChunk], queued: set[str]
+    ):
+        """将排队中最大的分片一分为二重新提交（工作窃取）"""
+        candidates = [
+            tid
+            for tid in queued
+            if len(in_flight[tid].data) >= max(2, 2 * self.chunk_sizer.min_items)
+        ]
+        if not candidates:
+            return
+
+        scheduler_task_id = max(candidates, key=lambda tid: len(in_flight[tid].data))
+        if not self._delete_scheduler_task(scheduler_task_id):
+            return  # 已被节点领取
+
+        chunk = in_flight.pop(scheduler_task_id)
+        items = list(chunk.data.items()) if isinstance(chunk.data, dict) else chunk.data
+        middle = len(items) // 2
+        halves = [
+            self._build_chunk(task, self._chunk_payload(task, part))
+            for part in (items[:middle], items[middle:])
+        ]
+
+        position = task.chunks.index(chunk)
+        task.chunks[position : position + 1] = halves
+        for half in halves:
+            self._submit_adaptive_chunk(half, in_flight)
+
+    def _submit_adaptive_chunk(self, chunk: TaskChunk, in_flight: dict[str, TaskChunk]):
+        chunk_task_id = self._submit_chunk_to_scheduler(chunk)
+        if chunk_task_id:
+            chunk.assigned_at = time.time()
+            in_flight[chunk_task_id] = chunk
+        else:
+            chunk.status = "failed"
+            chunk.error = "提交分片失败"
+
+    def _has_unchunked_data(self, task: DistributedTask) -> bool:
+        return task.next_offset < len(self._adaptive_items.get(task.task_id, []))
+
+    def _cut_adaptive_chunk(self, task: DistributedTask, size: int) -> TaskChunk:
+        """从未切分的数据中切出下一个分片"""
+        items = self._adaptive_items[task.task_id]
+        start = task.next_offset
+        task.next_offset = min(len(items), start + max(1, size))
+        return self._build_chunk(task, self._chunk_payload(task, items[start : task.next_offset]))
+
+    def _chunk_payload(self, task: DistributedTask, items: list[Any]) -> Any:
+        return dict(items) if isinstance(task.data, dict) else items
+
+    def _build_chunk(self, task: DistributedTask, chunk_data: Any) -> TaskChunk:
+        """按代码模板生成分片"""
+        chunk_index = task.next_chunk_index
+        task.next_chunk_index += 1
+        chunk_id = f"{task.task_id}_chunk_{chunk_index}"
+
+        code = task.code_template.replace("__DATA__", json.dumps(chunk_data))
+        code = code.replace("__CHUNK_ID__", chunk_id)
+        code = code.replace("__CHUNK_INDEX__", str(chunk_index))
+
+        return TaskChunk(chunk_id=chunk_id, parent_task_id=task.task_id, code=code, data=chunk_data)
 
     def get_task_status(self, task_id: str) -> Optional[dict[str, Any]]:
         """获取分布式任务状态"""
@@ -346,7 +507,7 @@ class DistributedTaskManager:
             response = requests.get(f"{self.scheduler_url}/status/{task_id}", timeout=5)
 
             if response.status_code == 200:
-                result = response.json()
+                result = decode_response(response)
                 status = result.get("status", "unknown")
 
                 if status == "completed":
@@ -361,6 +522,24 @@ class DistributedTaskManager:
         except Exception as e:
             return "failed", f"查询异常: {str(e)}"
 
+    def _get_scheduler_task_info(self, task_id: str) -> Optional[dict[str, Any]]:
+        """获取调度中心任务的完整状态（含执行节点与时间），失败返回 None"""
+        try:
+            response = requests.get(f"{self.scheduler_url}/status/{task_id}", timeout=5)
+            if response.status_code == 200:
+                return decode_response(response)
+            return None
+        except Exception:
+            return None
+
+    def _delete_scheduler_task(self, task_id: str) -> bool:
+        """删除调度中心中尚未执行的任务"""
+        try:
+            response = requests.delete(f"{self.scheduler_url}/api/tasks/{task_id}", timeout=5)
+            return response.status_code == 200
+        except Exception:
+            return False
+
     def _merge_chunk_results(self, task: DistributedTask) -> bool:
         """合并分片结果"""
         try:
@@ -39,6 +39,7 @@ from legacy.distributed_task_v2.fault_tolerance import (
     FaultToleranceManager,
     RetryConfig,
     RetryPolicy,
+    SpeculationConfig,
     StragglerDetector,
 )
 
@@ -563,4 +564,5 @@ __all__ = [
     "FailureType",
     "CircuitBreaker",
     "StragglerDetector",
+    "SpeculationConfig",
 ]
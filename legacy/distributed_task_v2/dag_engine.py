@@ -3,7 +3,11 @@ DAG Execution Engine for Distributed Tasks.
 
 Implements a Spark-like DAG execution engine:
 - Stage-based execution with dependencies
-- Parallel task execution within stages
+- Pipelined chunk execution: a chunk starts as soon as its own input
+  partitions are done, without waiting for whole upstream stages
+- Critical-path priority for ready chunks
+- Speculative backup attempts for straggler chunks
+- Chunk sizes learned from measured chunk runtimes (ChunkSizer)
 - Shuffle operations for wide dependencies
 - Fault tolerance with checkpointing
 - Progress tracking and monitoring
@@ -15,12 +19,18 @@ References:
 
 import asyncio
 import contextlib
+import heapq
+import itertools
 import time
 from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Callable, Optional
 
+from legacy.distributed_task_v2.fault_tolerance import SpeculationConfig, StragglerDetector
+from legacy.resource_estimator import ChunkSizer
+from legacy.task_deps import DependencyGraph
+
 
 class TaskStatus(Enum):
     PENDING = "pending"
@@ -177,6 +187,17 @@ class DAGTask:
         }
 
 
+@dataclass
+class ChunkAttempt:
+    """One submission of a chunk to the scheduler."""
+
+    started_at: float = field(default_factory=time.time)
+    exclude_nodes: list[str] = field(default_factory=list)
+    backup: bool = False
+    scheduler_task_id: Optional[str] = None
+    node_id: Optional[str] = None
+
+
 @dataclass
 class Checkpoint:
     """Checkpoint for fault tolerance."""
@@ -202,7 +223,8 @@ class DAGExecutionEngine:
 
     Features:
     - Stage-based execution with dependency resolution
-    - Parallel chunk execution within stages
+    - Pipelined chunk execution across stages, prioritized by critical path
+    - Speculative backups for stragglers, placed on a different node
     - Automatic retry on failure
     - Checkpoint-based recovery
     - Progress monitoring
@@ -211,16 +233,45 @@ class DAGExecutionEngine:
     MAX_CONCURRENT_CHUNKS = 10
     DEFAULT_TIMEOUT = 300
     CHECKPOINT_INTERVAL = 60
+    STATUS_POLL_INTERVAL = 0.5
 
     def __init__(
         self,
         submit_func: Callable = None,
         check_status_func: Callable = None,
         max_concurrent_chunks: int = None,
+        pipelined: bool = True,
+        chunk_cost_func: Callable[[TaskChunk], float] = None,
+        cancel_func: Callable = None,
+        speculation: SpeculationConfig = None,
+        chunk_sizer: ChunkSizer = None,
     ):
+        """
+        Args:
+            submit_func: ``async (code, data, **kwargs) -> scheduler task id``;
+                backup attempts pass ``exclude_nodes=[...]``
+            check_status_func: ``async (task_id) -> (status, result)``, or
+                ``(status, result, node_id)`` to enable node anti-affinity
+            cancel_func: ``async (task_id)`` used to delete losing attempts
+            speculation: Straggler backup policy; defaults to SpeculationConfig()
+            chunk_sizer: Records first-attempt runtimes of list-data chunks per
+                stage id, for DAGBuilders sharing the sizer to size later runs
+        """
         self.submit_func = submit_func
         self.check_status_func = check_status_func
+        self.cancel_func = cancel_func
+        self.speculation = speculation or SpeculationConfig()
+        self.straggler_detector = StragglerDetector(
+            threshold=self.speculation.multiplier,
+            quantile=self.speculation.quantile,
+            min_samples=self.speculation.min_samples,
+        )
+        self._speculation_used: dict[str, int] = defaultdict(int)
         self.max_concurrent_chunks = max_concurrent_chunks or self.MAX_CONCURRENT_CHUNKS
+        # pipelined=False keeps stage barriers and FIFO order (baseline for benchmarks)
+        self.pipelined = pipelined
+        self.chunk_cost_func = chunk_cost_func
+        self.chunk_sizer = chunk_sizer
 
         self.tasks: dict[str, DAGTask] = {}
         self.checkpoints: dict[str, Checkpoint] = {}
@@ -235,6 +286,11 @@ class DAGExecutionEngine:
             "chunks_executed": 0,
             "chunks_failed": 0,
             "retries": 0,
+            "speculative_launched": 0,
+            "speculative_wins": 0,
+            "speculative_cancelled": 0,
+            "speculative_saved_seconds": 0.0,
+            "speculative_wasted_seconds": 0.0,
         }
 
     async def start(self):
@@ -274,69 +330,222 @@ class DAGExecutionEngine:
         task.started_at = time.time()
 
         try:
-            while True:
-                ready_stages = task.get_ready_stages(self.completed_stages[task_id])
-
-                if not ready_stages:
-                    if all(s.status == StageStatus.COMPLETED for s in task.stages):
-                        task.status = TaskStatus.COMPLETED
-                        task.completed_at = time.time()
-                        self._stats["tasks_completed"] += 1
-                        await self._finalize_task(task)
-                        return True
-                    elif any(s.status == StageStatus.FAILED for s in task.stages):
-                        task.status = TaskStatus.FAILED
-                        task.completed_at = time.time()
-                        self._stats["tasks_failed"] += 1
-                        return False
-                    else:
-                        await asyncio.sleep(0.5)
-                        continue
-
-                for stage in ready_stages:
-                    asyncio.create_task(self._execute_stage(task, stage))
-
-                await asyncio.sleep(0.1)
-
+            graph, chunks, stage_nodes = self._build_chunk_graph(task)
+            success = await self._run_pipeline(task, graph, chunks, stage_nodes)
         except Exception as e:
-            task.status = TaskStatus.FAILED
             task.error = str(e)
-            task.completed_at = time.time()
-            self._stats["tasks_failed"] += 1
+            success = False
+        finally:
+            self._forget_speculation(task)
+
+        if task.status == TaskStatus.CANCELLED:
             return False
 
-    async def _execute_stage(self, task: DAGTask, stage: Stage):
-        """Execute a single stage."""
-        stage.status = StageStatus.RUNNING
-        stage.started_at = time.time()
+        task.completed_at = time.time()
+        if success:
+            task.status = TaskStatus.COMPLETED
+            self._stats["tasks_completed"] += 1
+            await self._finalize_task(task)
+            return True
 
-        try:
-            pending_chunks = [c for c in stage.chunks if c.status == TaskStatus.PENDING]
+        task.status = TaskStatus.FAILED
+        self._stats["tasks_failed"] += 1
+        return False
 
-            semaphore = asyncio.Semaphore(self.max_concurrent_chunks)
+    def _forget_speculation(self, task: DAGTask):
+        """Drop per-stage runtime samples and backup budgets of a finished task."""
+        for stage in task.stages:
+            stage_key = f"{task.task_id}:{stage.stage_id}"
+            self.straggler_detector.forget_stage(stage_key)
+            self._speculation_used.pop(stage_key, None)
+
+    def _build_chunk_graph(
+        self, task: DAGTask
+    ) -> tuple[DependencyGraph[str], dict[str, TaskChunk], dict[str, list[str]]]:
+        """
+        Build the chunk-level dependency graph of a task.
+
+        A narrow dependency on a stage with the same number of chunks links
+        chunk i to the parent's chunk i; wide dependencies (or differently
+        partitioned parents) link every chunk to all of the parent's chunks.
+        Explicit ``TaskChunk.dependencies`` take precedence. A stage without
+        chunks becomes a single barrier node.
+
+        Returns:
+            (graph, chunks by node id, node ids per stage)
+        """
+        stages = {stage.stage_id: stage for stage in task.stages}
+        stage_graph = DependencyGraph[str]()
+        for stage in task.stages:
+            stage_graph.add_node(stage.stage_id)
+            for dep in stage.dependencies:
+                if dep not in stages:
+                    raise ValueError(f"Stage {stage.stage_id} depends on unknown stage {dep}")
+                stage_graph.add_dependency(stage.stage_id, dep)
+
+        order = stage_graph.topological_sort()
+        if len(order) != len(stages):
+            raise ValueError("Stage dependencies contain a cycle")
+
+        graph = DependencyGraph[str]()
+        chunks: dict[str, TaskChunk] = {}
+        stage_nodes: dict[str, list[str]] = {}
+
+        for stage_id in order:
+            stage = stages[stage_id]
+            parents = [stage_nodes[dep] for dep in stage.dependencies]
+            narrow = self.pipelined and stage.dependency_type == DependencyType.NARROW
+
+            if not stage.chunks:
+                node_id = f"{stage_id}::barrier"
+                graph.add_node(node_id)
+                for parent in parents:
+                    for input_id in parent:
+                        graph.add_dependency(node_id, input_id)
+                stage_nodes[stage_id] = [node_id]
+                continue
+
+            for i, chunk in enumerate(stage.chunks):
+                graph.add_node(chunk.chunk_id)
+                chunks[chunk.chunk_id] = chunk
+
+                if chunk.dependencies and self.pipelined:
+                    inputs = chunk.dependencies
+                    unknown = [c for c in inputs if c not in chunks]
+                    if unknown:
+                        raise ValueError(
+                            f"Chunk {chunk.chunk_id} depends on unknown chunks {unknown}"
+                        )
+                else:
+                    inputs = []
+                    for parent in parents:
+                        if narrow and len(parent) == len(stage.chunks):
+                            inputs.append(parent[i])
+                        else:
+                            inputs.extend(parent)
+
+                for input_id in inputs:
+                    graph.add_dependency(chunk.chunk_id, input_id)
+
+            stage_nodes[stage_id] = [chunk.chunk_id for chunk in stage.chunks]
+
+        return graph, chunks, stage_nodes
+
+    def _chunk_cost(self, chunk: TaskChunk) -> float:
+        """Estimated relative run time of a chunk, used for critical-path priority."""
+        if self.chunk_cost_func:
+            return self.chunk_cost_func(chunk)
+        if isinstance(chunk.data, (list, tuple)):
+            return float(max(1, len(chunk.data)))
+        return 1.0
+
+    async def _run_pipeline(
+        self,
+        task: DAGTask,
+        graph: DependencyGraph[str],
+        chunks: dict[str, TaskChunk],
+        stage_nodes: dict[str, list[str]],
+    ) -> bool:
+        """
+        Run all chunks of a task as a pipeline.
+
+        Chunks are dispatched as soon as their inputs complete, up to
+        ``max_concurrent_chunks`` at once; among ready chunks the one with the
+        longest remaining critical path runs first.
+        """
+        stage_of = {node: stage for stage in task.stages for node in stage_nodes[stage.stage_id]}
+
+        if self.pipelined:
+            priority = graph.compute_path_lengths(
+                lambda node: self._chunk_cost(chunks[node]) if node in chunks else 0.0
+            )
+        else:
+            priority = dict.fromkeys(graph.nodes, 0.0)
 
-            async def execute_chunk(chunk: TaskChunk):
-                async with semaphore:
-                    return await self._execute_chunk(task, stage, chunk)
+        done = {node for node, chunk in chunks.items() if chunk.status == TaskStatus.COMPLETED}
+        remaining = {
+            node_id: sum(1 for dep in node.dependencies if dep not in done)
+            for node_id, node in graph.nodes.items()
+        }
+        left = {
+            stage_id: sum(1 for node in nodes if node not in done)
+            for stage_id, nodes in stage_nodes.items()
+        }
 
-            results = await asyncio.gather(
-                *[execute_chunk(c) for c in pending_chunks], return_exceptions=True
-            )
+        ready: list[tuple[float, int, str]] = []
+        sequence = itertools.count()
+        running: dict[asyncio.Future, str] = {}
+
+        def push(node: str):
+            heapq.heappush(ready, (-priority[node], next(sequence), node))
+
+        def finish(node: str):
+            stage = stage_of[node]
+            left[stage.stage_id] -= 1
+            if left[stage.stage_id] == 0:
+                self._complete_stage(task, stage)
+            for child in graph.nodes[node].dependents:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    push(child)
+
+        for stage in task.stages:
+            if left[stage.stage_id] == 0:
+                self._complete_stage(task, stage)
+        for node in graph.nodes:
+            if node not in done and remaining[node] == 0:
+                push(node)
+
+        failed = False
+        try:
+            while (ready or running) and not failed and task.status != TaskStatus.CANCELLED:
+                while ready and len(running) < self.max_concurrent_chunks:
+                    _, _, node = heapq.heappop(ready)
+                    chunk = chunks.get(node)
+                    if chunk is None:
+                        finish(node)
+                        continue
 
-            failed_count = sum(1 for r in results if isinstance(r, Exception) or r is False)
+                    stage = stage_of[node]
+                    if stage.status == StageStatus.PENDING:
+                        stage.status = StageStatus.RUNNING
+                        stage.started_at = time.time()
+                    running[asyncio.ensure_future(self._execute_chunk(task, stage, chunk))] = node
 
-            if failed_count > 0:
-                stage.status = StageStatus.FAILED
-            else:
-                stage.status = StageStatus.COMPLETED
-                self.completed_stages[task.task_id].add(stage.stage_id)
-                stage.results = [c.result for c in stage.chunks if c.result is not None]
+                if not running:
+                    continue
 
-            stage.completed_at = time.time()
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in finished:
+                    node = running.pop(future)
+                    if future.exception() is None and future.result():
+                        finish(node)
+                    else:
+                        failed = True
+                        stage = stage_of[node]
+                        stage.status = StageStatus.FAILED
+                        stage.completed_at = time.time()
+        finally:
+            for future, node in running.items():
+                future.cancel()
+                chunks[node].status = TaskStatus.CANCELLED
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        if failed or task.status == TaskStatus.CANCELLED:
+            return False
+        if not all(stage.status == StageStatus.COMPLETED for stage in task.stages):
+            task.error = "Unresolvable chunk dependencies"
+            return False
+        return True
 
-        except Exception:
-            stage.status = StageStatus.FAILED
-            stage.completed_at = time.time()
+    def _complete_stage(self, task: DAGTask, stage: Stage):
+        """Mark a stage completed once all of its chunks are done."""
+        stage.status = StageStatus.COMPLETED
+        stage.started_at = stage.started_at or time.time()
+        stage.completed_at = time.time()
+        stage.results = [c.result for c in stage.chunks if c.result is not None]
+        self.completed_stages[task.task_id].add(stage.stage_id)
 
     async def _execute_chunk(self, task: DAGTask, stage: Stage, chunk: TaskChunk) -> bool:
         """Execute a single chunk with retry support."""
@@ -353,26 +562,18 @@ class DAGExecutionEngine:
                     self._stats["chunks_executed"] += 1
                     return True
 
-                task_id = await self.submit_func(chunk.code, chunk.data)
-
-                if not task_id:
-                    raise Exception("Failed to submit chunk to scheduler")
-
-                chunk.assigned_node = task_id
-
-                while True:
-                    status, result = await self.check_status_func(task_id)
-
-                    if status == "completed":
-                        chunk.result = result
-                        chunk.status = TaskStatus.COMPLETED
-                        chunk.completed_at = time.time()
-                        self._stats["chunks_executed"] += 1
-                        return True
-                    elif status == "failed":
-                        raise Exception(result or "Chunk execution failed")
-
-                    await asyncio.sleep(0.5)
+                chunk.result = await self._execute_speculative(task, stage, chunk)
+                chunk.status = TaskStatus.COMPLETED
+                chunk.completed_at = time.time()
+                self._stats["chunks_executed"] += 1
+                if self.chunk_sizer and attempt == 0 and isinstance(chunk.data, list):
+                    self.chunk_sizer.record(
+                        stage.stage_id,
+                        len(chunk.data),
+                        chunk.completed_at - chunk.started_at,
+                        chunk.assigned_node,
+                    )
+                return True
 
             except Exception as e:
                 chunk.retry_count += 1
@@ -389,6 +590,119 @@ class DAGExecutionEngine:
 
         return False
 
+    async def _run_attempt(self, chunk: TaskChunk, attempt: ChunkAttempt) -> Any:
+        """Submit one attempt of a chunk and poll until it finishes."""
+        kwargs = {"exclude_nodes": attempt.exclude_nodes} if attempt.exclude_nodes else {}
+        task_id = await self.submit_func(chunk.code, chunk.data, **kwargs)
+
+        if not task_id:
+            raise Exception("Failed to submit chunk to scheduler")
+
+        attempt.scheduler_task_id = task_id
+        if not attempt.backup:
+            chunk.assigned_node = task_id
+
+        while True:
+            status, result, *node = await self.check_status_func(task_id)
+            if node and node[0]:
+                attempt.node_id = node[0]
+                if not attempt.backup:
+                    chunk.assigned_node = node[0]
+
+            if status == "completed":
+                return result
+            elif status == "failed":
+                raise Exception(result or "Chunk execution failed")
+
+            await asyncio.sleep(self.STATUS_POLL_INTERVAL)
+
+    async def _execute_speculative(self, task: DAGTask, stage: Stage, chunk: TaskChunk) -> Any:
+        """
+        Run a chunk, launching a backup attempt on another node if it straggles.
+
+        The primary is a straggler once it runs longer than the configured
+        multiple of the stage's quantile runtime. At most one backup runs per
+        chunk, within the stage's speculation budget. The first successful
+        attempt wins; the other is cancelled locally and through cancel_func.
+        """
+        detector = self.straggler_detector
+        stage_key = f"{task.task_id}:{stage.stage_id}"
+        chunk_key = f"{task.task_id}:{chunk.chunk_id}"
+        budget = self.speculation.stage_budget(len(stage.chunks))
+
+        primary = ChunkAttempt()
+        detector.record_start(chunk_key, stage_key)
+        attempts = {asyncio.ensure_future(self._run_attempt(chunk, primary)): primary}
+        backup: Optional[ChunkAttempt] = None
+        slowdown = 1.0
+        error: Optional[BaseException] = None
+
+        try:
+            while attempts:
+                can_speculate = backup is None and self._speculation_used[stage_key] < budget
+                done, _ = await asyncio.wait(
+                    attempts,
+                    timeout=self.speculation.check_interval if can_speculate else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                for future in done:
+                    attempt = attempts.pop(future)
+                    if future.exception() is not None:
+                        error = future.exception()
+                        continue
+
+                    now = time.time()
+                    if attempt is primary:
+                        detector.record_completion(chunk_key)
+                    else:
+                        detector.discard(chunk_key)
+                        detector.record_duration(stage_key, now - attempt.started_at)
+                        self._stats["speculative_wins"] += 1
+                        if primary in attempts.values():
+                            # Conservative estimate: the primary keeps the slowdown it had when
+                            # flagged and needs the backup's run time at that speed
+                            expected_end = primary.started_at + slowdown * (
+                                now - attempt.started_at
+                            )
+                            self._stats["speculative_saved_seconds"] += max(0.0, expected_end - now)
+                    return future.result()
+
+                if (
+                    not done
+                    and self._speculation_used[stage_key] < budget
+                    and detector.is_straggler(chunk_key)
+                ):
+                    baseline = detector.stage_quantile(stage_key)
+                    slowdown = detector.elapsed(chunk_key) / baseline if baseline else 1.0
+                    exclude = [primary.node_id] if primary.node_id else []
+                    backup = ChunkAttempt(exclude_nodes=exclude, backup=True)
+                    attempts[asyncio.ensure_future(self._run_attempt(chunk, backup))] = backup
+                    self._speculation_used[stage_key] += 1
+                    self._stats["speculative_launched"] += 1
+
+            raise error
+        finally:
+            detector.discard(chunk_key)
+            await self._cancel_attempts(attempts, speculated=backup is not None)
+
+    async def _cancel_attempts(
+        self, attempts: dict[asyncio.Future, ChunkAttempt], speculated: bool
+    ):
+        """Cancel losing or abandoned attempts, including their scheduler tasks."""
+        for future in attempts:
+            future.cancel()
+        if attempts:
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+        for attempt in attempts.values():
+            if speculated:
+                self._stats["speculative_cancelled"] += 1
+                self._stats["speculative_wasted_seconds"] += time.time() - attempt.started_at
+            if attempt.scheduler_task_id is not None and self.cancel_func:
+                with contextlib.suppress(Exception):
+                    await self.cancel_func(attempt.scheduler_task_id)
+
     async def _finalize_task(self, task: DAGTask):
         """Finalize task results after all stages complete."""
         final_stage = task.stages[-1] if task.stages else None
@@ -486,12 +800,26 @@ class DAGExecutionEngine:
 
 
 class DAGBuilder:
-    """Builder for creating DAG tasks."""
+    """Builder for creating DAG tasks.
+
+    With a chunk_sizer that has runtimes for a stage id, list data for that
+    stage is cut into chunks of the measured size instead of partition_count
+    equal parts.
+
+    A stage with a narrow dependency on already-chunked stages is instead cut
+    into exactly as many chunks as its parents have (ignoring both
+    partition_count and the sizer), so the engine can keep linking chunk i to
+    parent chunk i. A measured size therefore only takes effect at the head of
+    a narrow chain, and the stages downstream follow its chunk count.
+    """
 
-    def __init__(self, task_id: str, name: str, description: str = ""):
+    def __init__(
+        self, task_id: str, name: str, description: str = "", chunk_sizer: ChunkSizer = None
+    ):
         self.task_id = task_id
         self.name = name
         self.description = description
+        self.chunk_sizer = chunk_sizer
         self.stages: list[Stage] = []
         self._stage_counter = 0
 
@@ -552,10 +880,29 @@ class DAGBuilder:
             partition_count=partition_count,
         )
 
+    def _narrow_parent_count(self, stage: Stage) -> Optional[int]:
+        """Chunk count shared by the stage's narrow parents, if they agree on one."""
+        if stage.dependency_type != DependencyType.NARROW or not stage.dependencies:
+            return None
+        counts = {
+            len(parent.chunks)
+            for parent in self.stages
+            if parent.stage_id in stage.dependencies and parent.chunks
+        }
+        return counts.pop() if len(counts) == 1 else None
+
     def _create_chunks(self, stage: Stage, data: Any, partition_count: int) -> list[TaskChunk]:
         """Create chunks for a stage."""
-        if isinstance(data, list):
+        parent_count = self._narrow_parent_count(stage)
+        if isinstance(data, list) and parent_count:
+            # Match the parents so chunk i keeps a one-to-one narrow link
+            size, extra = divmod(len(data), parent_count)
+            bounds = [i * size + min(i, extra) for i in range(parent_count + 1)]
+            partitions = [data[bounds[i] : bounds[i + 1]] for i in range(parent_count)]
+        elif isinstance(data, list):
             chunk_size = max(1, len(data) // partition_count)
+            if self.chunk_sizer:
+                chunk_size = self.chunk_sizer.items_per_chunk(stage.stage_id, default=chunk_size)
             partitions = [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)]
         else:
             partitions = [data]
@@ -590,6 +937,7 @@ __all__ = [
     "TaskChunk",
     "Stage",
     "DAGTask",
+    "ChunkAttempt",
     "Checkpoint",
     "DAGExecutionEngine",
     "DAGBuilder",
@@ -7,6 +7,10 @@ Implements data locality optimization to minimize network transfer:
 - Network topology awareness
 - Locality-aware task assignment
 
+Locations are indexed by node, rack and data center as they are registered,
+so scoring a node costs one set lookup per required data item rather than a
+scan of every replica.
+
 References:
 - Hadoop Data Locality: "Hadoop: The Definitive Guide" (White, 2015)
 - Spark Data Locality: "Learning Spark" (Karau et al., 2015)
@@ -124,32 +128,73 @@ class DataLocalityManager:
         self.nodes: dict[str, NodeInfo] = {}
         self.network_costs: dict[str, int] = self.DEFAULT_NETWORK_COSTS.copy()
 
+        # Reverse indexes: node -> data ids, rack/data center -> replica counts
+        self._node_data: dict[str, set[str]] = defaultdict(set)
+        self._rack_data: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._dc_data: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
         self._stats = {
             "tasks_local": 0,
             "tasks_rack_local": 0,
             "tasks_remote": 0,
             "data_transferred": 0,
+            "data_read_local": 0,
             "locality_hit_rate": 0.0,
+            "rack_locality_hit_rate": 0.0,
         }
 
+    def _index_add(self, node_id: str, data_id: str):
+        node = self.nodes.get(node_id)
+        if node is None:
+            return
+        node.available_data.add(data_id)
+        if node.rack_id:
+            self._rack_data[node.rack_id][data_id] += 1
+        if node.data_center:
+            self._dc_data[node.data_center][data_id] += 1
+
+    def _index_remove(self, node_id: str, data_id: str):
+        node = self.nodes.get(node_id)
+        if node is None:
+            return
+        node.available_data.discard(data_id)
+        for index, key in ((self._rack_data, node.rack_id), (self._dc_data, node.data_center)):
+            if not key or key not in index:
+                continue
+            counts = index[key]
+            counts[data_id] -= 1
+            if counts[data_id] <= 0:
+                del counts[data_id]
+            if not counts:
+                del index[key]
+
     def register_node(self, node_id: str, rack_id: str = None, data_center: str = None):
         """Register a node with its topology information."""
+        if node_id in self.nodes:
+            for data_id in self._node_data.get(node_id, ()):
+                self._index_remove(node_id, data_id)
+
         self.nodes[node_id] = NodeInfo(
             node_id=node_id,
             rack_id=rack_id,
             data_center=data_center,
         )
+        for data_id in self._node_data.get(node_id, ()):
+            self._index_add(node_id, data_id)
 
     def unregister_node(self, node_id: str):
         """Unregister a node."""
+        for data_id in self._node_data.pop(node_id, set()):
+            self._index_remove(node_id, data_id)
+            remaining = [loc for loc in self.data_locations[data_id] if loc.node_id != node_id]
+            if remaining:
+                self.data_locations[data_id] = remaining
+            else:
+                del self.data_locations[data_id]
+
         if node_id in self.nodes:
             del self.nodes[node_id]
 
-        for data_id in list(self.data_locations.keys()):
-            self.data_locations[data_id] = [
-                loc for loc in self.data_locations[data_id] if loc.node_id != node_id
-            ]
-
     def register_data(
         self,
         data_id: str,
@@ -158,7 +203,19 @@ class DataLocalityManager:
         path: str = None,
         size_bytes: int = 0,
     ):
-        """Register data location on a node."""
+        """Register data location on a node.
+
+        Registering the same data on the same node again updates the
+        existing location instead of adding a duplicate replica.
+        """
+        if data_id in self._node_data.get(node_id, ()):
+            for loc in self.data_locations[data_id]:
+                if loc.node_id == node_id:
+                    loc.data_type = data_type
+                    loc.path = path
+                    loc.size_bytes = size_bytes
+            return
+
         location = DataLocation(
             data_id=data_id,
             data_type=data_type,
@@ -168,20 +225,41 @@ class DataLocalityManager:
         )
 
         self.data_locations[data_id].append(location)
-
-        if node_id in self.nodes:
-            self.nodes[node_id].available_data.add(data_id)
+        self._node_data[node_id].add(data_id)
+        self._index_add(node_id, data_id)
 
     def unregister_data(self, data_id: str, node_id: str = None):
         """Unregister data location."""
         if node_id:
-            self.data_locations[data_id] = [
-                loc for loc in self.data_locations[data_id] if loc.node_id != node_id
-            ]
-            if node_id in self.nodes:
-                self.nodes[node_id].available_data.discard(data_id)
+            holders = [node_id] if data_id in self._node_data.get(node_id, ()) else []
         else:
-            del self.data_locations[data_id]
+            holders = self.get_data_nodes(data_id)
+
+        for holder in holders:
+            self._index_remove(holder, data_id)
+            self._node_data[holder].discard(data_id)
+            if not self._node_data[holder]:
+                del self._node_data[holder]
+
+        remaining = [
+            loc for loc in self.data_locations.get(data_id, []) if loc.node_id not in holders
+        ]
+        if remaining:
+            self.data_locations[data_id] = remaining
+        else:
+            self.data_locations.pop(data_id, None)
+
+    def get_node_data(self, node_id: str) -> set[str]:
+        """Get the data IDs stored on a node."""
+        return set(self._node_data.get(node_id, ()))
+
+    def get_rack_data(self, rack_id: str) -> set[str]:
+        """Get the data IDs with at least one replica in a rack."""
+        return set(self._rack_data.get(rack_id, ()))
+
+    def get_data_size(self, data_id: str) -> int:
+        """Get the size of a piece of data (largest registered replica)."""
+        return max((loc.size_bytes for loc in self.data_locations.get(data_id, [])), default=0)
 
     def get_data_nodes(self, data_id: str) -> list[str]:
         """Get all nodes that have a piece of data."""
@@ -207,42 +285,24 @@ class DataLocalityManager:
             )
 
         node = self.nodes[node_id]
+        node_data = self._node_data.get(node_id, ())
+        rack_data = self._rack_data.get(node.rack_id, ()) if node.rack_id else ()
+        dc_data = self._dc_data.get(node.data_center, ()) if node.data_center else ()
+
         local_data = []
         rack_local_data = []
         data_center_local_data = []
         remote_data = []
 
         for data_id in required_data:
-            locations = self.data_locations.get(data_id, [])
-
-            if not locations:
+            if data_id in node_data:
+                local_data.append(data_id)
+            elif data_id in rack_data:
+                rack_local_data.append(data_id)
+            elif data_id in dc_data:
+                data_center_local_data.append(data_id)
+            else:
                 remote_data.append(data_id)
-                continue
-
-            found_local = False
-            found_rack = False
-            found_dc = False
-
-            for loc in locations:
-                if loc.node_id == node_id:
-                    local_data.append(data_id)
-                    found_local = True
-                    break
-                elif node.rack_id and self.nodes.get(loc.node_id, {}).rack_id == node.rack_id:
-                    found_rack = True
-                elif (
-                    node.data_center
-                    and self.nodes.get(loc.node_id, {}).data_center == node.data_center
-                ):
-                    found_dc = True
-
-            if not found_local:
-                if found_rack:
-                    rack_local_data.append(data_id)
-                elif found_dc:
-                    data_center_local_data.append(data_id)
-                else:
-                    remote_data.append(data_id)
 
         total_data = len(required_data)
         if total_data == 0:
@@ -329,9 +389,34 @@ class DataLocalityManager:
         best_node, best_score = scores[0]
 
         self._update_stats(best_score.level)
+        self._record_bytes(best_node, required_data)
 
         return best_node
 
+    def record_placement(self, node_id: str, required_data: list[str]) -> LocalityScore:
+        """
+        Record that a task needing required_data was placed on node_id.
+
+        Updates the locality hit rates and the bytes that have to be moved
+        to the node (data it does not hold locally).
+
+        Returns:
+            The LocalityScore of the placement
+        """
+        score = self.calculate_locality_score(node_id, required_data)
+        self._update_stats(score.level)
+        self._record_bytes(node_id, required_data)
+        return score
+
+    def _record_bytes(self, node_id: str, required_data: list[str]):
+        node_data = self._node_data.get(node_id, ())
+        for data_id in required_data:
+            size = self.get_data_size(data_id)
+            if data_id in node_data:
+                self._stats["data_read_local"] += size
+            else:
+                self._stats["data_transferred"] += size
+
     def _update_stats(self, level: LocalityLevel):
         """Update locality statistics."""
         if level in (LocalityLevel.PROCESS_LOCAL, LocalityLevel.NODE_LOCAL):
@@ -348,6 +433,9 @@ class DataLocalityManager:
         )
         if total > 0:
             self._stats["locality_hit_rate"] = self._stats["tasks_local"] / total
+            self._stats["rack_locality_hit_rate"] = (
+                self._stats["tasks_local"] + self._stats["tasks_rack_local"]
+            ) / total
 
     def get_locality_recommendations(
         self, required_data: list[str], available_nodes: list[str] = None
@@ -397,13 +485,9 @@ class DataLocalityManager:
         if current_nodes:
             first_node = self.nodes.get(current_nodes[0])
             if first_node:
-                same_rack = [
-                    n for n in candidates if self.nodes.get(n, {}).rack_id == first_node.rack_id
-                ]
+                same_rack = [n for n in candidates if self.nodes[n].rack_id == first_node.rack_id]
                 same_dc = [
-                    n
-                    for n in candidates
-                    if self.nodes.get(n, {}).data_center == first_node.data_center
+                    n for n in candidates if self.nodes[n].data_center == first_node.data_center
                 ]
 
                 for n in same_rack:
@@ -16,6 +16,7 @@ References:
 import asyncio
 import contextlib
 import hashlib
+import math
 import os
 import time
 from collections import defaultdict
@@ -72,6 +73,29 @@ class RetryConfig:
         return delay
 
 
+@dataclass
+class SpeculationConfig:
+    """Configuration for speculative backup execution of stragglers.
+
+    A running chunk becomes a straggler once it has run longer than
+    ``multiplier`` times the ``quantile`` runtime of finished chunks in its
+    stage. At most ``ceil(budget_fraction * chunks)`` backups run per stage.
+    """
+
+    enabled: bool = True
+    quantile: float = 0.75
+    multiplier: float = 1.5
+    min_samples: int = 3
+    budget_fraction: float = 0.1
+    check_interval: float = 1.0
+
+    def stage_budget(self, chunk_count: int) -> int:
+        """Maximum number of backup launches for a stage."""
+        if not self.enabled:
+            return 0
+        return math.ceil(self.budget_fraction * chunk_count)
+
+
 @dataclass
 class FailureRecord:
     """Record of a task failure."""
@@ -198,47 +222,71 @@ class StragglerDetector:
     """
     Detects and handles straggler tasks.
 
-    A straggler is a task that runs significantly slower than
-    the median task duration.
+    A straggler is a task that runs significantly slower than the
+    ``quantile`` runtime (the median by default) of finished tasks in
+    the same stage.
     """
 
     STRAGGLER_THRESHOLD = 2.0
     MIN_SAMPLES = 3
 
-    def __init__(self, threshold: float = None):
+    def __init__(self, threshold: float = None, quantile: float = 0.5, min_samples: int = None):
         self.threshold = threshold or self.STRAGGLER_THRESHOLD
+        self.quantile = quantile
+        self.min_samples = min_samples or self.MIN_SAMPLES
         self.task_durations: dict[str, list[float]] = defaultdict(list)
         self.task_start_times: dict[str, float] = {}
+        self._task_stages: dict[str, str] = {}
 
-    def record_start(self, chunk_id: str):
+    def record_start(self, chunk_id: str, stage_id: Optional[str] = None):
         """Record task start time."""
         self.task_start_times[chunk_id] = time.time()
+        self._task_stages[chunk_id] = stage_id or chunk_id.rsplit("-chunk-", 1)[0]
 
     def record_completion(self, chunk_id: str):
         """Record task completion and duration."""
         if chunk_id in self.task_start_times:
             duration = time.time() - self.task_start_times[chunk_id]
-            stage_id = chunk_id.rsplit("-chunk-", 1)[0]
-            self.task_durations[stage_id].append(duration)
-            del self.task_start_times[chunk_id]
+            self.record_duration(self._task_stages[chunk_id], duration)
+            self.discard(chunk_id)
+
+    def record_duration(self, stage_id: str, duration: float):
+        """Record a finished task duration for a stage."""
+        self.task_durations[stage_id].append(duration)
+
+    def discard(self, chunk_id: str):
+        """Stop tracking a task without recording its duration."""
+        self.task_start_times.pop(chunk_id, None)
+        self._task_stages.pop(chunk_id, None)
+
+    def forget_stage(self, stage_id: str):
+        """Drop the recorded durations of a stage that will not run again."""
+        self.task_durations.pop(stage_id, None)
+
+    def elapsed(self, chunk_id: str) -> Optional[float]:
+        """Run time so far of a tracked task."""
+        started = self.task_start_times.get(chunk_id)
+        return None if started is None else time.time() - started
+
+    def stage_quantile(self, stage_id: str) -> Optional[float]:
+        """Quantile runtime of finished tasks in a stage, if there are enough samples."""
+        durations = self.task_durations.get(stage_id, [])
+        if len(durations) < self.min_samples:
+            return None
+        sorted_durations = sorted(durations)
+        index = min(len(sorted_durations) - 1, int(self.quantile * len(sorted_durations)))
+        return sorted_durations[index]
 
     def is_straggler(self, chunk_id: str) -> bool:
         """Check if a task is a straggler."""
         if chunk_id not in self.task_start_times:
             return False
 
-        stage_id = chunk_id.rsplit("-chunk-", 1)[0]
-        durations = self.task_durations.get(stage_id, [])
-
-        if len(durations) < self.MIN_SAMPLES:
+        baseline = self.stage_quantile(self._task_stages[chunk_id])
+        if baseline is None:
             return False
 
-        current_duration = time.time() - self.task_start_times[chunk_id]
-
-        sorted_durations = sorted(durations)
-        median = sorted_durations[len(sorted_durations) // 2]
-
-        return current_duration > median * self.threshold
+        return self.elapsed(chunk_id) > baseline * self.threshold
 
     def get_stragglers(self) -> list[str]:
         """Get all current straggler tasks."""
@@ -565,6 +613,7 @@ __all__ = [
     "RetryPolicy",
     "FailureType",
     "RetryConfig",
+    "SpeculationConfig",
     "FailureRecord",
     "Checkpoint",
     "CircuitBreaker",
@@ -27,6 +27,7 @@ class IntegrationConfig:
     retry_max_attempts: int = 3
     task_default_timeout: float = 300.0
     metrics_namespace: str = "idle_accelerator"
+    metrics_cache_ttl_ms: float = 1000.0
 
 
 class LegacyIntegrator:
@@ -201,7 +202,8 @@ class LegacyIntegrator:
             from legacy.monitoring import MetricsRegistry, SystemMonitor
 
             self._metrics_registry = MetricsRegistry(
-                namespace=self.config.metrics_namespace
+                namespace=self.config.metrics_namespace,
+                cache_ttl_ms=self.config.metrics_cache_ttl_ms,
             )
             self._system_monitor = SystemMonitor(registry=self._metrics_registry)
 
@@ -7,7 +7,7 @@ import threading
 import time
 import uuid
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Callable, Generic, TypeVar
@@ -121,6 +121,26 @@ class MessageQueueBackend(ABC):
     def consume(self, topic: str, timeout: float = 0) -> Message | None:
         pass
 
+    def publish_many(self, messages: list[Message]) -> int:
+        """Publish messages in order; returns how many were accepted."""
+        published = 0
+        for message in messages:
+            if not self.publish(message):
+                break
+            published += 1
+        return published
+
+    def consume_batch(self, topic: str, max_messages: int, timeout: float = 0) -> list[Message]:
+        """Consume up to ``max_messages``, waiting at most ``timeout`` for the first one."""
+        messages: list[Message] = []
+        message = self.consume(topic, timeout)
+        while message is not None:
+            messages.append(message)
+            if len(messages) >= max_messages:
+                break
+            message = self.consume(topic)
+        return messages
+
     @abstractmethod
     def acknowledge(self, message_id: str) -> bool:
         pass
@@ -137,7 +157,7 @@ class MessageQueueBackend(ABC):
 class MemoryQueueBackend(MessageQueueBackend):
     def __init__(self, max_size: int = 10000):
         self.max_size = max_size
-        self._queues: dict[str, list[Message]] = defaultdict(list)
+        self._queues: dict[str, deque[Message]] = defaultdict(deque)
         self._messages: dict[str, Message] = {}
         self._lock = threading.RLock()
         self._conditions: dict[str, threading.Condition] = defaultdict(
@@ -145,36 +165,70 @@ class MemoryQueueBackend(MessageQueueBackend):
         )
         self._stats = QueueStats()
 
+    def _enqueue_locked(self, message: Message) -> bool:
+        if len(self._messages) >= self.max_size:
+            return False
+        self._queues[message.topic].append(message)
+        self._messages[message.id] = message
+        self._stats.total_published += 1
+        return True
+
+    def _update_sizes_locked(self) -> None:
+        self._stats.pending_messages = len(self._messages)
+        self._stats.topics = len(self._queues)
+
     def publish(self, message: Message) -> bool:
         with self._lock:
-            if len(self._messages) >= self.max_size:
+            if not self._enqueue_locked(message):
                 return False
+            self._update_sizes_locked()
+            # One message can satisfy one consumer, so wake just one waiter
+            self._conditions[message.topic].notify()
+            return True
 
-            self._queues[message.topic].append(message)
-            self._messages[message.id] = message
-            self._stats.total_published += 1
-            self._stats.pending_messages = len(self._messages)
-            self._stats.topics = len(self._queues)
+    def publish_many(self, messages: list[Message]) -> int:
+        with self._lock:
+            published: dict[str, int] = defaultdict(int)
+            for message in messages:
+                if not self._enqueue_locked(message):
+                    break
+                published[message.topic] += 1
+            self._update_sizes_locked()
+            for topic, count in published.items():
+                self._conditions[topic].notify(count)
+            return sum(published.values())
+
+    def _wait_for_messages(self, topic: str, timeout: float) -> deque[Message] | None:
+        """Wait (lock held) until ``topic`` has messages; returns its queue or None."""
+        queue = self._queues.get(topic)
+        if not queue and timeout > 0:
+            self._conditions[topic].wait_for(lambda: self._queues.get(topic), timeout)
+            queue = self._queues.get(topic)
+        return queue or None
 
-            self._conditions[message.topic].notify_all()
+    def consume(self, topic: str, timeout: float = 0) -> Message | None:
+        with self._lock:
+            queue = self._wait_for_messages(topic, timeout)
+            if queue is None:
+                return None
 
-            return True
+            message = queue.popleft()
+            message.status = MessageStatus.DELIVERED
+            self._stats.total_delivered += 1
+            return message
 
-    def consume(self, topic: str, timeout: float = 0) -> Message | None:
-        with self._conditions[topic]:
-            if not self._queues[topic]:
-                if timeout > 0:
-                    self._conditions[topic].wait(timeout)
-                if not self._queues[topic]:
-                    return None
-
-            if self._queues[topic]:
-                message = self._queues[topic].pop(0)
-                message.status = MessageStatus.DELIVERED
-                self._stats.total_delivered += 1
-                return message
+    def consume_batch(self, topic: str, max_messages: int, timeout: float = 0) -> list[Message]:
+        with self._lock:
+            queue = self._wait_for_messages(topic, timeout)
+            if queue is None:
+                return []
 
-            return None
+            count = min(max_messages, len(queue))
+            messages = [queue.popleft() for _ in range(count)]
+            for message in messages:
+                message.status = MessageStatus.DELIVERED
+            self._stats.total_delivered += count
+            return messages
 
     def acknowledge(self, message_id: str) -> bool:
         with self._lock:
@@ -236,8 +290,8 @@ class RedisQueueBackend(MessageQueueBackend):
     def _message_key(self, message_id: str) -> str:
         return f"{self.prefix}msg:{message_id}"
 
-    def publish(self, message: Message) -> bool:
-        message_data = json.dumps(
+    def _encode(self, message: Message) -> str:
+        return json.dumps(
             {
                 "id": message.id,
                 "topic": message.topic,
@@ -254,12 +308,39 @@ class RedisQueueBackend(MessageQueueBackend):
             }
         )
 
-        self.client.hset(self._message_key(message.id), "data", message_data)
+    def _decode_delivered(self, message_data: str) -> Message:
+        data = json.loads(message_data)
+        return Message(
+            id=data["id"],
+            topic=data["topic"],
+            payload=data.get("payload"),
+            headers=data.get("headers", {}),
+            status=MessageStatus.DELIVERED,
+            created_at=data["created_at"],
+            expires_at=data.get("expires_at"),
+            retry_count=data.get("retry_count", 0),
+            max_retries=data.get("max_retries", 3),
+            priority=data.get("priority", 0),
+            correlation_id=data.get("correlation_id"),
+            reply_to=data.get("reply_to"),
+        )
+
+    def publish(self, message: Message) -> bool:
+        self.client.hset(self._message_key(message.id), "data", self._encode(message))
         self.client.rpush(self._topic_key(message.topic), message.id)
         self._stats.total_published += 1
 
         return True
 
+    def publish_many(self, messages: list[Message]) -> int:
+        pipe = self.client.pipeline(transaction=False)
+        for message in messages:
+            pipe.hset(self._message_key(message.id), "data", self._encode(message))
+            pipe.rpush(self._topic_key(message.topic), message.id)
+        pipe.execute()
+        self._stats.total_published += len(messages)
+        return len(messages)
+
     def consume(self, topic: str, timeout: float = 0) -> Message | None:
         result = self.client.blpop(self._topic_key(topic), timeout=int(timeout) if timeout else 0)
 
@@ -272,25 +353,26 @@ class RedisQueueBackend(MessageQueueBackend):
         if not message_data:
             return None
 
-        data = json.loads(message_data)
-        message = Message(
-            id=data["id"],
-            topic=data["topic"],
-            payload=data.get("payload"),
-            headers=data.get("headers", {}),
-            status=MessageStatus.DELIVERED,
-            created_at=data["created_at"],
-            expires_at=data.get("expires_at"),
-            retry_count=data.get("retry_count", 0),
-            max_retries=data.get("max_retries", 3),
-            priority=data.get("priority", 0),
-            correlation_id=data.get("correlation_id"),
-            reply_to=data.get("reply_to"),
-        )
-
+        message = self._decode_delivered(message_data)
         self._stats.total_delivered += 1
         return message
 
+    def consume_batch(self, topic: str, max_messages: int, timeout: float = 0) -> list[Message]:
+        message_ids = self.client.lpop(self._topic_key(topic), max_messages)
+        if not message_ids:
+            if timeout > 0:
+                message = self.consume(topic, timeout)
+                return [message] if message else []
+            return []
+
+        pipe = self.client.pipeline(transaction=False)
+        for message_id in message_ids:
+            pipe.hget(self._message_key(message_id), "data")
+        messages = [self._decode_delivered(data) for data in pipe.execute() if data]
+
+        self._stats.total_delivered += len(messages)
+        return messages
+
     def acknowledge(self, message_id: str) -> bool:
         key = self._message_key(message_id)
         if self.client.exists(key):
@@ -472,6 +554,8 @@ class MessageQueue:
             return list(self._subscriptions.values())
 
 
+from legacy.message_queue.segment_log import SegmentLogBackend  # noqa: E402
+
 __all__ = [
     "MessageStatus",
     "DeliveryMode",
@@ -481,5 +565,6 @@ __all__ = [
     "MessageQueueBackend",
     "MemoryQueueBackend",
     "RedisQueueBackend",
+    "SegmentLogBackend",
     "MessageQueue",
 ]
@@ -0,0 +1,514 @@
+"""Segment Log - durable append-only message queue backend on local disk.
+
+Layout under ``directory``::
+
+    topics/<quoted topic>/<base offset>.log     records
+    topics/<quoted topic>/<base offset>.index   u64 end position per record
+    offsets/<quoted group>.json                 committed offset per topic
+
+Both files of a segment are preallocated (sparse) and memory mapped. A record
+is ``<u32 body length><u32 crc32(body)><u16 meta length>`` followed by the body:
+JSON metadata, then the payload. ``bytes`` payloads are stored raw and handed
+back as read-only ``memoryview`` slices of the mapping (zero copy); anything
+else is stored as JSON.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote, unquote
+
+from legacy.message_queue import Message, MessageQueueBackend, MessageStatus, QueueStats
+
+RECORD_HEADER = struct.Struct("<IIH")
+INDEX_ENTRY = struct.Struct("<Q")
+
+# Upper bound on records per segment relative to its size; the smallest
+# record (header plus a few metadata bytes) is well above this.
+BYTES_PER_INDEX_ENTRY = 32
+
+
+class _Segment:
+    def __init__(self, topic_dir: Path, base_offset: int, log_bytes: int | None = None):
+        self.base_offset = base_offset
+        self.log_path = topic_dir / f"{base_offset:020d}.log"
+        self.index_path = topic_dir / f"{base_offset:020d}.index"
+
+        create = log_bytes is not None
+        if create:
+            for path, size in (
+                (self.log_path, log_bytes),
+                (self.index_path, max(log_bytes // BYTES_PER_INDEX_ENTRY, 1) * INDEX_ENTRY.size),
+            ):
+                with open(path, "wb") as f:
+                    f.truncate(size)
+
+        # Both handles live as long as the segment and are closed in close().
+        self._log_file = open(self.log_path, "r+b")  # noqa: SIM115
+        self._index_file = open(self.index_path, "r+b")  # noqa: SIM115
+        self.log = mmap.mmap(self._log_file.fileno(), 0)
+        self.index = mmap.mmap(self._index_file.fileno(), 0)
+        self.capacity = len(self.index) // INDEX_ENTRY.size
+
+        self.count = 0
+        self.size = 0
+        self._synced_size = 0
+        self._last_timestamp: float | None = None
+        if not create:
+            self._recover()
+
+    def _end(self, i: int) -> int:
+        return INDEX_ENTRY.unpack_from(self.index, i * INDEX_ENTRY.size)[0]
+
+    def _recover(self) -> None:
+        # Index entries are strictly increasing and zero past the last record.
+        lo, hi = 0, self.capacity
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._end(mid):
+                lo = mid + 1
+            else:
+                hi = mid
+        self.count = lo
+        self.size = self._end(lo - 1) if lo else 0
+
+        # Re-index records that reached the log but not the index, and stop at
+        # the first torn write.
+        while self.count < self.capacity and self.size + RECORD_HEADER.size <= len(self.log):
+            body_len, crc, meta_len = RECORD_HEADER.unpack_from(self.log, self.size)
+            start = self.size + RECORD_HEADER.size
+            end = start + body_len
+            if body_len == 0 or end > len(self.log) or meta_len > body_len:
+                break
+            if zlib.crc32(self.log[start:end]) != crc:
+                self.log[self.size : end] = bytes(end - self.size)
+                break
+            INDEX_ENTRY.pack_into(self.index, self.count * INDEX_ENTRY.size, end)
+            self.count += 1
+            self.size = end
+        self._synced_size = self.size
+
+    @property
+    def next_offset(self) -> int:
+        return self.base_offset + self.count
+
+    def has_room(self, record_len: int) -> bool:
+        return self.count < self.capacity and self.size + record_len <= len(self.log)
+
+    def append(self, record: bytes) -> None:
+        end = self.size + len(record)
+        self.log[self.size : end] = record
+        INDEX_ENTRY.pack_into(self.index, self.count * INDEX_ENTRY.size, end)
+        self.count += 1
+        self.size = end
+
+    def _read_meta(self, i: int) -> tuple[dict[str, Any], int]:
+        position = self._end(i - 1) if i else 0
+        _, _, meta_len = RECORD_HEADER.unpack_from(self.log, position)
+        meta_start = position + RECORD_HEADER.size
+        payload_start = meta_start + meta_len
+        return json.loads(self.log[meta_start:payload_start]), payload_start
+
+    def read(self, offset: int) -> tuple[dict[str, Any], Any]:
+        i = offset - self.base_offset
+        meta, payload_start = self._read_meta(i)
+        payload_end = self._end(i)
+        if meta.pop("raw", False):
+            # Read-only: a consumer writing into its payload must not change the log
+            return meta, memoryview(self.log)[payload_start:payload_end].toreadonly()
+        return meta, json.loads(self.log[payload_start:payload_end])
+
+    def last_timestamp(self) -> float:
+        if self._last_timestamp is None and self.count:
+            self._last_timestamp = self._read_meta(self.count - 1)[0]["created_at"]
+        return self._last_timestamp or 0.0
+
+    def sync(self) -> None:
+        if self.size == self._synced_size:
+            return
+        start = self._synced_size - self._synced_size % mmap.ALLOCATIONGRANULARITY
+        self.log.flush(start, self.size - start)
+        self.index.flush()
+        self._synced_size = self.size
+
+    def close(self) -> None:
+        for mapping in (self.log, self.index):
+            # Consumers may still hold zero-copy payload views; the mapping is
+            # then released once they are garbage collected.
+            with contextlib.suppress(BufferError):
+                mapping.close()
+        self._log_file.close()
+        self._index_file.close()
+
+    def delete(self) -> None:
+        self.close()
+        self.log_path.unlink(missing_ok=True)
+        self.index_path.unlink(missing_ok=True)
+
+
+class _TopicLog:
+    def __init__(self, directory: Path, segment_bytes: int):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        directory.mkdir(parents=True, exist_ok=True)
+        bases = sorted(int(path.stem) for path in directory.glob("*.log"))
+        self.segments = [_Segment(directory, base) for base in bases]
+        if not self.segments:
+            self.segments.append(_Segment(directory, 0, segment_bytes))
+        self._bases = [segment.base_offset for segment in self.segments]
+
+    @property
+    def start_offset(self) -> int:
+        return self.segments[0].base_offset
+
+    @property
+    def next_offset(self) -> int:
+        return self.segments[-1].next_offset
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(segment.size for segment in self.segments)
+
+    def append(self, record: bytes) -> bool:
+        """Append a record; returns True when a new segment was rolled."""
+        active = self.segments[-1]
+        rolled = not active.has_room(len(record))
+        if rolled:
+            active.sync()
+            active = _Segment(
+                self.directory, active.next_offset, max(self.segment_bytes, len(record))
+            )
+            self.segments.append(active)
+            self._bases.append(active.base_offset)
+        active.append(record)
+        return rolled
+
+    def read(self, offset: int) -> tuple[dict[str, Any], Any]:
+        i = bisect.bisect_right(self._bases, offset) - 1
+        return self.segments[i].read(offset)
+
+    def enforce_retention(
+        self, max_bytes: int | None, max_age: float | None, keep_from: int | None = None
+    ) -> int:
+        """
+        Delete whole sealed segments past the limits; returns how many were removed.
+
+        A segment holding any offset at or above ``keep_from`` (the lowest
+        committed offset of the consumer groups) is kept.
+        """
+        removed = 0
+        cutoff = time.time() - max_age if max_age is not None else None
+        while len(self.segments) > 1:
+            oldest = self.segments[0]
+            if keep_from is not None and oldest.next_offset > keep_from:
+                break
+            too_big = max_bytes is not None and self.size_bytes > max_bytes
+            too_old = cutoff is not None and oldest.last_timestamp() < cutoff
+            if not (too_big or too_old):
+                break
+            self.segments.pop(0).delete()
+            self._bases.pop(0)
+            removed += 1
+        return removed
+
+    def sync(self) -> None:
+        self.segments[-1].sync()
+
+    def close(self) -> None:
+        for segment in self.segments:
+            segment.sync()
+            segment.close()
+
+
+@dataclass
+class _GroupCursor:
+    next_offset: int
+    inflight: dict[int, str] = field(default_factory=dict)
+
+    @property
+    def committed(self) -> int:
+        # Delivery is in offset order, so the first in-flight entry is the
+        # oldest unacknowledged message.
+        return next(iter(self.inflight), self.next_offset)
+
+
+class SegmentLogBackend(MessageQueueBackend):
+    """Kafka-style segment log on local disk with consumer-group offsets.
+
+    Delivery is at-least-once: a group's committed offset only moves past a
+    message once it and everything before it is acknowledged, so unacked
+    messages are redelivered after a restart. Every group receives every
+    message, so acknowledgements are per group: pass the same ``group`` to
+    :meth:`acknowledge` as to :meth:`consume`. Appends are made durable in
+    batches, every ``fsync_messages`` messages or ``fsync_interval`` seconds
+    (checked on publish/ack), and on :meth:`flush` / :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        consumer_group: str = "default",
+        segment_bytes: int = 64 * 1024 * 1024,
+        fsync_interval: float = 1.0,
+        fsync_messages: int = 1000,
+        retention_bytes: int | None = None,
+        retention_seconds: float | None = None,
+    ):
+        self.directory = Path(directory)
+        self.consumer_group = consumer_group
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.fsync_messages = fsync_messages
+        self.retention_bytes = retention_bytes
+        self.retention_seconds = retention_seconds
+
+        self._topics_dir = self.directory / "topics"
+        self._offsets_dir = self.directory / "offsets"
+        self._topics_dir.mkdir(parents=True, exist_ok=True)
+        self._offsets_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conditions: dict[str, threading.Condition] = defaultdict(
+            lambda: threading.Condition(self._lock)
+        )
+        self._topics: dict[str, _TopicLog] = {
+            unquote(path.name): _TopicLog(path, segment_bytes)
+            for path in self._topics_dir.iterdir()
+            if path.is_dir()
+        }
+        self._cursors: dict[str, dict[str, _GroupCursor]] = {}
+        self._inflight: dict[tuple[str, str], tuple[str, int]] = {}
+        self._dirty_groups: set[str] = set()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._stats = QueueStats(topics=len(self._topics))
+
+    # -- encoding -----------------------------------------------------------
+
+    @staticmethod
+    def _encode(message: Message) -> bytes:
+        payload = message.payload
+        raw = isinstance(payload, (bytes, bytearray, memoryview))
+        meta = json.dumps(
+            {
+                "id": message.id,
+                "headers": message.headers,
+                "created_at": message.created_at,
+                "expires_at": message.expires_at,
+                "retry_count": message.retry_count,
+                "max_retries": message.max_retries,
+                "priority": message.priority,
+                "correlation_id": message.correlation_id,
+                "reply_to": message.reply_to,
+                "raw": raw,
+            }
+        ).encode()
+        body = meta + (bytes(payload) if raw else json.dumps(payload).encode())
+        return RECORD_HEADER.pack(len(body), zlib.crc32(body), len(meta)) + body
+
+    @staticmethod
+    def _decode(topic: str, meta: dict[str, Any], payload: Any, status: MessageStatus) -> Message:
+        return Message(topic=topic, payload=payload, status=status, **meta)
+
+    # -- topics and cursors -------------------------------------------------
+
+    def _topic(self, topic: str) -> _TopicLog:
+        log = self._topics.get(topic)
+        if log is None:
+            log = _TopicLog(self._topics_dir / quote(topic, safe=""), self.segment_bytes)
+            self._topics[topic] = log
+            self._stats.topics = len(self._topics)
+        return log
+
+    def _offsets_path(self, group: str) -> Path:
+        return self._offsets_dir / f"{quote(group, safe='')}.json"
+
+    def _group_cursors(self, group: str) -> dict[str, _GroupCursor]:
+        cursors = self._cursors.get(group)
+        if cursors is None:
+            path = self._offsets_path(group)
+            committed = json.loads(path.read_text()) if path.exists() else {}
+            cursors = {name: _GroupCursor(offset) for name, offset in committed.items()}
+            self._cursors[group] = cursors
+        return cursors
+
+    def _cursor(self, group: str, topic: str) -> _GroupCursor:
+        cursors = self._group_cursors(group)
+        cursor = cursors.get(topic)
+        if cursor is None:
+            cursor = cursors[topic] = _GroupCursor(0)
+
+        log = self._topics.get(topic)
+        if log is not None and cursor.next_offset < log.start_offset:
+            cursor.next_offset = log.start_offset
+        return cursor
+
+    # -- durability ---------------------------------------------------------
+
+    def _save_offsets_locked(self) -> None:
+        for group in self._dirty_groups:
+            committed = {topic: cursor.committed for topic, cursor in self._cursors[group].items()}
+            path = self._offsets_path(group)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(committed))
+            os.replace(tmp, path)
+        self._dirty_groups.clear()
+
+    def _sync_locked(self) -> None:
+        for log in self._topics.values():
+            log.sync()
+        self._save_offsets_locked()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _maybe_sync_locked(self) -> None:
+        if (
+            self._unsynced >= self.fsync_messages
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self._sync_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._sync_locked()
+
+    def _min_committed_locked(self, topic: str) -> int | None:
+        """Lowest committed offset of ``topic`` across all known groups, or None."""
+        # Groups with saved offsets count even if this process never used them.
+        for path in self._offsets_dir.glob("*.json"):
+            self._group_cursors(unquote(path.stem))
+        committed = [
+            cursors[topic].committed for cursors in self._cursors.values() if topic in cursors
+        ]
+        return min(committed, default=None)
+
+    def enforce_retention(self) -> int:
+        """
+        Apply size/age retention to every topic; returns segments removed.
+
+        Segments a consumer group has not yet committed past are never removed.
+        """
+        with self._lock:
+            return sum(
+                log.enforce_retention(
+                    self.retention_bytes, self.retention_seconds, self._min_committed_locked(topic)
+                )
+                for topic, log in self._topics.items()
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._save_offsets_locked()
+            for log in self._topics.values():
+                log.close()
+            self._topics.clear()
+
+    # -- MessageQueueBackend ------------------------------------------------
+
+    def publish(self, message: Message) -> bool:
+        return self.publish_many([message]) == 1
+
+    def publish_many(self, messages: list[Message]) -> int:
+        with self._lock:
+            rolled = False
+            topics = set()
+            for message in messages:
+                rolled |= self._topic(message.topic).append(self._encode(message))
+                topics.add(message.topic)
+
+            self._stats.total_published += len(messages)
+            self._unsynced += len(messages)
+            self._maybe_sync_locked()
+            if rolled:
+                self.enforce_retention()
+            # Every consumer group reads every message, so wake all of the
+            # topic's waiters (but only that topic's).
+            for topic in topics:
+                self._conditions[topic].notify_all()
+            return len(messages)
+
+    def _has_messages(self, group: str, topic: str) -> bool:
+        log = self._topics.get(topic)
+        return log is not None and self._cursor(group, topic).next_offset < log.next_offset
+
+    def consume(self, topic: str, timeout: float = 0, group: str | None = None) -> Message | None:
+        messages = self.consume_batch(topic, 1, timeout, group)
+        return messages[0] if messages else None
+
+    def consume_batch(
+        self, topic: str, max_messages: int, timeout: float = 0, group: str | None = None
+    ) -> list[Message]:
+        group = group or self.consumer_group
+        with self._lock:
+            if not self._has_messages(group, topic) and timeout > 0:
+                self._conditions[topic].wait_for(lambda: self._has_messages(group, topic), timeout)
+            if not self._has_messages(group, topic):
+                return []
+
+            log = self._topics[topic]
+            cursor = self._cursor(group, topic)
+            end = min(log.next_offset, cursor.next_offset + max_messages)
+            messages = []
+            for offset in range(cursor.next_offset, end):
+                meta, payload = log.read(offset)
+                message = self._decode(topic, meta, payload, MessageStatus.DELIVERED)
+                cursor.inflight[offset] = message.id
+                self._inflight[(group, message.id)] = (topic, offset)
+                messages.append(message)
+            cursor.next_offset = end
+            # Persist the group's position even before its first ack so that
+            # retention keeps its messages across a restart
+            self._dirty_groups.add(group)
+
+            self._stats.total_delivered += len(messages)
+            return messages
+
+    def acknowledge(self, message_id: str, group: str | None = None) -> bool:
+        group = group or self.consumer_group
+        with self._lock:
+            entry = self._inflight.pop((group, message_id), None)
+            if entry is None:
+                return False
+
+            topic, offset = entry
+            self._cursors[group][topic].inflight.pop(offset, None)
+            self._dirty_groups.add(group)
+            self._stats.total_acknowledged += 1
+            self._maybe_sync_locked()
+            return True
+
+    def get_pending(self, topic: str, group: str | None = None) -> list[Message]:
+        group = group or self.consumer_group
+        with self._lock:
+            log = self._topics.get(topic)
+            if log is None:
+                return []
+            cursor = self._cursor(group, topic)
+            return [
+                self._decode(topic, *log.read(offset), MessageStatus.PENDING)
+                for offset in range(max(cursor.committed, log.start_offset), log.next_offset)
+            ]
+
+    def get_stats(self) -> QueueStats:
+        with self._lock:
+            stats = QueueStats(**dict(self._stats.__dict__.items()))
+            stats.pending_messages = sum(
+                log.next_offset - self._cursor(self.consumer_group, topic).committed
+                for topic, log in self._topics.items()
+            )
+            return stats
+
+
+__all__ = ["SegmentLogBackend"]
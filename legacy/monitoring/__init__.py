@@ -4,17 +4,24 @@ Monitoring and Metrics Collection Module.
 This module provides Prometheus-compatible metrics collection
 and monitoring capabilities.
 
+Counters and histograms are sharded per thread: each writer thread updates
+its own cell without taking a lock, and cells are merged on collect.
+
 Architecture Reference:
 - Prometheus: https://prometheus.io/docs/concepts/data_model/
 - OpenMetrics: https://github.com/OpenObservability/OpenMetrics
+- Native histograms: https://prometheus.io/docs/specs/native_histograms/
 """
 
 import asyncio
+import math
 import threading
 import time
+import weakref
+from bisect import bisect_left
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 
 class MetricType(str, Enum):
@@ -36,6 +43,60 @@ class MetricSample:
     timestamp: float = field(default_factory=time.time)
 
 
+class _ThreadShards:
+    """
+    Per-thread accumulator cells.
+
+    The owning thread is the only writer of its cell, so updates need no
+    lock. Cells of threads that have exited are folded into a base cell on
+    the next ``snapshot`` so thread churn does not grow the shard list.
+    ``fold`` merges one cell into another; the default sums element-wise.
+    """
+
+    def __init__(
+        self, factory: Callable[[], list], fold: Optional[Callable[[list, list], None]] = None
+    ):
+        self._factory = factory
+        self._fold = fold or self._sum_cells
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cells: list[tuple[weakref.ref, list]] = []
+        self._base = factory()
+
+    def cell(self) -> list:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._factory()
+            with self._lock:
+                self._cells.append((weakref.ref(threading.current_thread()), cell))
+            self._local.cell = cell
+            return cell
+
+    def snapshot(self) -> list:
+        """Return every cell folded into a fresh one."""
+        with self._lock:
+            live = []
+            for thread_ref, cell in self._cells:
+                thread = thread_ref()
+                if thread is None or not thread.is_alive():
+                    self._fold(self._base, cell)
+                else:
+                    live.append((thread_ref, cell))
+            self._cells = live
+
+            total = self._factory()
+            self._fold(total, self._base)
+            for _, cell in live:
+                self._fold(total, cell)
+            return total
+
+    @staticmethod
+    def _sum_cells(into: list, cell: list):
+        for i, value in enumerate(cell):
+            into[i] += value
+
+
 class Metric:
     """Base class for metrics."""
 
@@ -44,6 +105,7 @@ class Metric:
         self.description = description
         self.labels = labels or {}
         self._lock = threading.Lock()
+        self.changed = True
 
     def _label_key(self, labels: dict[str, str]) -> str:
         """Generate a key from labels."""
@@ -64,24 +126,23 @@ class Counter(Metric):
 
     def __init__(self, name: str, description: str = "", labels: Optional[dict[str, str]] = None):
         super().__init__(name, description, labels)
-        self._value = 0.0
+        self._shards = _ThreadShards(lambda: [0.0])
 
     def inc(self, amount: float = 1.0):
         """Increment counter by amount."""
         if amount < 0:
             raise ValueError("Counter can only increase")
 
-        with self._lock:
-            self._value += amount
+        self._shards.cell()[0] += amount
+        self.changed = True
 
     def get(self) -> float:
         """Get current value."""
-        with self._lock:
-            return self._value
+        return self._shards.snapshot()[0]
 
     def collect(self) -> list[MetricSample]:
         """Collect metric samples."""
-        return [MetricSample(name=self.name, value=self._value, labels=self.labels)]
+        return [MetricSample(name=self.name, value=self.get(), labels=self.labels)]
 
 
 class Gauge(Metric):
@@ -103,16 +164,19 @@ class Gauge(Metric):
         """Set gauge to value."""
         with self._lock:
             self._value = value
+        self.changed = True
 
     def inc(self, amount: float = 1.0):
         """Increment gauge by amount."""
         with self._lock:
             self._value += amount
+        self.changed = True
 
     def dec(self, amount: float = 1.0):
         """Decrement gauge by amount."""
         with self._lock:
             self._value -= amount
+        self.changed = True
 
     def get(self) -> float:
         """Get current value."""
@@ -145,30 +209,40 @@ class Histogram(Metric):
     ):
         super().__init__(name, description, labels)
         self.buckets = sorted(buckets)
-        self._counts = [0.0] * (len(buckets) + 1)
-        self._sum = 0.0
-        self._count = 0.0
+        # cell layout: [sum, count, bucket_0, ..., bucket_n, +Inf]
+        size = len(self.buckets) + 3
+        self._shards = _ThreadShards(lambda: [0.0] * size)
 
     def observe(self, value: float):
         """Observe a value."""
-        with self._lock:
-            self._sum += value
-            self._count += 1
+        cell = self._shards.cell()
+        cell[0] += value
+        cell[1] += 1
+        cell[2 + bisect_left(self.buckets, value)] += 1
+        self.changed = True
 
-            for i, bucket in enumerate(self.buckets):
-                if value <= bucket:
-                    self._counts[i] += 1
-                    break
-            else:
-                self._counts[-1] += 1
+    @property
+    def _sum(self) -> float:
+        return self._shards.snapshot()[0]
+
+    @property
+    def _count(self) -> float:
+        return self._shards.snapshot()[1]
+
+    @property
+    def _counts(self) -> list[float]:
+        return self._shards.snapshot()[2:]
 
     def collect(self) -> list[MetricSample]:
         """Collect metric samples."""
         samples = []
 
+        totals = self._shards.snapshot()
+        total_sum, total_count, counts = totals[0], totals[1], totals[2:]
+
         cumulative = 0.0
         for i, bucket in enumerate(self.buckets):
-            cumulative += self._counts[i]
+            cumulative += counts[i]
             samples.append(
                 MetricSample(
                     name=f"{self.name}_bucket",
@@ -177,22 +251,132 @@ class Histogram(Metric):
                 )
             )
 
-        cumulative += self._counts[-1]
+        cumulative += counts[-1]
         samples.append(
             MetricSample(
                 name=f"{self.name}_bucket", value=cumulative, labels={**self.labels, "le": "+Inf"}
             )
         )
 
-        samples.append(MetricSample(name=f"{self.name}_sum", value=self._sum, labels=self.labels))
+        samples.append(MetricSample(name=f"{self.name}_sum", value=total_sum, labels=self.labels))
 
         samples.append(
-            MetricSample(name=f"{self.name}_count", value=self._count, labels=self.labels)
+            MetricSample(name=f"{self.name}_count", value=total_count, labels=self.labels)
         )
 
         return samples
 
 
+class LatencyHistogram(Metric):
+    """
+    High-resolution latency histogram with exponential buckets.
+
+    Uses the Prometheus native-histogram bucket layout: with schema ``s``
+    every power of two is split into ``2**s`` buckets, so the relative
+    error of any quantile is bounded (about 2.2% at the default schema 4)
+    across nanoseconds to hours, with no bucket configuration. Buckets are
+    sparse and sharded per thread. Exported in the text format as a
+    summary with fixed quantiles.
+
+    Usage:
+        latency = LatencyHistogram("get_task_seconds", "get_task latency")
+        latency.observe(0.0004)
+        latency.quantile(0.99)
+    """
+
+    DEFAULT_SCHEMA = 4
+    QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        labels: Optional[dict[str, str]] = None,
+        schema: int = DEFAULT_SCHEMA,
+    ):
+        super().__init__(name, description, labels)
+        self.schema = schema
+        self._scale = float(1 << schema)
+        # cell layout: [sparse buckets, sum, count, zero_count]
+        self._shards = _ThreadShards(lambda: [{}, 0.0, 0.0, 0.0], fold=self._fold_cells)
+
+    @staticmethod
+    def _fold_cells(into: list, cell: list):
+        buckets = into[0]
+        # the owning thread may add buckets while another thread folds its cell
+        for index, count in list(cell[0].items()):
+            buckets[index] = buckets.get(index, 0) + count
+        for i in range(1, 4):
+            into[i] += cell[i]
+
+    def _bucket_index(self, value: float) -> int:
+        return math.ceil(math.log2(value) * self._scale)
+
+    def bucket_upper_bound(self, index: int) -> float:
+        return 2.0 ** (index / self._scale)
+
+    def observe(self, value: float):
+        """Observe a value (in seconds)."""
+        cell = self._shards.cell()
+        cell[1] += value
+        cell[2] += 1
+        if value <= 0:
+            cell[3] += 1
+        else:
+            buckets = cell[0]
+            index = self._bucket_index(value)
+            buckets[index] = buckets.get(index, 0) + 1
+        self.changed = True
+
+    def snapshot(self) -> tuple[dict[int, int], float, float, float]:
+        """Return merged (buckets, sum, count, zero_count)."""
+        buckets, total_sum, count, zero_count = self._shards.snapshot()
+        return buckets, total_sum, count, zero_count
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (upper bound of the bucket holding it)."""
+        buckets, _, count, zero_count = self.snapshot()
+        if count == 0:
+            return 0.0
+
+        rank = q * count
+        if rank <= zero_count:
+            return 0.0
+
+        cumulative = zero_count
+        for index in sorted(buckets):
+            cumulative += buckets[index]
+            if cumulative >= rank:
+                return self.bucket_upper_bound(index)
+        return self.bucket_upper_bound(max(buckets))
+
+    def collect(self) -> list[MetricSample]:
+        """Collect metric samples."""
+        buckets, total_sum, count, zero_count = self.snapshot()
+        ordered = sorted(buckets.items())
+
+        samples = []
+        for q in self.QUANTILES:
+            value = 0.0
+            rank = q * count
+            if count and rank > zero_count:
+                cumulative = zero_count
+                for index, bucket_count in ordered:
+                    cumulative += bucket_count
+                    value = self.bucket_upper_bound(index)
+                    if cumulative >= rank:
+                        break
+            samples.append(
+                MetricSample(
+                    name=self.name, value=value, labels={**self.labels, "quantile": str(q)}
+                )
+            )
+
+        samples.append(MetricSample(name=f"{self.name}_sum", value=total_sum, labels=self.labels))
+        samples.append(MetricSample(name=f"{self.name}_count", value=count, labels=self.labels))
+        return samples
+
+
 class MetricsRegistry:
     """
     Central registry for all metrics.
@@ -206,12 +390,23 @@ class MetricsRegistry:
 
         # Export in Prometheus format
         output = registry.export_prometheus()
+
+    The exposition text is cached and only rebuilt when some metric has
+    changed and the cache is at least ``cache_ttl_ms`` old.
     """
 
-    def __init__(self, namespace: str = "idle_accelerator"):
+    DEFAULT_CACHE_TTL_MS = 0
+
+    def __init__(
+        self, namespace: str = "idle_accelerator", cache_ttl_ms: float = DEFAULT_CACHE_TTL_MS
+    ):
         self.namespace = namespace
+        self.cache_ttl_ms = cache_ttl_ms
         self._metrics: dict[str, Metric] = {}
         self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._export_cache: Optional[str] = None
+        self._export_time = 0.0
 
     def register(self, metric: Metric) -> Metric:
         """Register a metric."""
@@ -219,12 +414,14 @@ class MetricsRegistry:
             if metric.name in self._metrics:
                 return self._metrics[metric.name]
             self._metrics[metric.name] = metric
+            self._export_cache = None
             return metric
 
     def unregister(self, name: str):
         """Unregister a metric."""
         with self._lock:
             self._metrics.pop(name, None)
+            self._export_cache = None
 
     def counter(self, name: str, description: str = "") -> Counter:
         """Get or create a counter."""
@@ -243,6 +440,13 @@ class MetricsRegistry:
         full_name = f"{self.namespace}_{name}"
         return self.register(Histogram(full_name, description, buckets=buckets))
 
+    def latency_histogram(
+        self, name: str, description: str = "", schema: int = LatencyHistogram.DEFAULT_SCHEMA
+    ) -> LatencyHistogram:
+        """Get or create a high-resolution latency histogram."""
+        full_name = f"{self.namespace}_{name}"
+        return self.register(LatencyHistogram(full_name, description, schema=schema))
+
     def collect_all(self) -> list[MetricSample]:
         """Collect all metric samples."""
         samples = []
@@ -253,27 +457,41 @@ class MetricsRegistry:
 
     def export_prometheus(self) -> str:
         """Export metrics in Prometheus text format."""
-        lines = []
+        with self._export_lock:
+            with self._lock:
+                metrics = list(self._metrics.values())
+                cached = self._export_cache
 
-        samples = self.collect_all()
+            if cached is not None:
+                age_ms = (time.monotonic() - self._export_time) * 1000
+                if age_ms < self.cache_ttl_ms or not any(m.changed for m in metrics):
+                    return cached
 
-        current_metric = None
-        for sample in samples:
-            base_name = sample.name.split("_bucket")[0].split("_sum")[0].split("_count")[0]
+            for metric in metrics:
+                metric.changed = False
 
-            if base_name != current_metric:
-                for name, metric in self._metrics.items():
-                    if name == base_name:
-                        lines.append(f"# HELP {base_name} {metric.description}")
-                        lines.append(f"# TYPE {base_name} {self._get_type(metric)}")
-                        break
-                current_metric = base_name
+            output = self._render(metrics)
 
-            label_str = ""
-            if sample.labels:
-                label_str = "{" + ", ".join(f'{k}="{v}"' for k, v in sample.labels.items()) + "}"
+            with self._lock:
+                self._export_cache = output
+                self._export_time = time.monotonic()
+            return output
+
+    def _render(self, metrics: list[Metric]) -> str:
+        lines = []
 
-            lines.append(f"{sample.name}{label_str} {sample.value}")
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {self._get_type(metric)}")
+
+            for sample in metric.collect():
+                label_str = ""
+                if sample.labels:
+                    label_str = (
+                        "{" + ", ".join(f'{k}="{v}"' for k, v in sample.labels.items()) + "}"
+                    )
+
+                lines.append(f"{sample.name}{label_str} {sample.value}")
 
         return "\n".join(lines)
 
@@ -285,6 +503,8 @@ class MetricsRegistry:
             return "gauge"
         elif isinstance(metric, Histogram):
             return "histogram"
+        elif isinstance(metric, LatencyHistogram):
+            return "summary"
         return "unknown"
 
 
@@ -303,6 +523,8 @@ class SystemMonitor:
         prometheus_output = monitor.export_prometheus()
     """
 
+    HOT_PATHS = ("get_task_for_node", "complete_task")
+
     def __init__(self, registry: Optional[MetricsRegistry] = None):
         self.registry = registry or MetricsRegistry()
 
@@ -324,6 +546,13 @@ class SystemMonitor:
             "scheduler_latency_seconds", "Scheduler decision latency"
         )
 
+        self.hot_path_latency = {
+            operation: self.registry.latency_histogram(
+                f"{operation}_seconds", f"Latency of scheduler {operation}"
+            )
+            for operation in self.HOT_PATHS
+        }
+
         self._running = False
         self._task: Optional[asyncio.Task] = None
 
@@ -363,6 +592,12 @@ class SystemMonitor:
         """Record scheduler decision latency."""
         self.scheduler_latency.observe(latency)
 
+    def record_hot_path_latency(self, operation: str, latency: float):
+        """Record latency of a scheduler hot path (see HOT_PATHS)."""
+        histogram = self.hot_path_latency.get(operation)
+        if histogram is not None:
+            histogram.observe(latency)
+
     def get_stats(self) -> dict[str, Any]:
         """Get current statistics."""
         return {
@@ -378,6 +613,10 @@ class SystemMonitor:
                 "available": self.nodes_available.get(),
                 "offline": self.nodes_offline.get(),
             },
+            "latency": {
+                operation: {f"p{q * 100:g}": histogram.quantile(q) for q in (0.5, 0.99)}
+                for operation, histogram in self.hot_path_latency.items()
+            },
         }
 
     def export_prometheus(self) -> str:
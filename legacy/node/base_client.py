@@ -16,6 +16,8 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Optional
 
+from serializer.http import decode_response, request_headers
+
 logger = logging.getLogger(__name__)
 
 
@@ -228,11 +230,12 @@ class BaseNodeClient(ABC):
             response = requests.get(
                 f"{self.config.scheduler_url}/get_task",
                 params={"node_id": self.node_id},
+                headers=request_headers(),
                 timeout=10,
             )
 
             if response.status_code == 200:
-                data = response.json()
+                data = decode_response(response)
                 if data.get("task_id"):
                     return data
 
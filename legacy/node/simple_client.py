@@ -61,6 +61,18 @@ except ImportError:
     log("建议安装: pip install psutil")
     PSUTIL_AVAILABLE = False
 
+# 协商序列化需要仓库根目录在导入路径中，单独部署时只用 JSON
+try:
+    from serializer.http import decode_response, request_headers
+except ImportError:
+
+    def request_headers() -> dict[str, str]:
+        return {"Accept": "application/json"}
+
+    def decode_response(response: Any) -> Any:
+        return response.json()
+
+
 # 配置
 SERVER_URL = "http://localhost:8000"
 CHECK_INTERVAL = 30
@@ -465,10 +477,11 @@ else:
             response = requests.get(
                 f"{self.server_url}/get_task",
                 params={"node_id": self.node_id, "device_type": self.device_type},
+                headers=request_headers(),
                 timeout=10,
             )
             if response.status_code == 200:
-                return response.json()
+                return decode_response(response)
             return None
         except Exception as e:
             log(f"获取任务失败: {e}")
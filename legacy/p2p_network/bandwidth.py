@@ -6,17 +6,26 @@ Implements:
 - Per-connection bandwidth limits
 - Global bandwidth management
 - Traffic statistics
+- Async pacing with weighted fair queueing across connections
 
 References:
 - Token Bucket: Turner, "New Directions in Communications" (1986)
+- WFQ: Demers, Keshav & Shenker, "Analysis and Simulation of a Fair Queueing Algorithm" (1989)
 """
 
+import asyncio
+import heapq
+import itertools
 import time
 from dataclasses import dataclass, field
 from enum import IntEnum
 from typing import Any, Optional
 
 
+class BandwidthUnavailableError(RuntimeError):
+    """Raised to a queued ``acquire`` whose bucket can never refill."""
+
+
 class TrafficPriority(IntEnum):
     LOW = 0
     NORMAL = 1
@@ -24,6 +33,14 @@ class TrafficPriority(IntEnum):
     CRITICAL = 3
 
 
+PRIORITY_WEIGHTS = {
+    TrafficPriority.LOW: 1,
+    TrafficPriority.NORMAL: 2,
+    TrafficPriority.HIGH: 4,
+    TrafficPriority.CRITICAL: 8,
+}
+
+
 @dataclass
 class BandwidthConfig:
     """Configuration for bandwidth limiting."""
@@ -39,37 +56,58 @@ class BandwidthConfig:
 
 @dataclass
 class TokenBucket:
-    """Token bucket for rate limiting."""
+    """
+    Token bucket for rate limiting.
+
+    Uses ``time.monotonic``; callers that already read the clock can pass
+    ``now`` to avoid a second read.
+    """
 
     capacity: int
     refill_rate: float
     tokens: float = 0.0
-    last_refill: float = field(default_factory=time.time)
+    last_refill: float = field(default_factory=time.monotonic)
 
-    def refill(self):
+    def refill(self, now: Optional[float] = None):
         """Refill tokens based on elapsed time."""
-        now = time.time()
+        if now is None:
+            now = time.monotonic()
         elapsed = now - self.last_refill
-        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
         self.last_refill = now
 
-    def consume(self, amount: int) -> bool:
+    def consume(self, amount: int, now: Optional[float] = None) -> bool:
         """Try to consume tokens."""
-        self.refill()
+        self.refill(now)
         if self.tokens >= amount:
             self.tokens -= amount
             return True
         return False
 
-    def wait_time(self, amount: int) -> float:
+    def wait_time(self, amount: int, now: Optional[float] = None) -> float:
         """Calculate time to wait for enough tokens."""
-        self.refill()
+        self.refill(now)
         if self.tokens >= amount:
             return 0.0
+        if self.refill_rate <= 0:
+            return float("inf")
         needed = amount - self.tokens
         return needed / self.refill_rate
 
 
+@dataclass(order=True)
+class _Waiter:
+    """A queued ``acquire`` call, ordered by its fair-queueing finish tag."""
+
+    finish_tag: float
+    seq: int
+    size: int = field(compare=False)
+    priority: TrafficPriority = field(compare=False)
+    connection_id: Optional[str] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
 @dataclass
 class ConnectionStats:
     """Statistics for a connection."""
@@ -104,6 +142,16 @@ class BandwidthManager:
     - Per-connection limits
     - Global bandwidth management
     - Traffic statistics
+    - ``acquire`` for async callers: sends that fit are granted with a single
+      clock read; the rest wait in a weighted fair queue (weights from
+      ``PRIORITY_WEIGHTS``, one flow per connection) and are woken exactly
+      when the bucket has refilled enough, without polling.
+
+    Messages larger than a bucket's capacity are admitted once the bucket
+    is full and drive it negative, so oversized transfers are paced rather
+    than rejected forever. A queued ``acquire`` whose bucket does not refill
+    at all (``refill_rate`` of 0) fails with ``BandwidthUnavailableError``
+    instead of waiting forever.
     """
 
     def __init__(self, config: BandwidthConfig = None):
@@ -119,6 +167,12 @@ class BandwidthManager:
         self._connections: dict[str, ConnectionStats] = {}
         self._connection_buckets: dict[str, TokenBucket] = {}
 
+        self._waiters: list[_Waiter] = []
+        self._flow_finish: dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
         self._stats = {
             "total_bytes_sent": 0,
             "total_bytes_received": 0,
@@ -126,6 +180,7 @@ class BandwidthManager:
             "total_packets_received": 0,
             "throttled_count": 0,
             "connections_created": 0,
+            "acquire_waits": 0,
         }
 
     def register_connection(self, connection_id: str):
@@ -144,28 +199,124 @@ class BandwidthManager:
         """Unregister a connection."""
         self._connections.pop(connection_id, None)
         self._connection_buckets.pop(connection_id, None)
+        self._flow_finish.pop(connection_id, None)
+
+    def _try_consume(self, size: int, connection_id: Optional[str], now: float) -> bool:
+        """Take ``size`` tokens from the upload and connection buckets, or neither."""
+        upload = self.upload_bucket
+        upload.refill(now)
+        if upload.tokens < min(size, upload.capacity):
+            return False
+
+        conn_bucket = self._connection_buckets.get(connection_id) if connection_id else None
+        if conn_bucket is not None:
+            conn_bucket.refill(now)
+            if conn_bucket.tokens < min(size, conn_bucket.capacity):
+                return False
+            conn_bucket.tokens -= size
+
+        upload.tokens -= size
+        return True
+
+    def _send_wait_time(self, size: int, connection_id: Optional[str], now: float) -> float:
+        """Seconds until ``_try_consume`` can succeed for this size."""
+        upload = self.upload_bucket
+        wait = upload.wait_time(min(size, upload.capacity), now)
+
+        conn_bucket = self._connection_buckets.get(connection_id) if connection_id else None
+        if conn_bucket is not None:
+            wait = max(wait, conn_bucket.wait_time(min(size, conn_bucket.capacity), now))
+
+        return wait
 
     def can_send(self, size: int, connection_id: str = None) -> bool:
         """Check if we can send data."""
-        if not self.upload_bucket.consume(size):
+        if not self._try_consume(size, connection_id, time.monotonic()):
             self._stats["throttled_count"] += 1
             return False
+        return True
 
-        return not (
-            connection_id
-            and connection_id in self._connection_buckets
-            and not self._connection_buckets[connection_id].consume(size)
+    async def acquire(
+        self,
+        size: int,
+        priority: TrafficPriority = TrafficPriority.NORMAL,
+        connection_id: str = None,
+    ):
+        """
+        Wait until ``size`` bytes may be sent, then reserve them.
+
+        Args:
+            size: Number of bytes to send
+            priority: Traffic class; higher classes get a larger fair share
+            connection_id: Connection to charge (and to queue fairly against)
+
+        Raises:
+            BandwidthUnavailableError: If the tokens can never become available
+        """
+        if not self._waiters and self._try_consume(size, connection_id, time.monotonic()):
+            return
+
+        loop = asyncio.get_running_loop()
+        flow = connection_id or f"priority:{priority.name}"
+        start = max(self._virtual_time, self._flow_finish.get(flow, 0.0))
+        finish_tag = start + size / PRIORITY_WEIGHTS[priority]
+        self._flow_finish[flow] = finish_tag
+
+        waiter = _Waiter(
+            finish_tag=finish_tag,
+            seq=next(self._seq),
+            size=size,
+            priority=priority,
+            connection_id=connection_id,
+            future=loop.create_future(),
         )
+        heapq.heappush(self._waiters, waiter)
+        self._stats["acquire_waits"] += 1
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch_waiters())
+
+        await waiter.future
+
+    async def _dispatch_waiters(self):
+        """Grant queued acquires in finish-tag order as tokens become available."""
+        while self._waiters:
+            waiter = self._waiters[0]
+            if waiter.future.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            now = time.monotonic()
+            if self._try_consume(waiter.size, waiter.connection_id, now):
+                heapq.heappop(self._waiters)
+                self._virtual_time = waiter.finish_tag
+                waiter.future.set_result(None)
+                continue
+
+            wait = self._send_wait_time(waiter.size, waiter.connection_id, now)
+            if wait == float("inf"):
+                heapq.heappop(self._waiters)
+                waiter.future.set_exception(
+                    BandwidthUnavailableError(
+                        f"No bandwidth will become available for {waiter.size} bytes"
+                    )
+                )
+                continue
+            await asyncio.sleep(wait)
+
+        self._flow_finish.clear()
+        self._virtual_time = 0.0
 
     def can_receive(self, size: int, connection_id: str = None) -> bool:
         """Check if we can receive data."""
-        if not self.download_bucket.consume(size):
+        now = time.monotonic()
+        if not self.download_bucket.consume(size, now):
             return False
 
         return not (
             connection_id
             and connection_id in self._connection_buckets
-            and not self._connection_buckets[connection_id].consume(size)
+            and not self._connection_buckets[connection_id].consume(size, now)
         )
 
     def record_send(self, size: int, connection_id: str = None):
@@ -212,6 +363,12 @@ class BandwidthManager:
             "active_connections": len(self._connections),
             "upload_tokens": self.upload_bucket.tokens,
             "download_tokens": self.download_bucket.tokens,
+            "waiting": {
+                priority.name: sum(
+                    1 for w in self._waiters if w.priority == priority and not w.future.done()
+                )
+                for priority in TrafficPriority
+            },
         }
 
     def cleanup_idle_connections(self, max_idle_time: float = 300.0):
@@ -228,7 +385,9 @@ class BandwidthManager:
 
 
 __all__ = [
+    "BandwidthUnavailableError",
     "TrafficPriority",
+    "PRIORITY_WEIGHTS",
     "BandwidthConfig",
     "TokenBucket",
     "ConnectionStats",
@@ -6,6 +6,8 @@ Implements data replication for the Kademlia DHT:
 - Periodic data refresh
 - Republishing mechanism
 - Data consistency checks
+- Batched per-node replication frames
+- Merkle-tree anti-entropy so refresh only re-sends keys that differ
 
 References:
 - Kademlia: Maymounkov & Mazieres, "A Peer-to-Peer Information System" (2002)
@@ -13,14 +15,30 @@ References:
 """
 
 import asyncio
+import bisect
 import contextlib
 import hashlib
+import heapq
+import json
 import time
 from collections import OrderedDict
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Callable, Optional
 
+from legacy.p2p_network.bandwidth import BandwidthManager
+
+
+def hash64(key: str) -> int:
+    """Stable 64-bit hash of a string (BLAKE2b, 8-byte digest)."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+def value_checksum(value: Any) -> str:
+    """Content hash of a stored value, used to detect unchanged replicas."""
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
 
 class ReplicationStatus(Enum):
     PENDING = "pending"
@@ -43,6 +61,11 @@ class ReplicatedValue:
     status: ReplicationStatus = ReplicationStatus.PENDING
     last_refresh: float = field(default_factory=time.time)
     version: int = 1
+    checksum: str = ""
+
+    def __post_init__(self):
+        if not self.checksum:
+            self.checksum = value_checksum(self.value)
 
     def is_expired(self) -> bool:
         """Check if the value has expired."""
@@ -65,6 +88,7 @@ class ReplicatedValue:
             "status": self.status.value,
             "last_refresh": self.last_refresh,
             "version": self.version,
+            "checksum": self.checksum,
         }
 
     @classmethod
@@ -81,6 +105,7 @@ class ReplicatedValue:
             status=ReplicationStatus(data.get("status", "pending")),
             last_refresh=data.get("last_refresh", time.time()),
             version=data.get("version", 1),
+            checksum=data.get("checksum", ""),
         )
 
 
@@ -106,6 +131,75 @@ class ReplicationTask:
         return len(self.completed_nodes)
 
 
+class MerkleTree:
+    """
+    Fixed-fanout Merkle tree over (key, version, checksum) entries.
+
+    Keys are hashed into ``bucket_count`` leaves, so two nodes holding the
+    same key set produce identical trees regardless of insertion order.
+    Comparing roots detects any divergence in one message; comparing
+    leaves narrows it down to the buckets that have to be re-sent.
+    """
+
+    DEFAULT_BUCKETS = 256
+
+    def __init__(self, leaves: list[str]):
+        if not leaves:
+            raise ValueError("MerkleTree needs at least one leaf")
+
+        self.levels: list[list[str]] = [list(leaves)]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            self.levels.append([self._combine(level[i : i + 2]) for i in range(0, len(level), 2)])
+
+    @staticmethod
+    def _combine(parts: list[str]) -> str:
+        return hashlib.blake2b("".join(parts).encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def bucket_of(key: str, bucket_count: int = DEFAULT_BUCKETS) -> int:
+        return hash64(key) % bucket_count
+
+    @classmethod
+    def from_entries(
+        cls, entries: list[tuple[str, int, str]], bucket_count: int = DEFAULT_BUCKETS
+    ) -> "MerkleTree":
+        """Build a tree from ``(key, version, checksum)`` tuples."""
+        buckets: list[list[str]] = [[] for _ in range(bucket_count)]
+        for key, version, checksum in entries:
+            buckets[cls.bucket_of(key, bucket_count)].append(f"{key}|{version}|{checksum}")
+
+        return cls([cls._combine(sorted(bucket)) for bucket in buckets])
+
+    @property
+    def root(self) -> str:
+        return self.levels[-1][0]
+
+    @property
+    def leaves(self) -> list[str]:
+        return self.levels[0]
+
+    def diff(self, other_leaves: list[str]) -> list[int]:
+        """Return the leaf indices that differ from another tree's leaves."""
+        if len(other_leaves) != len(self.leaves):
+            return list(range(len(self.leaves)))
+
+        other = MerkleTree(other_leaves)
+        if other.root == self.root:
+            return []
+
+        differing = [0]
+        for depth in range(len(self.levels) - 2, -1, -1):
+            mine, theirs = self.levels[depth], other.levels[depth]
+            differing = [
+                child
+                for parent in differing
+                for child in (2 * parent, 2 * parent + 1)
+                if child < len(mine) and mine[child] != theirs[child]
+            ]
+        return differing
+
+
 class DHTReplicationManager:
     """
     Manages DHT data replication.
@@ -115,12 +209,20 @@ class DHTReplicationManager:
     - Automatic data refresh
     - Failure recovery
     - Consistency checks
+    - Per-node batched replica frames, paced by an optional BandwidthManager
+    - Delta refresh: replicas already acknowledged at the current
+      version/checksum are skipped, and Merkle anti-entropy re-sends only
+      the buckets a peer reports as different, once per divergence
+    - ``handle_message`` dispatches incoming ``store_replica_batch`` and
+      ``merkle_sync`` messages, so a transport only has to route them here
     """
 
     DEFAULT_REPLICATION_FACTOR = 3
     REFRESH_INTERVAL = 3600
     REPLICATION_TIMEOUT = 30.0
     MAX_PENDING_TASKS = 1000
+    MAX_BATCH_SIZE = 100
+    MAX_CONCURRENT_SENDS = 8
 
     def __init__(
         self,
@@ -128,15 +230,25 @@ class DHTReplicationManager:
         replication_factor: int = None,
         send_func: Callable = None,
         find_nodes_func: Callable = None,
+        bandwidth_manager: Optional[BandwidthManager] = None,
     ):
         self.node_id = node_id
         self.replication_factor = replication_factor or self.DEFAULT_REPLICATION_FACTOR
         self.send_func = send_func
         self.find_nodes_func = find_nodes_func
+        self.bandwidth_manager = bandwidth_manager
 
         self.local_storage: dict[str, ReplicatedValue] = {}
         self.pending_replications: OrderedDict[str, ReplicationTask] = OrderedDict()
         self.replica_index: dict[str, list[str]] = {}
+        self._acked: dict[str, dict[str, tuple[int, str]]] = {}
+        # node_id -> bucket -> (local leaf, peer leaf) already re-sent by anti-entropy
+        self._synced_buckets: dict[str, dict[int, tuple[str, Optional[str]]]] = {}
+
+        self._message_handlers: dict[str, Callable] = {
+            "store_replica_batch": self._handle_store_replica_batch,
+            "merkle_sync": self._handle_merkle_sync,
+        }
 
         self._running = False
         self._tasks: list[asyncio.Task] = []
@@ -145,6 +257,12 @@ class DHTReplicationManager:
             "total_replicated": 0,
             "replication_failures": 0,
             "refresh_count": 0,
+            "batches_sent": 0,
+            "bytes_sent": 0,
+            "refresh_skipped": 0,
+            "anti_entropy_rounds": 0,
+            "anti_entropy_resent": 0,
+            "bandwidth_deferred": 0,
         }
 
     async def start(self):
@@ -168,6 +286,33 @@ class DHTReplicationManager:
                 await task
         self._tasks = []
 
+    def register_handler(self, message_type: str, handler: Callable):
+        """Register a message handler."""
+        self._message_handlers[message_type] = handler
+
+    async def handle_message(self, message: dict[str, Any]) -> Any:
+        """
+        Dispatch a replication message received from another node.
+
+        Returns:
+            The handler's reply, to be sent back to the sender, or None
+            for unknown message types
+        """
+        handler = self._message_handlers.get(message.get("type"))
+        if handler is None:
+            return None
+        if asyncio.iscoroutinefunction(handler):
+            return await handler(message)
+        return handler(message)
+
+    async def _handle_store_replica_batch(self, message: dict[str, Any]) -> bool:
+        """Accept a batched replica frame; the frame counts as delivered."""
+        await self.receive_replica_batch(message.get("replicas", []))
+        return True
+
+    def _handle_merkle_sync(self, message: dict[str, Any]) -> dict[str, Any]:
+        return self.handle_merkle_sync(message)
+
     async def store(self, key: str, value: Any, ttl: float = 86400, replicate: bool = True) -> bool:
         """
         Store a value in the DHT with replication.
@@ -190,6 +335,11 @@ class DHTReplicationManager:
             replication_factor=self.replication_factor,
         )
 
+        existing = self.local_storage.get(key)
+        if existing is not None:
+            changed = existing.checksum != replicated_value.checksum
+            replicated_value.version = existing.version + (1 if changed else 0)
+
         self.local_storage[key] = replicated_value
         self._stats["total_stored"] += 1
 
@@ -229,6 +379,7 @@ class DHTReplicationManager:
         """
         if key in self.local_storage:
             del self.local_storage[key]
+            self._forget_key(key)
             return True
         return False
 
@@ -276,29 +427,99 @@ class DHTReplicationManager:
 
         return True
 
+    async def receive_replica_batch(self, replicas: list[dict[str, Any]]) -> list[str]:
+        """
+        Receive a batched replica frame from another node.
+
+        Args:
+            replicas: Entries in the ``store_replica_batch`` message format
+
+        Returns:
+            Keys that were accepted
+        """
+        accepted = []
+        for entry in replicas:
+            if await self.receive_replica(
+                key=entry["key"],
+                value=entry["value"],
+                original_publisher=entry["original_publisher"],
+                timestamp=entry["timestamp"],
+                ttl=entry["ttl"],
+                version=entry.get("version", 1),
+            ):
+                accepted.append(entry["key"])
+        return accepted
+
+    def build_merkle_tree(self, publisher: Optional[str] = None) -> MerkleTree:
+        """Build a Merkle tree over live values, optionally for one publisher."""
+        return MerkleTree.from_entries(
+            [
+                (key, value.version, value.checksum)
+                for key, value in self.local_storage.items()
+                if not value.is_expired()
+                and (publisher is None or value.original_publisher == publisher)
+            ]
+        )
+
+    def handle_merkle_sync(self, message: dict[str, Any]) -> dict[str, Any]:
+        """
+        Answer an anti-entropy request from a publisher.
+
+        Returns the bucket indices whose contents differ from the
+        publisher's view, with this node's leaf for each of them, so the
+        publisher only has to re-send those keys.
+        """
+        tree = self.build_merkle_tree(publisher=message["sender_id"])
+        if tree.root == message.get("root"):
+            return {"differing_buckets": [], "bucket_leaves": []}
+        differing = tree.diff(message.get("leaves", []))
+        return {
+            "differing_buckets": differing,
+            "bucket_leaves": [tree.leaves[bucket] for bucket in differing],
+        }
+
+    def _forget_key(self, key: str):
+        """Drop acknowledgement state for a key."""
+        self.replica_index.pop(key, None)
+        for acked in self._acked.values():
+            acked.pop(key, None)
+
+    def _is_replica_current(self, node_id: str, value: ReplicatedValue) -> bool:
+        """Check whether a node has acknowledged this exact version of a value."""
+        return self._acked.get(node_id, {}).get(value.key) == (value.version, value.checksum)
+
+    def _schedule_replication(self, key: str, value: Any, target_nodes: list[str]):
+        """Queue a key for replication, merging into an existing pending task."""
+        task = self.pending_replications.get(key)
+        if task is None:
+            self.pending_replications[key] = ReplicationTask(
+                key=key, value=value, target_nodes=list(target_nodes)
+            )
+        else:
+            task.value = value
+            task.target_nodes.extend(n for n in target_nodes if n not in task.target_nodes)
+
+        while len(self.pending_replications) > self.MAX_PENDING_TASKS:
+            self.pending_replications.popitem(last=False)
+
+    async def _find_replica_targets(self, key: str) -> list[str]:
+        """Find the nodes that should hold replicas of a key."""
+        closest_nodes = await self.find_nodes_func(key, count=self.replication_factor)
+        target_nodes = [node.node_id for node in closest_nodes if node.node_id != self.node_id]
+        return target_nodes[: self.replication_factor]
+
     async def _initiate_replication(self, key: str, value: Any, ttl: float):
         """Initiate replication of a value to closest nodes."""
         if not self.find_nodes_func:
             return
 
         try:
-            closest_nodes = await self.find_nodes_func(key, count=self.replication_factor)
-
-            target_nodes = [node.node_id for node in closest_nodes if node.node_id != self.node_id]
+            target_nodes = await self._find_replica_targets(key)
 
             if not target_nodes:
                 return
 
-            task = ReplicationTask(
-                key=key,
-                value=value,
-                target_nodes=target_nodes[: self.replication_factor],
-            )
-
-            self.pending_replications[key] = task
-
-            while len(self.pending_replications) > self.MAX_PENDING_TASKS:
-                self.pending_replications.popitem(last=False)
+            self._schedule_replication(key, value, target_nodes)
 
         except Exception as e:
             print(f"[DHT Replication] Failed to initiate replication for {key}: {e}")
@@ -311,90 +532,218 @@ class DHTReplicationManager:
             if not self.send_func:
                 continue
 
-            completed_keys = []
+            await self._process_pending_replications()
+
+    async def _process_pending_replications(self):
+        """Send one round of pending replicas, grouped into per-node frames."""
+        completed_keys = []
+        outgoing: dict[str, list[str]] = {}
+
+        for key, task in list(self.pending_replications.items()):
+            if task.is_complete:
+                completed_keys.append(key)
+                if key in self.local_storage:
+                    self.local_storage[key].status = ReplicationStatus.REPLICATED
+                    self.local_storage[key].replicas = task.completed_nodes
+                    self.replica_index[key] = list(task.completed_nodes)
+                continue
+
+            if time.time() - task.started_at > self.REPLICATION_TIMEOUT:
+                completed_keys.append(key)
+                self._stats["replication_failures"] += 1
+                continue
+
+            for node_id in task.target_nodes:
+                if node_id not in task.completed_nodes and node_id not in task.failed_nodes:
+                    outgoing.setdefault(node_id, []).append(key)
+
+        for key in completed_keys:
+            self.pending_replications.pop(key, None)
+
+        if outgoing:
+            limit = self.MAX_CONCURRENT_SENDS
+            if self.bandwidth_manager is not None:
+                limit = min(limit, self.bandwidth_manager.config.max_connections)
+            semaphore = asyncio.Semaphore(max(1, limit))
+
+            async def send_to(node_id: str, keys: list[str]):
+                async with semaphore:
+                    await self._replicate_to_node(node_id, keys)
+
+            await asyncio.gather(*(send_to(n, keys) for n, keys in outgoing.items()))
+
+        for task in self.pending_replications.values():
+            if len(task.failed_nodes) > 0 and task.retry_count < task.max_retries:
+                task.retry_count += 1
+                task.failed_nodes.clear()
+
+    async def _replicate_to_node(self, node_id: str, keys: list[str]):
+        """Send all pending keys for one node in frames of MAX_BATCH_SIZE."""
+        for start in range(0, len(keys), self.MAX_BATCH_SIZE):
+            frame_keys = keys[start : start + self.MAX_BATCH_SIZE]
+            result = await self._send_replica_batch(node_id, frame_keys)
+
+            if result is None:
+                self._stats["bandwidth_deferred"] += 1
+                return
 
-            for key, task in list(self.pending_replications.items()):
-                if task.is_complete:
-                    completed_keys.append(key)
-                    if key in self.local_storage:
-                        self.local_storage[key].status = ReplicationStatus.REPLICATED
-                        self.local_storage[key].replicas = task.completed_nodes
+            for key in frame_keys:
+                task = self.pending_replications.get(key)
+                if task is None:
                     continue
+                if result:
+                    task.completed_nodes.append(node_id)
+                    value = self.local_storage.get(key)
+                    if value is not None:
+                        self._acked.setdefault(node_id, {})[key] = (value.version, value.checksum)
+                else:
+                    task.failed_nodes.append(node_id)
+
+    async def _send_replica_batch(self, node_id: str, keys: list[str]) -> Optional[bool]:
+        """
+        Send a batched replica frame to a node.
 
-                remaining_nodes = [
-                    n
-                    for n in task.target_nodes
-                    if n not in task.completed_nodes and n not in task.failed_nodes
-                ]
-
-                for node_id in remaining_nodes[:3]:
-                    try:
-                        success = await self._send_replica(node_id, task.key, task.value)
-                        if success:
-                            task.completed_nodes.append(node_id)
-                        else:
-                            task.failed_nodes.append(node_id)
-                    except Exception:
-                        task.failed_nodes.append(node_id)
-
-                if len(task.failed_nodes) > 0 and task.retry_count < task.max_retries:
-                    task.retry_count += 1
-                    task.failed_nodes.clear()
-
-                if time.time() - task.started_at > self.REPLICATION_TIMEOUT:
-                    completed_keys.append(key)
-                    self._stats["replication_failures"] += 1
-
-            for key in completed_keys:
-                self.pending_replications.pop(key, None)
-
-    async def _send_replica(self, node_id: str, key: str, value: Any) -> bool:
-        """Send a replica to a specific node."""
+        Returns:
+            True/False for delivery, or None if the bandwidth budget
+            deferred the frame to a later round.
+        """
         if not self.send_func:
             return False
 
-        try:
+        replicas = []
+        for key in keys:
             stored_value = self.local_storage.get(key)
-            if not stored_value:
-                return False
+            if stored_value is None:
+                continue
+            replicas.append(
+                {
+                    "key": key,
+                    "value": stored_value.value,
+                    "original_publisher": stored_value.original_publisher,
+                    "timestamp": stored_value.timestamp,
+                    "ttl": stored_value.ttl,
+                    "version": stored_value.version,
+                }
+            )
+
+        if not replicas:
+            return False
+
+        message = {"type": "store_replica_batch", "sender_id": self.node_id, "replicas": replicas}
+        size = len(json.dumps(message, default=str))
+
+        if self.bandwidth_manager is not None and not self.bandwidth_manager.can_send(
+            size, connection_id=node_id
+        ):
+            return None
 
-            message = {
-                "type": "store_replica",
-                "key": key,
-                "value": value,
-                "original_publisher": stored_value.original_publisher,
-                "timestamp": stored_value.timestamp,
-                "ttl": stored_value.ttl,
-                "version": stored_value.version,
-            }
-
-            return await self.send_func(node_id, message)
+        try:
+            success = bool(await self.send_func(node_id, message))
         except Exception:
             return False
 
+        if self.bandwidth_manager is not None:
+            self.bandwidth_manager.record_send(size, connection_id=node_id)
+        self._stats["batches_sent"] += 1
+        self._stats["bytes_sent"] += size
+        return success
+
     async def _run_refresh_loop(self):
         """Periodically refresh stored values."""
         while self._running:
             await asyncio.sleep(self.REFRESH_INTERVAL / 2)
 
-            keys_to_refresh = []
-
-            for key, value in self.local_storage.items():
-                if value.original_publisher == self.node_id and value.needs_refresh(
-                    self.REFRESH_INTERVAL
-                ):
-                    keys_to_refresh.append(key)
-
-            for key in keys_to_refresh:
-                try:
-                    value = self.local_storage[key]
-                    if not value.is_expired():
-                        await self._initiate_replication(key, value.value, value.ttl)
-                        value.last_refresh = time.time()
-                        value.version += 1
-                        self._stats["refresh_count"] += 1
-                except Exception as e:
-                    print(f"[DHT Replication] Failed to refresh {key}: {e}")
+            await self._refresh_values()
+
+            for node_id in list(self._acked):
+                await self._anti_entropy(node_id)
+
+    async def _refresh_values(self):
+        """Re-replicate own values whose replicas are missing or stale."""
+        keys_to_refresh = [
+            key
+            for key, value in self.local_storage.items()
+            if value.original_publisher == self.node_id
+            and value.needs_refresh(self.REFRESH_INTERVAL)
+        ]
+
+        for key in keys_to_refresh:
+            try:
+                value = self.local_storage[key]
+                if value.is_expired():
+                    continue
+
+                if self.find_nodes_func:
+                    target_nodes = await self._find_replica_targets(key)
+                    stale = [n for n in target_nodes if not self._is_replica_current(n, value)]
+                    self._stats["refresh_skipped"] += len(target_nodes) - len(stale)
+                    if stale:
+                        self._schedule_replication(key, value.value, stale)
+
+                value.last_refresh = time.time()
+                self._stats["refresh_count"] += 1
+            except Exception as e:
+                print(f"[DHT Replication] Failed to refresh {key}: {e}")
+
+    async def _anti_entropy(self, node_id: str):
+        """
+        Compare Merkle trees with a replica node and re-send differing buckets.
+
+        The peer answers ``merkle_sync`` via ``handle_merkle_sync``; transports
+        whose ``send_func`` only returns a bool skip this round. A bucket is
+        marked as synced once re-sent, and is only re-sent again when either
+        side's leaf for it changes (e.g. the peer holds extra keys for this
+        publisher that re-sending cannot remove).
+        """
+        acked = self._acked.get(node_id)
+        if not acked or not self.send_func:
+            return
+
+        entries = []
+        for key in acked:
+            value = self.local_storage.get(key)
+            if value is not None and not value.is_expired():
+                entries.append((key, value.version, value.checksum))
+        tree = MerkleTree.from_entries(entries)
+
+        try:
+            response = await self.send_func(
+                node_id,
+                {
+                    "type": "merkle_sync",
+                    "sender_id": self.node_id,
+                    "root": tree.root,
+                    "leaves": tree.leaves,
+                },
+            )
+        except Exception:
+            return
+
+        self._stats["anti_entropy_rounds"] += 1
+        if not isinstance(response, dict):
+            return
+
+        synced = self._synced_buckets.setdefault(node_id, {})
+        buckets = response.get("differing_buckets", [])
+        peer_leaves = response.get("bucket_leaves") or [None] * len(buckets)
+
+        differing = set()
+        for bucket, peer_leaf in zip(buckets, peer_leaves):
+            marker = (tree.leaves[bucket], peer_leaf)
+            if synced.get(bucket) != marker:
+                synced[bucket] = marker
+                differing.add(bucket)
+        for bucket in set(synced) - set(buckets):
+            del synced[bucket]
+
+        if not differing:
+            return
+
+        for key, _version, _checksum in entries:
+            if MerkleTree.bucket_of(key) in differing:
+                acked.pop(key, None)
+                self._schedule_replication(key, self.local_storage[key].value, [node_id])
+                self._stats["anti_entropy_resent"] += 1
 
     async def _run_cleanup_loop(self):
         """Clean up expired values."""
@@ -405,7 +754,7 @@ class DHTReplicationManager:
 
             for key in expired_keys:
                 del self.local_storage[key]
-                self.replica_index.pop(key, None)
+                self._forget_key(key)
 
     def get_stats(self) -> dict[str, Any]:
         """Get replication statistics."""
@@ -422,12 +771,46 @@ class DHTReplicationManager:
         return [value.to_dict() for value in self.local_storage.values() if not value.is_expired()]
 
 
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _mix64(value: int) -> int:
+    """SplitMix64 finalizer, used to combine a key hash with a node seed."""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def jump_consistent_hash(key: int, num_buckets: int) -> int:
+    """
+    Map a 64-bit key to a bucket in ``[0, num_buckets)``.
+
+    Lamping & Veach, "A Fast, Minimal Memory, Consistent Hash Algorithm" (2014).
+    Growing from n to n+1 buckets moves only ~1/(n+1) of the keys.
+    """
+    if num_buckets <= 0:
+        raise ValueError("num_buckets must be positive")
+
+    b, j = -1, 0
+    key &= _MASK64
+    while j < num_buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & _MASK64
+        j = int((b + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return b
+
+
 class ConsistentHashRing:
     """
     Consistent hash ring for data partitioning.
 
     Used to determine which nodes are responsible for storing
     specific keys in a distributed manner.
+
+    ``sorted_keys`` is kept ordered incrementally, so lookups are a
+    binary search and adding or removing a node only touches that
+    node's virtual points.
     """
 
     VIRTUAL_NODES = 150
@@ -436,63 +819,60 @@ class ConsistentHashRing:
         self.virtual_nodes = virtual_nodes or self.VIRTUAL_NODES
         self.ring: dict[int, str] = {}
         self.sorted_keys: list[int] = []
+        self._node_points: dict[str, list[int]] = {}
 
     def _hash(self, key: str) -> int:
         """Generate a consistent hash for a key."""
-        return int(hashlib.md5(key.encode()).hexdigest(), 16)
+        return hash64(key)
 
     def add_node(self, node_id: str):
         """Add a node to the ring."""
+        if node_id in self._node_points:
+            return
+
+        points = []
         for i in range(self.virtual_nodes):
-            virtual_key = f"{node_id}:{i}"
-            hash_key = self._hash(virtual_key)
+            hash_key = self._hash(f"{node_id}:{i}")
+            if hash_key in self.ring:
+                continue
             self.ring[hash_key] = node_id
+            bisect.insort(self.sorted_keys, hash_key)
+            points.append(hash_key)
 
-        self.sorted_keys = sorted(self.ring.keys())
+        self._node_points[node_id] = points
 
     def remove_node(self, node_id: str):
         """Remove a node from the ring."""
-        keys_to_remove = [k for k, v in self.ring.items() if v == node_id]
-
-        for key in keys_to_remove:
-            del self.ring[key]
-
-        self.sorted_keys = sorted(self.ring.keys())
+        for hash_key in self._node_points.pop(node_id, []):
+            del self.ring[hash_key]
+            idx = bisect.bisect_left(self.sorted_keys, hash_key)
+            del self.sorted_keys[idx]
 
     def get_node(self, key: str) -> Optional[str]:
         """Get the node responsible for a key."""
         if not self.ring:
             return None
 
-        hash_key = self._hash(key)
+        idx = bisect.bisect_left(self.sorted_keys, self._hash(key))
+        if idx == len(self.sorted_keys):
+            idx = 0
 
-        for ring_key in self.sorted_keys:
-            if hash_key <= ring_key:
-                return self.ring[ring_key]
-
-        return self.ring[self.sorted_keys[0]]
+        return self.ring[self.sorted_keys[idx]]
 
     def get_nodes(self, key: str, count: int = 3) -> list[str]:
         """Get multiple nodes responsible for a key (for replication)."""
         if not self.ring:
             return []
 
-        hash_key = self._hash(key)
+        count = min(count, len(self._node_points))
+        total = len(self.sorted_keys)
+        start_idx = bisect.bisect_left(self.sorted_keys, self._hash(key))
+
         nodes = []
         seen_nodes = set()
 
-        start_idx = 0
-        for i, ring_key in enumerate(self.sorted_keys):
-            if hash_key <= ring_key:
-                start_idx = i
-                break
-        else:
-            start_idx = 0
-
-        for i in range(len(self.sorted_keys)):
-            idx = (start_idx + i) % len(self.sorted_keys)
-            ring_key = self.sorted_keys[idx]
-            node = self.ring[ring_key]
+        for i in range(total):
+            node = self.ring[self.sorted_keys[(start_idx + i) % total]]
 
             if node not in seen_nodes:
                 nodes.append(node)
@@ -504,10 +884,104 @@ class ConsistentHashRing:
         return nodes
 
 
+class JumpHashRing:
+    """
+    Jump consistent hash over a fixed-size cluster.
+
+    Needs no virtual nodes and gives near-perfect balance, but buckets are
+    positional: appending a node is minimal-disruption, while removing a
+    node from the middle moves the last node into its slot (keys of the
+    removed node and of the last node are remapped).
+    """
+
+    def __init__(self, nodes: Optional[list[str]] = None):
+        self.nodes: list[str] = []
+        for node_id in nodes or []:
+            self.add_node(node_id)
+
+    def add_node(self, node_id: str):
+        """Append a node as the next bucket."""
+        if node_id not in self.nodes:
+            self.nodes.append(node_id)
+
+    def remove_node(self, node_id: str):
+        """Remove a node, moving the last bucket into its slot."""
+        if node_id not in self.nodes:
+            return
+
+        idx = self.nodes.index(node_id)
+        last = self.nodes.pop()
+        if idx < len(self.nodes):
+            self.nodes[idx] = last
+
+    def get_node(self, key: str) -> Optional[str]:
+        """Get the node responsible for a key."""
+        if not self.nodes:
+            return None
+        return self.nodes[jump_consistent_hash(hash64(key), len(self.nodes))]
+
+    def get_nodes(self, key: str, count: int = 3) -> list[str]:
+        """Get the primary bucket plus the following buckets as replicas."""
+        if not self.nodes:
+            return []
+
+        total = len(self.nodes)
+        start_idx = jump_consistent_hash(hash64(key), total)
+        return [self.nodes[(start_idx + i) % total] for i in range(min(count, total))]
+
+
+class RendezvousHashRing:
+    """
+    Rendezvous (highest random weight) hashing.
+
+    Every node scores every key and the top scorers own it. Lookups are
+    O(nodes), so this suits small fixed-size clusters; in exchange any
+    node can be removed with only its own keys moving.
+    """
+
+    def __init__(self, nodes: Optional[list[str]] = None):
+        self._seeds: dict[str, int] = {}
+        for node_id in nodes or []:
+            self.add_node(node_id)
+
+    @property
+    def nodes(self) -> list[str]:
+        return list(self._seeds)
+
+    def add_node(self, node_id: str):
+        """Add a node."""
+        self._seeds.setdefault(node_id, hash64(node_id))
+
+    def remove_node(self, node_id: str):
+        """Remove a node."""
+        self._seeds.pop(node_id, None)
+
+    def get_node(self, key: str) -> Optional[str]:
+        """Get the node responsible for a key."""
+        if not self._seeds:
+            return None
+
+        key_hash = hash64(key)
+        return max(self._seeds, key=lambda node: _mix64(key_hash ^ self._seeds[node]))
+
+    def get_nodes(self, key: str, count: int = 3) -> list[str]:
+        """Get the ``count`` highest-scoring nodes for a key."""
+        key_hash = hash64(key)
+        return heapq.nlargest(
+            count, self._seeds, key=lambda node: _mix64(key_hash ^ self._seeds[node])
+        )
+
+
 __all__ = [
     "ReplicationStatus",
     "ReplicatedValue",
     "ReplicationTask",
+    "MerkleTree",
     "DHTReplicationManager",
     "ConsistentHashRing",
+    "JumpHashRing",
+    "RendezvousHashRing",
+    "hash64",
+    "jump_consistent_hash",
+    "value_checksum",
 ]
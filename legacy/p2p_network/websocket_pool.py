@@ -21,6 +21,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Callable, Optional
 
+from legacy.p2p_network.bandwidth import BandwidthManager, TrafficPriority
+
 
 class ConnectionState(Enum):
     CONNECTING = "connecting"
@@ -109,10 +111,12 @@ class WebSocketConnectionPool:
     - Automatic reconnection
     - Health monitoring
     - Load balancing
+    - Optional send pacing through a shared BandwidthManager
     """
 
-    def __init__(self, config: PoolConfig = None):
+    def __init__(self, config: PoolConfig = None, bandwidth_manager: BandwidthManager = None):
         self.config = config or PoolConfig()
+        self.bandwidth_manager = bandwidth_manager
 
         self._connections: dict[str, PooledConnection] = {}
         self._peer_connections: dict[str, list[str]] = {}
@@ -247,6 +251,7 @@ class WebSocketConnectionPool:
 
                 if success:
                     conn.state = ConnectionState.CONNECTED
+                    self._register_bandwidth(conn_id)
                     return conn
                 else:
                     conn.state = ConnectionState.ERROR
@@ -261,8 +266,14 @@ class WebSocketConnectionPool:
                 return None
         else:
             conn.state = ConnectionState.CONNECTED
+            self._register_bandwidth(conn_id)
             return conn
 
+    def _register_bandwidth(self, conn_id: str):
+        """Give a connected connection its own bucket in the bandwidth manager."""
+        if self.bandwidth_manager is not None:
+            self.bandwidth_manager.register_connection(conn_id)
+
     async def release_connection(self, conn_id: str):
         """Release a connection back to the pool."""
         async with self._lock:
@@ -300,16 +311,37 @@ class WebSocketConnectionPool:
         del self._connections[conn_id]
         self._stats["connections_closed"] += 1
 
-    async def send_message(self, conn_id: str, message: bytes, message_type: str = None) -> bool:
-        """Send a message through a connection."""
+        if self.bandwidth_manager is not None:
+            self.bandwidth_manager.unregister_connection(conn_id)
+
+    async def send_message(
+        self,
+        conn_id: str,
+        message: bytes,
+        message_type: str = None,
+        priority: TrafficPriority = TrafficPriority.NORMAL,
+    ) -> bool:
+        """
+        Send a message through a connection.
+
+        With a bandwidth manager attached, waits for upload tokens first so
+        large transfers are paced and connections share bandwidth fairly.
+        """
         conn = self._connections.get(conn_id)
         if not conn or not conn.is_healthy:
             return False
 
-        if len(message) > self.config.max_message_size:
+        size = len(message)
+        if size > self.config.max_message_size:
             return False
 
-        conn.record_send(len(message))
+        if self.bandwidth_manager is not None:
+            await self.bandwidth_manager.acquire(size, priority, connection_id=conn_id)
+            if not conn.is_healthy:
+                return False
+            self.bandwidth_manager.record_send(size, connection_id=conn_id)
+
+        conn.record_send(size)
         self._stats["messages_sent"] += 1
 
         return True
@@ -1,15 +1,40 @@
-"""Resource Estimator - Estimates task resource requirements."""
+"""Resource Estimator - Estimates task resource requirements.
+
+The linear-regression and percentile strategies are incremental: each
+recorded run updates per-task-type streaming state (Welford-style running
+moments with exponential forgetting, P² quantile markers), so ``record`` and
+``estimate`` cost O(1) regardless of history length. That state can be saved
+to and restored from a JSON file.
+"""
 
 from __future__ import annotations
 
+import bisect
+import json
+import os
 import statistics
+import tempfile
 import threading
 import time
 from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from enum import Enum
+from pathlib import Path
 from typing import Any
 
+STATE_VERSION = 1
+
+# TaskMetrics fields tracked by the incremental strategies
+_METRIC_FIELDS = {
+    "cpu": "actual_cpu",
+    "memory": "actual_memory",
+    "disk": "actual_disk",
+    "network": "actual_network",
+    "duration": "actual_duration",
+}
+
 
 class ResourceType(str, Enum):
     CPU = "cpu"
@@ -83,15 +108,252 @@ class TaskMetrics:
     node_id: str | None = None
 
 
+def _metric_values(metrics: TaskMetrics) -> dict[str, float]:
+    return {name: getattr(metrics, attr) for name, attr in _METRIC_FIELDS.items()}
+
+
+class RunningRegression:
+    """Streaming least-squares fit of several targets against one input.
+
+    Keeps weighted means and co-moments (Welford/West updates). Before each
+    update all previous weights are multiplied by ``decay``, so with
+    ``decay < 1`` old samples are forgotten exponentially.
+    """
+
+    def __init__(self, decay: float = 1.0):
+        self.decay = decay
+        self.count = 0
+        self.weight = 0.0
+        self.mean_x = 0.0
+        self.m2_x = 0.0
+        self.mean_y: dict[str, float] = {}
+        self.c_xy: dict[str, float] = {}
+
+    def add(self, x: float, values: dict[str, float]):
+        d = self.decay
+        self.weight = self.weight * d + 1.0
+        self.m2_x *= d
+        for key in self.c_xy:
+            self.c_xy[key] *= d
+
+        dx = x - self.mean_x
+        self.mean_x += dx / self.weight
+        self.m2_x += dx * (x - self.mean_x)
+
+        for key, y in values.items():
+            mean_y = self.mean_y.get(key, 0.0)
+            mean_y += (y - mean_y) / self.weight
+            self.mean_y[key] = mean_y
+            self.c_xy[key] = self.c_xy.get(key, 0.0) + dx * (y - mean_y)
+
+        self.count += 1
+
+    def mean(self, key: str) -> float:
+        return self.mean_y.get(key, 0.0)
+
+    def fit(self, key: str) -> tuple[float, float] | None:
+        """Return ``(slope, intercept)``, or None if all inputs were equal."""
+        if self.m2_x <= 1e-12 * max(1.0, self.mean_x * self.mean_x) * self.weight:
+            return None
+        slope = self.c_xy.get(key, 0.0) / self.m2_x
+        return slope, self.mean(key) - slope * self.mean_x
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "decay": self.decay,
+            "count": self.count,
+            "weight": self.weight,
+            "mean_x": self.mean_x,
+            "m2_x": self.m2_x,
+            "mean_y": self.mean_y,
+            "c_xy": self.c_xy,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> RunningRegression:
+        model = cls(decay=data["decay"])
+        model.count = data["count"]
+        model.weight = data["weight"]
+        model.mean_x = data["mean_x"]
+        model.m2_x = data["m2_x"]
+        model.mean_y = dict(data["mean_y"])
+        model.c_xy = dict(data["c_xy"])
+        return model
+
+
+class P2Quantile:
+    """Streaming quantile estimate with the P² algorithm (Jain & Chlamtac, 1985).
+
+    Five markers track the minimum, the quantile, the maximum and two points
+    between; each update is O(1) and the state is a few floats. Up to five
+    samples the exact order statistic is returned.
+    """
+
+    def __init__(self, quantile: float):
+        self.quantile = quantile
+        self.count = 0
+        self.heights: list[float] = []
+        self.positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.desired = [1.0, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5.0]
+        self.increments = [0.0, quantile / 2, quantile, (1 + quantile) / 2, 1.0]
+
+    def add(self, x: float):
+        self.count += 1
+        h = self.heights
+        if len(h) < 5:
+            bisect.insort(h, x)
+            return
+
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(1, 5) if x < h[i]) - 1
+
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                q = self._parabolic(i, s)
+                if not h[i - 1] < q < h[i + 1]:
+                    q = h[i] + s * (h[i + s] - h[i]) / (n[i + s] - n[i])
+                h[i] = q
+                n[i] += s
+
+    def _parabolic(self, i: int, s: int) -> float:
+        h, n = self.heights, self.positions
+        return h[i] + s / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + s) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - s) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> float:
+        if self.count == 0:
+            return 0
+        if self.count <= 5:
+            index = min(int(self.count * self.quantile), self.count - 1)
+            return self.heights[index]
+        return self.heights[2]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "quantile": self.quantile,
+            "count": self.count,
+            "heights": self.heights,
+            "positions": self.positions,
+            "desired": self.desired,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> P2Quantile:
+        sketch = cls(data["quantile"])
+        sketch.count = data["count"]
+        sketch.heights = list(data["heights"])
+        sketch.positions = list(data["positions"])
+        sketch.desired = list(data["desired"])
+        return sketch
+
+
 class EstimationStrategy(ABC):
+    # Incremental strategies keep their own state, updated by observe()
+    incremental = False
+
     @abstractmethod
     def estimate(
         self, task_type: str, input_size: int, historical_data: list[TaskMetrics]
     ) -> ResourceEstimate:
         pass
 
+    def observe(self, metrics: TaskMetrics):
+        """Fold one recorded run into the strategy's streaming state."""
+        return None
+
+    def estimate_incremental(self, task_type: str, input_size: int) -> ResourceEstimate | None:
+        """Estimate from streaming state; None if nothing was observed."""
+        return None
+
+    def forget(self, task_type: str | None = None):
+        """Drop streaming state for one task type, or all of it."""
+        return None
+
+    def state_dict(self) -> dict[str, Any]:
+        return {}
+
+    def load_state_dict(self, state: dict[str, Any]):
+        """Restore streaming state saved by state_dict()."""
+        return None
+
 
 class LinearRegressionEstimator(EstimationStrategy):
+    incremental = True
+
+    def __init__(self, decay: float = 1.0):
+        self.decay = decay
+        self._models: dict[str, RunningRegression] = {}
+
+    def observe(self, metrics: TaskMetrics):
+        if not metrics.success:
+            return
+        model = self._models.get(metrics.task_type)
+        if model is None:
+            model = self._models[metrics.task_type] = RunningRegression(self.decay)
+        model.add(metrics.input_size, _metric_values(metrics))
+
+    def estimate_incremental(self, task_type: str, input_size: int) -> ResourceEstimate | None:
+        model = self._models.get(task_type)
+        if model is None:
+            return None
+
+        fits = {key: model.fit(key) for key in _METRIC_FIELDS} if model.count >= 2 else {}
+        if not fits or fits["duration"] is None:
+            return ResourceEstimate(
+                cpu_cores=model.mean("cpu"),
+                memory_mb=model.mean("memory"),
+                disk_mb=model.mean("disk"),
+                network_mbps=model.mean("network"),
+                estimated_duration_seconds=model.mean("duration"),
+                confidence=0.5,
+                based_on_samples=model.count,
+            )
+
+        def predict(key: str) -> float:
+            fit = fits[key]
+            if fit is None:
+                return model.mean(key)
+            slope, intercept = fit
+            return slope * input_size + intercept
+
+        return ResourceEstimate(
+            cpu_cores=max(0.1, predict("cpu")),
+            memory_mb=max(64, predict("memory")),
+            estimated_duration_seconds=max(1, predict("duration")),
+            confidence=min(1.0, model.count / 10.0),
+            based_on_samples=model.count,
+        )
+
+    def forget(self, task_type: str | None = None):
+        if task_type:
+            self._models.pop(task_type, None)
+        else:
+            self._models.clear()
+
+    def state_dict(self) -> dict[str, Any]:
+        return {"models": {k: m.to_dict() for k, m in self._models.items()}}
+
+    def load_state_dict(self, state: dict[str, Any]):
+        self._models = {
+            k: RunningRegression.from_dict(m) for k, m in state.get("models", {}).items()
+        }
+
     def estimate(
         self, task_type: str, input_size: int, historical_data: list[TaskMetrics]
     ) -> ResourceEstimate:
@@ -141,7 +403,7 @@ class LinearRegressionEstimator(EstimationStrategy):
             confidence=0.5,
         )
 
-    def _linear_regression(self, x: list[float], y: list[float]) -> tuple[float, float]:
+    def _linear_regression(self, x: Sequence[float], y: Sequence[float]) -> tuple[float, float]:
         n = len(x)
         if n == 0:
             return 0, 0
@@ -162,8 +424,78 @@ class LinearRegressionEstimator(EstimationStrategy):
 
 
 class PercentileEstimator(EstimationStrategy):
+    """Percentile of past runs, from P² sketches per task type.
+
+    Runs of similar input size share a sketch (sizes bucketed by powers of
+    two); the task type's overall sketch is used for sizes not seen yet.
+    """
+
+    incremental = True
+
     def __init__(self, percentile: float = 90):
         self.percentile = percentile
+        self._sketches: dict[tuple[str, int | None], dict[str, P2Quantile]] = {}
+
+    @staticmethod
+    def _size_bucket(input_size: int) -> int:
+        return max(0, int(input_size)).bit_length()
+
+    def observe(self, metrics: TaskMetrics):
+        if not metrics.success:
+            return
+        values = _metric_values(metrics)
+        bucket = self._size_bucket(metrics.input_size)
+        for key in ((metrics.task_type, None), (metrics.task_type, bucket)):
+            sketches = self._sketches.get(key)
+            if sketches is None:
+                q = self.percentile / 100
+                sketches = self._sketches[key] = {name: P2Quantile(q) for name in _METRIC_FIELDS}
+            for name, value in values.items():
+                sketches[name].add(value)
+
+    def estimate_incremental(self, task_type: str, input_size: int) -> ResourceEstimate | None:
+        sketches = self._sketches.get((task_type, self._size_bucket(input_size)))
+        if sketches is None:
+            sketches = self._sketches.get((task_type, None))
+        if sketches is None:
+            return None
+
+        samples = sketches["duration"].count
+        return ResourceEstimate(
+            cpu_cores=sketches["cpu"].value(),
+            memory_mb=sketches["memory"].value(),
+            disk_mb=sketches["disk"].value(),
+            network_mbps=sketches["network"].value(),
+            estimated_duration_seconds=sketches["duration"].value(),
+            confidence=min(1.0, samples / 5.0),
+            based_on_samples=samples,
+        )
+
+    def forget(self, task_type: str | None = None):
+        if task_type:
+            self._sketches = {k: v for k, v in self._sketches.items() if k[0] != task_type}
+        else:
+            self._sketches.clear()
+
+    def state_dict(self) -> dict[str, Any]:
+        return {
+            "sketches": [
+                {
+                    "task_type": task_type,
+                    "bucket": bucket,
+                    "metrics": {name: s.to_dict() for name, s in sketches.items()},
+                }
+                for (task_type, bucket), sketches in self._sketches.items()
+            ]
+        }
+
+    def load_state_dict(self, state: dict[str, Any]):
+        self._sketches = {
+            (entry["task_type"], entry["bucket"]): {
+                name: P2Quantile.from_dict(s) for name, s in entry["metrics"].items()
+            }
+            for entry in state.get("sketches", [])
+        }
 
     def estimate(
         self, task_type: str, input_size: int, historical_data: list[TaskMetrics]
@@ -240,31 +572,76 @@ class WeightedAverageEstimator(EstimationStrategy):
 
 
 class ResourceEstimator:
-    def __init__(self, strategy: EstimationStrategy | None = None, max_history: int = 1000):
-        self.strategy = strategy or LinearRegressionEstimator()
+    """Records task runs and estimates resources for new ones.
+
+    Args:
+        strategy: Estimation strategy; defaults to an incremental linear
+            regression forgetting at ``decay``.
+        max_history: Raw runs kept per task type, for non-incremental
+            strategies and get_statistics().
+        decay: Per-sample forgetting factor of the streaming state; defaults
+            to ``1 - 1 / max_history`` (effective window of max_history runs).
+        state_path: JSON file the streaming state is loaded from on start
+            and saved to every ``save_every`` records.
+    """
+
+    def __init__(
+        self,
+        strategy: EstimationStrategy | None = None,
+        max_history: int = 1000,
+        decay: float | None = None,
+        state_path: str | os.PathLike | None = None,
+        save_every: int = 100,
+    ):
+        self.decay = decay if decay is not None else 1 - 1 / max(1, max_history)
+        self.strategy = strategy or LinearRegressionEstimator(decay=self.decay)
         self.max_history = max_history
-        self._history: dict[str, list[TaskMetrics]] = {}
+        self.state_path = Path(state_path) if state_path else None
+        self.save_every = save_every
+        self._history: dict[str, deque[TaskMetrics]] = {}
+        # (task_type, node_id or None) -> duration vs input size
+        self._durations: dict[tuple[str, str | None], RunningRegression] = {}
         self._lock = threading.RLock()
         self._defaults: dict[str, ResourceEstimate] = {}
+        self._unsaved = 0
+
+        if self.state_path and self.state_path.exists():
+            self.load_state()
 
     def set_default(self, task_type: str, estimate: ResourceEstimate):
         self._defaults[task_type] = estimate
 
     def record(self, metrics: TaskMetrics):
         with self._lock:
-            if metrics.task_type not in self._history:
-                self._history[metrics.task_type] = []
-
-            self._history[metrics.task_type].append(metrics)
-
-            if len(self._history[metrics.task_type]) > self.max_history:
-                self._history[metrics.task_type] = self._history[metrics.task_type][
-                    -self.max_history :
-                ]
+            history = self._history.get(metrics.task_type)
+            if history is None:
+                history = self._history[metrics.task_type] = deque(maxlen=self.max_history)
+            history.append(metrics)
+
+            self.strategy.observe(metrics)
+            if metrics.success:
+                keys: list[tuple[str, str | None]] = [(metrics.task_type, None)]
+                if metrics.node_id is not None:
+                    keys.append((metrics.task_type, metrics.node_id))
+                for key in keys:
+                    model = self._durations.get(key)
+                    if model is None:
+                        model = self._durations[key] = RunningRegression(self.decay)
+                    model.add(metrics.input_size, {"duration": metrics.actual_duration})
+
+            self._unsaved += 1
+            if self.state_path and self._unsaved >= self.save_every:
+                self.save_state()
 
     def estimate(self, task_type: str, input_size: int = 0) -> ResourceEstimate:
         with self._lock:
-            historical_data = self._history.get(task_type, [])
+            if self.strategy.incremental:
+                estimate = self.strategy.estimate_incremental(task_type, input_size)
+                if estimate is not None:
+                    return estimate
+                return self._defaults.get(task_type) or ResourceEstimate()
+
+            historical_data = list(self._history.get(task_type, ()))
 
             if not historical_data:
                 default = self._defaults.get(task_type)
@@ -274,6 +651,26 @@ class ResourceEstimator:
 
             return self.strategy.estimate(task_type, input_size, historical_data)
 
+    def duration_model(
+        self, task_type: str, node_id: str | None = None
+    ) -> tuple[float, float] | None:
+        """Fit ``duration = per_item * input_size + overhead`` to successful runs.
+
+        Returns ``(per_item_seconds, overhead_seconds)``, or None without samples.
+        With ``node_id`` only that node's runs are used.
+        """
+        with self._lock:
+            model = self._durations.get((task_type, node_id))
+            if model is None:
+                return None
+
+            fit = model.fit("duration")
+            if fit is not None and fit[0] > 0:
+                return fit[0], max(0.0, fit[1])
+
+            mean_size = model.mean_x
+            return (model.mean("duration") / mean_size if mean_size else 0.0), 0.0
+
     def estimate_batch(self, tasks: list[tuple[str, int]]) -> ResourceEstimate:
         total = ResourceEstimate()
 
@@ -285,7 +682,7 @@ class ResourceEstimator:
 
     def get_statistics(self, task_type: str) -> dict[str, Any]:
         with self._lock:
-            data = self._history.get(task_type, [])
+            data: Sequence[TaskMetrics] = self._history.get(task_type, ())
 
             if not data:
                 return {"count": 0}
@@ -311,8 +708,55 @@ class ResourceEstimator:
         with self._lock:
             if task_type:
                 self._history.pop(task_type, None)
+                self._durations = {k: v for k, v in self._durations.items() if k[0] != task_type}
             else:
                 self._history.clear()
+                self._durations.clear()
+            self.strategy.forget(task_type)
+
+    def state_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "version": STATE_VERSION,
+                "durations": [
+                    {"task_type": task_type, "node_id": node_id, "model": model.to_dict()}
+                    for (task_type, node_id), model in self._durations.items()
+                ],
+                "strategy": self.strategy.state_dict(),
+            }
+
+    def load_state_dict(self, state: dict[str, Any]):
+        if state.get("version") != STATE_VERSION:
+            return
+        with self._lock:
+            self._durations = {
+                (entry["task_type"], entry["node_id"]): RunningRegression.from_dict(entry["model"])
+                for entry in state.get("durations", [])
+            }
+            self.strategy.load_state_dict(state.get("strategy", {}))
+
+    def save_state(self, path: str | os.PathLike | None = None):
+        """Write the streaming state as JSON, atomically replacing the file."""
+        target = Path(path) if path else self.state_path
+        if target is None:
+            raise ValueError("no state path configured")
+
+        with self._lock:
+            data = json.dumps(self.state_dict())
+            self._unsaved = 0
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=".estimator-")
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+
+    def load_state(self, path: str | os.PathLike | None = None):
+        target = Path(path) if path else self.state_path
+        if target is None:
+            raise ValueError("no state path configured")
+        with open(target) as f:
+            self.load_state_dict(json.load(f))
 
 
 class ResourceProfiler:
@@ -362,14 +806,84 @@ class ResourceProfiler:
             return len(self._active_tasks)
 
 
+class ChunkSizer:
+    """Sizes data chunks so each one runs for about ``target_seconds``.
+
+    Chunk runtimes are recorded in the estimator; the next chunk size comes
+    from its duration model, using the node's own runs when it has any.
+    """
+
+    def __init__(
+        self,
+        estimator: ResourceEstimator | None = None,
+        target_seconds: float = 10.0,
+        min_items: int = 1,
+        max_items: int = 100_000,
+    ):
+        self.estimator = estimator or ResourceEstimator()
+        self.target_seconds = target_seconds
+        self.min_items = min_items
+        self.max_items = max_items
+
+    def record(
+        self,
+        task_type: str,
+        items: int,
+        duration: float,
+        node_id: str | None = None,
+        success: bool = True,
+    ):
+        self.estimator.record(
+            TaskMetrics(
+                task_type=task_type,
+                input_size=items,
+                actual_cpu=0,
+                actual_memory=0,
+                actual_disk=0,
+                actual_network=0,
+                actual_duration=duration,
+                success=success,
+                node_id=node_id,
+            )
+        )
+
+    def items_per_chunk(
+        self,
+        task_type: str,
+        node_id: str | None = None,
+        default: int | None = None,
+        target_seconds: float | None = None,
+    ) -> int | None:
+        """Items that fill the target runtime, or ``default`` if nothing was measured."""
+        model = None
+        if node_id is not None:
+            model = self.estimator.duration_model(task_type, node_id)
+        if model is None:
+            model = self.estimator.duration_model(task_type)
+        if model is None:
+            return default
+
+        per_item, overhead = model
+        if per_item <= 0:
+            return self.max_items
+
+        target = target_seconds or self.target_seconds
+        # Overhead beyond half the target cannot be amortized; size for half
+        budget = max(target - overhead, target / 2)
+        return max(self.min_items, min(self.max_items, int(budget / per_item)))
+
+
 __all__ = [
     "ResourceType",
     "ResourceEstimate",
     "TaskMetrics",
+    "RunningRegression",
+    "P2Quantile",
     "EstimationStrategy",
     "LinearRegressionEstimator",
     "PercentileEstimator",
     "WeightedAverageEstimator",
     "ResourceEstimator",
     "ResourceProfiler",
+    "ChunkSizer",
 ]
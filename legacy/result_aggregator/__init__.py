@@ -1,4 +1,11 @@
-"""Result Aggregator - Aggregates and processes task results."""
+"""Result Aggregator - Aggregates and processes task results.
+
+Built-in strategies are streaming: each result is folded into a running
+state when it arrives, so adding results is O(1) however many chunks an
+aggregation has. NumPy array results are combined elementwise, in place.
+``finalize`` hands out a snapshot, so a returned (partial) result never
+changes as later results are folded in.
+"""
 
 from __future__ import annotations
 
@@ -6,14 +13,25 @@ import hashlib
 import json
 import time
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Callable, Generic, TypeVar, Union
 
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
 T = TypeVar("T")
 K = TypeVar("K")
 
+# Marks a state that has not seen a successful result yet
+_EMPTY = object()
+
 
 class AggregationStatus(str, Enum):
     PENDING = "pending"
@@ -69,154 +87,322 @@ class AggregationStrategy(ABC, Generic[T]):
         pass
 
 
-class SumAggregator(AggregationStrategy[Union[int, float]]):
-    def aggregate(self, results: list[TaskResult]) -> int | float:
-        return sum(r.value for r in results if r.success)
+class StreamingAggregator(AggregationStrategy[T]):
+    """Strategy that folds each successful result into a running state.
 
-    def can_aggregate(self, results: list[TaskResult], total: int) -> bool:
-        return len(results) == total
+    ResultAggregator keeps one state per aggregation, so adding a result and
+    checking completion are O(1) instead of a pass over every result.
+    """
 
+    # Complete once every expected result has arrived; False means any time
+    wait_for_all = True
 
-class AverageAggregator(AggregationStrategy[float]):
-    def aggregate(self, results: list[TaskResult]) -> float:
-        values = [r.value for r in results if r.success]
-        return sum(values) / len(values) if values else 0.0
+    @abstractmethod
+    def initial_state(self) -> Any:
+        pass
 
-    def can_aggregate(self, results: list[TaskResult], total: int) -> bool:
-        return len(results) == total
+    @abstractmethod
+    def fold(self, state: Any, value: Any) -> Any:
+        pass
 
+    def finalize(self, state: Any) -> T:
+        """Result for the current state; must not share anything fold() later mutates."""
+        return state.copy() if _is_array(state) else state
 
-class CountAggregator(AggregationStrategy[int]):
-    def aggregate(self, results: list[TaskResult]) -> int:
-        return sum(1 for r in results if r.success)
+    def is_complete(self, state: Any, received: int, total: int) -> bool:
+        return received == total if self.wait_for_all else True
+
+    def aggregate(self, results: list[TaskResult]) -> T:
+        state = self.initial_state()
+        for r in results:
+            if r.success:
+                state = self.fold(state, r.value)
+        return self.finalize(state)
 
     def can_aggregate(self, results: list[TaskResult], total: int) -> bool:
-        return True
+        return len(results) == total if self.wait_for_all else True
 
 
-class MinAggregator(AggregationStrategy[Union[int, float]]):
-    def aggregate(self, results: list[TaskResult]) -> int | float:
-        values = [r.value for r in results if r.success]
-        return min(values) if values else 0
+def _is_array(value: Any) -> bool:
+    return NUMPY_AVAILABLE and isinstance(value, np.ndarray)
 
-    def can_aggregate(self, results: list[TaskResult], total: int) -> bool:
-        return len(results) == total
 
+def _in_place(acc: Any, value: Any) -> bool:
+    """Whether an elementwise result can be written into acc (an array the state owns)."""
+    return (
+        _is_array(acc)
+        and _is_array(value)
+        and acc.shape == value.shape
+        and acc.dtype == np.result_type(acc, value)
+    )
 
-class MaxAggregator(AggregationStrategy[Union[int, float]]):
-    def aggregate(self, results: list[TaskResult]) -> int | float:
-        values = [r.value for r in results if r.success]
-        return max(values) if values else 0
 
-    def can_aggregate(self, results: list[TaskResult], total: int) -> bool:
-        return len(results) == total
+def _add(acc: Any, value: Any) -> Any:
+    if _in_place(acc, value):
+        return np.add(acc, value, out=acc)
+    # The first array is copied by ``0 + value``, so inputs are never modified
+    return acc + value
 
 
-class ListAggregator(AggregationStrategy[list[Any]]):
-    def aggregate(self, results: list[TaskResult]) -> list[Any]:
-        return [r.value for r in results if r.success]
+class SumAggregator(StreamingAggregator[Union[int, float]]):
+    def initial_state(self) -> Any:
+        return 0
 
-    def can_aggregate(self, results: list[TaskResult], total: int) -> bool:
-        return True
+    def fold(self, state: Any, value: Any) -> Any:
+        return _add(state, value)
 
 
-class DictAggregator(AggregationStrategy[dict[str, Any]]):
-    def aggregate(self, results: list[TaskResult]) -> dict[str, Any]:
-        result = {}
-        for r in results:
-            if r.success and isinstance(r.value, dict):
-                result.update(r.value)
-        return result
+class AverageAggregator(StreamingAggregator[float]):
+    def initial_state(self) -> Any:
+        return [0, 0]
 
-    def can_aggregate(self, results: list[TaskResult], total: int) -> bool:
-        return True
+    def fold(self, state: Any, value: Any) -> Any:
+        state[0] = _add(state[0], value)
+        state[1] += 1
+        return state
 
+    def finalize(self, state: Any) -> float:
+        total, count = state
+        return total / count if count else 0.0
 
-class FirstAggregator(AggregationStrategy[Any]):
-    def aggregate(self, results: list[TaskResult]) -> Any:
-        for r in results:
-            if r.success:
-                return r.value
-        return None
+
+class CountAggregator(StreamingAggregator[int]):
+    wait_for_all = False
+
+    def initial_state(self) -> Any:
+        return 0
+
+    def fold(self, state: Any, value: Any) -> Any:
+        return state + 1
+
+
+class MinAggregator(StreamingAggregator[Union[int, float]]):
+    def initial_state(self) -> Any:
+        return _EMPTY
+
+    def fold(self, state: Any, value: Any) -> Any:
+        if state is _EMPTY:
+            return value.copy() if _is_array(value) else value
+        if _is_array(state) or _is_array(value):
+            return np.minimum(state, value, out=state if _in_place(state, value) else None)
+        return min(state, value)
+
+    def finalize(self, state: Any) -> int | float:
+        if state is _EMPTY:
+            return 0
+        return state.copy() if _is_array(state) else state
+
+
+class MaxAggregator(StreamingAggregator[Union[int, float]]):
+    def initial_state(self) -> Any:
+        return _EMPTY
+
+    def fold(self, state: Any, value: Any) -> Any:
+        if state is _EMPTY:
+            return value.copy() if _is_array(value) else value
+        if _is_array(state) or _is_array(value):
+            return np.maximum(state, value, out=state if _in_place(state, value) else None)
+        return max(state, value)
+
+    def finalize(self, state: Any) -> int | float:
+        if state is _EMPTY:
+            return 0
+        return state.copy() if _is_array(state) else state
+
+
+class ListAggregator(StreamingAggregator[list[Any]]):
+    wait_for_all = False
+
+    def initial_state(self) -> Any:
+        return []
+
+    def fold(self, state: Any, value: Any) -> Any:
+        state.append(value)
+        return state
+
+    def finalize(self, state: Any) -> list[Any]:
+        return list(state)
+
+
+class DictAggregator(StreamingAggregator[dict[str, Any]]):
+    wait_for_all = False
+
+    def initial_state(self) -> Any:
+        return {}
+
+    def fold(self, state: Any, value: Any) -> Any:
+        if isinstance(value, dict):
+            state.update(value)
+        return state
+
+    def finalize(self, state: Any) -> dict[str, Any]:
+        return dict(state)
+
+
+class FirstAggregator(StreamingAggregator[Any]):
+    def initial_state(self) -> Any:
+        return _EMPTY
+
+    def fold(self, state: Any, value: Any) -> Any:
+        return value if state is _EMPTY else state
+
+    def finalize(self, state: Any) -> Any:
+        return None if state is _EMPTY else state
+
+    def is_complete(self, state: Any, received: int, total: int) -> bool:
+        return state is not _EMPTY
 
     def can_aggregate(self, results: list[TaskResult], total: int) -> bool:
         return any(r.success for r in results)
 
 
-class LastAggregator(AggregationStrategy[Any]):
-    def aggregate(self, results: list[TaskResult]) -> Any:
-        for r in reversed(results):
-            if r.success:
-                return r.value
-        return None
+class LastAggregator(StreamingAggregator[Any]):
+    def initial_state(self) -> Any:
+        return _EMPTY
+
+    def fold(self, state: Any, value: Any) -> Any:
+        return value
+
+    def finalize(self, state: Any) -> Any:
+        return None if state is _EMPTY else state
 
-    def can_aggregate(self, results: list[TaskResult], total: int) -> bool:
-        return len(results) == total
 
+class MergeAggregator(StreamingAggregator[dict[str, Any]]):
+    wait_for_all = False
 
-class MergeAggregator(AggregationStrategy[dict[str, Any]]):
     def __init__(self, deep: bool = True):
         self.deep = deep
 
-    def aggregate(self, results: list[TaskResult]) -> dict[str, Any]:
-        merged = {}
-        for r in results:
-            if r.success and isinstance(r.value, dict):
-                if self.deep:
-                    merged = self._deep_merge(merged, r.value)
-                else:
-                    merged.update(r.value)
-        return merged
-
-    def _deep_merge(self, base: dict, update: dict) -> dict:
-        result = base.copy()
+    def initial_state(self) -> Any:
+        return {}
+
+    def fold(self, state: Any, value: Any) -> Any:
+        if isinstance(value, dict):
+            if self.deep:
+                self._merge_into(state, value)
+            else:
+                state.update(value)
+        return state
+
+    def _merge_into(self, target: dict, update: dict) -> None:
+        """Deep-merge update into target, copying nested dicts so inputs stay untouched."""
         for key, value in update.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._deep_merge(result[key], value)
+            if key in target and isinstance(target[key], dict) and isinstance(value, dict):
+                self._merge_into(target[key], value)
+            elif isinstance(value, dict):
+                target[key] = {}
+                self._merge_into(target[key], value)
             else:
-                result[key] = value
-        return result
+                target[key] = value
 
-    def can_aggregate(self, results: list[TaskResult], total: int) -> bool:
-        return True
+    def finalize(self, state: Any) -> dict[str, Any]:
+        return _copy_dicts(state) if self.deep else dict(state)
+
+
+def _copy_dicts(value: dict) -> dict:
+    """Copy a dict and the dicts nested in it; other values are shared."""
+    return {k: _copy_dicts(v) if isinstance(v, dict) else v for k, v in value.items()}
+
+
+def tree_reduce(
+    values: list[Any], reducer: Callable[[Any, Any], Any], executor: Executor | None = None
+) -> Any:
+    """Reduce values pairwise, level by level, preserving their order.
+
+    ``reducer`` must be associative. The combinations within a level are
+    independent, so with an executor each level runs in parallel.
+    """
+    if not values:
+        raise ValueError("tree_reduce() of an empty sequence")
+
+    level = list(values)
+    while len(level) > 1:
+        lefts, rights = level[0:-1:2], level[1::2]
+        if executor is not None:
+            combined = list(executor.map(reducer, lefts, rights))
+        else:
+            combined = [reducer(a, b) for a, b in zip(lefts, rights)]
+        if len(level) % 2:
+            combined.append(level[-1])
+        level = combined
+    return level[0]
+
+
+class ReduceAggregator(StreamingAggregator[Any]):
+    """Fold results with ``reducer``.
 
+    With ``tree=True`` the reducer (which must then be associative) combines
+    partial results hierarchically: arriving values are merged like a binary
+    counter, so each combine joins two partials covering the same number of
+    results and at most log2(n) partials are pending. Batch aggregate() in
+    tree mode runs each level of the reduction on ``executor`` if given.
+    """
 
-class ReduceAggregator(AggregationStrategy[Any]):
-    def __init__(self, reducer: Callable[[Any, Any], Any], initial: Any = None):
+    def __init__(
+        self,
+        reducer: Callable[[Any, Any], Any],
+        initial: Any = None,
+        tree: bool = False,
+        executor: Executor | None = None,
+    ):
         self.reducer = reducer
         self.initial = initial
+        self.tree = tree
+        self.executor = executor
+
+    def initial_state(self) -> Any:
+        if self.tree:
+            return []
+        return _EMPTY if self.initial is None else self.initial
+
+    def fold(self, state: Any, value: Any) -> Any:
+        if not self.tree:
+            return value if state is _EMPTY else self.reducer(state, value)
+
+        # state: [rank, partial] pairs with strictly decreasing rank
+        state.append([0, value])
+        while len(state) > 1 and state[-1][0] == state[-2][0]:
+            rank, right = state.pop()
+            state[-1] = [rank + 1, self.reducer(state[-1][1], right)]
+        return state
+
+    def finalize(self, state: Any) -> Any:
+        if not self.tree:
+            return self.initial if state is _EMPTY else state
+        if not state:
+            return self.initial
+
+        result = state[0][1]
+        for _, partial in state[1:]:
+            result = self.reducer(result, partial)
+        return result if self.initial is None else self.reducer(self.initial, result)
 
     def aggregate(self, results: list[TaskResult]) -> Any:
+        if not self.tree:
+            return super().aggregate(results)
+
         values = [r.value for r in results if r.success]
         if not values:
             return self.initial
+        result = tree_reduce(values, self.reducer, self.executor)
+        return result if self.initial is None else self.reducer(self.initial, result)
 
-        result = self.initial if self.initial is not None else values[0]
-        start = 1 if self.initial is not None else 0
 
-        for value in values[start:]:
-            result = self.reducer(result, value)
+class GroupByAggregator(StreamingAggregator[dict[Any, list[Any]]]):
+    wait_for_all = False
 
-        return result
-
-    def can_aggregate(self, results: list[TaskResult], total: int) -> bool:
-        return len(results) == total
-
-
-class GroupByAggregator(AggregationStrategy[dict[Any, list[Any]]]):
     def __init__(self, key_func: Callable[[Any], Any]):
         self.key_func = key_func
 
-    def aggregate(self, results: list[TaskResult]) -> dict[Any, list[Any]]:
-        grouped = defaultdict(list)
-        for r in results:
-            if r.success:
-                key = self.key_func(r.value)
-                grouped[key].append(r.value)
-        return dict(grouped)
+    def initial_state(self) -> Any:
+        return {}
 
-    def can_aggregate(self, results: list[TaskResult], total: int) -> bool:
-        return True
+    def fold(self, state: Any, value: Any) -> Any:
+        state.setdefault(self.key_func(value), []).append(value)
+        return state
+
+    def finalize(self, state: Any) -> dict[Any, list[Any]]:
+        return {key: list(values) for key, values in state.items()}
 
 
 class ResultAggregator(Generic[T]):
@@ -228,6 +414,8 @@ class ResultAggregator(Generic[T]):
         self._aggregations: dict[str, AggregationResult] = {}
         self._results: dict[str, list[TaskResult]] = {}
         self._expected_counts: dict[str, int] = {}
+        # Running fold state per aggregation, for streaming strategies
+        self._states: dict[str, Any] = {}
 
     def create_aggregation(self, aggregation_id: str, total_tasks: int) -> AggregationResult[T]:
         result = AggregationResult[T](
@@ -237,6 +425,8 @@ class ResultAggregator(Generic[T]):
         self._aggregations[aggregation_id] = result
         self._results[aggregation_id] = []
         self._expected_counts[aggregation_id] = total_tasks
+        if isinstance(self.strategy, StreamingAggregator):
+            self._states[aggregation_id] = self.strategy.initial_state()
 
         return result
 
@@ -258,10 +448,31 @@ class ResultAggregator(Generic[T]):
 
         total = self._expected_counts[aggregation_id]
         results = self._results[aggregation_id]
+        strategy = self.strategy
+
+        if isinstance(strategy, StreamingAggregator):
+            state = self._states[aggregation_id]
+            try:
+                if result.success:
+                    state = self._states[aggregation_id] = strategy.fold(state, result.value)
+            except Exception as e:
+                agg_result.status = AggregationStatus.FAILED
+                agg_result.errors.append(str(e))
+                return agg_result
+            complete = strategy.is_complete(state, len(results), total)
+
+            def aggregate() -> Any:
+                return strategy.finalize(state)
+
+        else:
+            complete = strategy.can_aggregate(results, total)
+
+            def aggregate() -> Any:
+                return strategy.aggregate(results)
 
-        if self.strategy.can_aggregate(results, total):
+        if complete:
             try:
-                agg_result.result = self.strategy.aggregate(results)
+                agg_result.result = aggregate()
                 agg_result.status = AggregationStatus.COMPLETED
                 agg_result.completed_at = time.time()
             except Exception as e:
@@ -269,7 +480,7 @@ class ResultAggregator(Generic[T]):
                 agg_result.errors.append(str(e))
         elif self.partial_aggregation and len(results) > 0:
             try:
-                agg_result.result = self.strategy.aggregate(results)
+                agg_result.result = aggregate()
                 agg_result.status = AggregationStatus.PARTIAL
             except Exception:
                 pass
@@ -285,6 +496,8 @@ class ResultAggregator(Generic[T]):
             return None
 
         try:
+            if aggregation_id in self._states:
+                return self.strategy.finalize(self._states[aggregation_id])
             return self.strategy.aggregate(results)
         except Exception:
             return None
@@ -341,6 +554,7 @@ class ResultAggregator(Generic[T]):
             del self._aggregations[agg_id]
             del self._results[agg_id]
             del self._expected_counts[agg_id]
+            self._states.pop(agg_id, None)
 
         return len(to_remove)
 
@@ -386,6 +600,7 @@ __all__ = [
     "TaskResult",
     "AggregationResult",
     "AggregationStrategy",
+    "StreamingAggregator",
     "SumAggregator",
     "AverageAggregator",
     "CountAggregator",
@@ -398,6 +613,7 @@ __all__ = [
     "MergeAggregator",
     "ReduceAggregator",
     "GroupByAggregator",
+    "tree_reduce",
     "ResultAggregator",
     "DistributedResultCollector",
 ]
@@ -0,0 +1,209 @@
+"""
+scheduler/result_memo.py
+提交端结果记忆化 - 确定性任务的结果复用与在途合并
+
+提交时带 cache=true 的任务按 (代码, 资源, 运行时版本) 计算键：
+- 命中已完成结果：直接生成一个已完成的任务，不再调度执行
+- 相同任务正在执行：新任务挂起等待，领头任务完成时一并完成
+- 未命中：正常调度，完成后结果写入缓存
+
+缓存只保存结果摘要（正文在结果存储中），按 LRU + TTL 淘汰。
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+# 节点执行环境版本，参与缓存键计算；升级运行时后旧结果自动失效
+RUNTIME_VERSION = os.getenv(
+    "TASK_RUNTIME_VERSION", f"python{sys.version_info.major}.{sys.version_info.minor}"
+)
+
+
+@dataclass
+class MemoEntry:
+    """已缓存的任务结果"""
+
+    digest: str
+    size: int
+    cpu_seconds: float
+    stored_at: float
+
+
+@dataclass
+class MemoDecision:
+    """一次带缓存提交的处理结果"""
+
+    outcome: str  # hit, coalesced, miss
+    task_id: int
+    entry: Optional[MemoEntry] = None
+    leader_id: Optional[int] = None
+
+
+class ResultMemoizer:
+    """
+    结果记忆化器
+
+    Args:
+        max_entries: 缓存结果数量上限（LRU 淘汰）
+        ttl: 缓存结果有效期（秒）
+        runtime_version: 运行时版本标识
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl: float = 3600.0,
+        runtime_version: str = RUNTIME_VERSION,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.runtime_version = runtime_version
+
+        self._entries: OrderedDict[str, MemoEntry] = OrderedDict()
+        # 在途任务：键 -> [领头任务, 等待的任务...]
+        self._inflight: dict[str, list[int]] = {}
+        self._task_keys: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "lookups": 0,
+            "hits": 0,
+            "coalesced": 0,
+            "misses": 0,
+            "saved_cpu_seconds": 0.0,
+        }
+
+    def make_key(self, code: str, resources: Optional[dict[str, Any]]) -> str:
+        """计算缓存键"""
+        payload = json.dumps(
+            {"code": code, "resources": resources or {}, "runtime": self.runtime_version},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _lookup_locked(self, key: str) -> Optional[MemoEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def submit(
+        self,
+        key: str,
+        create_task: Callable[[bool], int],
+        is_valid: Optional[Callable[[MemoEntry], bool]] = None,
+    ) -> MemoDecision:
+        """
+        处理一次带缓存的提交
+
+        Args:
+            key: make_key 计算的缓存键
+            create_task: 创建任务的回调，参数为是否加入调度队列，返回任务ID
+            is_valid: 校验缓存结果是否仍可用（如正文仍在结果存储中）；
+                不可用的结果被丢弃，本次提交按未命中处理
+
+        Returns:
+            MemoDecision；命中时调用方需用 entry 的摘要完成该任务
+        """
+        with self._lock:
+            self._stats["lookups"] += 1
+
+            entry = self._lookup_locked(key)
+            if entry is not None and is_valid is not None and not is_valid(entry):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._stats["hits"] += 1
+                self._stats["saved_cpu_seconds"] += entry.cpu_seconds
+                return MemoDecision("hit", create_task(False), entry=entry)
+
+            waiting = self._inflight.get(key)
+            if waiting:
+                task_id = create_task(False)
+                waiting.append(task_id)
+                self._task_keys[task_id] = key
+                self._stats["coalesced"] += 1
+                return MemoDecision("coalesced", task_id, leader_id=waiting[0])
+
+            task_id = create_task(True)
+            self._inflight[key] = [task_id]
+            self._task_keys[task_id] = key
+            self._stats["misses"] += 1
+            return MemoDecision("miss", task_id)
+
+    def is_leader(self, task_id: int) -> bool:
+        """任务是否为某个在途键的领头任务"""
+        with self._lock:
+            key = self._task_keys.get(task_id)
+            waiting = self._inflight.get(key) if key else None
+            return bool(waiting) and waiting[0] == task_id
+
+    def complete(self, task_id: int, digest: str, size: int, cpu_seconds: float) -> list[int]:
+        """
+        领头任务完成：缓存结果并返回等待中的任务ID
+
+        非领头或未登记的任务返回空列表。
+        """
+        with self._lock:
+            key = self._task_keys.get(task_id)
+            waiting = self._inflight.get(key) if key else None
+            if not waiting or waiting[0] != task_id:
+                return []
+
+            del self._inflight[key]
+            for tid in waiting:
+                self._task_keys.pop(tid, None)
+
+            self._entries[key] = MemoEntry(digest, size, cpu_seconds, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+            followers = waiting[1:]
+            self._stats["saved_cpu_seconds"] += cpu_seconds * len(followers)
+            return followers
+
+    def abandon(self, task_id: int) -> Optional[int]:
+        """
+        任务被删除：从在途列表移除
+
+        Returns:
+            领头任务被删除且有等待任务时，返回接替执行的任务ID（调用方需将其加入调度队列）
+        """
+        with self._lock:
+            key = self._task_keys.pop(task_id, None)
+            waiting = self._inflight.get(key) if key else None
+            if not waiting:
+                return None
+
+            was_leader = waiting[0] == task_id
+            waiting.remove(task_id)
+            if not waiting:
+                del self._inflight[key]
+                return None
+            return waiting[0] if was_leader else None
+
+    def stats(self) -> dict[str, Any]:
+        """缓存统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["lookups"]
+            stats["hit_ratio"] = (stats["hits"] + stats["coalesced"]) / lookups if lookups else 0.0
+            stats["saved_cpu_seconds"] = round(stats["saved_cpu_seconds"], 3)
+            stats["entries"] = len(self._entries)
+            stats["inflight"] = len(self._inflight)
+        return stats
+
+
+__all__ = ["MemoDecision", "MemoEntry", "ResultMemoizer", "RUNTIME_VERSION"]
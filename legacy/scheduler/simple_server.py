@@ -14,6 +14,8 @@ scheduler/simple_server.py
 import asyncio
 import atexit
 import concurrent.futures
+import hashlib
+import json
 import os
 import sys
 import threading
@@ -24,6 +26,9 @@ from contextlib import asynccontextmanager
 from typing import Any, Optional
 
 from fastapi import BackgroundTasks, Body, FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -44,6 +49,28 @@ except ImportError:
     SANDBOX_AVAILABLE = False
     print("Warning: Using legacy sandbox, consider migrating to new architecture")
 
+from legacy.scheduler.result_memo import ResultMemoizer
+from legacy.storage.result_index import RESULT_FIELDS, CompletionIndex
+from legacy.storage.result_store import ResultRef, ResultStore
+from serializer.http import VARY, encode_response
+
+# 结果正文按内容寻址存放的目录，多个存储实例共享以便去重；
+# 未设置时放在数据库目录下，与 SQLite 后端使用同一目录，重启后结果仍可读取
+RESULT_STORE_DIR = os.getenv("RESULT_STORE_DIR")
+
+# 流式提交的结果正文上限（字节）
+RESULT_STREAM_MAX_BYTES = int(os.getenv("RESULT_STREAM_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def _default_result_store() -> ResultStore:
+    """创建默认结果存储，目录在持久数据目录中而不是临时目录"""
+    if RESULT_STORE_DIR:
+        return ResultStore(RESULT_STORE_DIR)
+    from src.infrastructure.persistence import get_db_dir
+
+    return ResultStore(get_db_dir() / "idle_sense_results")
+
+
 LEGACY_INTEGRATION_ENABLED = os.getenv("LEGACY_INTEGRATION", "true").lower() == "true"
 integrator = None
 
@@ -78,6 +105,7 @@ class TaskSubmission(BaseModel):
     timeout: Optional[int] = 300
     resources: Optional[dict[str, Any]] = {"cpu": 1.0, "memory": 512}
     user_id: Optional[str] = None
+    cache: bool = False  # 确定性任务：相同代码与资源复用已有结果
 
 
 class TaskResult(BaseModel):
@@ -99,10 +127,18 @@ class TaskInfo(BaseModel):
     assigned_node: Optional[str] = None
     completed_at: Optional[float] = None
     result: Optional[str] = None
+    result_digest: Optional[str] = None
+    result_size: Optional[int] = None
     required_resources: dict[str, Any] = {"cpu": 1.0, "memory": 512}
     user_id: Optional[str] = None
 
 
+class TaskStatusBatch(BaseModel):
+    """批量状态查询模型"""
+
+    task_ids: list[int]
+
+
 class NodeRegistration(BaseModel):
     """节点注册模型"""
 
@@ -128,10 +164,11 @@ class NodeHeartbeat(BaseModel):
 class OptimizedMemoryStorage:
     """优化版内存存储，修复节点显示问题"""
 
-    def __init__(self):
-        # 任务存储
+    def __init__(self, result_store: Optional[ResultStore] = None):
+        # 任务存储，结果正文只保存摘要，正文在结果存储中按需读取
         self.tasks: dict[int, TaskInfo] = {}
         self.task_id_counter = 1
+        self.result_store = result_store or _default_result_store()
 
         # 节点管理 - 优化数据结构
         self.nodes: dict[str, dict] = {}
@@ -142,6 +179,9 @@ class OptimizedMemoryStorage:
         self.pending_tasks: list[int] = []
         self.assigned_tasks: dict[str, list[int]] = defaultdict(list)
 
+        # 完成顺序索引：按游标与 since 水位线二分查找结果页
+        self.completed = CompletionIndex()
+
         self.server_id = str(uuid.uuid4())[:8]
         self.lock = threading.RLock()
 
@@ -161,8 +201,9 @@ class OptimizedMemoryStorage:
         timeout: int = 300,
         resources: Optional[dict] = None,
         user_id: Optional[str] = None,
+        enqueue: bool = True,
     ) -> int:
-        """添加新任务"""
+        """添加新任务，enqueue=False 时任务暂不进入调度队列"""
         with self.lock:
             task_id = self.task_id_counter
             self.task_id_counter += 1
@@ -177,13 +218,23 @@ class OptimizedMemoryStorage:
             )
 
             self.tasks[task_id] = task
-            self.pending_tasks.append(task_id)
+            if enqueue:
+                self.pending_tasks.append(task_id)
 
-            # 立即尝试调度
-            self._schedule_tasks()
+                # 立即尝试调度
+                self._schedule_tasks()
 
             return task_id
 
+    def release_task(self, task_id: int) -> bool:
+        """将未入队的待处理任务加入调度队列"""
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if not task or task.status != "pending" or task_id in self.pending_tasks:
+                return False
+            self.pending_tasks.append(task_id)
+            return True
+
     def get_task_for_node(self, node_id: str) -> Optional[TaskInfo]:
         """为节点获取任务"""
         with self.lock:
@@ -204,6 +255,10 @@ class OptimizedMemoryStorage:
                 if not task or task.status != "pending":
                     continue
 
+                # 推测执行的备份任务不会分给原任务所在节点
+                if node_id in task.required_resources.get("exclude_nodes", ()):
+                    continue
+
                 if self._can_node_handle_task(node_info, task):
                     score = self._calculate_match_score(node_info, task)
                     if score > best_score:
@@ -225,8 +280,24 @@ class OptimizedMemoryStorage:
 
             return best_task
 
+    def can_complete(self, task_id: int) -> bool:
+        """任务是否存在且处于可完成状态"""
+        with self.lock:
+            task = self.tasks.get(task_id)
+            return task is not None and task.status in ["pending", "assigned", "running"]
+
     def complete_task(self, task_id: int, result: str, node_id: Optional[str] = None) -> bool:
         """完成任务"""
+        if not self.can_complete(task_id):
+            return False
+
+        # 哈希和压缩在锁外进行
+        return self.complete_task_ref(task_id, self.result_store.put(result), node_id)
+
+    def complete_task_ref(
+        self, task_id: int, ref: ResultRef, node_id: Optional[str] = None
+    ) -> bool:
+        """以已写入结果存储的正文完成任务"""
         with self.lock:
             if task_id not in self.tasks:
                 return False
@@ -238,7 +309,9 @@ class OptimizedMemoryStorage:
             # 更新任务状态
             task.status = "completed"
             task.completed_at = time.time()
-            task.result = result
+            task.result_digest = ref.digest
+            task.result_size = ref.size
+            self.completed.record(task_id, task.completed_at)
 
             # 释放节点资源
             actual_node_id = node_id or task.assigned_node
@@ -556,7 +629,9 @@ class OptimizedMemoryStorage:
         return {
             "task_id": task.task_id,
             "status": task.status,
-            "result": task.result,
+            "result": self._load_result(task),
+            "result_digest": task.result_digest,
+            "result_size": task.result_size,
             "created_at": task.created_at,
             "assigned_at": task.assigned_at,
             "assigned_node": task.assigned_node,
@@ -565,20 +640,43 @@ class OptimizedMemoryStorage:
             "user_id": task.user_id,
         }
 
+    def _load_result(self, task: TaskInfo) -> Optional[str]:
+        """从结果存储读取任务结果正文"""
+        if task.result_digest:
+            return self.result_store.get_text(task.result_digest)
+        return task.result
+
+    def batch_get(self, task_ids: list[int]) -> list[Optional[dict[str, Any]]]:
+        """批量获取任务状态，未找到的位置为 None"""
+        with self.lock:
+            return [self.get_task_status(task_id) for task_id in task_ids]
+
     def get_all_results(self) -> list[dict[str, Any]]:
         """获取所有结果"""
+        return self.get_results_page()["results"]
+
+    def get_results_page(
+        self,
+        cursor: int = 0,
+        limit: Optional[int] = None,
+        since: Optional[float] = None,
+        fields: Optional[tuple[str, ...]] = None,
+    ) -> dict[str, Any]:
+        """
+        按完成顺序分页获取结果
+
+        Args:
+            cursor: 上一页返回的 next_cursor
+            limit: 每页数量，None 表示取到末尾
+            since: 水位线，仅返回完成时间晚于该值的结果
+            fields: 投影字段，None 表示全部字段
+
+        Returns:
+            {"results", "next_cursor", "has_more", "watermark"}，
+            轮询方保存 watermark 即可增量获取
+        """
         with self.lock:
-            return [
-                {
-                    "task_id": task.task_id,
-                    "result": task.result,
-                    "completed_at": task.completed_at,
-                    "assigned_node": task.assigned_node,
-                    "user_id": task.user_id,
-                }
-                for task in self.tasks.values()
-                if task.status == "completed"
-            ]
+            return self.completed.page(self.tasks, cursor, limit, since, fields, self._load_result)
 
     def get_system_stats(self) -> dict[str, Any]:
         """获取系统统计"""
@@ -665,6 +763,7 @@ class PersistentSchedulerStorage:
 
         self.task_storage = PersistentTaskStorage(db_path=db_path)
         self.node_storage = PersistentNodeStorage(db_path=db_path)
+        self.result_store = self.task_storage.result_store
 
         self.server_id = str(uuid.uuid4())[:8]
         self.lock = threading.RLock()
@@ -754,21 +853,45 @@ class PersistentSchedulerStorage:
         timeout: int = 300,
         resources: Optional[dict] = None,
         user_id: Optional[str] = None,
+        enqueue: bool = True,
     ) -> int:
-        return self.task_storage.add_task(code, timeout, resources, user_id)
+        return self.task_storage.add_task(code, timeout, resources, user_id, enqueue)
+
+    def release_task(self, task_id: int) -> bool:
+        return self.task_storage.release_task(task_id)
 
     def get_task_for_node(self, node_id: str) -> Optional[Any]:
         return self.task_storage.get_task_for_node(node_id)
 
+    def can_complete(self, task_id: int) -> bool:
+        return self.task_storage.can_complete(task_id)
+
     def complete_task(self, task_id: int, result: str, node_id: Optional[str] = None) -> bool:
         return self.task_storage.complete_task(task_id, result, node_id)
 
+    def complete_task_ref(
+        self, task_id: int, ref: ResultRef, node_id: Optional[str] = None
+    ) -> bool:
+        return self.task_storage.complete_task_ref(task_id, ref, node_id)
+
     def get_task_status(self, task_id: int) -> Optional[dict[str, Any]]:
         return self.task_storage.get_task_status(task_id)
 
+    def batch_get(self, task_ids: list[int]) -> list[Optional[dict[str, Any]]]:
+        return self.task_storage.batch_get(task_ids)
+
     def get_all_results(self) -> list[dict[str, Any]]:
         return self.task_storage.get_all_results()
 
+    def get_results_page(
+        self,
+        cursor: int = 0,
+        limit: Optional[int] = None,
+        since: Optional[float] = None,
+        fields: Optional[tuple[str, ...]] = None,
+    ) -> dict[str, Any]:
+        return self.task_storage.get_results_page(cursor, limit, since, fields)
+
     def delete_task(self, task_id: int) -> dict[str, Any]:
         return self.task_storage.delete_task(task_id)
 
@@ -1007,6 +1130,31 @@ if RATE_LIMITING_AVAILABLE:
         print(f"[警告] 限流器初始化失败: {e}")
 
 
+def _dump_json(payload: Any) -> bytes:
+    """与 FastAPI 的 JSONResponse 保持一致的 JSON 编码"""
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _negotiated_response(
+    request: Request, payload: Any, headers: Optional[dict[str, str]] = None
+) -> Response:
+    """
+    按请求头协商响应编码
+
+    Accept 含 application/msgpack 时返回 MessagePack（服务端已安装 msgpack），
+    否则返回 JSON；响应体超过阈值时按 Accept-Encoding 使用 zstd/gzip 压缩。
+    """
+    encoded = encode_response(
+        payload,
+        request.headers.get("accept"),
+        request.headers.get("accept-encoding"),
+        json_dumps=_dump_json,
+    )
+    return Response(content=encoded.body, headers={**encoded.headers, **(headers or {})})
+
+
 def rate_limit(limit_value: str):
     """限流装饰器辅助函数"""
 
@@ -1050,6 +1198,12 @@ else:
 
 storage = _storage_instance
 
+# 提交端结果记忆化（仅对 cache=true 的提交生效）
+result_memo = ResultMemoizer(
+    max_entries=int(os.getenv("RESULT_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("RESULT_CACHE_TTL", "3600")),
+)
+
 
 # 初始化沙箱（优先使用新架构）
 if SANDBOX_AVAILABLE:
@@ -1222,6 +1376,9 @@ async def submit_task(
     if not safety_check["safe"]:
         raise HTTPException(status_code=400, detail=f"代码安全检查失败: {safety_check['error']}")
 
+    if submission.cache:
+        return _submit_memoized(submission)
+
     task_id = storage.add_task(
         submission.code, submission.timeout, submission.resources, submission.user_id
     )
@@ -1236,11 +1393,82 @@ async def submit_task(
     }
 
 
+def _submit_memoized(submission: TaskSubmission) -> dict[str, Any]:
+    """带缓存提交：命中直接完成，相同任务在途时合并等待"""
+    key = result_memo.make_key(submission.code, submission.resources)
+    decision = result_memo.submit(
+        key,
+        lambda enqueue: storage.add_task(
+            submission.code,
+            submission.timeout,
+            submission.resources,
+            submission.user_id,
+            enqueue=enqueue,
+        ),
+        # 结果正文已被清理的缓存项作废，按未命中登记为在途领头任务
+        is_valid=lambda entry: storage.result_store.exists(entry.digest),
+    )
+    task_id = decision.task_id
+
+    if decision.outcome == "hit":
+        entry = decision.entry
+        storage.complete_task_ref(task_id, ResultRef(entry.digest, entry.size))
+        return {
+            "task_id": task_id,
+            "status": "completed",
+            "cached": True,
+            "message": f"任务 {task_id} 命中结果缓存",
+            "safety_check": "通过",
+        }
+    if decision.outcome == "coalesced":
+        return {
+            "task_id": task_id,
+            "status": "submitted",
+            "cached": True,
+            "message": f"任务 {task_id} 将复用任务 {decision.leader_id} 的执行结果",
+            "safety_check": "通过",
+        }
+
+    return {
+        "task_id": task_id,
+        "status": "submitted",
+        "cached": False,
+        "message": f"任务 {task_id} 已加入队列",
+        "safety_check": "通过",
+    }
+
+
+def _finish_memoized(task_id: int):
+    """领头任务完成后写入结果缓存，并完成合并等待的任务"""
+    if not result_memo.is_leader(task_id):
+        return
+    status = storage.get_task_status(task_id)
+    if not status or not status.get("result_digest"):
+        return
+
+    cpu_seconds = 0.0
+    if status.get("assigned_at") and status.get("completed_at"):
+        cpu = (status.get("required_resources") or {}).get("cpu", 1.0)
+        cpu_seconds = max(0.0, status["completed_at"] - status["assigned_at"]) * cpu
+
+    ref = ResultRef(status["result_digest"], status["result_size"])
+    for follower_id in result_memo.complete(task_id, ref.digest, ref.size, cpu_seconds):
+        storage.complete_task_ref(follower_id, ref)
+
+
+def _record_hot_path_latency(operation: str, started: float):
+    """记录调度热路径延迟（高精度延迟直方图）"""
+    if LEGACY_INTEGRATION_ENABLED and integrator and integrator.system_monitor:
+        integrator.system_monitor.record_hot_path_latency(operation, time.perf_counter() - started)
+
+
 @app.get("/get_task")
-async def get_task(node_id: Optional[str] = None):
+async def get_task(request: Request, node_id: Optional[str] = None):
     """获取任务"""
     if node_id:
+        started = time.perf_counter()
         task = storage.get_task_for_node(node_id)
+        _record_hot_path_latency("get_task_for_node", started)
     else:
         # 兼容模式
         with storage.lock:
@@ -1257,45 +1485,164 @@ async def get_task(node_id: Optional[str] = None):
     if task is None:
         return {"task_id": None, "code": None, "status": "no_tasks"}
 
-    return {
-        "task_id": task.task_id,
-        "code": task.code,
-        "status": "assigned",
-        "assigned_node": task.assigned_node,
-    }
+    return _negotiated_response(
+        request,
+        {
+            "task_id": task.task_id,
+            "code": task.code,
+            "status": "assigned",
+            "assigned_node": task.assigned_node,
+        },
+    )
 
 
 @app.post("/submit_result")
 async def submit_result(result: TaskResult):
     """提交结果"""
+    started = time.perf_counter()
     success = storage.complete_task(result.task_id, result.result, result.node_id)
+    _record_hot_path_latency("complete_task", started)
 
     if not success:
         raise HTTPException(status_code=404, detail="任务未找到或无法完成")
 
+    _finish_memoized(result.task_id)
     return {"success": True, "task_id": result.task_id, "message": f"任务 {result.task_id} 完成"}
 
 
+@app.post("/submit_result/stream")
+async def submit_result_stream(task_id: int, request: Request, node_id: Optional[str] = None):
+    """以原始请求体流式提交大结果，边接收边哈希压缩写入结果存储"""
+    started = time.perf_counter()
+    # 先校验任务，避免为无法完成的任务接收并写入整个请求体
+    if not storage.can_complete(task_id):
+        raise HTTPException(status_code=404, detail="任务未找到或无法完成")
+
+    too_large = f"结果超过 {RESULT_STREAM_MAX_BYTES} 字节上限"
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > RESULT_STREAM_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=too_large)
+
+    # 哈希、压缩和文件写入都是阻塞操作，放到线程池中执行
+    received = 0
+    with await run_in_threadpool(storage.result_store.writer) as writer:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > RESULT_STREAM_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=too_large)
+            await run_in_threadpool(writer.write, chunk)
+        ref = await run_in_threadpool(writer.commit)
+
+    success = storage.complete_task_ref(task_id, ref, node_id)
+    _record_hot_path_latency("complete_task", started)
+
+    if not success:
+        raise HTTPException(status_code=404, detail="任务未找到或无法完成")
+
+    _finish_memoized(task_id)
+    return {"success": True, "task_id": task_id, "result": ref.to_dict()}
+
+
 @app.get("/status/{task_id}")
-async def get_status(task_id: int):
+async def get_status(task_id: int, request: Request):
     """获取任务状态"""
     status = storage.get_task_status(task_id)
     if status is None:
         raise HTTPException(status_code=404, detail="任务未找到")
-    return status
+    return _negotiated_response(request, status)
+
+
+STATUS_BATCH_LIMIT = 1000
+
+
+@app.post("/status/batch")
+async def get_status_batch(batch: TaskStatusBatch, request: Request):
+    """批量获取任务状态，支持 ETag / If-None-Match"""
+    if len(batch.task_ids) > STATUS_BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"单次最多查询 {STATUS_BATCH_LIMIT} 个任务")
+
+    statuses = storage.batch_get(batch.task_ids)
+    payload = {"statuses": {str(tid): status for tid, status in zip(batch.task_ids, statuses)}}
+    # ETag 取自规范 JSON 与协商的格式，同一内容的 JSON / MessagePack 表示互不混用
+    body = json.dumps(payload, sort_keys=True, default=str)
+    accept = request.headers.get("accept") or ""
+    digest = hashlib.sha256(f"{accept}\n{body}".encode()).hexdigest()[:32]
+    etag = f'"{digest}"'
+
+    if request.headers.get("if-none-match") in (etag, f"W/{etag}"):
+        return Response(status_code=304, headers={"ETag": etag, "Vary": VARY})
+    return _negotiated_response(request, payload, headers={"ETag": etag})
+
+
+RESULTS_PAGE_LIMIT = 1000
+RESULTS_STREAM_CHUNK = 500
+
+
+def _parse_result_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """解析逗号分隔的投影字段"""
+    if not fields:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = sorted(set(names) - set(RESULT_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"未知字段: {', '.join(unknown)}")
+    return names or None
 
 
 @app.get("/results")
-async def get_results():
-    """获取所有结果"""
-    results = storage.get_all_results()
-    return {"count": len(results), "results": results}
+async def get_results(
+    request: Request,
+    cursor: int = 0,
+    limit: Optional[int] = None,
+    since: Optional[float] = None,
+    fields: Optional[str] = None,
+):
+    """
+    获取结果，按完成顺序排列
+
+    支持游标分页（cursor/limit）、since 水位线增量获取和 fields 字段投影；
+    不带 limit 时返回全部结果，兼容旧客户端。
+    """
+    if limit is not None and not 1 <= limit <= RESULTS_PAGE_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit 取值范围为 1-{RESULTS_PAGE_LIMIT}")
+
+    page = storage.get_results_page(cursor, limit, since, _parse_result_fields(fields))
+    return _negotiated_response(request, {"count": len(page["results"]), **page})
+
+
+@app.get("/results/blob/{digest}")
+async def get_result_blob(digest: str):
+    """按摘要流式读取结果正文"""
+    chunks = storage.result_store.iter_chunks(digest)
+    if chunks is None:
+        raise HTTPException(status_code=404, detail="结果未找到")
+    return StreamingResponse(chunks, media_type="application/octet-stream")
+
+
+@app.get("/results/stream")
+async def stream_results(since: Optional[float] = None, fields: Optional[str] = None):
+    """以 NDJSON 流式导出结果，逐页读取存储，避免一次性构建完整响应"""
+    projection = _parse_result_fields(fields)
+
+    def _lines():
+        cursor = 0
+        while True:
+            page = storage.get_results_page(cursor, RESULTS_STREAM_CHUNK, since, projection)
+            for item in page["results"]:
+                yield json.dumps(item, default=str) + "\n"
+            if not page["has_more"]:
+                break
+            cursor = page["next_cursor"]
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
 
 
 @app.get("/stats")
-async def get_stats():
+async def get_stats(request: Request):
     """获取统计"""
-    return storage.get_system_stats()
+    stats = storage.get_system_stats()
+    stats["result_cache"] = result_memo.stats()
+    return _negotiated_response(request, stats)
 
 
 # ==================== 节点管理API ====================
@@ -1328,7 +1675,7 @@ async def update_heartbeat(node_id: str, heartbeat: NodeHeartbeat):
 
 
 @app.get("/api/nodes")
-async def list_nodes(online_only: bool = True):
+async def list_nodes(request: Request, online_only: bool = True):
     """列出节点"""
     try:
         if online_only:
@@ -1347,9 +1694,10 @@ async def list_nodes(online_only: bool = True):
                         }
                     )
 
-        return {"count": len(nodes), "nodes": nodes, "online_only": online_only}
+        payload = {"count": len(nodes), "nodes": nodes, "online_only": online_only}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取节点失败: {str(e)}") from e
+    return _negotiated_response(request, payload)
 
 
 @app.post("/api/nodes/activate-local")
@@ -1418,6 +1766,11 @@ async def delete_task_api(task_id: int):
     result = storage.delete_task(task_id)
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["error"])
+
+    # 被删除的是合并执行的领头任务时，由第一个等待任务接替执行
+    successor = result_memo.abandon(task_id)
+    if successor is not None:
+        storage.release_task(successor)
     return result
 
 
@@ -8,11 +8,14 @@ Implements:
 - Preemption for high-priority tasks
 - Affinity/Anti-affinity constraints
 - Resource quotas and limits
+- Data locality with delay scheduling
 
 References:
 - Kubernetes Scheduler: https://kubernetes.io/docs/concepts/scheduling-eviction/
 - Scheduling Framework: https://kubernetes.io/docs/concepts/scheduling-eviction/scheduling-framework/
 - Borg: "Large-scale cluster management at Google with Borg" (Verma et al., 2015)
+- Delay Scheduling: "Delay Scheduling: A Simple Technique for Achieving Locality
+  and Fairness in Cluster Scheduling" (Zaharia et al., 2010)
 """
 
 import asyncio
@@ -21,7 +24,9 @@ import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from enum import Enum, IntEnum
-from typing import Any, Optional
+from typing import Any, Callable, Optional
+
+from legacy.distributed_task_v2.data_locality import DataLocalityManager, LocalityLevel
 
 
 class TaskPriority(IntEnum):
@@ -141,6 +146,7 @@ class TaskSpec:
     preemption_policy: str = "PreemptLowerPriority"
     user_id: str = ""
     labels: dict[str, str] = field(default_factory=dict)
+    data_ids: list[str] = field(default_factory=list)
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -159,6 +165,7 @@ class TaskSpec:
             "assigned_node": self.assigned_node,
             "user_id": self.user_id,
             "labels": self.labels,
+            "data_ids": self.data_ids,
         }
 
 
@@ -228,6 +235,10 @@ class Predicate(ABC):
     def check(self, node: NodeSpec, task: TaskSpec) -> bool:
         pass
 
+    def on_bind(self, node: NodeSpec, task: TaskSpec) -> None:
+        """Called after the task has been bound to the node; a no-op hook by default."""
+        return None
+
 
 class ResourceFitPredicate(Predicate):
     """Check if node has enough resources."""
@@ -301,6 +312,64 @@ class TaskAntiAffinityPredicate(Predicate):
         return True
 
 
+class DataLocalityPredicate(Predicate):
+    """Delay scheduling: hold a task back from nodes without its data.
+
+    A task that reads ``data_ids`` first only fits nodes holding most of its
+    data (NODE_LOCAL). After ``node_local_wait`` seconds it also accepts nodes
+    in a rack holding the data (RACK_LOCAL), and after a further
+    ``rack_local_wait`` seconds any node. The wait starts the first time the
+    task is considered. Tasks whose data is not registered anywhere are not
+    delayed.
+
+    Placements are recorded in the locality manager, which reports bytes
+    moved and locality hit rates.
+    """
+
+    def __init__(
+        self,
+        manager: DataLocalityManager,
+        node_local_wait: float = 3.0,
+        rack_local_wait: float = 3.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.manager = manager
+        self.node_local_wait = node_local_wait
+        self.rack_local_wait = rack_local_wait
+        self._clock = clock
+        self._waiting_since: dict[str, float] = {}
+
+    @property
+    def name(self) -> str:
+        return "DataLocality"
+
+    def allowed_level(self, task: TaskSpec) -> LocalityLevel:
+        """Worst locality level the task accepts right now."""
+        if not task.data_ids or not any(self.manager.get_data_nodes(d) for d in task.data_ids):
+            return LocalityLevel.ANY
+
+        now = self._clock()
+        waited = now - self._waiting_since.setdefault(task.task_id, now)
+        if waited < self.node_local_wait:
+            return LocalityLevel.NODE_LOCAL
+        if waited < self.node_local_wait + self.rack_local_wait:
+            return LocalityLevel.RACK_LOCAL
+        return LocalityLevel.ANY
+
+    def check(self, node: NodeSpec, task: TaskSpec) -> bool:
+        allowed = self.allowed_level(task)
+        if allowed == LocalityLevel.ANY:
+            return True
+
+        level = self.manager.calculate_locality_score(node.node_id, task.data_ids).level
+        return level <= allowed
+
+    def on_bind(self, node: NodeSpec, task: TaskSpec) -> None:
+        self._waiting_since.pop(task.task_id, None)
+        if task.data_ids:
+            self.manager.record_placement(node.node_id, task.data_ids)
+
+
 class PriorityFunction(ABC):
     """Base class for scheduling priority functions."""
 
@@ -313,6 +382,10 @@ class PriorityFunction(ABC):
     def score(self, node: NodeSpec, task: TaskSpec) -> float:
         pass
 
+    def on_bind(self, node: NodeSpec, task: TaskSpec) -> None:
+        """Called after the task has been bound to the node; a no-op hook by default."""
+        return None
+
 
 class ResourceBalancePriority(PriorityFunction):
     """Score based on resource balance after scheduling."""
@@ -388,6 +461,22 @@ class SpreadPriority(PriorityFunction):
         return 100 / (task_count + 1)
 
 
+class DataLocalityPriority(PriorityFunction):
+    """Score nodes by the share of the task's data they hold or are near."""
+
+    def __init__(self, manager: DataLocalityManager):
+        self.manager = manager
+
+    @property
+    def name(self) -> str:
+        return "DataLocality"
+
+    def score(self, node: NodeSpec, task: TaskSpec) -> float:
+        if not task.data_ids:
+            return 0.0
+        return self.manager.calculate_locality_score(node.node_id, task.data_ids).score * 100
+
+
 class Scheduler:
     """Advanced task scheduler with Kubernetes-style algorithms.
 
@@ -551,6 +640,17 @@ class Scheduler:
 
         return candidates[0]
 
+    def _bind(self, node: NodeSpec, task: TaskSpec) -> None:
+        node.tasks.add(task.task_id)
+        task.assigned_node = node.node_id
+        task.scheduled_at = time.time()
+        task.state = TaskState.ASSIGNED
+
+        for predicate in self.predicates:
+            predicate.on_bind(node, task)
+        for priority_func, _ in self.priorities:
+            priority_func.on_bind(node, task)
+
     def _find_preemption_candidates(self, task: TaskSpec) -> list[tuple[NodeSpec, list[TaskSpec]]]:
         """Find nodes where lower priority tasks can be preempted."""
         candidates = []
@@ -619,10 +719,7 @@ class Scheduler:
                     selected = self._select_node_policy(candidates, task)
 
                     if selected and selected.allocate(task.resources):
-                        selected.tasks.add(task.task_id)
-                        task.assigned_node = selected.node_id
-                        task.scheduled_at = time.time()
-                        task.state = TaskState.ASSIGNED
+                        self._bind(selected, task)
 
                         self._queue.remove(task_id)
                         self._stats["scheduled"] += 1
@@ -636,10 +733,7 @@ class Scheduler:
                         node, tasks_to_preempt = preemption_candidates[0]
 
                         if self._preempt_tasks(node, tasks_to_preempt, task):
-                            node.tasks.add(task.task_id)
-                            task.assigned_node = node.node_id
-                            task.scheduled_at = time.time()
-                            task.state = TaskState.ASSIGNED
+                            self._bind(node, task)
 
                             self._queue.remove(task_id)
                             self._stats["scheduled"] += 1
@@ -718,11 +812,13 @@ __all__ = [
     "NodeAffinityPredicate",
     "TaintTolerationPredicate",
     "TaskAntiAffinityPredicate",
+    "DataLocalityPredicate",
     "PriorityFunction",
     "ResourceBalancePriority",
     "LeastLoadedPriority",
     "MostLoadedPriority",
     "NodeReliabilityPriority",
     "SpreadPriority",
+    "DataLocalityPriority",
     "Scheduler",
 ]
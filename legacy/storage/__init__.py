@@ -12,6 +12,7 @@ Architecture Reference:
 
 import asyncio
 import json
+import math
 import time
 from dataclasses import dataclass, field
 from enum import Enum
@@ -365,6 +366,18 @@ class RedisStorage(BaseStorage):
     Suitable for production multi-node deployments.
     Provides persistence and distributed access.
 
+    Each task is a hash of JSON-encoded fields, so writers change only the
+    fields they touch. Pending tasks are indexed in one sorted set per
+    resource class (CPU and memory requirements rounded down to powers of
+    two), scored by creation time. A class is never larger than the
+    requirements of its tasks, so it only prefilters: nodes walk the classes
+    not above their capacity (largest first) and run a Lua script that looks
+    at a bounded batch of one class's queue, takes the oldest task whose
+    exact requirements fit and marks it assigned in one atomic step, so two
+    nodes can never claim the same task and no single script call scans a
+    whole queue. ``update_task`` is a WATCH/MULTI transaction and retries if
+    a claim lands in between.
+
     Requirements:
         pip install redis
 
@@ -376,6 +389,67 @@ class RedisStorage(BaseStorage):
         https://redis.io/docs/data-types/
     """
 
+    # Pending task ids examined per claim script call.
+    CLAIM_SCAN_BATCH = 100
+
+    # KEYS[1]: resource class set, KEYS[2]: pending queue of the class
+    # ARGV: node cpu, node memory, key prefix, class name, start offset, last id seen,
+    #       scan batch size, then the JSON-encoded status, assigned_node and assigned_at
+    # Returns {1, id} when a task was claimed, {2, last id, next offset} when more
+    # of the queue is left to scan and {0} when the class is exhausted.
+    CLAIM_SCRIPT = """
+local queue = KEYS[2]
+local cpu = tonumber(ARGV[1])
+local memory = tonumber(ARGV[2])
+local prefix = ARGV[3]
+local batch = tonumber(ARGV[7])
+
+local start = tonumber(ARGV[5])
+if ARGV[6] ~= '' then
+    local rank = redis.call('ZRANK', queue, ARGV[6])
+    if rank then
+        start = rank + 1
+    end
+end
+
+local ids = redis.call('ZRANGE', queue, start, start + batch - 1)
+local removed = 0
+for _, id in ipairs(ids) do
+    local task_key = prefix .. 'task:' .. id
+    local resources = redis.call('HGET', task_key, 'resources')
+    if not resources then
+        redis.call('ZREM', queue, id)
+        removed = removed + 1
+    else
+        resources = cjson.decode(resources)
+        if type(resources) ~= 'table' then
+            resources = {}
+        end
+        local need_cpu = tonumber(resources['cpu']) or 1.0
+        local need_memory = tonumber(resources['memory']) or 512
+        if need_cpu <= cpu and need_memory <= memory then
+            redis.call('ZREM', queue, id)
+            if redis.call('ZCARD', queue) == 0 then
+                redis.call('SREM', KEYS[1], ARGV[4])
+            end
+            redis.call(
+                'HSET', task_key,
+                'status', ARGV[8], 'assigned_node', ARGV[9], 'assigned_at', ARGV[10]
+            )
+            return {1, id}
+        end
+    end
+end
+
+if #ids < batch then
+    if redis.call('ZCARD', queue) == 0 then
+        redis.call('SREM', KEYS[1], ARGV[4])
+    end
+    return {0}
+end
+return {2, ids[#ids], start + #ids - removed}
+"""
+
     def __init__(
         self,
         redis_url: str = "redis://localhost:6379/0",
@@ -386,7 +460,62 @@ class RedisStorage(BaseStorage):
         self.redis_url = redis_url
         self.key_prefix = key_prefix
         self._client = None
+        self._claim_script = None
         self._task_counter_key = f"{key_prefix}task_counter"
+        self._classes_key = f"{key_prefix}pending_classes"
+
+    @staticmethod
+    def resource_class(resources: dict[str, Any]) -> str:
+        """
+        Round CPU/memory requirements down to powers of two: ``"<cpu>:<memory_mb>"``.
+
+        Requirements below the smallest class (0.5 CPU, 256 MB) fall into class 0,
+        so a class never exceeds the requirements it stands for.
+        """
+        cpu = float(resources.get("cpu", 1.0) or 0)
+        memory = float(resources.get("memory", 512) or 0)
+        cpu_class = 2.0 ** math.floor(math.log2(cpu)) if cpu >= 0.5 else 0
+        memory_class = 2 ** math.floor(math.log2(memory)) if memory >= 256 else 0
+        return f"{cpu_class:g}:{memory_class}"
+
+    def _pending_key(self, task: TaskInfo) -> str:
+        return f"{self.key_prefix}pending:{self.resource_class(task.resources)}"
+
+    @staticmethod
+    def _task_fields(task: TaskInfo) -> dict[str, str]:
+        """Encode each task field as JSON for the task hash."""
+        return {name: json.dumps(value) for name, value in task.to_dict().items()}
+
+    @staticmethod
+    def _task_from_fields(fields: dict[bytes, bytes]) -> TaskInfo:
+        """Decode a task hash written by ``_task_fields``."""
+        return TaskInfo.from_dict(
+            {name.decode(): json.loads(value) for name, value in fields.items()}
+        )
+
+    def _queue_task_writes(self, pipe, task: TaskInfo, previous: Optional[TaskInfo] = None) -> None:
+        """Queue the writes that store ``task`` and keep the pending index in sync."""
+        key = f"{self.key_prefix}task:{task.task_id}"
+        pending_key = self._pending_key(task)
+
+        if previous is None:
+            pipe.delete(key)
+        elif self._pending_key(previous) != pending_key:
+            pipe.zrem(self._pending_key(previous), task.task_id)
+        pipe.hset(key, mapping=self._task_fields(task))
+        pipe.expire(key, self.task_ttl)
+        if task.status == TaskStatus.PENDING:
+            pipe.zadd(pending_key, {task.task_id: task.created_at})
+            pipe.sadd(self._classes_key, self.resource_class(task.resources))
+        else:
+            pipe.zrem(pending_key, task.task_id)
+
+    async def _get_claim_script(self):
+        """Register the claim script once per client."""
+        if self._claim_script is None:
+            client = await self._get_client()
+            self._claim_script = client.register_script(self.CLAIM_SCRIPT)
+        return self._claim_script
 
     async def _get_client(self):
         """Get or create Redis client."""
@@ -408,32 +537,55 @@ class RedisStorage(BaseStorage):
         if task.task_id == 0:
             task.task_id = await client.incr(self._task_counter_key)
 
-        key = f"{self.key_prefix}task:{task.task_id}"
-        await client.setex(key, self.task_ttl, self._serialize_task(task))
-        await client.sadd(f"{self.key_prefix}tasks:pending", task.task_id)
+        async with client.pipeline(transaction=True) as pipe:
+            self._queue_task_writes(pipe, task)
+            await pipe.execute()
 
     async def get_task(self, task_id: int) -> Optional[TaskInfo]:
         client = await self._get_client()
         key = f"{self.key_prefix}task:{task_id}"
-        data = await client.get(key)
+        fields = await client.hgetall(key)
 
-        if data:
-            return self._deserialize_task(data.decode())
+        if fields:
+            return self._task_from_fields(fields)
         return None
 
     async def update_task(self, task_id: int, updates: dict[str, Any]) -> None:
-        task = await self.get_task(task_id)
-        if task:
-            for key, value in updates.items():
-                if hasattr(task, key):
-                    setattr(task, key, value)
-            await self.store_task(task)
+        from redis.exceptions import WatchError
+
+        client = await self._get_client()
+        key = f"{self.key_prefix}task:{task_id}"
+
+        async with client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    fields = await pipe.hgetall(key)
+                    if not fields:
+                        return
+                    previous = self._task_from_fields(fields)
+                    task = self._task_from_fields(fields)
+                    for name, value in updates.items():
+                        if hasattr(task, name):
+                            setattr(task, name, value)
+
+                    pipe.multi()
+                    self._queue_task_writes(pipe, task, previous)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue
 
     async def delete_task(self, task_id: int) -> None:
+        task = await self.get_task(task_id)
         client = await self._get_client()
         key = f"{self.key_prefix}task:{task_id}"
-        await client.delete(key)
-        await client.srem(f"{self.key_prefix}tasks:pending", task_id)
+
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if task is not None:
+                pipe.zrem(self._pending_key(task), task_id)
+            await pipe.execute()
 
     async def list_tasks(
         self, status: Optional[TaskStatus] = None, user_id: Optional[str] = None, limit: int = 100
@@ -447,9 +599,9 @@ class RedisStorage(BaseStorage):
 
         tasks = []
         for key in keys[: limit * 2]:
-            data = await client.get(key)
-            if data:
-                task = self._deserialize_task(data.decode())
+            fields = await client.hgetall(key)
+            if fields:
+                task = self._task_from_fields(fields)
                 if status and task.status != status:
                     continue
                 if user_id and task.user_id != user_id:
@@ -501,30 +653,48 @@ class RedisStorage(BaseStorage):
         if not node:
             return None
 
-        tasks = await self.list_tasks(status=TaskStatus.PENDING)
-
-        if not tasks:
-            return None
-
-        best_task = None
-        best_score = -1
-
-        for task in tasks:
-            score = self._calculate_match_score(node, task)
-            if score > best_score:
-                best_score = score
-                best_task = task
+        cpu = float(node.available_resources.get("cpu", 0))
+        memory = float(node.available_resources.get("memory", 0))
+        client = await self._get_client()
+        script = await self._get_claim_script()
 
-        if best_task and best_score > 0:
-            await self.update_task(
-                best_task.task_id,
-                {
-                    "status": TaskStatus.ASSIGNED,
-                    "assigned_node": node_id,
-                    "assigned_at": time.time(),
-                },
-            )
-            return best_task
+        fits = []
+        for raw in await client.smembers(self._classes_key):
+            name = raw.decode() if isinstance(raw, bytes) else raw
+            class_cpu, _, class_memory = name.partition(":")
+            try:
+                bounds = (float(class_cpu), float(class_memory))
+            except ValueError:
+                continue
+            if bounds[0] <= cpu and bounds[1] <= memory:
+                fits.append((bounds, name))
+        fits.sort(reverse=True)
+
+        status, assigned_node = json.dumps(TaskStatus.ASSIGNED.value), json.dumps(node_id)
+        for _, name in fits:
+            queue = f"{self.key_prefix}pending:{name}"
+            offset, last_id = 0, ""
+            while True:
+                result = await script(
+                    keys=[self._classes_key, queue],
+                    args=[
+                        cpu,
+                        memory,
+                        self.key_prefix,
+                        name,
+                        offset,
+                        last_id,
+                        self.CLAIM_SCAN_BATCH,
+                        status,
+                        assigned_node,
+                        json.dumps(time.time()),
+                    ],
+                )
+                if result[0] == 0:
+                    break
+                if result[0] == 1:
+                    return await self.get_task(int(result[1]))
+                last_id, offset = result[1], result[2]
 
         return None
 
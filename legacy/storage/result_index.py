@@ -0,0 +1,137 @@
+"""Result Index - completion-ordered index for paging task results.
+
+Task storages record each completed task here. Pages are cut by cursor and by
+a ``since`` watermark (completion time) with binary searches instead of scans
+over every task.
+
+Every entry gets a sequence number that only ever grows, and cursors are
+sequence numbers, so dropping entries (a task that completes again, or one
+that left the storage) never shifts a cursor a client is holding. Completion
+times are kept strictly increasing, so a watermark never skips a result.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+from collections.abc import Callable, Mapping
+from typing import Any
+
+# Fields a result page can be projected to.
+RESULT_FIELDS = (
+    "task_id",
+    "result",
+    "result_digest",
+    "result_size",
+    "completed_at",
+    "assigned_node",
+    "user_id",
+)
+
+
+def project_result(
+    task: Any,
+    fields: tuple[str, ...] | None = None,
+    load_result: Callable[[Any], str | None] | None = None,
+) -> dict[str, Any]:
+    """Project a completed task onto ``fields``; the body is only read for ``result``."""
+    projected = {}
+    for name in fields or RESULT_FIELDS:
+        if name == "result" and load_result is not None:
+            projected[name] = load_result(task)
+        else:
+            projected[name] = getattr(task, name)
+    return projected
+
+
+class CompletionIndex:
+    """Completed task ids in completion order. Not thread-safe; callers hold their lock."""
+
+    def __init__(self):
+        self._seqs: list[int] = []
+        self._ids: list[int] = []
+        self._times: list[float] = []
+        self._seq_of: dict[int, int] = {}
+        self._next_seq = 0
+        self._last_time = -math.inf
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, task_id: int) -> bool:
+        return task_id in self._seq_of
+
+    def record(self, task_id: int, completed_at: float) -> None:
+        """Append a completion; a task already indexed moves to the end."""
+        self.discard(task_id)
+        # Equal timestamps or a clock step back get the next float up.
+        if completed_at <= self._last_time:
+            completed_at = math.nextafter(self._last_time, math.inf)
+        self._last_time = completed_at
+
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seqs.append(seq)
+        self._ids.append(task_id)
+        self._times.append(completed_at)
+        self._seq_of[task_id] = seq
+
+    def discard(self, task_id: int) -> bool:
+        """Drop a task from the index; returns False if it was not indexed."""
+        seq = self._seq_of.pop(task_id, None)
+        if seq is None:
+            return False
+        i = bisect.bisect_left(self._seqs, seq)
+        del self._seqs[i], self._ids[i], self._times[i]
+        return True
+
+    def page(
+        self,
+        tasks: Mapping[int, Any],
+        cursor: int = 0,
+        limit: int | None = None,
+        since: float | None = None,
+        fields: tuple[str, ...] | None = None,
+        load_result: Callable[[Any], str | None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Cut one page of results.
+
+        Entries whose task is no longer in ``tasks`` are pruned as they are met.
+
+        Returns:
+            ``{"results", "next_cursor", "has_more", "watermark"}``
+        """
+        total = len(self._ids)
+        start = bisect.bisect_left(self._seqs, max(0, cursor))
+        if since is not None:
+            start = max(start, bisect.bisect_right(self._times, since))
+        end = total if limit is None else min(total, start + limit)
+
+        results = []
+        missing = []
+        for task_id in self._ids[start:end]:
+            task = tasks.get(task_id)
+            if task is None:
+                missing.append(task_id)
+            else:
+                results.append(project_result(task, fields, load_result))
+
+        next_cursor = self._seqs[end - 1] + 1 if end else 0
+        watermark = self._times[end - 1] if end else 0.0
+        if since is not None:
+            watermark = max(watermark, since)
+        has_more = end < total
+
+        for task_id in missing:
+            self.discard(task_id)
+
+        return {
+            "results": results,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "watermark": watermark,
+        }
+
+
+__all__ = ["RESULT_FIELDS", "CompletionIndex", "project_result"]
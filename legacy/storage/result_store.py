@@ -0,0 +1,238 @@
+"""Result Store - content-addressed, compressed storage for task result bodies.
+
+Bodies are keyed by their SHA-256 digest and written once, as a zlib stream,
+to ``directory/<digest[:2]>/<digest>.z``. Identical results share one file, and
+task records keep only a :class:`ResultRef` (digest and size) and read the body
+back on demand, so scheduler memory does not grow with result volume.
+
+Writes go to a temporary file in ``directory`` and are renamed into place,
+so a blob is either absent or complete and concurrent writers of the same
+body are harmless.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+CHUNK_SIZE = 64 * 1024
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+@dataclass(frozen=True)
+class ResultRef:
+    """Reference to a stored result body."""
+
+    digest: str
+    size: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"digest": self.digest, "size": self.size}
+
+
+def _to_bytes(data: bytes | str) -> bytes:
+    return data.encode("utf-8") if isinstance(data, str) else bytes(data)
+
+
+class ResultWriter:
+    """Incrementally hashes and compresses a body that arrives in chunks.
+
+    Call :meth:`commit` once all chunks are written; leaving the ``with``
+    block without committing discards the partial body.
+    """
+
+    def __init__(self, store: ResultStore):
+        self._store = store
+        store.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=store.directory, prefix=".incoming-")
+        self._tmp_path = Path(tmp_path)
+        self._file = os.fdopen(fd, "wb")
+        self._hash = hashlib.sha256()
+        self._compressor = zlib.compressobj(store.compression_level)
+        self._size = 0
+        self._stored_size = 0
+        self._closed = False
+
+    def write(self, chunk: bytes | str) -> None:
+        if self._closed:
+            raise ValueError("write to a closed ResultWriter")
+        data = _to_bytes(chunk)
+        self._hash.update(data)
+        self._size += len(data)
+        compressed = self._compressor.compress(data)
+        self._stored_size += len(compressed)
+        self._file.write(compressed)
+
+    def commit(self) -> ResultRef:
+        if self._closed:
+            raise ValueError("ResultWriter already closed")
+        tail = self._compressor.flush()
+        self._stored_size += len(tail)
+        self._file.write(tail)
+        self._file.close()
+        self._closed = True
+
+        ref = ResultRef(self._hash.hexdigest(), self._size)
+        self._store._install(self._tmp_path, ref, self._stored_size)
+        return ref
+
+    def abort(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> ResultWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.abort()
+
+
+class ResultStore:
+    """Content-addressed result bodies in a compressed blob directory.
+
+    Args:
+        directory: Blob directory, created on first write.
+        compression_level: zlib level used for new blobs.
+        cache_size: Number of recently read bodies kept decoded in memory.
+        cache_max_bytes: Bodies larger than this are never cached.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        compression_level: int = 6,
+        cache_size: int = 128,
+        cache_max_bytes: int = 64 * 1024,
+    ):
+        self.directory = Path(directory)
+        self.compression_level = compression_level
+        self.cache_size = cache_size
+        self.cache_max_bytes = cache_max_bytes
+
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "dedup_hits": 0, "bytes_in": 0, "bytes_written": 0}
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / f"{digest}.z"
+
+    def _install(self, tmp_path: Path, ref: ResultRef, stored_size: int) -> None:
+        """Move a finished temp blob into place, or drop it if already stored."""
+        path = self._path(ref.digest)
+        deduplicated = path.exists()
+        if deduplicated:
+            tmp_path.unlink(missing_ok=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self._stats["puts"] += 1
+            self._stats["bytes_in"] += ref.size
+            if deduplicated:
+                self._stats["dedup_hits"] += 1
+            else:
+                self._stats["bytes_written"] += stored_size
+
+    def put(self, data: bytes | str) -> ResultRef:
+        """Store a body held in memory; bodies already stored are not rewritten."""
+        data = _to_bytes(data)
+        ref = ResultRef(hashlib.sha256(data).hexdigest(), len(data))
+        if self._path(ref.digest).exists():
+            with self._lock:
+                self._stats["puts"] += 1
+                self._stats["bytes_in"] += ref.size
+                self._stats["dedup_hits"] += 1
+            return ref
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        compressed = zlib.compress(data, self.compression_level)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".incoming-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(compressed)
+        self._install(Path(tmp_path), ref, len(compressed))
+        return ref
+
+    def put_stream(self, chunks: Iterable[bytes | str]) -> ResultRef:
+        """Store a body from an iterable of chunks without buffering it whole."""
+        with self.writer() as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+            return writer.commit()
+
+    def writer(self) -> ResultWriter:
+        """Start an incremental write, for bodies pushed from async sources."""
+        return ResultWriter(self)
+
+    def exists(self, digest: str) -> bool:
+        return bool(_DIGEST_RE.match(digest)) and self._path(digest).exists()
+
+    def get(self, digest: str) -> bytes | None:
+        """Return the body for ``digest``, or None if it is unknown."""
+        if not _DIGEST_RE.match(digest):
+            return None
+        with self._lock:
+            data = self._cache.get(digest)
+            if data is not None:
+                self._cache.move_to_end(digest)
+                return data
+
+        try:
+            with open(self._path(digest), "rb") as f:
+                data = zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+
+        if len(data) <= self.cache_max_bytes and self.cache_size > 0:
+            with self._lock:
+                self._cache[digest] = data
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return data
+
+    def get_text(self, digest: str) -> str | None:
+        data = self.get(digest)
+        return None if data is None else data.decode("utf-8", errors="replace")
+
+    def iter_chunks(self, digest: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes] | None:
+        """Stream the decompressed body in chunks, or None if it is unknown."""
+        if not self.exists(digest):
+            return None
+
+        def _chunks() -> Iterator[bytes]:
+            decompressor = zlib.decompressobj()
+            with open(self._path(digest), "rb") as f:
+                while True:
+                    compressed = f.read(chunk_size)
+                    if not compressed:
+                        break
+                    data = decompressor.decompress(compressed)
+                    if data:
+                        yield data
+            tail = decompressor.flush()
+            if tail:
+                yield tail
+
+        return _chunks()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached_bodies"] = len(self._cache)
+        return stats
+
+
+__all__ = ["CHUNK_SIZE", "ResultRef", "ResultStore", "ResultWriter"]
@@ -258,6 +258,18 @@ class DependencyGraph(Generic[T]):
 
         return list(reversed(path))
 
+    def compute_path_lengths(self, weight: Callable[[T], float] | None = None) -> dict[T, float]:
+        # Longest weighted path from each node to a sink (node included); {} on cycles
+        order = self.topological_sort()
+        lengths: dict[T, float] = {}
+
+        for node_id in reversed(order):
+            own = weight(node_id) if weight else 1.0
+            tail = max((lengths[dep_id] for dep_id in self.nodes[node_id].dependents), default=0.0)
+            lengths[node_id] = own + tail
+
+        return lengths
+
     def subgraph(self, node_ids: set[T]) -> DependencyGraph[T]:
         sub = DependencyGraph[T]()
 
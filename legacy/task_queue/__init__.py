@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import heapq
+import itertools
 import threading
 import time
 import uuid
@@ -121,6 +123,26 @@ class TaskQueueBackend(ABC):
     def dequeue(self, timeout: float = 0) -> Task | None:
         pass
 
+    def enqueue_many(self, tasks: list[Task]) -> int:
+        """Enqueue tasks in order; returns how many were accepted."""
+        enqueued = 0
+        for task in tasks:
+            if not self.enqueue(task):
+                break
+            enqueued += 1
+        return enqueued
+
+    def dequeue_batch(self, max_tasks: int, timeout: float = 0) -> list[Task]:
+        """Dequeue up to ``max_tasks``, waiting at most ``timeout`` for the first one."""
+        tasks: list[Task] = []
+        task = self.dequeue(timeout)
+        while task is not None:
+            tasks.append(task)
+            if len(tasks) >= max_tasks:
+                break
+            task = self.dequeue()
+        return tasks
+
     @abstractmethod
     def peek(self) -> Task | None:
         pass
@@ -143,43 +165,69 @@ class TaskQueueBackend(ABC):
 
 
 class MemoryQueueBackend(TaskQueueBackend):
+    """In-memory priority queue.
+
+    A binary heap of ``(-priority, sequence, task)`` entries: highest priority
+    first, FIFO among equal priorities.
+    """
+
     def __init__(self, max_size: int = 10000):
         self.max_size = max_size
-        self._queue: list[Task] = []
+        self._queue: list[tuple[int, int, Task]] = []
+        self._sequence = itertools.count()
         self._tasks: dict[str, Task] = {}
         self._lock = threading.RLock()
         self._condition = threading.Condition(self._lock)
 
+    def _push_locked(self, task: Task) -> bool:
+        if len(self._queue) >= self.max_size:
+            return False
+        task.status = TaskStatus.QUEUED
+        heapq.heappush(self._queue, (-task.priority, next(self._sequence), task))
+        self._tasks[task.id] = task
+        return True
+
+    def _pop_locked(self) -> Task:
+        task = heapq.heappop(self._queue)[2]
+        task.status = TaskStatus.RUNNING
+        task.started_at = time.time()
+        return task
+
     def enqueue(self, task: Task) -> bool:
         with self._lock:
-            if len(self._queue) >= self.max_size:
+            if not self._push_locked(task):
                 return False
-
-            task.status = TaskStatus.QUEUED
-            self._queue.append(task)
-            self._tasks[task.id] = task
-            self._queue.sort(key=lambda t: t.priority, reverse=True)
             self._condition.notify()
             return True
 
+    def enqueue_many(self, tasks: list[Task]) -> int:
+        with self._lock:
+            enqueued = 0
+            for task in tasks:
+                if not self._push_locked(task):
+                    break
+                enqueued += 1
+            self._condition.notify(enqueued)
+            return enqueued
+
     def dequeue(self, timeout: float = 0) -> Task | None:
         with self._condition:
+            if not self._queue and timeout > 0:
+                self._condition.wait_for(lambda: self._queue, timeout)
             if not self._queue:
-                if timeout > 0:
-                    self._condition.wait(timeout)
-                if not self._queue:
-                    return None
-
-            if self._queue:
-                task = self._queue.pop(0)
-                task.status = TaskStatus.RUNNING
-                task.started_at = time.time()
-                return task
-            return None
+                return None
+            return self._pop_locked()
+
+    def dequeue_batch(self, max_tasks: int, timeout: float = 0) -> list[Task]:
+        with self._condition:
+            if not self._queue and timeout > 0:
+                self._condition.wait_for(lambda: self._queue, timeout)
+            count = min(max_tasks, len(self._queue))
+            return [self._pop_locked() for _ in range(count)]
 
     def peek(self) -> Task | None:
         with self._lock:
-            return self._queue[0] if self._queue else None
+            return self._queue[0][2] if self._queue else None
 
     def size(self) -> int:
         with self._lock:
@@ -239,11 +287,11 @@ class RedisQueueBackend(TaskQueueBackend):
     def _task_key(self, task_id: str) -> str:
         return f"{self._task_prefix}{task_id}"
 
-    def enqueue(self, task: Task) -> bool:
+    def _encode_queued(self, task: Task) -> str:
         import json as json_module
 
         task.status = TaskStatus.QUEUED
-        task_data = json_module.dumps(
+        return json_module.dumps(
             {
                 "id": task.id,
                 "name": task.name,
@@ -258,24 +306,26 @@ class RedisQueueBackend(TaskQueueBackend):
             }
         )
 
-        self.client.hset(self._task_key(task.id), "data", task_data)
+    def enqueue(self, task: Task) -> bool:
+        self.client.hset(self._task_key(task.id), "data", self._encode_queued(task))
         self.client.zadd(self.queue_name, {task.id: -task.priority})
 
         return True
 
-    def dequeue(self, timeout: float = 0) -> Task | None:
-        import json as json_module
+    def enqueue_many(self, tasks: list[Task]) -> int:
+        if not tasks:
+            return 0
 
-        result = self.client.zpopmax(self.queue_name)
+        pipe = self.client.pipeline(transaction=False)
+        for task in tasks:
+            pipe.hset(self._task_key(task.id), "data", self._encode_queued(task))
+        pipe.zadd(self.queue_name, {task.id: -task.priority for task in tasks})
+        pipe.execute()
+        return len(tasks)
 
-        if not result:
-            return None
-
-        task_id, _ = result[0]
-        task_data = self.client.hget(self._task_key(task_id), "data")
-
-        if not task_data:
-            return None
+    def _start_task(self, task_data: str) -> tuple[Task, str]:
+        """Decode a popped task, mark it running and return it with its new encoding."""
+        import json as json_module
 
         data = json_module.loads(task_data)
         task = Task(
@@ -291,15 +341,46 @@ class RedisQueueBackend(TaskQueueBackend):
             metadata=data.get("metadata", {}),
             tags=data.get("tags", []),
         )
-
-        self.client.hset(
-            self._task_key(task.id),
-            "data",
-            json_module.dumps({**data, "status": task.status.value, "started_at": task.started_at}),
+        encoded = json_module.dumps(
+            {**data, "status": task.status.value, "started_at": task.started_at}
         )
+        return task, encoded
+
+    def dequeue(self, timeout: float = 0) -> Task | None:
+        result = self.client.zpopmax(self.queue_name)
+
+        if not result:
+            return None
+
+        task_id, _ = result[0]
+        task_data = self.client.hget(self._task_key(task_id), "data")
+
+        if not task_data:
+            return None
+
+        task, encoded = self._start_task(task_data)
+        self.client.hset(self._task_key(task.id), "data", encoded)
 
         return task
 
+    def dequeue_batch(self, max_tasks: int, timeout: float = 0) -> list[Task]:
+        result = self.client.zpopmax(self.queue_name, max_tasks)
+
+        if not result:
+            return []
+
+        pipe = self.client.pipeline(transaction=False)
+        for task_id, _ in result:
+            pipe.hget(self._task_key(task_id), "data")
+        started = [self._start_task(data) for data in pipe.execute() if data]
+
+        pipe = self.client.pipeline(transaction=False)
+        for task, encoded in started:
+            pipe.hset(self._task_key(task.id), "data", encoded)
+        pipe.execute()
+
+        return [task for task, _ in started]
+
     def peek(self) -> Task | None:
         result = self.client.zrange(self.queue_name, -1, -1, withscores=True)
 
@@ -433,6 +514,33 @@ class TaskQueue(Generic[T]):
 
         return task
 
+    def enqueue_many(
+        self,
+        name: str,
+        payloads: list[Any],
+        priority: int = TaskPriority.NORMAL,
+        timeout: float | None = None,
+        max_retries: int = 3,
+    ) -> list[Task]:
+        """Enqueue one task per payload; returns the tasks that were accepted."""
+        tasks = [
+            Task(
+                name=name,
+                payload=payload,
+                priority=priority,
+                timeout_seconds=timeout or self.default_timeout,
+                max_retries=max_retries,
+            )
+            for payload in payloads
+        ]
+
+        enqueued = self.backend.enqueue_many(tasks)
+        with self._lock:
+            self._stats.total_enqueued += enqueued
+            self._stats.current_size = self.backend.size()
+
+        return tasks[:enqueued]
+
     def dequeue(self, timeout: float = 0) -> Task | None:
         task = self.backend.dequeue(timeout)
 
@@ -1,14 +1,31 @@
-"""Timeout Manager - Task timeout management with multiple strategies."""
+"""Timeout Manager - Task timeout management with multiple strategies.
+
+Timers for every TimeoutManager share one DeadlineScheduler thread (a heap
+of expiries), and TimeoutExecutor runs calls on a bounded worker pool
+instead of starting a thread per call. Workers still held by timed-out
+calls are counted; once every worker is stranded that way, new calls run
+on a capped number of overflow threads until workers come back, and are
+rejected with PoolExhaustedError when those are taken too.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import heapq
+import inspect
+import itertools
+import os
 import signal
 import threading
 import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
 from contextlib import contextmanager, suppress
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Callable, TypeVar
+from typing import Any, TypeVar
 
 T = TypeVar("T")
 
@@ -69,6 +86,10 @@ class TimeoutError(Exception):
         self.context = context
 
 
+class PoolExhaustedError(RuntimeError):
+    """Raised when every worker and overflow thread is held by a call that has not returned."""
+
+
 @dataclass
 class TimeoutStats:
     total_timeouts: int = 0
@@ -89,13 +110,209 @@ class TimeoutStats:
         }
 
 
+class DeadlineScheduler:
+    """Runs callbacks at their deadlines from a single daemon thread.
+
+    Deadlines live in a min-heap keyed on ``time.monotonic()``. Cancelled
+    entries are dropped lazily when they reach the top, and the heap is
+    compacted once more than half of it is cancelled. Callbacks run on the
+    scheduler thread and should return quickly.
+    """
+
+    COMPACT_MIN_SIZE = 64
+
+    def __init__(self, name: str = "timeout-deadlines"):
+        self._name = name
+        self._heap: list[list[Any]] = []
+        self._entries: dict[int, list[Any]] = {}
+        self._cancelled = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def schedule(self, delay: float, callback: Callable[..., Any], *args: Any) -> int:
+        entry = [time.monotonic() + delay, next(self._seq), callback, args]
+        handle = entry[1]
+
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            self._entries[handle] = entry
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+            elif self._heap[0] is entry:
+                self._cond.notify()
+
+        return handle
+
+    def cancel(self, handle: int) -> bool:
+        with self._cond:
+            entry = self._entries.pop(handle, None)
+            if entry is None:
+                return False
+
+            entry[2] = None
+            self._cancelled += 1
+            if len(self._heap) > self.COMPACT_MIN_SIZE and self._cancelled * 2 > len(self._heap):
+                self._heap = [e for e in self._heap if e[2] is not None]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+
+        return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._entries)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    while self._heap and self._heap[0][2] is None:
+                        heapq.heappop(self._heap)
+                        self._cancelled = max(0, self._cancelled - 1)
+
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+
+                _, handle, callback, args = heapq.heappop(self._heap)
+                del self._entries[handle]
+
+            with suppress(Exception):
+                callback(*args)
+
+
+class _ThreadFuture(Future):
+    """Future for a call that overflowed onto its own thread."""
+
+
+class WorkerPool:
+    """Bounded worker pool that tracks workers stranded by timed-out calls.
+
+    A call that is already running when it times out keeps its worker until
+    the callable returns. Such workers are counted as stranded; while all
+    ``max_workers`` are stranded the pool is saturated and ``submit`` runs
+    each call on a daemon overflow thread instead of queueing it behind
+    calls that may never return. At most ``max_overflow`` (default
+    ``max_workers``) overflow threads run at once; beyond that ``submit``
+    raises :class:`PoolExhaustedError`.
+    """
+
+    def __init__(self, max_workers: int, max_overflow: int | None = None):
+        self.max_workers = max_workers
+        self.max_overflow = max_workers if max_overflow is None else max_overflow
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="timeout-worker"
+        )
+        self._overflow_slots = threading.BoundedSemaphore(self.max_overflow)
+        self._lock = threading.Lock()
+        self._stranded = 0
+        self._overflow = 0
+        self._overflow_calls = 0
+        self._rejected_calls = 0
+
+    @property
+    def saturated(self) -> bool:
+        return self._stranded >= self.max_workers
+
+    def submit(self, func: Callable[..., T], *args, **kwargs) -> Future:
+        if not self.saturated:
+            return self._executor.submit(func, *args, **kwargs)
+
+        if not self._overflow_slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected_calls += 1
+            raise PoolExhaustedError(
+                f"all {self.max_workers} workers and {self.max_overflow} overflow threads "
+                "are held by calls that have not returned"
+            )
+
+        future: Future = _ThreadFuture()
+        future.set_running_or_notify_cancel()
+
+        def target():
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._overflow -= 1
+                self._overflow_slots.release()
+
+        with self._lock:
+            self._overflow += 1
+            self._overflow_calls += 1
+        threading.Thread(target=target, name="timeout-overflow", daemon=True).start()
+        return future
+
+    def abandon(self, future: Future):
+        """Give up on a timed-out call: cancel it if queued, else count its worker."""
+        if future.cancel() or isinstance(future, _ThreadFuture):
+            return
+
+        with self._lock:
+            self._stranded += 1
+        future.add_done_callback(self._release)
+
+    def _release(self, _future: Future):
+        with self._lock:
+            self._stranded -= 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "stranded_workers": self._stranded,
+                "overflow_threads": self._overflow,
+                "overflow_calls": self._overflow_calls,
+                "rejected_calls": self._rejected_calls,
+                "saturated": self._stranded >= self.max_workers,
+            }
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_default_scheduler: DeadlineScheduler | None = None
+_shared_pool: WorkerPool | None = None
+_shared_lock = threading.Lock()
+
+
+def get_deadline_scheduler() -> DeadlineScheduler:
+    global _default_scheduler
+    with _shared_lock:
+        if _default_scheduler is None:
+            _default_scheduler = DeadlineScheduler()
+        return _default_scheduler
+
+
+def _get_shared_pool() -> WorkerPool:
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = WorkerPool(TimeoutExecutor.DEFAULT_MAX_WORKERS)
+        return _shared_pool
+
+
 class TimeoutManager:
-    def __init__(self):
+    EXECUTION_WINDOW = 100
+
+    def __init__(self, scheduler: DeadlineScheduler | None = None):
         self._timeouts: dict[str, TimeoutContext] = {}
-        self._timers: dict[str, threading.Timer] = {}
+        self._timers: dict[str, int] = {}
         self._callbacks: dict[str, Callable] = {}
         self._stats = TimeoutStats()
-        self._execution_times: list[float] = []
+        self._execution_times: deque[float] = deque(maxlen=self.EXECUTION_WINDOW)
+        self._execution_time_sum = 0.0
+        self._finished: deque[tuple[float, str]] = deque()
+        self._scheduler = scheduler or get_deadline_scheduler()
         self._lock = threading.RLock()
 
     def register(
@@ -122,6 +339,9 @@ class TimeoutManager:
         return context
 
     def start(self, timeout_id: str) -> bool:
+        return self._start(timeout_id, arm=True)
+
+    def _start(self, timeout_id: str, arm: bool) -> bool:
         with self._lock:
             context = self._timeouts.get(timeout_id)
             if not context or context.state != TimeoutState.PENDING:
@@ -130,36 +350,35 @@ class TimeoutManager:
             context.state = TimeoutState.RUNNING
             context.start_time = time.time()
 
-            timer = threading.Timer(
-                context.timeout_seconds, self._handle_timeout, args=(timeout_id,)
-            )
-            timer.daemon = True
-            timer.start()
-
-            self._timers[timeout_id] = timer
+            if arm:
+                self._timers[timeout_id] = self._scheduler.schedule(
+                    context.timeout_seconds, self._handle_timeout, timeout_id
+                )
 
         return True
 
+    def _disarm(self, timeout_id: str):
+        handle = self._timers.pop(timeout_id, None)
+        if handle is not None:
+            self._scheduler.cancel(handle)
+
+    def _finish(self, context: TimeoutContext, state: TimeoutState):
+        context.state = state
+        context.end_time = time.time()
+        self._finished.append((context.end_time, context.timeout_id))
+
     def complete(self, timeout_id: str, result: Any = None) -> bool:
         with self._lock:
             context = self._timeouts.get(timeout_id)
             if not context or context.state != TimeoutState.RUNNING:
                 return False
 
-            timer = self._timers.pop(timeout_id, None)
-            if timer:
-                timer.cancel()
-
-            context.state = TimeoutState.COMPLETED
-            context.end_time = time.time()
+            self._disarm(timeout_id)
+            self._finish(context, TimeoutState.COMPLETED)
             context.result = result
 
             self._stats.completed_timeouts += 1
-            self._execution_times.append(context.elapsed_time)
-            if len(self._execution_times) > 100:
-                self._execution_times = self._execution_times[-100:]
-            self._stats.avg_execution_time = sum(self._execution_times) / len(self._execution_times)
-
+            self._record_execution_time(context.elapsed_time)
             self._update_timeout_ratio()
 
         return True
@@ -170,12 +389,8 @@ class TimeoutManager:
             if not context or context.state not in (TimeoutState.PENDING, TimeoutState.RUNNING):
                 return False
 
-            timer = self._timers.pop(timeout_id, None)
-            if timer:
-                timer.cancel()
-
-            context.state = TimeoutState.CANCELLED
-            context.end_time = time.time()
+            self._disarm(timeout_id)
+            self._finish(context, TimeoutState.CANCELLED)
 
             self._stats.cancelled_timeouts += 1
 
@@ -187,8 +402,8 @@ class TimeoutManager:
             if not context or context.state != TimeoutState.RUNNING:
                 return
 
-            context.state = TimeoutState.TIMEOUT
-            context.end_time = time.time()
+            self._disarm(timeout_id)
+            self._finish(context, TimeoutState.TIMEOUT)
 
             self._stats.triggered_timeouts += 1
             self._update_timeout_ratio()
@@ -199,6 +414,13 @@ class TimeoutManager:
             with suppress(Exception):
                 callback(context)
 
+    def _record_execution_time(self, elapsed: float):
+        if len(self._execution_times) == self._execution_times.maxlen:
+            self._execution_time_sum -= self._execution_times[0]
+        self._execution_times.append(elapsed)
+        self._execution_time_sum += elapsed
+        self._stats.avg_execution_time = self._execution_time_sum / len(self._execution_times)
+
     def _update_timeout_ratio(self):
         total = self._stats.completed_timeouts + self._stats.triggered_timeouts
         if total > 0:
@@ -222,70 +444,129 @@ class TimeoutManager:
             return TimeoutStats(**dict(self._stats.__dict__.items()))
 
     def clear_completed(self, max_age_seconds: float = 3600) -> int:
-        now = time.time()
-        to_remove = []
+        """Drop finished contexts older than ``max_age_seconds``.
+
+        Finished contexts are queued in end-time order, so this only walks
+        the expired prefix rather than every registered context.
+        """
+        cutoff = time.time() - max_age_seconds
+        removed = 0
 
         with self._lock:
-            for tid, context in self._timeouts.items():
-                if (
-                    context.state
-                    in (TimeoutState.COMPLETED, TimeoutState.TIMEOUT, TimeoutState.CANCELLED)
-                    and context.end_time
-                    and (now - context.end_time) > max_age_seconds
-                ):
-                    to_remove.append(tid)
-
-            for tid in to_remove:
+            while self._finished and self._finished[0][0] < cutoff:
+                end_time, tid = self._finished.popleft()
+                context = self._timeouts.get(tid)
+                if context is None or context.end_time != end_time:
+                    continue
                 del self._timeouts[tid]
                 self._callbacks.pop(tid, None)
+                removed += 1
 
-        return len(to_remove)
+        return removed
 
 
 class TimeoutExecutor:
+    """Runs callables under a timeout.
+
+    Calls execute on a bounded :class:`WorkerPool` (shared across executors
+    unless ``max_workers`` is given). A call that times out keeps its worker
+    until the callable returns, since Python threads cannot be killed; calls
+    that are still queued when they time out are cancelled and never run.
+    ``pool_stats`` reports stranded workers, and a pool whose workers are all
+    stranded runs new calls on a capped set of overflow threads rather than
+    starving them (see :class:`WorkerPool`). The timeout is enforced only by
+    waiting on the call's future, so each timeout is handled exactly once.
+    ``execute_async`` is the coroutine equivalent built on ``asyncio.timeout``.
+    """
+
+    DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
     def __init__(
         self,
         default_timeout: float = 30.0,
         action: TimeoutAction = TimeoutAction.RAISE,
         default_value: Any = None,
         on_timeout: Callable[[TimeoutContext], None] | None = None,
+        max_workers: int | None = None,
     ):
         self.default_timeout = default_timeout
         self.action = action
         self.default_value = default_value
         self.on_timeout = on_timeout
         self._manager = TimeoutManager()
+        self._own_pool = WorkerPool(max_workers) if max_workers else None
+
+    @property
+    def _pool(self) -> WorkerPool:
+        return self._own_pool or _get_shared_pool()
 
     def execute(self, func: Callable[..., T], *args, timeout: float | None = None, **kwargs) -> T:
         timeout_seconds = timeout or self.default_timeout
 
         context = self._manager.register(timeout_seconds, callback=self.on_timeout)
+        # No deadline timer: the wait below is the only timeout path
+        self._manager._start(context.timeout_id, arm=False)
 
-        result = [None]
-        error = [None]
-        completed = threading.Event()
+        try:
+            future = self._pool.submit(func, *args, **kwargs)
+        except PoolExhaustedError:
+            self._manager.cancel(context.timeout_id)
+            raise
+        done, _ = wait_futures([future], timeout=timeout_seconds)
 
-        def target():
+        if done:
             try:
-                result[0] = func(*args, **kwargs)
-            except Exception as e:
-                error[0] = e
-            finally:
-                completed.set()
+                value = future.result()
+            except BaseException:
+                self._manager.complete(context.timeout_id)
+                raise
+            self._manager.complete(context.timeout_id, value)
+            return value
+
+        self._pool.abandon(future)
+        return self._timed_out(context, timeout_seconds)
 
-        self._manager.start(context.timeout_id)
+    async def execute_async(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args,
+        timeout: float | None = None,
+        **kwargs,
+    ) -> T:
+        timeout_seconds = timeout or self.default_timeout
 
-        thread = threading.Thread(target=target, daemon=True)
-        thread.start()
+        context = self._manager.register(timeout_seconds, callback=self.on_timeout)
+        self._manager._start(context.timeout_id, arm=False)
 
-        finished = completed.wait(timeout=timeout_seconds)
+        if hasattr(asyncio, "timeout"):
+            deadline = asyncio.timeout(timeout_seconds)
+            try:
+                async with deadline:
+                    value = await func(*args, **kwargs)
+            except asyncio.TimeoutError:
+                if not deadline.expired():
+                    self._manager.complete(context.timeout_id)
+                    raise
+                return self._timed_out(context, timeout_seconds)
+            except BaseException:
+                self._manager.complete(context.timeout_id)
+                raise
+        else:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            done, _ = await asyncio.wait({task}, timeout=timeout_seconds)
+            if not done:
+                task.cancel()
+                return self._timed_out(context, timeout_seconds)
+            try:
+                value = task.result()
+            except BaseException:
+                self._manager.complete(context.timeout_id)
+                raise
 
-        if finished:
-            self._manager.complete(context.timeout_id, result[0])
-            if error[0]:
-                raise error[0]
-            return result[0]
+        self._manager.complete(context.timeout_id, value)
+        return value
 
+    def _timed_out(self, context: TimeoutContext, timeout_seconds: float) -> Any:
         self._manager._handle_timeout(context.timeout_id)
 
         if self.action == TimeoutAction.RAISE:
@@ -302,11 +583,26 @@ class TimeoutExecutor:
     def get_stats(self) -> TimeoutStats:
         return self._manager.get_stats()
 
+    def pool_stats(self) -> dict[str, Any]:
+        return self._pool.stats()
+
+    def shutdown(self, wait: bool = False):
+        if self._own_pool is not None:
+            self._own_pool.shutdown(wait=wait)
+
 
 def timeout(seconds: float, action: TimeoutAction = TimeoutAction.RAISE, default: Any = None):
     executor = TimeoutExecutor(default_timeout=seconds, action=action, default_value=default)
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        if inspect.iscoroutinefunction(func):
+
+            async def async_wrapper(*args, **kwargs) -> T:
+                return await executor.execute_async(func, *args, **kwargs)
+
+            async_wrapper.timeout_stats = executor.get_stats
+            return async_wrapper
+
         def wrapper(*args, **kwargs) -> T:
             return executor.execute(func, *args, **kwargs)
 
@@ -392,7 +688,11 @@ __all__ = [
     "TimeoutContext",
     "TimeoutError",
     "TimeoutStats",
+    "PoolExhaustedError",
+    "DeadlineScheduler",
+    "get_deadline_scheduler",
     "TimeoutManager",
+    "WorkerPool",
     "TimeoutExecutor",
     "timeout",
     "timeout_context",
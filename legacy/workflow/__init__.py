@@ -24,8 +24,10 @@ import logging
 import time
 import uuid
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import partial
 from typing import Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -92,23 +94,178 @@ class WorkflowExecutor(ABC):
         pass
 
 
+class _StatusWatcher:
+    """Waits for many scheduler tasks with one batched status request per poll.
+
+    Every executor coroutine waiting on a task registers a future here; a single
+    background task polls ``POST /status/batch`` for all of them and resolves
+    the futures as tasks finish. The poll interval starts at ``poll_interval``
+    and backs off to ``max_poll_interval`` while nothing changes.
+    """
+
+    def __init__(self, executor: "DefaultExecutor"):
+        self.executor = executor
+        self.loop = asyncio.get_running_loop()
+        self.waiters: dict[str, asyncio.Future] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.batch_supported = True
+
+    def wait(self, task_id: str) -> asyncio.Future:
+        future = self.waiters.get(task_id)
+        if future is None or future.done():
+            future = self.loop.create_future()
+            self.waiters[task_id] = future
+        if self.task is None or self.task.done():
+            self.task = self.loop.create_task(self._run())
+        return future
+
+    async def _run(self) -> None:
+        interval = self.executor.poll_interval
+        while True:
+            self._drop_abandoned()
+            if not self.waiters:
+                return
+
+            await asyncio.sleep(interval)
+            try:
+                statuses = await self._fetch(list(self.waiters))
+            except Exception as e:
+                logger.warning(f"Status poll failed: {e}")
+                statuses = {}
+
+            finished = False
+            for task_id, status in statuses.items():
+                if status and status.get("status") in ("completed", "failed"):
+                    future = self.waiters.pop(task_id, None)
+                    if future is not None and not future.done():
+                        future.set_result(status)
+                    finished = True
+
+            if finished:
+                interval = self.executor.poll_interval
+            else:
+                interval = min(interval * 2, self.executor.max_poll_interval)
+
+    def _drop_abandoned(self) -> None:
+        for task_id in [tid for tid, f in self.waiters.items() if f.done()]:
+            del self.waiters[task_id]
+
+    async def _fetch(self, task_ids: list[str]) -> dict[str, Optional[dict[str, Any]]]:
+        if self.batch_supported:
+            statuses: dict[str, Optional[dict[str, Any]]] = {}
+            size = self.executor.STATUS_BATCH_SIZE
+            for i in range(0, len(task_ids), size):
+                response = await self.executor._request(
+                    "post",
+                    "/status/batch",
+                    json={"task_ids": [int(t) for t in task_ids[i : i + size]]},
+                )
+                if response.status_code in (404, 405):
+                    self.batch_supported = False
+                    break
+                if response.status_code == 200:
+                    statuses.update(response.json().get("statuses", {}))
+            else:
+                return statuses
+
+        # Scheduler without the batch endpoint: fall back to concurrent per-task polls
+        responses = await asyncio.gather(
+            *(self.executor._request("get", f"/status/{task_id}") for task_id in task_ids),
+            return_exceptions=True,
+        )
+        return {
+            task_id: response.json()
+            for task_id, response in zip(task_ids, responses)
+            if not isinstance(response, BaseException) and response.status_code == 200
+        }
+
+
 class DefaultExecutor(WorkflowExecutor):
-    """Default executor that uses the scheduler."""
+    """Default executor that uses the scheduler.
+
+    HTTP calls go through one pooled ``requests.Session`` on a private thread
+    pool, so the event loop never blocks and groups, chords and workflows really
+    run their tasks concurrently. At most ``max_concurrency`` tasks are in
+    flight at once, and completion is detected by a shared batched status poll
+    instead of one polling loop per task.
+
+    Args:
+        scheduler_url: Scheduler base URL.
+        max_concurrency: Maximum number of tasks submitted and not yet finished.
+        poll_interval: Initial delay between status polls, in seconds.
+        max_poll_interval: Upper bound for the backed-off poll delay.
+    """
 
-    def __init__(self, scheduler_url: str = "http://localhost:8000"):
-        self.scheduler_url = scheduler_url
+    STATUS_BATCH_SIZE = 1000
+
+    def __init__(
+        self,
+        scheduler_url: str = "http://localhost:8000",
+        max_concurrency: int = 32,
+        poll_interval: float = 0.5,
+        max_poll_interval: float = 5.0,
+    ):
+        self.scheduler_url = scheduler_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+
+        self._session = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._watchers: dict[asyncio.AbstractEventLoop, _StatusWatcher] = {}
+
+    def _get_session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency + 1)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    async def _request(self, method: str, path: str, **kwargs):
+        """Run a blocking HTTP call on the executor's thread pool."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_concurrency + 1, thread_name_prefix="workflow-http"
+            )
+        call = partial(
+            getattr(self._get_session(), method),
+            f"{self.scheduler_url}{path}",
+            timeout=10,
+            **kwargs,
+        )
+        return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+
+    def _loop_state(self) -> tuple[asyncio.Semaphore, _StatusWatcher]:
+        """Semaphore and watcher are bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        for stale in [lp for lp in self._watchers if lp is not loop and lp.is_closed()]:
+            del self._watchers[stale]
+            del self._semaphores[stale]
+        if loop not in self._watchers:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+            self._watchers[loop] = _StatusWatcher(self)
+        return self._semaphores[loop], self._watchers[loop]
 
     async def execute(self, node: TaskNode) -> TaskResult:
         """Execute a task via the scheduler."""
         if node.task is None:
             return TaskResult(task_id=node.node_id, success=False, error="No task defined")
 
+        semaphore, watcher = self._loop_state()
+        async with semaphore:
+            return await self._execute(node, watcher)
+
+    async def _execute(self, node: TaskNode, watcher: _StatusWatcher) -> TaskResult:
         start_time = time.time()
 
         try:
-            import requests
-
-            response = requests.post(f"{self.scheduler_url}/submit", json=node.task, timeout=10)
+            response = await self._request("post", "/submit", json=node.task)
 
             if response.status_code != 200:
                 return TaskResult(
@@ -118,37 +275,33 @@ class DefaultExecutor(WorkflowExecutor):
                 )
 
             task_id = response.json().get("task_id")
+            if task_id is None:
+                return TaskResult(
+                    task_id=node.node_id, success=False, error="Submit returned no task_id"
+                )
+            task_id = str(task_id)
 
             max_wait = node.task.get("timeout", 300)
-            waited = 0
-
-            while waited < max_wait:
-                response = requests.get(f"{self.scheduler_url}/status/{task_id}", timeout=10)
+            try:
+                status = await asyncio.wait_for(watcher.wait(task_id), timeout=max_wait)
+            except asyncio.TimeoutError:
+                return TaskResult(
+                    task_id=task_id, success=False, error="Timeout waiting for result"
+                )
 
-                if response.status_code == 200:
-                    status = response.json()
-
-                    if status.get("status") == "completed":
-                        return TaskResult(
-                            task_id=str(task_id),
-                            success=True,
-                            result=status.get("result"),
-                            execution_time=time.time() - start_time,
-                        )
-
-                    if status.get("status") == "failed":
-                        return TaskResult(
-                            task_id=str(task_id),
-                            success=False,
-                            error=status.get("error"),
-                            execution_time=time.time() - start_time,
-                        )
-
-                await asyncio.sleep(2)
-                waited += 2
+            if status.get("status") == "completed":
+                return TaskResult(
+                    task_id=task_id,
+                    success=True,
+                    result=status.get("result"),
+                    execution_time=time.time() - start_time,
+                )
 
             return TaskResult(
-                task_id=str(task_id), success=False, error="Timeout waiting for result"
+                task_id=task_id,
+                success=False,
+                error=status.get("error"),
+                execution_time=time.time() - start_time,
             )
 
         except Exception as e:
@@ -159,6 +312,15 @@ class DefaultExecutor(WorkflowExecutor):
                 execution_time=time.time() - start_time,
             )
 
+    def close(self) -> None:
+        """Release pooled connections and worker threads."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
 
 class TaskChain:
     """
@@ -402,64 +564,76 @@ class Workflow:
         self.nodes[task_id] = node
         return self
 
-    def _get_ready_tasks(self) -> list[str]:
-        """Get tasks ready to execute."""
-        ready = []
-
-        for task_id, node in self.nodes.items():
-            if node.status != WorkflowStatus.PENDING:
-                continue
-
-            all_deps_done = all(
-                self.nodes[dep].status == WorkflowStatus.COMPLETED for dep in node.dependencies
-            )
+    def _cancel_dependents(self, task_id: str, dependents: dict[str, list[str]]) -> None:
+        """Cancel every pending node downstream of a failed or cancelled node."""
+        stack = list(dependents[task_id])
+        while stack:
+            node = self.nodes[stack.pop()]
+            if node.status == WorkflowStatus.PENDING:
+                node.status = WorkflowStatus.CANCELLED
+                stack.extend(dependents[node.node_id])
 
-            any_dep_failed = any(
-                self.nodes[dep].status == WorkflowStatus.FAILED for dep in node.dependencies
-            )
+    async def _run_node(self, task_id: str) -> TaskResult:
+        node = self.nodes[task_id]
+        node.status = WorkflowStatus.RUNNING
 
-            if any_dep_failed:
-                node.status = WorkflowStatus.CANCELLED
-                continue
+        dep_results = {
+            dep: self.results[dep].result for dep in node.dependencies if dep in self.results
+        }
 
-            if all_deps_done:
-                ready.append(task_id)
+        if dep_results:
+            node.task["dep_results"] = dep_results
 
-        return ready
+        try:
+            return await self.executor.execute(node)
+        except Exception as e:
+            return TaskResult(task_id=task_id, success=False, error=str(e))
 
     async def execute(self) -> dict[str, TaskResult]:
-        """Execute the workflow."""
-        self.status = WorkflowStatus.RUNNING
+        """Execute the workflow.
 
-        while True:
-            ready = self._get_ready_tasks()
+        Each node is dispatched as soon as its own dependencies have completed,
+        so independent branches never wait for each other.
+        """
+        self.status = WorkflowStatus.RUNNING
 
-            if not ready:
-                break
+        dependents: dict[str, list[str]] = {task_id: [] for task_id in self.nodes}
+        remaining: dict[str, int] = {}
+        for task_id, node in self.nodes.items():
+            for dep in node.dependencies:
+                if dep not in self.nodes:
+                    raise ValueError(f"Task '{task_id}' depends on unknown task '{dep}'")
+                dependents[dep].append(task_id)
+            remaining[task_id] = len(set(node.dependencies))
 
-            tasks = []
-            for task_id in ready:
-                node = self.nodes[task_id]
-                node.status = WorkflowStatus.RUNNING
+        running: dict[asyncio.Task, str] = {}
 
-                dep_results = {
-                    dep: self.results[dep].result
-                    for dep in node.dependencies
-                    if dep in self.results
-                }
+        def dispatch(task_id: str) -> None:
+            running[asyncio.ensure_future(self._run_node(task_id))] = task_id
 
-                if dep_results:
-                    node.task["dep_results"] = dep_results
+        for task_id, count in remaining.items():
+            if count == 0 and self.nodes[task_id].status == WorkflowStatus.PENDING:
+                dispatch(task_id)
 
-                tasks.append((task_id, self.executor.execute(node)))
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
 
-            for task_id, coro in tasks:
-                result = await coro
+            for future in done:
+                task_id = running.pop(future)
+                result = future.result()
                 self.results[task_id] = result
                 self.nodes[task_id].result = result
-                self.nodes[task_id].status = (
-                    WorkflowStatus.COMPLETED if result.success else WorkflowStatus.FAILED
-                )
+
+                if not result.success:
+                    self.nodes[task_id].status = WorkflowStatus.FAILED
+                    self._cancel_dependents(task_id, dependents)
+                    continue
+
+                self.nodes[task_id].status = WorkflowStatus.COMPLETED
+                for child in dict.fromkeys(dependents[task_id]):
+                    remaining[child] -= 1
+                    if remaining[child] == 0 and self.nodes[child].status == WorkflowStatus.PENDING:
+                        dispatch(child)
 
         all_completed = all(n.status == WorkflowStatus.COMPLETED for n in self.nodes.values())
 
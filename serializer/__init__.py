@@ -3,11 +3,14 @@
 from __future__ import annotations
 
 import base64
+import importlib.util
 import json
 import pickle
 import struct
+import sys
 import threading
 from abc import ABC, abstractmethod
+from array import array
 from dataclasses import asdict, dataclass, is_dataclass
 from datetime import date, datetime
 from datetime import time as time_type
@@ -15,6 +18,13 @@ from enum import Enum
 from pathlib import Path
 from typing import Any, Callable, TypeVar
 
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 T = TypeVar("T")
 
 
@@ -194,117 +204,346 @@ class MessagePackSerializer(Serializer):
             raise DeserializationError(f"MessagePack deserialization failed: {e}") from e
 
 
-class BinarySerializer(Serializer):
-    TYPE_NONE = 0
-    TYPE_BOOL = 1
-    TYPE_INT = 2
-    TYPE_FLOAT = 3
-    TYPE_STR = 4
-    TYPE_BYTES = 5
-    TYPE_LIST = 6
-    TYPE_DICT = 7
+_BYTE = struct.Struct(">B")
+_HEADER = struct.Struct(">BI")
+_BOOL = struct.Struct(">BB")
+_INT = struct.Struct(">Bq")
+_FLOAT = struct.Struct(">Bd")
+_LENGTH = struct.Struct(">I")
+_INT64 = struct.Struct(">q")
+_FLOAT64 = struct.Struct(">d")
+_ARRAY_HEADER = struct.Struct(">BBB3sB")
+_DIM = struct.Struct(">Q")
 
-    def __init__(self):
-        self._lock = threading.Lock()
+_unpack_length = _LENGTH.unpack_from
+_unpack_int = _INT64.unpack_from
+_unpack_float = _FLOAT64.unpack_from
+
+_TYPE_NONE = 0
+_TYPE_BOOL = 1
+_TYPE_INT = 2
+_TYPE_FLOAT = 3
+_TYPE_STR = 4
+_TYPE_BYTES = 5
+_TYPE_LIST = 6
+_TYPE_DICT = 7
+_TYPE_INT_LIST = 8
+_TYPE_FLOAT_LIST = 9
+_TYPE_ARRAY = 10
+
+_NONE_BYTES = _HEADER.pack(_TYPE_NONE, 0)
+_TRUE_BYTES = _BOOL.pack(_TYPE_BOOL, 1)
+_FALSE_BYTES = _BOOL.pack(_TYPE_BOOL, 0)
+
+# Lists at least this long are checked for a homogeneous int/float fast path.
+_PACKED_LIST_MIN = 8
+
+_ARRAY_KINDS = {"b": "i", "h": "i", "i": "i", "l": "i", "q": "i", "f": "f", "d": "f"}
+
+
+class BinarySerializer(Serializer):
+    """Compact tagged binary format.
+
+    Each call encodes into one growable ``bytearray`` with pre-compiled
+    ``struct`` formats, and keeps no state on the instance, so one serializer
+    can be shared between threads without a lock.
+
+    Homogeneous int/float lists of at least 8 items are packed as a single
+    run of 8-byte values. ``array.array`` and NumPy arrays of bool/int/uint/
+    float are written straight from their buffers with a dtype and shape
+    header, and come back as the same container type.
+
+    Wire compatibility: codes 0-7 are unchanged, so this class reads anything
+    older encoders wrote. The packed lists (codes 8 and 9) and arrays (code
+    10) cannot be read by decoders that predate them. Pass
+    ``packed_lists=False`` when the reader may be older; lists are then
+    written element by element, as before. Arrays have no older encoding.
+
+    With ``zero_copy=True``, ``deserialize`` returns ``memoryview`` slices of
+    the input for bytes fields, and arrays that view the input (read-only
+    when the input is ``bytes``). The input must then outlive the result.
+    """
+
+    TYPE_NONE = _TYPE_NONE
+    TYPE_BOOL = _TYPE_BOOL
+    TYPE_INT = _TYPE_INT
+    TYPE_FLOAT = _TYPE_FLOAT
+    TYPE_STR = _TYPE_STR
+    TYPE_BYTES = _TYPE_BYTES
+    TYPE_LIST = _TYPE_LIST
+    TYPE_DICT = _TYPE_DICT
+    TYPE_INT_LIST = _TYPE_INT_LIST
+    TYPE_FLOAT_LIST = _TYPE_FLOAT_LIST
+    TYPE_ARRAY = _TYPE_ARRAY
+
+    ARRAY_PYTHON = 0
+    ARRAY_NUMPY = 1
+
+    def __init__(self, zero_copy: bool = False, packed_lists: bool = True):
+        self.zero_copy = zero_copy
+        self.packed_lists = packed_lists
 
     @property
     def content_type(self) -> str:
         return "application/octet-stream"
 
     def serialize(self, obj: Any) -> bytes:
-        with self._lock:
-            return self._encode(obj)
+        out = bytearray()
+        self.serialize_into(obj, out)
+        return bytes(out)
 
-    def _encode(self, obj: Any) -> bytes:
+    def serialize_into(self, obj: Any, out: bytearray) -> int:
+        """Append the encoding of ``obj`` to ``out``; returns the bytes written."""
+        start = len(out)
+        try:
+            self._encode(obj, out)
+        except SerializationError:
+            del out[start:]
+            raise
+        except (struct.error, OverflowError, ValueError) as e:
+            del out[start:]
+            raise SerializationError(f"Binary serialization failed: {e}") from e
+        return len(out) - start
+
+    def _encode(self, obj: Any, out: bytearray) -> None:
         if obj is None:
-            return struct.pack(">BI", self.TYPE_NONE, 0)
-
-        if isinstance(obj, bool):
-            return struct.pack(">BB", self.TYPE_BOOL, 1 if obj else 0)
-
-        if isinstance(obj, int):
-            return struct.pack(">Bq", self.TYPE_INT, obj)
+            out += _NONE_BYTES
+            return
 
-        if isinstance(obj, float):
-            return struct.pack(">Bd", self.TYPE_FLOAT, obj)
+        obj_type = type(obj)
 
-        if isinstance(obj, str):
+        if obj_type is bool:
+            out += _TRUE_BYTES if obj else _FALSE_BYTES
+        elif obj_type is int:
+            out += _INT.pack(_TYPE_INT, obj)
+        elif obj_type is float:
+            out += _FLOAT.pack(_TYPE_FLOAT, obj)
+        elif obj_type is str:
             encoded = obj.encode("utf-8")
-            return struct.pack(">BI", self.TYPE_STR, len(encoded)) + encoded
-
-        if isinstance(obj, bytes):
-            return struct.pack(">BI", self.TYPE_BYTES, len(obj)) + obj
-
-        if isinstance(obj, (list, tuple)):
-            items = b"".join(self._encode(item) for item in obj)
-            return struct.pack(">BI", self.TYPE_LIST, len(obj)) + items
-
-        if isinstance(obj, dict):
-            items = b""
+            out += _HEADER.pack(_TYPE_STR, len(encoded))
+            out += encoded
+        elif obj_type is list or obj_type is tuple:
+            if (
+                not self.packed_lists
+                or len(obj) < _PACKED_LIST_MIN
+                or not self._encode_packed(obj, out)
+            ):
+                out += _HEADER.pack(_TYPE_LIST, len(obj))
+                encode = self._encode
+                for item in obj:
+                    encode(item, out)
+        elif obj_type is dict:
+            out += _HEADER.pack(_TYPE_DICT, len(obj))
+            encode = self._encode
             for key, value in obj.items():
-                items += self._encode(key)
-                items += self._encode(value)
-            return struct.pack(">BI", self.TYPE_DICT, len(obj)) + items
-
-        raise SerializationError(f"Unsupported type: {type(obj).__name__}")
-
-    def deserialize(self, data: bytes) -> Any:
-        with self._lock:
-            result, _ = self._decode(data, 0)
-            return result
+                encode(key, out)
+                encode(value, out)
+        elif isinstance(obj, (bytes, bytearray, memoryview)):
+            view = memoryview(obj).cast("B") if isinstance(obj, memoryview) else obj
+            out += _HEADER.pack(_TYPE_BYTES, len(view))
+            out += view
+        elif isinstance(obj, array):
+            self._encode_array(obj, out)
+        elif NUMPY_AVAILABLE and isinstance(obj, np.ndarray):
+            self._encode_ndarray(obj, out)
+        elif isinstance(obj, int):
+            out += _INT.pack(_TYPE_INT, obj)
+        elif isinstance(obj, float):
+            out += _FLOAT.pack(_TYPE_FLOAT, obj)
+        elif isinstance(obj, str):
+            # str(obj) would use the subclass's __str__ ("Color.RED" for a str Enum)
+            encoded = str.encode(obj, "utf-8")
+            out += _HEADER.pack(_TYPE_STR, len(encoded))
+            out += encoded
+        elif isinstance(obj, (list, tuple)):
+            self._encode(list(obj), out)
+        elif isinstance(obj, dict):
+            self._encode(dict(obj), out)
+        else:
+            raise SerializationError(f"Unsupported type: {type(obj).__name__}")
+
+    def _encode_packed(self, obj: list | tuple, out: bytearray) -> bool:
+        """Encode a list of only ints or only floats as one packed run."""
+        first = type(obj[0])
+        if first is float:
+            type_byte, code = _TYPE_FLOAT_LIST, "d"
+        elif first is int:
+            type_byte, code = _TYPE_INT_LIST, "q"
+        else:
+            return False
+        for item in obj:
+            if type(item) is not first:
+                return False
 
-    def _decode(self, data: bytes, offset: int) -> tuple:
-        type_byte = struct.unpack_from(">B", data, offset)[0]
+        try:
+            packed = struct.pack(f">{len(obj)}{code}", *obj)
+        except struct.error:
+            return False
+        out += _HEADER.pack(type_byte, len(obj))
+        out += packed
+        return True
+
+    def _encode_array(self, obj: array, out: bytearray) -> None:
+        kind = _ARRAY_KINDS.get(obj.typecode.lower())
+        if kind is None:
+            raise SerializationError(f"Unsupported array typecode: {obj.typecode}")
+        if kind == "i" and obj.typecode.isupper():
+            kind = "u"
+        dtype = f"{_BYTE_ORDER}{kind}{obj.itemsize}"
+        self._write_array(self.ARRAY_PYTHON, dtype, (len(obj),), memoryview(obj), out)
+
+    def _encode_ndarray(self, obj: Any, out: bytearray) -> None:
+        if obj.dtype.kind not in "biuf" or obj.dtype.itemsize > 8:
+            raise SerializationError(f"Unsupported array dtype: {obj.dtype}")
+        obj = np.ascontiguousarray(obj)
+        dtype = obj.dtype.str
+        if dtype[0] == "|":
+            dtype = _BYTE_ORDER + dtype[1:]
+        self._write_array(self.ARRAY_NUMPY, dtype, obj.shape, memoryview(obj), out)
+
+    def _write_array(
+        self, container: int, dtype: str, shape: tuple, data: memoryview, out: bytearray
+    ) -> None:
+        # Pad so the data starts 8-byte aligned relative to the output start.
+        end = len(out) + _ARRAY_HEADER.size + _DIM.size * len(shape)
+        pad = -end % 8
+        out += _ARRAY_HEADER.pack(_TYPE_ARRAY, container, len(shape), dtype.encode(), pad)
+        for dim in shape:
+            out += _DIM.pack(dim)
+        out += bytes(pad)
+        out += data.cast("B") if data.nbytes else b""
+
+    def deserialize(self, data: bytes | bytearray | memoryview) -> Any:
+        view = memoryview(data)
+        if view.format != "B" or view.ndim != 1:
+            view = view.cast("B")
+        # Strings and numbers decode fastest from bytes; memoryview slices are
+        # only taken for zero-copy bytes fields and arrays.
+        buf = data if type(data) is bytes else view
+        try:
+            result, _ = self._decode(buf, view, 0)
+        except DeserializationError:
+            raise
+        except (struct.error, IndexError, ValueError) as e:
+            raise DeserializationError(f"Binary deserialization failed: {e}") from e
+        return result
+
+    def _decode(self, data: bytes | memoryview, view: memoryview, offset: int) -> tuple:
+        type_byte = data[offset]
         offset += 1
 
-        if type_byte == self.TYPE_NONE:
-            return None, offset + 4
-
-        if type_byte == self.TYPE_BOOL:
-            value = struct.unpack_from(">B", data, offset)[0]
-            return bool(value), offset + 1
-
-        if type_byte == self.TYPE_INT:
-            value = struct.unpack_from(">q", data, offset)[0]
-            return value, offset + 8
-
-        if type_byte == self.TYPE_FLOAT:
-            value = struct.unpack_from(">d", data, offset)[0]
-            return value, offset + 8
+        if type_byte == _TYPE_INT:
+            return _unpack_int(data, offset)[0], offset + 8
 
-        if type_byte == self.TYPE_STR:
-            length = struct.unpack_from(">I", data, offset)[0]
+        if type_byte == _TYPE_STR:
+            length = _unpack_length(data, offset)[0]
             offset += 4
-            value = data[offset : offset + length].decode("utf-8")
-            return value, offset + length
+            end = offset + length
+            return str(data[offset:end], "utf-8"), end
 
-        if type_byte == self.TYPE_BYTES:
-            length = struct.unpack_from(">I", data, offset)[0]
+        if type_byte == _TYPE_FLOAT:
+            return _unpack_float(data, offset)[0], offset + 8
+
+        if type_byte == _TYPE_DICT:
+            length = _unpack_length(data, offset)[0]
             offset += 4
-            value = data[offset : offset + length]
-            return value, offset + length
+            decode = self._decode
+            result = {}
+            for _ in range(length):
+                key, offset = decode(data, view, offset)
+                result[key], offset = decode(data, view, offset)
+            return result, offset
 
-        if type_byte == self.TYPE_LIST:
-            length = struct.unpack_from(">I", data, offset)[0]
+        if type_byte == _TYPE_LIST:
+            length = _unpack_length(data, offset)[0]
             offset += 4
-            items = []
+            decode = self._decode
+            items: list[Any] = []
+            append = items.append
             for _ in range(length):
-                item, offset = self._decode(data, offset)
-                items.append(item)
+                item, offset = decode(data, view, offset)
+                append(item)
             return items, offset
 
-        if type_byte == self.TYPE_DICT:
-            length = struct.unpack_from(">I", data, offset)[0]
+        if type_byte == _TYPE_NONE:
+            return None, offset + 4
+
+        if type_byte == _TYPE_BOOL:
+            return data[offset] != 0, offset + 1
+
+        if type_byte == _TYPE_BYTES:
+            length = _unpack_length(data, offset)[0]
             offset += 4
-            result = {}
-            for _ in range(length):
-                key, offset = self._decode(data, offset)
-                value, offset = self._decode(data, offset)
-                result[key] = value
-            return result, offset
+            value = view[offset : offset + length]
+            if len(value) != length:
+                raise DeserializationError("Truncated bytes field")
+            return (value if self.zero_copy else value.tobytes()), offset + length
+
+        if type_byte in (_TYPE_INT_LIST, _TYPE_FLOAT_LIST):
+            length = _unpack_length(data, offset)[0]
+            offset += 4
+            code = "q" if type_byte == _TYPE_INT_LIST else "d"
+            return list(struct.unpack_from(f">{length}{code}", data, offset)), offset + 8 * length
+
+        if type_byte == _TYPE_ARRAY:
+            return self._decode_array(view, offset - 1)
 
         raise DeserializationError(f"Unknown type byte: {type_byte}")
 
+    def _decode_array(self, data: memoryview, offset: int) -> tuple:
+        _, container, ndim, dtype, pad = _ARRAY_HEADER.unpack_from(data, offset)
+        offset += _ARRAY_HEADER.size
+        shape = tuple(_DIM.unpack_from(data, offset + _DIM.size * i)[0] for i in range(ndim))
+        offset += _DIM.size * ndim + pad
+
+        dtype = dtype.decode("ascii")
+        itemsize = int(dtype[2])
+        count = 1
+        for dim in shape:
+            count *= dim
+        nbytes = count * itemsize
+        raw = data[offset : offset + nbytes]
+        if len(raw) != nbytes:
+            raise DeserializationError("Truncated array data")
+        offset += nbytes
+
+        if container == self.ARRAY_NUMPY and NUMPY_AVAILABLE:
+            value = np.frombuffer(raw, dtype=np.dtype(dtype)).reshape(shape)
+            return (value if self.zero_copy else value.copy()), offset
+
+        code = _struct_code(dtype[1], itemsize)
+        if container == self.ARRAY_PYTHON:
+            values = array(code)
+            values.frombytes(raw)
+            if dtype[0] != _BYTE_ORDER:
+                values.byteswap()
+            return values, offset
+
+        # NumPy data without NumPy installed: a typed view in native order.
+        if dtype[0] != _BYTE_ORDER:
+            swapped = array(code)
+            swapped.frombytes(raw)
+            swapped.byteswap()
+            raw = memoryview(swapped)
+        # memoryview.cast is only typed for literal format codes
+        byte_view: Any = raw.cast("B")
+        return byte_view.cast(code, shape), offset
+
+
+_BYTE_ORDER = "<" if sys.byteorder == "little" else ">"
+
+
+def _struct_code(kind: str, itemsize: int) -> str:
+    """Native struct/array code for a dtype kind and item size."""
+    if kind == "f":
+        return "d" if itemsize == 8 else "f"
+    if kind == "b":
+        return "?"
+    for code in "bhilq":
+        if struct.calcsize(code) == itemsize:
+            return code if kind == "i" else code.upper()
+    raise DeserializationError(f"Unsupported array item size: {itemsize}")
+
 
 class SerializerRegistry:
     _instance: SerializerRegistry | None = None
@@ -326,6 +565,8 @@ class SerializerRegistry:
         self._serializers: dict[str, Serializer] = {
             "json": JSONSerializer(),
         }
+        if importlib.util.find_spec("msgpack") is not None:
+            self._serializers["msgpack"] = MessagePackSerializer()
         self._default = "json"
 
     def register(self, name: str, serializer: Serializer):
@@ -334,6 +575,13 @@ class SerializerRegistry:
     def get(self, name: str) -> Serializer | None:
         return self._serializers.get(name)
 
+    def for_content_type(self, content_type: str) -> Serializer | None:
+        """Find a registered serializer by MIME type, for HTTP content negotiation."""
+        for serializer in self._serializers.values():
+            if serializer.content_type == content_type:
+                return serializer
+        return None
+
     def set_default(self, name: str):
         if name in self._serializers:
             self._default = name
@@ -0,0 +1,212 @@
+"""HTTP content negotiation for API bodies.
+
+Servers pick a response serializer from :class:`serializer.SerializerRegistry`
+by the request's ``Accept`` header and compress bodies above a size threshold
+according to ``Accept-Encoding`` (zstd when ``zstandard`` is installed, else
+gzip). Clients send :func:`request_headers` and decode with
+:func:`decode_response`; the HTTP library (``requests``/``urllib3``) already
+advertises and undoes the content codings it supports.
+
+JSON stays the default on both sides, so old clients and servers keep working:
+a server without MessagePack support answers in JSON, and a client decodes by
+the ``Content-Type`` it actually receives.
+"""
+
+from __future__ import annotations
+
+import gzip
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from serializer import (
+    DeserializationError,
+    JSONSerializer,
+    SerializationError,
+    Serializer,
+    SerializerRegistry,
+)
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+# Bodies smaller than this are sent uncompressed.
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Negotiated responses vary by both headers; 304s must repeat it.
+VARY = "Accept, Accept-Encoding"
+
+_json = JSONSerializer()
+
+
+@dataclass
+class EncodedBody:
+    """A response body ready to send, with its content headers."""
+
+    body: bytes
+    content_type: str
+    content_encoding: str | None = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"Content-Type": self.content_type, "Vary": VARY}
+        if self.content_encoding:
+            headers["Content-Encoding"] = self.content_encoding
+        return headers
+
+
+def _parse_header(header: str | None) -> list[tuple[str, float]]:
+    """Parse a comma-separated header with q-values, best first."""
+    items = []
+    for position, part in enumerate((header or "").split(",")):
+        name, *params = (piece.strip() for piece in part.split(";"))
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            items.append((name.lower(), quality, position))
+    items.sort(key=lambda item: (-item[1], item[2]))
+    return [(name, quality) for name, quality, _ in items]
+
+
+def msgpack_available() -> bool:
+    return SerializerRegistry().for_content_type(MSGPACK_CONTENT_TYPE) is not None
+
+
+def request_headers() -> dict[str, str]:
+    """Accept header for clients: prefer MessagePack when it is installed."""
+    if msgpack_available():
+        return {"Accept": f"{MSGPACK_CONTENT_TYPE}, {JSON_CONTENT_TYPE};q=0.9"}
+    return {"Accept": JSON_CONTENT_TYPE}
+
+
+def negotiate(accept: str | None) -> Serializer:
+    """Choose the serializer for an ``Accept`` header; JSON if nothing better matches."""
+    registry = SerializerRegistry()
+    for media_type, _ in _parse_header(accept):
+        if media_type in ("*/*", "application/*"):
+            break
+        serializer = registry.for_content_type(media_type)
+        if serializer is not None:
+            return serializer
+    return _json
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """Choose a content coding for an ``Accept-Encoding`` header."""
+    accepted = {name for name, _ in _parse_header(accept_encoding)}
+    if ZSTD_AVAILABLE and "zstd" in accepted:
+        return "zstd"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def decompress(body: bytes, encoding: str | None) -> bytes:
+    if not encoding or encoding == "identity":
+        return body
+    if encoding == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise DeserializationError("zstd support requires zstandard package")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    raise DeserializationError(f"Unsupported content encoding: {encoding}")
+
+
+def encode_response(
+    obj: Any,
+    accept: str | None = None,
+    accept_encoding: str | None = None,
+    min_size: int = COMPRESS_MIN_BYTES,
+    json_dumps: Callable[[Any], bytes] | None = None,
+) -> EncodedBody:
+    """
+    Serialize ``obj`` as the client prefers and compress it if it is large.
+
+    ``json_dumps`` replaces :class:`JSONSerializer` for JSON bodies, so a web
+    framework can keep its own JSON encoding (no ``__datetime__`` tags).
+    """
+    serializer = negotiate(accept)
+    if serializer.content_type != JSON_CONTENT_TYPE:
+        try:
+            body = serializer.serialize(obj)
+        except SerializationError:
+            serializer = _json
+    if serializer.content_type == JSON_CONTENT_TYPE:
+        body = json_dumps(obj) if json_dumps is not None else serializer.serialize(obj)
+
+    encoding = choose_encoding(accept_encoding) if len(body) >= min_size else None
+    if encoding:
+        body = compress(body, encoding)
+    return EncodedBody(body, serializer.content_type, encoding)
+
+
+def decode_body(
+    body: bytes, content_type: str | None = None, content_encoding: str | None = None
+) -> Any:
+    """Decode a raw body by its ``Content-Type`` and ``Content-Encoding``."""
+    body = decompress(body, content_encoding)
+    media_type = (content_type or JSON_CONTENT_TYPE).split(";")[0].strip().lower()
+    serializer = SerializerRegistry().for_content_type(media_type) or _json
+    return serializer.deserialize(body)
+
+
+def decode_response(response: Any) -> Any:
+    """
+    Decode an HTTP client response (``requests``/``httpx`` style).
+
+    The HTTP library has already undone the content coding; JSON bodies go
+    through ``response.json()`` so existing response objects keep working.
+    """
+    headers = getattr(response, "headers", None)
+    content_type = headers.get("Content-Type") if headers is not None else None
+    media_type = content_type.split(";")[0].strip().lower() if isinstance(content_type, str) else ""
+    if media_type and media_type != JSON_CONTENT_TYPE:
+        serializer = SerializerRegistry().for_content_type(media_type)
+        if serializer is not None:
+            return serializer.deserialize(response.content)
+    return response.json()
+
+
+__all__ = [
+    "COMPRESS_MIN_BYTES",
+    "EncodedBody",
+    "JSON_CONTENT_TYPE",
+    "MSGPACK_CONTENT_TYPE",
+    "VARY",
+    "ZSTD_AVAILABLE",
+    "choose_encoding",
+    "compress",
+    "decode_body",
+    "decode_response",
+    "decompress",
+    "encode_response",
+    "msgpack_available",
+    "negotiate",
+    "request_headers",
+]
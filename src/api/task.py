@@ -9,8 +9,6 @@ from typing import Any, Optional
 from src.core.use_cases.task.cancel_task_use_case import CancelTaskUseCase
 from src.core.use_cases.task.delete_task_use_case import DeleteTaskUseCase
 from src.core.use_cases.task.get_task_status_use_case import GetTaskStatusUseCase
-from src.core.use_cases.task.monitor_task_use_case import MonitorTaskUseCase
-from src.core.use_cases.task.submit_task_use_case import SubmitTaskUseCase
 from src.infrastructure.external.scheduler_client import SchedulerClient
 
 
@@ -34,10 +32,19 @@ class TaskAPI:
         timeout: int = 300,
         resources: Optional[dict[str, Any]] = None,
         user_id: Optional[str] = None,
+        cache: bool = False,
     ) -> dict[str, Any]:
-        """提交任务"""
-        use_case = SubmitTaskUseCase(self._client)
-        return use_case.execute(code, timeout, resources, user_id)
+        """提交任务，cache=True 时相同代码与资源的任务复用已有结果"""
+        resources = resources or {}
+        success, data = self._client.submit_task(
+            code,
+            timeout,
+            cpu=resources.get("cpu", 1.0),
+            memory=resources.get("memory", 512),
+            user_id=user_id,
+            cache=cache,
+        )
+        return {"success": success, **data}
 
     def get_status(self, task_id: str) -> dict[str, Any]:
         """获取任务状态"""
@@ -55,9 +62,11 @@ class TaskAPI:
         return use_case.execute(task_id)
 
     def monitor(self, task_ids: Optional[list[str]] = None) -> list[dict[str, Any]]:
-        """监控任务"""
-        use_case = MonitorTaskUseCase(self._client)
-        return use_case.execute(task_ids)
+        """监控任务：批量获取给定任务的状态，未找到的任务不返回"""
+        success, statuses = self._client.get_task_statuses(task_ids or [])
+        if not success:
+            return []
+        return [status for status in statuses.values() if status]
 
     def get_results(self) -> list[dict[str, Any]]:
         """获取所有任务结果"""
@@ -51,6 +51,7 @@ class ISchedulerService(ABC):
         cpu: float = 1.0,
         memory: int = 512,
         user_id: Optional[str] = None,
+        cache: bool = False,
     ) -> tuple[bool, dict[str, Any]]:
         """
         提交任务到调度中心
@@ -61,6 +62,7 @@ class ISchedulerService(ABC):
             cpu: CPU需求
             memory: 内存需求（MB）
             user_id: 用户ID
+            cache: 确定性任务，允许复用相同代码与资源的已有结果
 
         Returns:
             (是否成功, 任务信息)
@@ -80,6 +82,24 @@ class ISchedulerService(ABC):
         """
         pass
 
+    def get_task_statuses(self, task_ids: list[str]) -> tuple[bool, dict[str, Any]]:
+        """
+        批量获取任务状态
+
+        默认逐个调用 get_task_status，实现类可覆盖为单次批量请求。
+
+        Args:
+            task_ids: 任务ID列表
+
+        Returns:
+            (是否成功, {任务ID: 任务状态，未找到为 None})
+        """
+        statuses: dict[str, Any] = {}
+        for task_id in task_ids:
+            success, status = self.get_task_status(task_id)
+            statuses[str(task_id)] = status if success else None
+        return True, statuses
+
     @abstractmethod
     def delete_task(self, task_id: str) -> tuple[bool, dict[str, Any]]:
         """
@@ -103,6 +123,39 @@ class ISchedulerService(ABC):
         """
         pass
 
+    def fetch_results_since(
+        self,
+        since: Optional[float] = None,
+        fields: Optional[list[str]] = None,
+        page_size: Optional[int] = None,
+    ) -> tuple[bool, dict[str, Any]]:
+        """
+        增量获取水位线之后的任务结果
+
+        默认基于 get_all_results 过滤，实现类可覆盖为服务端分页。
+
+        Args:
+            since: 水位线，仅返回完成时间晚于该值的结果
+            fields: 投影字段
+            page_size: 每页数量
+
+        Returns:
+            (是否成功, {"results": 新结果列表, "watermark": 新水位线})
+        """
+        success, data = self.get_all_results()
+        if not success:
+            return False, data
+
+        results = [
+            r
+            for r in data.get("results", [])
+            if since is None or (r.get("completed_at") or 0) > since
+        ]
+        watermark = max((r.get("completed_at") or 0 for r in results), default=since)
+        if fields:
+            results = [{name: r.get(name) for name in fields} for r in results]
+        return True, {"results": results, "watermark": watermark}
+
     @abstractmethod
     def get_system_stats(self) -> tuple[bool, dict[str, Any]]:
         """
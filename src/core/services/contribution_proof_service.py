@@ -8,14 +8,22 @@ Wang J., arXiv 2024
 - 贡献分 = 累计算力时长 × 任务复杂度系数 × 质量因子 × 声誉加成
 - 贡献证明生成和验证
 - 防篡改签名
+- 追加写 SQLite 持久化与批量验证
 """
 
+import bisect
 import hashlib
 import hmac
 import json
+import os
+import sqlite3
+import threading
 import time
 import uuid
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any, Optional
 
 
@@ -97,6 +105,137 @@ class ContributionProof:
         )
 
 
+def _proof_message(proof: ContributionProof) -> bytes:
+    """签名覆盖的证明字段"""
+    proof_data = {
+        "proof_id": proof.proof_id,
+        "node_address": proof.node_address,
+        "task_id": proof.task_id,
+        "contribution_score": proof.contribution_score,
+        "timestamp": proof.timestamp,
+    }
+    return json.dumps(proof_data, sort_keys=True).encode()
+
+
+def _sign_message(secret_key: str, message: bytes) -> str:
+    return hmac.new(secret_key.encode(), message, hashlib.sha256).hexdigest()
+
+
+def _verify_chunk(secret_key: str, items: list[tuple[bytes, Optional[str]]]) -> list[bool]:
+    """在工作进程中校验一批 (消息, 签名)"""
+    return [
+        signature is not None and hmac.compare_digest(signature, _sign_message(secret_key, message))
+        for message, signature in items
+    ]
+
+
+class ContributionProofStore:
+    """
+    贡献证明的追加写 SQLite 存储
+
+    证明与验证记录只追加不修改，写入先进入缓冲区，
+    达到 batch_size 后以单个事务批量提交。
+    """
+
+    def __init__(self, db_path: str = "contribution_proofs.db", batch_size: int = 100):
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending_proofs: list[tuple[str, str, float, str]] = []
+        self._pending_verifications: list[tuple[str, str, float]] = []
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """初始化数据库"""
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS contribution_proofs (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    proof_id TEXT NOT NULL UNIQUE,
+                    node_address TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    data TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS contribution_verifications (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    proof_id TEXT NOT NULL,
+                    verifier_address TEXT NOT NULL,
+                    timestamp REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_proofs_node
+                ON contribution_proofs(node_address, timestamp)
+            """)
+
+    def append(self, proof: ContributionProof) -> None:
+        """追加一条证明"""
+        row = (proof.proof_id, proof.node_address, proof.timestamp, json.dumps(proof.to_dict()))
+        with self._lock:
+            self._pending_proofs.append(row)
+            if len(self._pending_proofs) >= self.batch_size:
+                self._flush_locked()
+
+    def append_verification(self, proof_id: str, verifier_address: str) -> None:
+        """追加一条验证记录"""
+        with self._lock:
+            self._pending_verifications.append((proof_id, verifier_address, time.time()))
+            if len(self._pending_verifications) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """提交缓冲区中的全部记录"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending_proofs and not self._pending_verifications:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO contribution_proofs "
+                "(proof_id, node_address, timestamp, data) VALUES (?, ?, ?, ?)",
+                self._pending_proofs,
+            )
+            self._conn.executemany(
+                "INSERT INTO contribution_verifications "
+                "(proof_id, verifier_address, timestamp) VALUES (?, ?, ?)",
+                self._pending_verifications,
+            )
+        self._pending_proofs.clear()
+        self._pending_verifications.clear()
+
+    def load(self) -> Iterator[ContributionProof]:
+        """按写入顺序回放全部证明，并应用验证记录"""
+        self.flush()
+        with self._lock:
+            verifiers = dict(
+                self._conn.execute(
+                    "SELECT proof_id, verifier_address FROM contribution_verifications "
+                    "ORDER BY seq"
+                ).fetchall()
+            )
+            rows = self._conn.execute(
+                "SELECT data FROM contribution_proofs ORDER BY seq"
+            ).fetchall()
+
+        for (data,) in rows:
+            proof = ContributionProof.from_dict(json.loads(data))
+            if proof.proof_id in verifiers:
+                proof.verifier_address = verifiers[proof.proof_id]
+                proof.verified = True
+            yield proof
+
+    def close(self) -> None:
+        """提交缓冲区并关闭连接"""
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+
 class ContributionProofService:
     """贡献证明服务"""
 
@@ -111,10 +250,64 @@ class ContributionProofService:
     BASE_REPUTATION = 50.0
     MAX_REPUTATION_BONUS = 0.5
 
-    def __init__(self, secret_key: Optional[str] = None):
+    # 批量验证参数：少于阈值时在当前进程校验，进程池开销不划算
+    PARALLEL_VERIFY_THRESHOLD = 5000
+    VERIFY_CHUNK_SIZE = 2000
+
+    # 持久化时的签名密钥环境变量（未显式传入 secret_key 时读取）
+    SECRET_KEY_ENV = "IDLE_CONTRIBUTION_PROOF_SECRET"
+
+    def __init__(
+        self,
+        secret_key: Optional[str] = None,
+        store: Optional[ContributionProofStore] = None,
+    ):
+        """
+        Args:
+            secret_key: 签名密钥；不持久化时缺省为进程内随机密钥
+            store: 持久化存储；重启后需用同一密钥校验已保存的证明，
+                因此必须提供 secret_key 或设置 IDLE_CONTRIBUTION_PROOF_SECRET
+
+        Raises:
+            ValueError: 传入 store 但没有稳定的签名密钥
+        """
+        if store is not None and not secret_key:
+            secret_key = os.environ.get(self.SECRET_KEY_ENV)
+            if not secret_key:
+                raise ValueError(
+                    "持久化贡献证明需要稳定的签名密钥: "
+                    f"请传入 secret_key 或设置环境变量 {self.SECRET_KEY_ENV}"
+                )
         self._secret_key = secret_key or str(uuid.uuid4())
+        self._store = store
         self._proofs: dict[str, ContributionProof] = {}
         self._node_contributions: dict[str, float] = {}
+        # 节点 -> 按 (时间戳, 证明ID) 升序排列的索引
+        self._node_index: dict[str, list[tuple[float, str]]] = {}
+        self._total_contribution = 0.0
+        self._verified_count = 0
+
+        if store is not None:
+            for proof in store.load():
+                self._index_proof(proof)
+
+    def _index_proof(self, proof: ContributionProof) -> None:
+        """登记证明并更新索引与聚合统计"""
+        self._proofs[proof.proof_id] = proof
+
+        entries = self._node_index.setdefault(proof.node_address, [])
+        entry = (proof.timestamp, proof.proof_id)
+        if not entries or entries[-1] <= entry:
+            entries.append(entry)
+        else:
+            bisect.insort(entries, entry)
+
+        self._node_contributions[proof.node_address] = (
+            self._node_contributions.get(proof.node_address, 0.0) + proof.contribution_score
+        )
+        self._total_contribution += proof.contribution_score
+        if proof.verified:
+            self._verified_count += 1
 
     def _generate_proof_id(self) -> str:
         """生成唯一证明ID"""
@@ -223,26 +416,15 @@ class ContributionProofService:
         )
 
         proof.signature = self._sign_proof(proof)
-        self._proofs[proof.proof_id] = proof
-
-        if node_address not in self._node_contributions:
-            self._node_contributions[node_address] = 0.0
-        self._node_contributions[node_address] += contribution_score
+        self._index_proof(proof)
+        if self._store is not None:
+            self._store.append(proof)
 
         return proof
 
     def _sign_proof(self, proof: ContributionProof) -> str:
         """签名证明数据"""
-        proof_data = {
-            "proof_id": proof.proof_id,
-            "node_address": proof.node_address,
-            "task_id": proof.task_id,
-            "contribution_score": proof.contribution_score,
-            "timestamp": proof.timestamp,
-        }
-        proof_json = json.dumps(proof_data, sort_keys=True).encode()
-        signature = hmac.new(self._secret_key.encode(), proof_json, hashlib.sha256).hexdigest()
-        return signature
+        return _sign_message(self._secret_key, _proof_message(proof))
 
     def verify_proof(self, proof: ContributionProof) -> bool:
         """验证贡献证明"""
@@ -258,6 +440,35 @@ class ContributionProofService:
             return False
         return self.verify_proof(self._proofs[proof_id])
 
+    def verify_proofs(
+        self, proofs: Sequence[ContributionProof], max_workers: Optional[int] = None
+    ) -> list[bool]:
+        """
+        批量验证贡献证明（审计巡检）
+
+        证明数量达到 PARALLEL_VERIFY_THRESHOLD 时分块交给进程池校验 HMAC。
+
+        Args:
+            proofs: 待验证的证明
+            max_workers: 进程池大小，默认由 ProcessPoolExecutor 决定
+
+        Returns:
+            与输入顺序一致的验证结果
+        """
+        items = [(_proof_message(p), p.signature) for p in proofs]
+        if len(items) < self.PARALLEL_VERIFY_THRESHOLD:
+            return _verify_chunk(self._secret_key, items)
+
+        chunk = self.VERIFY_CHUNK_SIZE
+        chunks = [items[i : i + chunk] for i in range(0, len(items), chunk)]
+        results: list[bool] = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for chunk_results in executor.map(
+                _verify_chunk, [self._secret_key] * len(chunks), chunks
+            ):
+                results.extend(chunk_results)
+        return results
+
     def add_verification(self, proof_id: str, verifier_address: str) -> bool:
         """
         添加验证
@@ -273,8 +484,12 @@ class ContributionProofService:
             return False
 
         proof = self._proofs[proof_id]
+        if not proof.verified:
+            self._verified_count += 1
         proof.verifier_address = verifier_address
         proof.verified = True
+        if self._store is not None:
+            self._store.append_verification(proof_id, verifier_address)
         return True
 
     def get_proof(self, proof_id: str) -> Optional[ContributionProof]:
@@ -283,8 +498,10 @@ class ContributionProofService:
 
     def get_node_proofs(self, node_address: str, limit: int = 100) -> list[ContributionProof]:
         """获取节点的贡献证明列表"""
-        proofs = [p for p in self._proofs.values() if p.node_address == node_address]
-        return sorted(proofs, key=lambda p: p.timestamp, reverse=True)[:limit]
+        entries = self._node_index.get(node_address, [])
+        if limit <= 0:
+            return []
+        return [self._proofs[proof_id] for _, proof_id in reversed(entries[-limit:])]
 
     def get_node_total_contribution(self, node_address: str) -> float:
         """获取节点总贡献分"""
@@ -293,8 +510,8 @@ class ContributionProofService:
     def get_stats(self) -> dict[str, Any]:
         """获取贡献证明系统统计"""
         total_proofs = len(self._proofs)
-        verified_proofs = sum(1 for p in self._proofs.values() if p.verified)
-        total_contribution = sum(self._node_contributions.values())
+        verified_proofs = self._verified_count
+        total_contribution = self._total_contribution
         avg_contribution = (
             total_contribution / len(self._node_contributions) if self._node_contributions else 0.0
         )
@@ -308,5 +525,20 @@ class ContributionProofService:
             "avg_contribution_per_node": avg_contribution,
         }
 
+    def flush(self) -> None:
+        """将缓冲的证明写入持久化存储"""
+        if self._store is not None:
+            self._store.flush()
+
+    def close(self) -> None:
+        """提交缓冲区并关闭持久化存储"""
+        if self._store is not None:
+            self._store.close()
+
 
-__all__ = ["ContributionProofService", "ContributionProof", "ResourceMetrics"]
+__all__ = [
+    "ContributionProofService",
+    "ContributionProof",
+    "ContributionProofStore",
+    "ResourceMetrics",
+]
@@ -72,16 +72,22 @@ class MonitorTaskUseCase:
         else:
             local_tasks = self._task_repository.list_all(request.limit)
 
+        # 一次批量请求获取全部任务的最新状态
+        success, statuses = self._scheduler_service.get_task_statuses(
+            [task.task_id for task in local_tasks]
+        )
+
         # 聚合任务状态
         tasks_data = []
         for task in local_tasks:
-            # 从调度器获取最新状态
-            success, status_data = self._scheduler_service.get_task_status(task.task_id)
-
-            if success:
-                # 更新本地任务状态
-                task.status = TaskStatus(status_data.get("status", "pending"))
-                self._task_repository.update(task)
+            status_data = statuses.get(str(task.task_id)) if success else None
+
+            if status_data:
+                # 仅在状态变化时更新本地任务
+                new_status = TaskStatus(status_data.get("status", "pending"))
+                if new_status != task.status:
+                    task.status = new_status
+                    self._task_repository.update(task)
 
             tasks_data.append(
                 {
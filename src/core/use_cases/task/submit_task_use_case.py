@@ -58,6 +58,7 @@ class SubmitTaskRequest:
     timeout: int = 300
     cpu: float = 1.0
     memory: int = 512
+    cache: bool = False
 
 
 @dataclass
@@ -197,6 +198,7 @@ class SubmitTaskUseCase:
             cpu=task.cpu_request,
             memory=task.memory_request,
             user_id=task.user_id,
+            cache=request.cache,
         )
 
         if not scheduler_result[0]:
@@ -1,18 +1,28 @@
 """
 审计日志系统
 
-记录所有关键操作，支持审计追溯
+记录所有关键操作，支持审计追溯：
+- 后台写线程批量落盘，调用方只入队不等待磁盘
+- 写入失败时重试，仍失败则追加到溢出文件，稍后补写
+- WAL 模式，读写使用独立连接
+- 按天分表，支持按保留天数删除旧分区
 """
 
+import atexit
 import json
+import logging
+import queue
 import sqlite3
 import threading
+import time
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from enum import Enum
 from pathlib import Path
 from typing import Any, Optional
 
+logger = logging.getLogger(__name__)
+
 
 class AuditAction(Enum):
     """审计操作类型"""
@@ -87,43 +97,249 @@ class AuditLog:
         )
 
 
+# 按天分区的表名前缀；旧版未分区的 audit_logs 表仍可查询，视为最早的分区
+LEGACY_TABLE = "audit_logs"
+PARTITION_PREFIX = "audit_logs_"
+
+_COLUMNS = "timestamp, action, user_id, resource_type, resource_id, details, ip_address, user_agent"
+
+# 队列中的记录是 _to_row() 编码好的行；写线程停止标记；
+# flush() 入队 threading.Event，写完之前的记录后置位
+_STOP = object()
+
+# 批量写入失败时的重试次数与首次退避（秒）
+WRITE_RETRIES = 3
+RETRY_BACKOFF = 0.1
+
+
+def _partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def _partition_day(table: str) -> Optional[date]:
+    try:
+        return datetime.strptime(table[len(PARTITION_PREFIX) :], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def _to_row(entry: AuditLog) -> tuple:
+    """编码为数据库行；details 无法 JSON 编码时抛出 TypeError"""
+    return (
+        entry.timestamp.isoformat(),
+        entry.action.value,
+        entry.user_id,
+        entry.resource_type,
+        entry.resource_id,
+        json.dumps(entry.details),
+        entry.ip_address,
+        entry.user_agent,
+    )
+
+
+def _from_row(row: tuple) -> AuditLog:
+    return AuditLog.from_dict(
+        {
+            "timestamp": row[0],
+            "action": row[1],
+            "user_id": row[2],
+            "resource_type": row[3],
+            "resource_id": row[4],
+            "details": json.loads(row[5]) if row[5] else {},
+            "ip_address": row[6],
+            "user_agent": row[7],
+        }
+    )
+
+
 class AuditLogger:
     """
     审计日志记录器
 
-    记录所有关键操作，支持查询和追溯
+    记录所有关键操作，支持查询和追溯。
+
+    log() 只把记录放入有界队列，由后台线程每 flush_interval 秒或攒满
+    batch_size 条时在一个事务内用 executemany 写入；队列满时 log() 阻塞，
+    审计记录不会被丢弃。写入失败的批次按退避重试，仍失败则追加到
+    ``<db_path>.spill.jsonl``，下次写入成功或重新打开时补写进数据库。
+    query() 会先等待已入队的记录落盘，再通过独立的读连接查询。
+    进程退出时自动 close() 写完剩余记录。
     """
 
-    def __init__(self, db_path: str = "audit.db"):
+    def __init__(
+        self,
+        db_path: str = "audit.db",
+        batch_size: int = 200,
+        flush_interval: float = 0.05,
+        max_queue_size: int = 10000,
+        retention_days: Optional[int] = None,
+    ):
+        """
+        Args:
+            db_path: 数据库文件路径
+            batch_size: 单个事务最多写入的记录数
+            flush_interval: 攒批的最长等待时间（秒）
+            max_queue_size: 内存队列上限
+            retention_days: 分区保留天数，None 表示永久保留
+        """
         self.db_path = Path(db_path)
-        self._lock = threading.Lock()
+        self.spill_path = self.db_path.with_name(f"{self.db_path.name}.spill.jsonl")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._partitions: set[str] = set()
+        self._purged_on: Optional[date] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        self._close_lock = threading.Lock()
+        self._closed = False
+
         self._init_db()
+        self._writer = threading.Thread(target=self._run_writer, name="audit-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
 
     def _init_db(self) -> None:
-        """初始化数据库"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS audit_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    action TEXT NOT NULL,
-                    user_id TEXT NOT NULL,
-                    resource_type TEXT NOT NULL,
-                    resource_id TEXT NOT NULL,
-                    details TEXT,
-                    ip_address TEXT,
-                    user_agent TEXT
+        """初始化数据库：开启 WAL 并创建当天分区"""
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                self._ensure_partition(conn, date.today())
+            self._replay_spill(conn)
+        finally:
+            conn.close()
+
+    def _ensure_partition(self, conn: sqlite3.Connection, day: date) -> str:
+        """确保指定日期的分区表存在，返回表名"""
+        table = _partition_name(day)
+        if table in self._partitions:
+            return table
+
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                action TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                resource_type TEXT NOT NULL,
+                resource_id TEXT NOT NULL,
+                details TEXT,
+                ip_address TEXT,
+                user_agent TEXT
+            )
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_user_id ON {table}(user_id)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_action ON {table}(action)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_timestamp ON {table}(timestamp)")
+        self._partitions.add(table)
+        return table
+
+    def _write_batch(self, conn: sqlite3.Connection, rows: list[tuple]) -> None:
+        """在一个事务内按分区批量写入"""
+        by_day: dict[date, list[tuple]] = {}
+        for row in rows:
+            by_day.setdefault(datetime.fromisoformat(row[0]).date(), []).append(row)
+
+        with conn:
+            for day, rows in by_day.items():
+                table = self._ensure_partition(conn, day)
+                conn.executemany(
+                    f"INSERT INTO {table} ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
                 )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_user_id ON audit_logs(user_id)
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_action ON audit_logs(action)
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_timestamp ON audit_logs(timestamp)
-            """)
+
+        if self.retention_days is not None and self._purged_on != date.today():
+            self._purge(conn, date.today())
+
+    def _write_with_retry(self, conn: sqlite3.Connection, rows: list[tuple]) -> None:
+        """按退避重试写入；全部失败时把批次追加到溢出文件，不丢弃记录"""
+        for attempt in range(WRITE_RETRIES):
+            try:
+                self._write_batch(conn, rows)
+            except sqlite3.Error as e:
+                logger.warning(
+                    "审计日志批量写入失败 (%d 条, 第 %d 次): %s", len(rows), attempt + 1, e
+                )
+                time.sleep(RETRY_BACKOFF * 2**attempt)
+            else:
+                if self.spill_path.exists():
+                    self._replay_spill(conn)
+                return
+        self._spill(rows)
+
+    def _spill(self, rows: list[tuple]) -> None:
+        """把写不进数据库的行追加到溢出文件"""
+        try:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+            logger.error("审计日志写入数据库失败，%d 条已写入 %s", len(rows), self.spill_path)
+        except OSError as e:
+            logger.critical("审计日志写入失败且无法写入溢出文件 (%d 条): %s", len(rows), e)
+
+    def _replay_spill(self, conn: sqlite3.Connection) -> None:
+        """把溢出文件中的记录补写进数据库，成功后删除该文件"""
+        try:
+            with open(self.spill_path, encoding="utf-8") as f:
+                rows = [tuple(json.loads(line)) for line in f if line.strip()]
+        except FileNotFoundError:
+            return
+        try:
+            if rows:
+                self._write_batch(conn, rows)
+        except sqlite3.Error as e:
+            logger.warning("补写审计日志溢出文件失败 (%d 条): %s", len(rows), e)
+            return
+        self.spill_path.unlink(missing_ok=True)
+
+    def _run_writer(self) -> None:
+        """后台写线程：阻塞等待首条记录，再在 flush_interval 内攒批"""
+        conn = self._connect()
+        try:
+            stop = False
+            while not stop:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while isinstance(batch[-1], tuple):
+                    if len(batch) >= self.batch_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                stop = batch[-1] is _STOP
+                rows = [item for item in batch if isinstance(item, tuple)]
+                try:
+                    if rows:
+                        self._write_with_retry(conn, rows)
+                except Exception:
+                    # 写线程不能退出，否则 flush() 和队列满时的 log() 会永远阻塞
+                    logger.exception("审计日志写线程处理批次失败 (%d 条)", len(rows))
+                    self._spill(rows)
+                finally:
+                    if isinstance(batch[-1], threading.Event):
+                        batch[-1].set()
+        finally:
+            conn.close()
+
+    def _enqueue(self, item: Any) -> bool:
+        """入队；已关闭时返回 False。与 close() 互斥，保证入队的记录都排在停止标记之前"""
+        with self._close_lock:
+            if self._closed:
+                return False
+            self._queue.put(item)
+            return True
 
     def log(
         self,
@@ -135,7 +351,7 @@ class AuditLogger:
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
     ) -> None:
-        """记录审计日志"""
+        """记录审计日志（入队后立即返回）；details 无法 JSON 编码时抛出 TypeError"""
         log_entry = AuditLog(
             timestamp=datetime.now(),
             action=action,
@@ -147,24 +363,61 @@ class AuditLogger:
             user_agent=user_agent,
         )
 
-        with self._lock, sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                    INSERT INTO audit_logs
-                    (timestamp, action, user_id, resource_type, resource_id, details, ip_address, user_agent)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                (
-                    log_entry.timestamp.isoformat(),
-                    log_entry.action.value,
-                    log_entry.user_id,
-                    log_entry.resource_type,
-                    log_entry.resource_id,
-                    json.dumps(log_entry.details),
-                    log_entry.ip_address,
-                    log_entry.user_agent,
-                ),
-            )
+        # 在调用方编码，非法输入在这里报错而不是在写线程中
+        row = _to_row(log_entry)
+        if not self._enqueue(row):
+            # 写线程已停止，同步写入
+            self._write_now([log_entry])
+
+    def _write_now(self, entries: list[AuditLog]) -> None:
+        conn = self._connect()
+        try:
+            self._write_batch(conn, [_to_row(entry) for entry in entries])
+        finally:
+            conn.close()
+
+    def flush(self) -> None:
+        """等待已入队的记录全部写入"""
+        done = threading.Event()
+        if self._enqueue(done):
+            done.wait()
+
+    def _list_partitions(self, conn: sqlite3.Connection) -> list[str]:
+        """列出所有分区表，按日期从新到旧"""
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?",
+            (f"{PARTITION_PREFIX}[0-9]*",),
+        ).fetchall()
+        tables = [name for (name,) in rows if _partition_day(name)]
+        return sorted(tables, reverse=True)
+
+    def _purge(self, conn: sqlite3.Connection, today: date) -> list[str]:
+        cutoff = today - timedelta(days=self.retention_days)
+        dropped = []
+        for table in self._list_partitions(conn):
+            if _partition_day(table) < cutoff:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+                self._partitions.discard(table)
+                dropped.append(table)
+        conn.commit()
+        self._purged_on = today
+        return dropped
+
+    def purge_expired(self, today: Optional[date] = None) -> list[str]:
+        """
+        删除超过保留天数的分区
+
+        Returns:
+            被删除的分区表名
+        """
+        if self.retention_days is None:
+            return []
+        self.flush()
+        conn = self._connect()
+        try:
+            return self._purge(conn, today or date.today())
+        finally:
+            conn.close()
 
     def query(
         self,
@@ -175,9 +428,9 @@ class AuditLogger:
         end_time: Optional[datetime] = None,
         limit: int = 100,
     ) -> list[AuditLog]:
-        """查询审计日志"""
+        """查询审计日志，按时间倒序，只扫描时间范围内的分区"""
         conditions = []
-        params = []
+        params: list[Any] = []
 
         if user_id:
             conditions.append("user_id = ?")
@@ -196,31 +449,59 @@ class AuditLogger:
             params.append(end_time.isoformat())
 
         where_clause = " AND ".join(conditions) if conditions else "1=1"
-        sql = f"""
-            SELECT timestamp, action, user_id, resource_type, resource_id, details, ip_address, user_agent
-            FROM audit_logs
-            WHERE {where_clause}
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """
-        params.append(limit)
-
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(sql, params)
-            results = []
-            for row in cursor.fetchall():
-                data = {
-                    "timestamp": row[0],
-                    "action": row[1],
-                    "user_id": row[2],
-                    "resource_type": row[3],
-                    "resource_id": row[4],
-                    "details": json.loads(row[5]) if row[5] else {},
-                    "ip_address": row[6],
-                    "user_agent": row[7],
-                }
-                results.append(AuditLog.from_dict(data))
+
+        self.flush()
+        with self._read_lock:
+            if self._read_conn is None:
+                self._read_conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn = self._read_conn
+
+            tables = [
+                table
+                for table in self._list_partitions(conn)
+                if (start_time is None or _partition_day(table) >= start_time.date())
+                and (end_time is None or _partition_day(table) <= end_time.date())
+            ]
+            legacy = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (LEGACY_TABLE,)
+            ).fetchone()
+            if legacy:
+                tables.append(LEGACY_TABLE)
+
+            results: list[AuditLog] = []
+            for table in tables:
+                remaining = limit - len(results)
+                if remaining <= 0:
+                    break
+                rows = conn.execute(
+                    f"""
+                    SELECT {_COLUMNS}
+                    FROM {table}
+                    WHERE {where_clause}
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                    """,
+                    [*params, remaining],
+                ).fetchall()
+                results.extend(_from_row(row) for row in rows)
             return results
 
+    def close(self) -> None:
+        """停止写线程，写完剩余记录并关闭连接"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            # 之后不会再有记录入队，停止标记之前的记录都会被写线程写完
+            self._queue.put(_STOP)
+
+        self._writer.join()
+
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+        atexit.unregister(self.close)
+
 
 __all__ = ["AuditAction", "AuditLog", "AuditLogger"]
@@ -20,12 +20,18 @@
     success, task_info = client.submit_task(code="print('hello')", timeout=300)
 """
 
+import json
 import threading
+from collections import OrderedDict
+from collections.abc import Iterator
 from dataclasses import dataclass
 from typing import Any, Optional
 
 import requests
 
+from serializer import DeserializationError
+from serializer.http import decode_response, request_headers
+
 from ..utils.api_utils import safe_api_call
 
 
@@ -95,6 +101,11 @@ class SchedulerClient:
         ...     print(f"Online nodes: {health_info.online_nodes}")
     """
 
+    # 批量状态查询缓存的 ETag 数量上限（按任务集合区分）
+    STATUS_ETAG_CACHE_SIZE = 64
+    # 增量拉取结果时的分页大小
+    RESULTS_PAGE_SIZE = 500
+
     def __init__(
         self,
         base_url: str = "http://localhost:8000",
@@ -116,6 +127,10 @@ class SchedulerClient:
         self.health_check_timeout = health_check_timeout
         self.max_retries = max_retries
         self._session = requests.Session()
+        # 调度器支持时以 MessagePack 接收响应，压缩由 requests 自动协商
+        self._session.headers.update(request_headers())
+        self._status_etags: OrderedDict[tuple[str, ...], tuple[str, dict[str, Any]]] = OrderedDict()
+        self._etag_lock = threading.Lock()
 
     def _request(self, method: str, endpoint: str, **kwargs) -> tuple[bool, Any]:
         """
@@ -253,6 +268,7 @@ class SchedulerClient:
         cpu: float = 1.0,
         memory: int = 512,
         user_id: Optional[str] = None,
+        cache: bool = False,
     ) -> tuple[bool, dict[str, Any]]:
         """
         提交任务到调度中心
@@ -263,6 +279,7 @@ class SchedulerClient:
             cpu: CPU需求（核心数）
             memory: 内存需求（MB）
             user_id: 用户ID
+            cache: 确定性任务，允许复用相同代码与资源的已有结果
 
         Returns:
             (是否成功, 任务信息)
@@ -272,6 +289,7 @@ class SchedulerClient:
             "timeout": timeout,
             "resources": {"cpu": cpu, "memory": memory},
             "user_id": user_id,
+            "cache": cache,
         }
         return self._request("POST", "/submit", json=payload, timeout=10)
 
@@ -287,6 +305,75 @@ class SchedulerClient:
         """
         return self._request("GET", f"/status/{task_id}", timeout=5)
 
+    def get_task_statuses(self, task_ids: list[str]) -> tuple[bool, dict[str, Any]]:
+        """
+        批量获取任务状态
+
+        一次 POST /status/batch 请求代替逐个查询。同一组任务的状态未变化时，
+        调度器根据 If-None-Match 返回 304，直接复用上次结果。
+        调度器不支持批量接口时退化为逐个查询。
+
+        Args:
+            task_ids: 任务ID列表
+
+        Returns:
+            (是否成功, {任务ID: 任务状态，未找到为 None})
+        """
+        key = tuple(sorted({str(task_id) for task_id in task_ids}))
+        if not key:
+            return True, {}
+
+        with self._etag_lock:
+            cached = self._status_etags.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        try:
+            response = self._session.post(
+                f"{self.base_url}/status/batch",
+                json={"task_ids": list(key)},
+                headers=headers,
+                timeout=5,
+            )
+        except requests.exceptions.RequestException as e:
+            return False, {"error": f"请求失败: {str(e)}", "details": str(e)}
+
+        if response.status_code == 304 and cached:
+            with self._etag_lock:
+                self._status_etags.move_to_end(key)
+            return True, cached[1]
+        if response.status_code in (404, 405):
+            return self._get_task_statuses_each(key)
+        if response.status_code != 200:
+            return False, {
+                "error": f"HTTP {response.status_code}",
+                "text": response.text,
+                "status_code": response.status_code,
+            }
+
+        try:
+            statuses = decode_response(response).get("statuses", {})
+        except (ValueError, DeserializationError):
+            return False, {"error": "响应格式错误", "text": response.text}
+
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._etag_lock:
+                self._status_etags[key] = (etag, statuses)
+                self._status_etags.move_to_end(key)
+                while len(self._status_etags) > self.STATUS_ETAG_CACHE_SIZE:
+                    self._status_etags.popitem(last=False)
+        return True, statuses
+
+    def _get_task_statuses_each(self, task_ids: tuple[str, ...]) -> tuple[bool, dict[str, Any]]:
+        """逐个查询任务状态（兼容不支持批量接口的调度器）"""
+        statuses: dict[str, Any] = {}
+        for task_id in task_ids:
+            success, status = self.get_task_status(task_id)
+            if not success and status.get("status_code") != 404:
+                return False, status
+            statuses[task_id] = status if success else None
+        return True, statuses
+
     def delete_task(self, task_id: str) -> tuple[bool, dict[str, Any]]:
         """
         删除任务
@@ -308,6 +395,88 @@ class SchedulerClient:
         """
         return self._request("GET", "/results", timeout=5)
 
+    def get_results_page(
+        self,
+        cursor: int = 0,
+        limit: Optional[int] = None,
+        since: Optional[float] = None,
+        fields: Optional[list[str]] = None,
+    ) -> tuple[bool, dict[str, Any]]:
+        """
+        分页获取任务结果
+
+        Args:
+            cursor: 上一页返回的 next_cursor
+            limit: 每页数量，None 表示取到末尾
+            since: 水位线，仅返回完成时间晚于该值的结果
+            fields: 投影字段，如 ["task_id", "completed_at"]，省略结果正文
+
+        Returns:
+            (是否成功, {"results", "next_cursor", "has_more", "watermark"})
+        """
+        params: dict[str, Any] = {"cursor": cursor}
+        if limit is not None:
+            params["limit"] = limit
+        if since is not None:
+            params["since"] = since
+        if fields:
+            params["fields"] = ",".join(fields)
+        return self._request("GET", "/results", params=params, timeout=5)
+
+    def fetch_results_since(
+        self,
+        since: Optional[float] = None,
+        fields: Optional[list[str]] = None,
+        page_size: Optional[int] = None,
+    ) -> tuple[bool, dict[str, Any]]:
+        """
+        增量拉取水位线之后的全部结果
+
+        逐页请求直到没有更多数据，调用方保存返回的 watermark 供下次使用。
+
+        Returns:
+            (是否成功, {"results": 新结果列表, "watermark": 新水位线})
+        """
+        results: list[dict[str, Any]] = []
+        watermark = since
+        cursor = 0
+        while True:
+            success, page = self.get_results_page(
+                cursor, page_size or self.RESULTS_PAGE_SIZE, since, fields
+            )
+            if not success:
+                return False, page
+            results.extend(page.get("results", []))
+            watermark = page.get("watermark", watermark)
+            # 不支持分页的旧调度器不返回 has_more，一次即取完
+            if not page.get("has_more"):
+                break
+            cursor = page["next_cursor"]
+        return True, {"results": results, "watermark": watermark}
+
+    def stream_results(
+        self, since: Optional[float] = None, fields: Optional[list[str]] = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        以 NDJSON 流式导出结果，逐行解析，适合大批量导出
+
+        Raises:
+            requests.RequestException: 请求失败
+        """
+        params: dict[str, Any] = {}
+        if since is not None:
+            params["since"] = since
+        if fields:
+            params["fields"] = ",".join(fields)
+
+        with self._session.get(
+            f"{self.base_url}/results/stream", params=params, stream=True, timeout=self.timeout
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
     def get_system_stats(self) -> tuple[bool, dict[str, Any]]:
         """
         获取系统统计信息
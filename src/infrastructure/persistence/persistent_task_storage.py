@@ -6,12 +6,33 @@ import threading
 import time
 from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
 from typing import Any, Optional
 
+from legacy.storage.result_index import CompletionIndex
+from legacy.storage.result_store import ResultRef, ResultStore
 from src.core.entities.task import Task, TaskStatus
 from src.infrastructure.persistence import ensure_data_dirs, get_db_path
 from src.infrastructure.repositories.sqlite_task_repository import SQLiteTaskRepository
 
+# SQLite 行的 result 列只保存结果存储中的引用，正文按需从结果存储读取
+_RESULT_REF_PREFIX = "result-store:"
+
+
+def _encode_result_ref(ref: ResultRef) -> str:
+    """将结果引用编码为写入 result 列的字符串"""
+    return f"{_RESULT_REF_PREFIX}{ref.digest}:{ref.size}"
+
+
+def _decode_result_ref(value: Optional[str]) -> Optional[ResultRef]:
+    """解析 result 列中的结果引用，不是引用时返回 None"""
+    if not value or not value.startswith(_RESULT_REF_PREFIX):
+        return None
+    digest, _, size = value[len(_RESULT_REF_PREFIX) :].partition(":")
+    if not digest or not size.isdigit():
+        return None
+    return ResultRef(digest, int(size))
+
 
 @dataclass
 class CachedTaskInfo:
@@ -25,6 +46,8 @@ class CachedTaskInfo:
     assigned_node: Optional[str] = None
     completed_at: Optional[float] = None
     result: Optional[str] = None
+    result_digest: Optional[str] = None
+    result_size: Optional[int] = None
     required_resources: dict[str, Any] = field(default_factory=lambda: {"cpu": 1.0, "memory": 512})
     user_id: Optional[str] = None
     _internal_task_id: Optional[str] = None
@@ -46,10 +69,16 @@ class PersistentTaskStorage:
         - 异步初始化 + 同步便捷方法
         - 批量操作支持
         - int task_id（调度器兼容）<--> str task_id（SQLite）双向映射
+        - 缓存只保留结果摘要，正文存放在按内容寻址的结果存储中，按需读取
+        - SQLite 行同样只记录结果引用，完成任务时不读取正文
     """
 
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, result_store: Optional[ResultStore] = None):
         self._db_path = str(db_path or get_db_path())
+        db_file = Path(self._db_path)
+        self.result_store = result_store or ResultStore(
+            db_file.with_name(f"{db_file.stem}_results")
+        )
         self._repo: Optional[SQLiteTaskRepository] = None
         self._initialized = False
         self._lock = threading.RLock()
@@ -62,6 +91,9 @@ class PersistentTaskStorage:
         self._pending_tasks: list[int] = []
         self._assigned_tasks: dict[str, list[int]] = {}
 
+        # 完成顺序索引：按游标与 since 水位线二分查找结果页
+        self._completed = CompletionIndex()
+
         self._stats = {
             "tasks_processed": 0,
             "tasks_failed": 0,
@@ -132,11 +164,15 @@ class PersistentTaskStorage:
                 assigned_at=task.started_at.timestamp() if task.started_at else None,
                 assigned_node=task.assigned_node,
                 completed_at=task.completed_at.timestamp() if task.completed_at else None,
-                result=task.result,
                 required_resources=resources,
                 user_id=task.user_id,
                 _internal_task_id=task.task_id,
             )
+            if task.result is not None:
+                # 旧数据行保存的是完整正文，恢复时写入结果存储
+                ref = _decode_result_ref(task.result) or self.result_store.put(task.result)
+                cached.result_digest = ref.digest
+                cached.result_size = ref.size
 
             self._id_map[int_id] = task.task_id
             self._reverse_id_map[task.task_id] = int_id
@@ -151,6 +187,13 @@ class PersistentTaskStorage:
             max_int_id = max(max_int_id, int_id)
             self._task_id_counter = max_int_id + 1
 
+        completed = sorted(
+            (c for c in self._cache.values() if c.status == "completed"),
+            key=lambda c: (c.completed_at or 0.0, c.task_id),
+        )
+        for cached in completed:
+            self._completed.record(cached.task_id, cached.completed_at or 0.0)
+
     def _run_async(self, coro):
         """在专用线程中运行异步协程，带重连机制，兼容同步/异步调用上下文"""
         self._ensure_init()
@@ -194,6 +237,7 @@ class PersistentTaskStorage:
     def _invalidate_cache(self, int_id: int):
         """使指定任务的缓存失效"""
         self._cache.pop(int_id, None)
+        self._completed.discard(int_id)
 
     def _update_cache(self, int_id: int, cached: CachedTaskInfo):
         """更新内存缓存"""
@@ -205,8 +249,12 @@ class PersistentTaskStorage:
         timeout: int = 300,
         resources: Optional[dict] = None,
         user_id: Optional[str] = None,
+        enqueue: bool = True,
     ) -> int:
-        """添加新任务，返回 int 类型 task_id（兼容调度器接口）"""
+        """添加新任务，返回 int 类型 task_id（兼容调度器接口）
+
+        enqueue=False 时任务暂不进入调度队列，之后可通过 release_task 入队。
+        """
         with self._lock:
             int_id = self._task_id_counter
             self._task_id_counter += 1
@@ -236,10 +284,20 @@ class PersistentTaskStorage:
                 _internal_task_id=saved.task_id if saved else task.task_id,
             )
             self._update_cache(int_id, cached)
-            self._pending_tasks.append(int_id)
+            if enqueue:
+                self._pending_tasks.append(int_id)
 
             return int_id
 
+    def release_task(self, task_id: int) -> bool:
+        """将未入队的待处理任务加入调度队列（兼容调度器接口）"""
+        with self._lock:
+            cached = self._cache.get(task_id)
+            if not cached or cached.status != "pending" or task_id in self._pending_tasks:
+                return False
+            self._pending_tasks.append(task_id)
+            return True
+
     async def _do_save_task(self, task: Task, int_id: int) -> Task:
         """内部异步保存任务"""
         saved = await self._repo.save(task)
@@ -260,6 +318,9 @@ class PersistentTaskStorage:
                     continue
 
                 req = cached.required_resources or {}
+                if node_id in req.get("exclude_nodes", ()):
+                    continue
+
                 score = 1.0
                 if "cpu" in req:
                     score *= min(1.0, 4.0 / max(0.1, req.get("cpu", 1.0)))
@@ -304,8 +365,24 @@ class PersistentTaskStorage:
             task.completed_at = datetime.now()
         await self._repo.save(task)
 
+    def can_complete(self, task_id: int) -> bool:
+        """任务是否存在且处于可完成状态（兼容调度器接口）"""
+        cached = self._cache.get(task_id)
+        return cached is not None and cached.status in ("pending", "assigned", "running")
+
     def complete_task(self, task_id: int, result: str, node_id: Optional[str] = None) -> bool:
         """完成任务（兼容调度器接口）"""
+        if not self.can_complete(task_id):
+            return False
+        return self._complete(task_id, self.result_store.put(result), node_id)
+
+    def complete_task_ref(
+        self, task_id: int, ref: ResultRef, node_id: Optional[str] = None
+    ) -> bool:
+        """以已写入结果存储的正文完成任务（兼容调度器接口）"""
+        return self._complete(task_id, ref, node_id)
+
+    def _complete(self, task_id: int, ref: ResultRef, node_id: Optional[str]) -> bool:
         with self._lock:
             cached = self._cache.get(task_id)
             if not cached:
@@ -316,7 +393,9 @@ class PersistentTaskStorage:
 
             cached.status = "completed"
             cached.completed_at = time.time()
-            cached.result = result
+            cached.result_digest = ref.digest
+            cached.result_size = ref.size
+            self._completed.record(task_id, cached.completed_at)
 
             actual_node = node_id or cached.assigned_node
             if actual_node and actual_node in self._assigned_tasks:
@@ -326,8 +405,9 @@ class PersistentTaskStorage:
 
             internal_id = self._id_map.get(task_id)
             if internal_id:
+                # 数据库只记录结果引用，正文留在结果存储中
                 with contextlib.suppress(Exception):
-                    self._run_async(self._do_complete_task(internal_id, result))
+                    self._run_async(self._do_complete_task(internal_id, _encode_result_ref(ref)))
 
             return True
 
@@ -356,10 +436,16 @@ class PersistentTaskStorage:
             return None
 
         self._stats["cache_hits"] += 1
+        return self._cached_to_status_dict(cached)
+
+    def _cached_to_status_dict(self, cached: CachedTaskInfo) -> dict[str, Any]:
+        """将缓存任务转换为状态字典"""
         return {
             "task_id": cached.task_id,
             "status": cached.status,
-            "result": cached.result,
+            "result": self._load_result(cached),
+            "result_digest": cached.result_digest,
+            "result_size": cached.result_size,
             "created_at": cached.created_at,
             "assigned_at": cached.assigned_at,
             "assigned_node": cached.assigned_node,
@@ -368,14 +454,24 @@ class PersistentTaskStorage:
             "user_id": cached.user_id,
         }
 
+    def _load_result(self, cached: CachedTaskInfo) -> Optional[str]:
+        """从结果存储读取任务结果正文"""
+        if cached.result_digest:
+            return self.result_store.get_text(cached.result_digest)
+        return cached.result
+
     def _task_to_status_dict(self, task: Task, int_id: int) -> dict[str, Any]:
         """将 Task 实体转换为状态字典"""
+        result = task.result
+        ref = _decode_result_ref(result)
+        if ref is not None:
+            result = self.result_store.get_text(ref.digest)
         return {
             "task_id": int_id,
             "status": (
                 task.status.value if isinstance(task.status, TaskStatus) else str(task.status)
             ),
-            "result": task.result,
+            "result": result,
             "created_at": task.created_at.timestamp() if task.created_at else time.time(),
             "assigned_at": task.started_at.timestamp() if task.started_at else None,
             "assigned_node": task.assigned_node,
@@ -386,20 +482,31 @@ class PersistentTaskStorage:
 
     def get_all_results(self) -> list[dict[str, Any]]:
         """获取所有已完成任务的结果（兼容调度器接口）"""
+        return self.get_results_page()["results"]
+
+    def get_results_page(
+        self,
+        cursor: int = 0,
+        limit: Optional[int] = None,
+        since: Optional[float] = None,
+        fields: Optional[tuple[str, ...]] = None,
+    ) -> dict[str, Any]:
+        """
+        按完成顺序分页获取结果（兼容调度器接口）
+
+        Args:
+            cursor: 上一页返回的 next_cursor
+            limit: 每页数量，None 表示取到末尾
+            since: 水位线，仅返回完成时间晚于该值的结果
+            fields: 投影字段，None 表示全部字段
+
+        Returns:
+            {"results", "next_cursor", "has_more", "watermark"}
+        """
         with self._lock:
-            results = []
-            for cached in self._cache.values():
-                if cached.status == "completed":
-                    results.append(
-                        {
-                            "task_id": cached.task_id,
-                            "result": cached.result,
-                            "completed_at": cached.completed_at,
-                            "assigned_node": cached.assigned_node,
-                            "user_id": cached.user_id,
-                        }
-                    )
-            return results
+            return self._completed.page(
+                self._cache, cursor, limit, since, fields, self._load_result
+            )
 
     def get_system_stats(self) -> dict[str, Any]:
         """获取系统统计信息（兼容调度器接口）"""
@@ -472,10 +579,38 @@ class PersistentTaskStorage:
         Returns:
             任务状态字典列表，未找到的位置为 None
         """
-        results = []
-        for tid in task_ids:
-            status = self.get_task_status(tid)
-            results.append(status)
+        results: list[Optional[dict[str, Any]]] = [None] * len(task_ids)
+        misses: list[tuple[int, int, str]] = []
+        for pos, tid in enumerate(task_ids):
+            cached = self._cache.get(tid)
+            if cached:
+                self._stats["cache_hits"] += 1
+                results[pos] = self._cached_to_status_dict(cached)
+                continue
+            internal_id = self._id_map.get(tid)
+            if internal_id:
+                misses.append((pos, tid, internal_id))
+            else:
+                self._stats["cache_misses"] += 1
+
+        if misses:
+            # 未命中缓存的任务在同一次事件循环调用中并发读取
+            async def _load_many():
+                return await asyncio.gather(
+                    *(self._repo.get_by_id(internal_id) for _, _, internal_id in misses),
+                    return_exceptions=True,
+                )
+
+            try:
+                tasks = self._run_async(_load_many())
+            except Exception:
+                tasks = [None] * len(misses)
+
+            for (pos, tid, _), task in zip(misses, tasks):
+                if isinstance(task, Task):
+                    results[pos] = self._task_to_status_dict(task, tid)
+                else:
+                    self._stats["cache_misses"] += 1
         return results
 
     def delete_task(self, task_id: int) -> dict[str, Any]:
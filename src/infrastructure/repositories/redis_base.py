@@ -0,0 +1,154 @@
+"""
+Redis 仓储基类
+
+提供 Redis 仓储的公共能力，支持：
+- 惰性创建异步客户端
+- 基于有序集合（ZSET）的时间序索引
+- 单次往返的分页读取（ZREVRANGE + MGET 在 Lua 脚本内执行）
+- 游标分页与过期实体的索引清理
+"""
+
+from datetime import datetime
+from typing import Any, Optional
+
+# 按索引倒序取一页 ID 并批量读取实体，整页只需一次网络往返。
+# 有游标时从游标成员之后继续；游标成员已被删除时退化为按分数续读。
+PAGE_SCRIPT = """
+local index = KEYS[1]
+local prefix = ARGV[1]
+local limit = tonumber(ARGV[2])
+local offset = tonumber(ARGV[3])
+local cursor_id = ARGV[4]
+local cursor_score = ARGV[5]
+
+local entries
+if cursor_id ~= '' then
+    local rank = redis.call('ZREVRANK', index, cursor_id)
+    if rank then
+        entries = redis.call('ZREVRANGE', index, rank + 1, rank + limit, 'WITHSCORES')
+    else
+        entries = redis.call('ZREVRANGEBYSCORE', index, '(' .. cursor_score, '-inf',
+            'WITHSCORES', 'LIMIT', 0, limit)
+    end
+else
+    entries = redis.call('ZREVRANGE', index, offset, offset + limit - 1, 'WITHSCORES')
+end
+
+if #entries == 0 then
+    return {{}, {}}
+end
+
+local keys = {}
+for i = 1, #entries, 2 do
+    keys[#keys + 1] = prefix .. entries[i]
+end
+return {entries, redis.call('MGET', unpack(keys))}
+"""
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def timestamp_score(value: Optional[datetime]) -> float:
+    """将时间转换为有序集合分数，缺失时为0"""
+    return value.timestamp() if value else 0.0
+
+
+class RedisRepositoryBase:
+    """
+    Redis 仓储基类
+
+    实体以 JSON 字符串存放在 ``{key_prefix}{id}``，索引为
+    ``{key_prefix}idx:*`` 有序集合，分数为时间戳，成员为实体ID。
+    """
+
+    MAX_PAGE_SIZE = 1000
+
+    def __init__(self, redis_url: str, key_prefix: str, ttl: int):
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+        self._client = None
+        self._page_script: Optional[Any] = None
+
+    async def _get_client(self):
+        if self._client is None:
+            try:
+                import redis.asyncio as redis
+
+                self._client = redis.from_url(self.redis_url)
+            except ImportError as e:
+                raise ImportError(
+                    "Redis storage requires the redis package. "
+                    "Install it with: pip install redis"
+                ) from e
+        return self._client
+
+    def _index_key(self, name: str) -> str:
+        return f"{self.key_prefix}idx:{name}"
+
+    def _validate_pagination(self, limit: int, offset: int) -> tuple[int, int]:
+        if limit <= 0:
+            raise ValueError(f"limit must be > 0, got {limit}")
+        if offset < 0:
+            raise ValueError(f"offset must be >= 0, got {offset}")
+        return min(limit, self.MAX_PAGE_SIZE), offset
+
+    async def _fetch_page(
+        self,
+        index: str,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[str], Optional[str]]:
+        """
+        按索引倒序读取一页实体
+
+        Args:
+            index: 索引名（不含前缀）
+            limit: 每页数量
+            offset: 偏移量（仅在未提供游标时生效）
+            cursor: 上一页返回的游标
+
+        Returns:
+            (实体JSON列表, 下一页游标)，没有更多数据时游标为None
+        """
+        limit, offset = self._validate_pagination(limit, offset)
+        client = await self._get_client()
+        page_script = self._page_script
+        if page_script is None:
+            page_script = self._page_script = client.register_script(PAGE_SCRIPT)
+
+        cursor_score, _, cursor_id = (cursor or "").partition(":")
+        index_key = self._index_key(index)
+        entries, values = await page_script(
+            keys=[index_key],
+            args=[self.key_prefix, limit, offset, cursor_id, cursor_score],
+        )
+
+        items = []
+        stale = []
+        for i, value in enumerate(values):
+            if value is None:
+                stale.append(entries[2 * i])
+            else:
+                items.append(_decode(value))
+
+        if stale:
+            # 实体已因TTL过期，顺带清理索引
+            await client.zrem(index_key, *stale)
+
+        next_cursor = None
+        if len(values) == limit:
+            next_cursor = f"{_decode(entries[-1])}:{_decode(entries[-2])}"
+        return items, next_cursor
+
+    async def close(self) -> None:
+        if self._client:
+            await self._client.close()
+            self._client = None
+            self._page_script = None
+
+
+__all__ = ["RedisRepositoryBase", "timestamp_score"]
@@ -11,8 +11,10 @@ from typing import Optional
 from src.core.entities import Node, NodeStatus
 from src.core.interfaces.repositories import INodeRepository
 
+from .redis_base import RedisRepositoryBase, timestamp_score
 
-class RedisNodeRepository(INodeRepository):
+
+class RedisNodeRepository(RedisRepositoryBase, INodeRepository):
     """
     基于Redis的节点仓储实现
 
@@ -20,6 +22,7 @@ class RedisNodeRepository(INodeRepository):
     - 分布式访问
     - 高性能读写
     - TTL自动过期
+    - 按注册时间倒序分页，在线/空闲节点有独立索引
     """
 
     def __init__(
@@ -28,23 +31,7 @@ class RedisNodeRepository(INodeRepository):
         key_prefix: str = "idle_sense:node:",
         ttl: int = 86400,
     ):
-        self.redis_url = redis_url
-        self.key_prefix = key_prefix
-        self.ttl = ttl
-        self._client = None
-
-    async def _get_client(self):
-        if self._client is None:
-            try:
-                import redis.asyncio as redis
-
-                self._client = redis.from_url(self.redis_url)
-            except ImportError as e:
-                raise ImportError(
-                    "Redis storage requires the redis package. "
-                    "Install it with: pip install redis"
-                ) from e
-        return self._client
+        super().__init__(redis_url, key_prefix, ttl)
 
     def _node_to_dict(self, node: Node) -> str:
         return json.dumps(
@@ -87,64 +74,61 @@ class RedisNodeRepository(INodeRepository):
         data = await client.get(key)
         return self._dict_to_node(data.decode()) if data else None
 
+    def _write_commands(self, pipe, node: Node) -> None:
+        """向管道写入节点本身及其全部索引"""
+        node_id = node.node_id
+        score = timestamp_score(node.registered_at)
+        pipe.setex(f"{self.key_prefix}{node_id}", self.ttl, self._node_to_dict(node))
+        pipe.zadd(self._index_key("all"), {node_id: score})
+        for status in NodeStatus:
+            if status != node.status:
+                pipe.zrem(self._index_key(f"status:{status.value}"), node_id)
+        pipe.zadd(self._index_key(f"status:{node.status.value}"), {node_id: score})
+        for name, member in (("online", node.is_online), ("idle", node.is_idle)):
+            if member:
+                pipe.zadd(self._index_key(name), {node_id: score})
+            else:
+                pipe.zrem(self._index_key(name), node_id)
+
     async def save(self, node: Node) -> Node:
         client = await self._get_client()
-        key = f"{self.key_prefix}{node.node_id}"
-        await client.setex(key, self.ttl, self._node_to_dict(node))
-        await client.sadd(f"{self.key_prefix}all", node.node_id)
-        await client.sadd(f"{self.key_prefix}status:{node.status.value}", node.node_id)
+        async with client.pipeline(transaction=True) as pipe:
+            self._write_commands(pipe, node)
+            await pipe.execute()
         return node
 
     async def update(self, node: Node) -> Node:
-        client = await self._get_client()
-        old_node = await self.get_by_id(node.node_id)
-        if old_node and old_node.status != node.status:
-            await client.srem(f"{self.key_prefix}status:{old_node.status.value}", node.node_id)
         return await self.save(node)
 
     async def delete(self, node_id: str) -> bool:
         client = await self._get_client()
-        node = await self.get_by_id(node_id)
-        if node:
-            await client.delete(f"{self.key_prefix}{node_id}")
-            await client.srem(f"{self.key_prefix}all", node_id)
-            await client.srem(f"{self.key_prefix}status:{node.status.value}", node_id)
-            return True
-        return False
-
-    async def list_all(self) -> list[Node]:
-        client = await self._get_client()
-        node_ids = await client.smembers(f"{self.key_prefix}all")
-        nodes = []
-        for node_id in node_ids:
-            node = await self.get_by_id(node_id.decode())
-            if node:
-                nodes.append(node)
-        return nodes
-
-    async def list_by_status(self, status: NodeStatus) -> list[Node]:
-        client = await self._get_client()
-        node_ids = await client.smembers(f"{self.key_prefix}status:{status.value}")
-        nodes = []
-        for node_id in node_ids:
-            node = await self.get_by_id(node_id.decode())
-            if node:
-                nodes.append(node)
-        return nodes
-
-    async def list_online(self) -> list[Node]:
-        nodes = []
-        for status in [NodeStatus.ONLINE, NodeStatus.IDLE, NodeStatus.BUSY]:
-            nodes.extend(await self.list_by_status(status))
-        return nodes
-
-    async def list_idle(self) -> list[Node]:
-        return await self.list_by_status(NodeStatus.IDLE)
-
-    async def close(self) -> None:
-        if self._client:
-            await self._client.close()
-            self._client = None
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.delete(f"{self.key_prefix}{node_id}")
+            pipe.zrem(self._index_key("all"), node_id)
+            for status in NodeStatus:
+                pipe.zrem(self._index_key(f"status:{status.value}"), node_id)
+            pipe.zrem(self._index_key("online"), node_id)
+            pipe.zrem(self._index_key("idle"), node_id)
+            results = await pipe.execute()
+        return bool(results[0])
+
+    async def _list(self, index: str, limit: int, offset: int) -> list[Node]:
+        items, _ = await self._fetch_page(index, limit, offset=offset)
+        return [self._dict_to_node(item) for item in items]
+
+    async def list_all(self, limit: int = 100, offset: int = 0) -> list[Node]:
+        return await self._list("all", limit, offset)
+
+    async def list_by_status(
+        self, status: NodeStatus, limit: int = 100, offset: int = 0
+    ) -> list[Node]:
+        return await self._list(f"status:{status.value}", limit, offset)
+
+    async def list_online(self, limit: int = 100, offset: int = 0) -> list[Node]:
+        return await self._list("online", limit, offset)
+
+    async def list_idle(self, limit: int = 100, offset: int = 0) -> list[Node]:
+        return await self._list("idle", limit, offset)
 
 
 __all__ = ["RedisNodeRepository"]
@@ -11,8 +11,10 @@ from typing import Optional
 from src.core.entities import Task, TaskStatus, TaskType
 from src.core.interfaces.repositories import ITaskRepository
 
+from .redis_base import RedisRepositoryBase, timestamp_score
 
-class RedisTaskRepository(ITaskRepository):
+
+class RedisTaskRepository(RedisRepositoryBase, ITaskRepository):
     """
     基于Redis的任务仓储实现
 
@@ -20,6 +22,7 @@ class RedisTaskRepository(ITaskRepository):
     - 分布式访问
     - 高性能读写
     - TTL自动过期
+    - 按创建时间倒序的游标分页
     """
 
     def __init__(
@@ -28,23 +31,7 @@ class RedisTaskRepository(ITaskRepository):
         key_prefix: str = "idle_sense:task:",
         ttl: int = 86400,
     ):
-        self.redis_url = redis_url
-        self.key_prefix = key_prefix
-        self.ttl = ttl
-        self._client = None
-
-    async def _get_client(self):
-        if self._client is None:
-            try:
-                import redis.asyncio as redis
-
-                self._client = redis.from_url(self.redis_url)
-            except ImportError as e:
-                raise ImportError(
-                    "Redis storage requires the redis package. "
-                    "Install it with: pip install redis"
-                ) from e
-        return self._client
+        super().__init__(redis_url, key_prefix, ttl)
 
     def _task_to_dict(self, task: Task) -> str:
         return json.dumps(
@@ -99,72 +86,84 @@ class RedisTaskRepository(ITaskRepository):
         data = await client.get(key)
         return self._dict_to_task(data.decode()) if data else None
 
+    def _write_commands(self, pipe, task: Task) -> None:
+        """向管道写入任务本身及其全部索引"""
+        score = timestamp_score(task.created_at)
+        pipe.setex(f"{self.key_prefix}{task.task_id}", self.ttl, self._task_to_dict(task))
+        pipe.zadd(self._index_key("all"), {task.task_id: score})
+        for status in TaskStatus:
+            if status != task.status:
+                pipe.zrem(self._index_key(f"status:{status.value}"), task.task_id)
+        pipe.zadd(self._index_key(f"status:{task.status.value}"), {task.task_id: score})
+        if task.user_id:
+            pipe.zadd(self._index_key(f"user:{task.user_id}"), {task.task_id: score})
+
     async def save(self, task: Task) -> Task:
         client = await self._get_client()
-        key = f"{self.key_prefix}{task.task_id}"
-        await client.setex(key, self.ttl, self._task_to_dict(task))
-        await client.sadd(f"{self.key_prefix}all", task.task_id)
-        await client.sadd(f"{self.key_prefix}status:{task.status.value}", task.task_id)
-        if task.user_id:
-            await client.sadd(f"{self.key_prefix}user:{task.user_id}", task.task_id)
+        async with client.pipeline(transaction=True) as pipe:
+            self._write_commands(pipe, task)
+            await pipe.execute()
         return task
 
     async def update(self, task: Task) -> Task:
         client = await self._get_client()
         old_task = await self.get_by_id(task.task_id)
-        if old_task:
-            if old_task.status != task.status:
-                await client.srem(f"{self.key_prefix}status:{old_task.status.value}", task.task_id)
-            if old_task.user_id and old_task.user_id != task.user_id:
-                await client.srem(f"{self.key_prefix}user:{old_task.user_id}", task.task_id)
-        return await self.save(task)
+        async with client.pipeline(transaction=True) as pipe:
+            if old_task and old_task.user_id and old_task.user_id != task.user_id:
+                pipe.zrem(self._index_key(f"user:{old_task.user_id}"), task.task_id)
+            self._write_commands(pipe, task)
+            await pipe.execute()
+        return task
 
     async def delete(self, task_id: str) -> bool:
         client = await self._get_client()
         task = await self.get_by_id(task_id)
         if task:
-            await client.delete(f"{self.key_prefix}{task_id}")
-            await client.srem(f"{self.key_prefix}all", task_id)
-            await client.srem(f"{self.key_prefix}status:{task.status.value}", task_id)
-            if task.user_id:
-                await client.srem(f"{self.key_prefix}user:{task.user_id}", task_id)
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.delete(f"{self.key_prefix}{task_id}")
+                pipe.zrem(self._index_key("all"), task_id)
+                pipe.zrem(self._index_key(f"status:{task.status.value}"), task_id)
+                if task.user_id:
+                    pipe.zrem(self._index_key(f"user:{task.user_id}"), task_id)
+                await pipe.execute()
             return True
         return False
 
+    async def _page(
+        self, index: str, limit: int, cursor: Optional[str]
+    ) -> tuple[list[Task], Optional[str]]:
+        items, next_cursor = await self._fetch_page(index, limit, cursor=cursor)
+        return [self._dict_to_task(item) for item in items], next_cursor
+
+    async def page_by_user(
+        self, user_id: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> tuple[list[Task], Optional[str]]:
+        """按创建时间倒序分页获取用户任务，返回 (任务列表, 下一页游标)"""
+        return await self._page(f"user:{user_id}", limit, cursor)
+
+    async def page_by_status(
+        self, status: TaskStatus, limit: int = 100, cursor: Optional[str] = None
+    ) -> tuple[list[Task], Optional[str]]:
+        """按创建时间倒序分页获取指定状态的任务，返回 (任务列表, 下一页游标)"""
+        return await self._page(f"status:{status.value}", limit, cursor)
+
+    async def page_all(
+        self, limit: int = 100, cursor: Optional[str] = None
+    ) -> tuple[list[Task], Optional[str]]:
+        """按创建时间倒序分页获取全部任务，返回 (任务列表, 下一页游标)"""
+        return await self._page("all", limit, cursor)
+
     async def list_by_user(self, user_id: str, limit: int = 100) -> list[Task]:
-        client = await self._get_client()
-        task_ids = await client.smembers(f"{self.key_prefix}user:{user_id}")
-        tasks = []
-        for task_id in task_ids[:limit]:
-            task = await self.get_by_id(task_id.decode())
-            if task:
-                tasks.append(task)
-        return sorted(tasks, key=lambda t: t.created_at, reverse=True)[:limit]
+        tasks, _ = await self.page_by_user(user_id, limit)
+        return tasks
 
     async def list_by_status(self, status: TaskStatus, limit: int = 100) -> list[Task]:
-        client = await self._get_client()
-        task_ids = await client.smembers(f"{self.key_prefix}status:{status.value}")
-        tasks = []
-        for task_id in task_ids[:limit]:
-            task = await self.get_by_id(task_id.decode())
-            if task:
-                tasks.append(task)
-        return sorted(tasks, key=lambda t: t.created_at, reverse=True)[:limit]
+        tasks, _ = await self.page_by_status(status, limit)
+        return tasks
 
     async def list_all(self, limit: int = 100) -> list[Task]:
-        client = await self._get_client()
-        task_ids = await client.smembers(f"{self.key_prefix}all")
-        tasks = []
-        for task_id in task_ids[:limit]:
-            task = await self.get_by_id(task_id.decode())
-            if task:
-                tasks.append(task)
-        return sorted(tasks, key=lambda t: t.created_at, reverse=True)[:limit]
-
-    async def close(self) -> None:
-        if self._client:
-            await self._client.close()
-            self._client = None
+        tasks, _ = await self.page_all(limit)
+        return tasks
 
 
 __all__ = ["RedisTaskRepository"]
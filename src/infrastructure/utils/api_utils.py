@@ -24,6 +24,9 @@ from typing import Any, Callable, Optional, TypeVar
 
 import requests
 
+from serializer import DeserializationError
+from serializer.http import decode_response
+
 T = TypeVar("T")
 
 
@@ -75,8 +78,8 @@ def safe_api_call(
         if hasattr(response, "status_code"):
             if response.status_code == 200:
                 try:
-                    return True, response.json()
-                except ValueError:
+                    return True, decode_response(response)
+                except (ValueError, DeserializationError):
                     return True, {"text": response.text}
             else:
                 error_msg = f"HTTP {response.status_code}"
@@ -129,8 +132,8 @@ def safe_api_call_v2(func: Callable[..., requests.Response], *args, **kwargs) ->
         if hasattr(response, "status_code"):
             if response.status_code == 200:
                 try:
-                    return APIResult.ok(response.json(), response.status_code)
-                except ValueError:
+                    return APIResult.ok(decode_response(response), response.status_code)
+                except (ValueError, DeserializationError):
                     return APIResult.ok({"text": response.text}, response.status_code)
             else:
                 error_msg = f"HTTP {response.status_code}"
@@ -1,9 +1,10 @@
 """
 Streamlit 工具模块
 
-提供会话管理等工具
+提供会话管理、任务结果增量缓存等工具
 """
 
+from .results_cache import clear_results_cache, get_cached_results
 from .session_backend import (
     MemorySessionBackend,
     RedisSessionBackend,
@@ -19,4 +20,6 @@ __all__ = [
     "MemorySessionBackend",
     "RedisSessionBackend",
     "SessionBackendFactory",
+    "get_cached_results",
+    "clear_results_cache",
 ]
@@ -0,0 +1,51 @@
+"""
+任务结果增量缓存
+
+在会话状态中缓存已拉取的任务结果，每次渲染只向调度器请求水位线之后的新结果。
+已完成任务的结果不会再变化，因此按任务ID合并即可。
+
+使用示例：
+    from src.presentation.streamlit.utils.results_cache import get_cached_results
+
+    success, results = get_cached_results(client)
+    if success:
+        results_list = results["results"]
+"""
+
+from typing import Any
+
+import streamlit as st
+
+RESULTS_CACHE_KEY = "task_results_cache"
+
+
+def get_cached_results(client) -> tuple[bool, dict[str, Any]]:
+    """
+    增量获取全部任务结果
+
+    Args:
+        client: 调度器客户端，需提供 fetch_results_since
+
+    Returns:
+        (是否成功, {"results": 按完成顺序的结果列表})；
+        请求失败但已有缓存时返回缓存内容
+    """
+    cache = st.session_state.setdefault(RESULTS_CACHE_KEY, {"watermark": None, "results": {}})
+
+    success, data = client.fetch_results_since(since=cache["watermark"])
+    if success:
+        for result in data.get("results", []):
+            cache["results"][result.get("task_id")] = result
+        cache["watermark"] = data.get("watermark", cache["watermark"])
+    elif not cache["results"]:
+        return False, data
+
+    return True, {"results": list(cache["results"].values())}
+
+
+def clear_results_cache() -> None:
+    """清空结果缓存，下次渲染时全量拉取"""
+    st.session_state.pop(RESULTS_CACHE_KEY, None)
+
+
+__all__ = ["get_cached_results", "clear_results_cache"]
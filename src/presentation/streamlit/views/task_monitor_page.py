@@ -13,6 +13,7 @@ import pandas as pd
 import streamlit as st
 
 from src.presentation.streamlit.utils.di_utils import container
+from src.presentation.streamlit.utils.results_cache import get_cached_results
 
 
 def render(user_id: Optional[str] = None):
@@ -27,7 +28,7 @@ def render(user_id: Optional[str] = None):
     )
 
     client = container.scheduler_client()
-    success, results = client.get_all_results()
+    success, results = get_cached_results(client)
 
     if success and results.get("results"):
         results_list = results["results"]
@@ -2,7 +2,10 @@
 Pytest configuration and shared fixtures for idle-accelerator tests.
 """
 
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -10,6 +13,10 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Databases and result blobs created at import time (e.g. the scheduler's
+# module-level storage) go to a temp data dir instead of the repo's data/
+_data_dir = None
+
 
 @pytest.fixture
 def mock_psutil():
@@ -110,6 +117,18 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "windows: marks Windows-only tests")
     config.addinivalue_line("markers", "macos: marks macOS-only tests")
 
+    global _data_dir
+    if "IDLE_SENSE_DATA_DIR" not in os.environ:
+        _data_dir = tempfile.mkdtemp(prefix="idle-sense-test-data-")
+        os.environ["IDLE_SENSE_DATA_DIR"] = _data_dir
+
+
+def pytest_unconfigure(config):
+    """Remove the temp data dir."""
+    if _data_dir is not None:
+        os.environ.pop("IDLE_SENSE_DATA_DIR", None)
+        shutil.rmtree(_data_dir, ignore_errors=True)
+
 
 def pytest_collection_modifyitems(config, items):
     """Skip tests based on markers and platform."""
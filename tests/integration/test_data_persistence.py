@@ -96,6 +96,15 @@ class TestSchedulerRestartRecovery:
         recovered_2 = storage2.get_task_status(created_ids[2])
         assert recovered_2["status"] == "completed"
 
+        page = storage2.get_results_page(limit=1, fields=("task_id", "completed_at"))
+        assert len(page["results"]) == 1
+        assert set(page["results"][0]) == {"task_id", "completed_at"}
+        assert page["has_more"] is True
+        rest = storage2.get_results_page(cursor=page["next_cursor"])
+        assert len(rest["results"]) == 1
+        assert rest["has_more"] is False
+        assert storage2.get_results_page(since=rest["watermark"])["results"] == []
+
         stats = storage2.get_system_stats()
         assert stats["tasks"]["total"] >= 3
         assert stats["persistence"]["initialized"] is True
@@ -315,6 +324,39 @@ class TestConcurrentWrites:
         asyncio.run(_run_token_concurrency())
 
 
+class TestResultReferences:
+    """结果正文只存放在结果存储中"""
+
+    def test_row_keeps_result_reference(self, tmp_path: Path):
+        """
+        完成任务后 SQLite 行只记录结果引用 -> 缓存未命中与重启后
+        都能从结果存储读回正文
+        """
+        db_file = str(tmp_path / "result_refs.db")
+        body = "x" * 4096
+
+        storage = PersistentTaskStorage(db_path=db_file)
+        storage.init_sync()
+        tid = storage.add_task(code="print('x')")
+        storage.complete_task(tid, result=body)
+
+        row = storage._run_async(storage._repo.get_by_id(storage._id_map[tid]))
+        assert row.result.startswith("result-store:")
+        assert body not in row.result
+
+        cached = storage._cache.pop(tid)
+        assert storage.get_task_status(tid)["result"] == body
+        storage._cache[tid] = cached
+        asyncio.run(storage.close())
+
+        storage2 = PersistentTaskStorage(db_path=db_file)
+        storage2.init_sync()
+        recovered = storage2.get_task_status(tid)
+        assert recovered["result"] == body
+        assert recovered["result_size"] == len(body)
+        asyncio.run(storage2.close())
+
+
 class TestCorruptedDbRecovery:
     """数据库损坏恢复测试"""
 
@@ -0,0 +1,132 @@
+"""Tests for adaptive chunk sizing."""
+
+import json
+import time
+
+import pytest
+
+import legacy.distributed_task as distributed_task
+from legacy.distributed_task import DistributedTaskManager
+from legacy.resource_estimator import ChunkSizer
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.text = ""
+
+    def json(self):
+        return self._payload
+
+
+class FakeScheduler:
+    """Runs chunks instantly; each item costs per_item seconds of reported runtime."""
+
+    def __init__(self, per_item=0.1, overhead=0.0, queued_polls=0):
+        self.per_item = per_item
+        self.overhead = overhead
+        self.queued_polls = queued_polls
+        self.tasks = {}
+        self.deleted = []
+
+    def post(self, url, timeout=None, **kwargs):
+        task_id = str(len(self.tasks) + 1)
+        self.tasks[task_id] = {"items": len(json.loads(kwargs["json"]["code"])), "polls": 0}
+        return FakeResponse(200, {"task_id": task_id})
+
+    def get(self, url, timeout=None):
+        task = self.tasks[url.rsplit("/", 1)[1]]
+        task["polls"] += 1
+        if task["polls"] <= self.queued_polls:
+            return FakeResponse(200, {"status": "pending"})
+        return FakeResponse(
+            200,
+            {
+                "status": "completed",
+                "result": str(task["items"]),
+                "assigned_node": "node-1",
+                "assigned_at": 100.0,
+                "completed_at": 100.0 + self.overhead + self.per_item * task["items"],
+            },
+        )
+
+    def delete(self, url, timeout=None):
+        self.deleted.append(url.rsplit("/", 1)[1])
+        return FakeResponse(200)
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    fake = FakeScheduler()
+    monkeypatch.setattr(distributed_task, "requests", fake)
+    return fake
+
+
+def _run(manager, data, **kwargs):
+    task_id = manager.submit_distributed_task("square", "", "__DATA__", data, **kwargs)
+    assert manager.create_task_chunks(task_id)
+    assert manager.execute_distributed_task(task_id)
+    return manager.tasks[task_id]
+
+
+class TestChunkSizer:
+    def test_no_history_returns_default(self):
+        assert ChunkSizer().items_per_chunk("t", default=7) == 7
+
+    def test_sizes_to_target_after_overhead(self):
+        sizer = ChunkSizer(target_seconds=10.0)
+        sizer.record("t", 10, 3.0)
+        sizer.record("t", 30, 7.0)
+
+        # 0.2 s per item plus 1 s overhead
+        assert sizer.items_per_chunk("t") == 45
+
+    def test_prefers_node_history_and_clamps(self):
+        sizer = ChunkSizer(target_seconds=10.0, max_items=50)
+        sizer.record("t", 10, 1.0, node_id="fast")
+        sizer.record("t", 10, 10.0, node_id="slow")
+
+        assert sizer.items_per_chunk("t", node_id="slow") == 10
+        assert sizer.items_per_chunk("t", node_id="fast") == 50
+        assert sizer.items_per_chunk("t", node_id="unknown") == 18
+
+
+class TestAdaptiveDistributedTask:
+    def test_probe_then_sized_chunks(self, scheduler):
+        manager = DistributedTaskManager(poll_interval=0)
+        task = _run(
+            manager,
+            list(range(105)),
+            chunk_size=5,
+            adaptive=True,
+            target_chunk_seconds=2.0,
+        )
+
+        assert [len(c.data) for c in task.chunks] == [5, 20, 20, 20, 20, 20]
+        assert task.chunks[1].data[0] == 5
+        assert task.status == "completed"
+
+    def test_queued_chunk_split_when_work_runs_out(self, scheduler):
+        scheduler.queued_polls = 1
+        manager = DistributedTaskManager(poll_interval=0)
+        task = _run(
+            manager,
+            {str(i): i for i in range(10)},
+            chunk_size=10,
+            max_parallel_chunks=2,
+            adaptive=True,
+        )
+
+        assert scheduler.deleted == ["1"]
+        assert [len(c.data) for c in task.chunks] == [5, 5]
+        assert task.chunks[0].data == {str(i): i for i in range(5)}
+        assert task.status == "completed"
+
+    def test_fixed_chunking_unchanged(self, scheduler):
+        manager = DistributedTaskManager(poll_interval=0)
+        start = time.monotonic()
+        task = _run(manager, list(range(25)), chunk_size=10)
+
+        assert [len(c.data) for c in task.chunks] == [10, 10, 5]
+        assert time.monotonic() - start < 1.0
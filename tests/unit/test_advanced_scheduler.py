@@ -16,8 +16,11 @@ import unittest
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+from legacy.distributed_task_v2.data_locality import DataLocalityManager
 from legacy.scheduler_v2.advanced_scheduler import (
     AffinitySpec,
+    DataLocalityPredicate,
+    DataLocalityPriority,
     LeastLoadedPriority,
     MostLoadedPriority,
     NodeAffinityPredicate,
@@ -630,5 +633,69 @@ class TestIntegration(unittest.TestCase):
         self.assertEqual(results[0][1], "node1")
 
 
+class TestDataLocality(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.locality = DataLocalityManager()
+        self.locality.register_node("local", rack_id="rack-a")
+        self.locality.register_node("same_rack", rack_id="rack-a")
+        self.locality.register_node("remote", rack_id="rack-b")
+        self.locality.register_data("block-1", "local", size_bytes=1000)
+
+        self.predicate = DataLocalityPredicate(
+            self.locality, node_local_wait=1.0, rack_local_wait=1.0, clock=lambda: self.now
+        )
+        self.scheduler = Scheduler(
+            policy=SchedulingPolicy.LEAST_LOADED,
+            predicates=Scheduler.DEFAULT_PREDICATES + [self.predicate],
+            priorities=Scheduler.DEFAULT_PRIORITIES + [(DataLocalityPriority(self.locality), 2.0)],
+        )
+        for node_id in ("local", "same_rack", "remote"):
+            self.scheduler.add_node(
+                NodeSpec(node_id=node_id, capacity=ResourceSpec(cpu=4.0, memory=8192.0))
+            )
+
+    def _task(self, task_id):
+        return TaskSpec(task_id=task_id, resources=ResourceSpec(cpu=4.0), data_ids=["block-1"])
+
+    def test_prefers_node_local(self):
+        self.scheduler.submit_task(self._task("t1"))
+
+        results = asyncio.run(self.scheduler.schedule())
+
+        self.assertEqual(results, [("t1", "local")])
+        stats = self.locality.get_stats()
+        self.assertEqual(stats["locality_hit_rate"], 1.0)
+        self.assertEqual(stats["data_read_local"], 1000)
+        self.assertEqual(stats["data_transferred"], 0)
+
+    def test_delay_relaxes_to_rack_then_any(self):
+        self.scheduler.submit_task(self._task("t1"))
+        self.scheduler.submit_task(self._task("t2"))
+        self.scheduler.submit_task(self._task("t3"))
+
+        first = dict(asyncio.run(self.scheduler.schedule()))
+        self.assertEqual(list(first.values()).count(None), 2)
+
+        self.now = 1.5
+        second = [r for r in asyncio.run(self.scheduler.schedule()) if r[1]]
+        self.assertEqual([node for _, node in second], ["same_rack"])
+
+        self.now = 2.5
+        third = [r for r in asyncio.run(self.scheduler.schedule()) if r[1]]
+        self.assertEqual([node for _, node in third], ["remote"])
+
+        stats = self.locality.get_stats()
+        self.assertEqual(stats["tasks_local"], 1)
+        self.assertEqual(stats["tasks_rack_local"], 1)
+        self.assertEqual(stats["tasks_remote"], 1)
+        self.assertEqual(stats["data_transferred"], 2000)
+
+    def test_task_without_known_data_not_delayed(self):
+        task = TaskSpec(task_id="t1", resources=ResourceSpec(cpu=1.0), data_ids=["unknown"])
+
+        self.assertTrue(self.predicate.check(self.scheduler.get_node("remote"), task))
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
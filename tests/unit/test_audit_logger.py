@@ -0,0 +1,206 @@
+"""
+审计日志记录器测试
+"""
+
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.infrastructure.audit import AuditAction, AuditLog, AuditLogger
+from src.infrastructure.audit import audit_logger as audit_module
+from src.infrastructure.audit.audit_logger import LEGACY_TABLE, PARTITION_PREFIX
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "audit.db")
+
+
+@pytest.fixture
+def audit_logger(db_path):
+    logger = AuditLogger(db_path=db_path, batch_size=50, flush_interval=0.01)
+    yield logger
+    logger.close()
+
+
+def _tables(db_path):
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+    return {name for (name,) in rows}
+
+
+class TestAuditLogger:
+    """AuditLogger 测试"""
+
+    def test_wal_mode_enabled(self, audit_logger, db_path):
+        """测试启用 WAL 模式"""
+        with sqlite3.connect(db_path) as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_query_sees_buffered_entries(self, audit_logger):
+        """测试查询前会写入已入队的记录"""
+        for i in range(120):
+            audit_logger.log(AuditAction.TASK_SUBMIT, user_id=f"user_{i % 3}", resource_id=str(i))
+
+        logs = audit_logger.query(user_id="user_0", limit=1000)
+
+        assert len(logs) == 40
+        assert all(log.action == AuditAction.TASK_SUBMIT for log in logs)
+        assert logs == sorted(logs, key=lambda log: log.timestamp, reverse=True)
+
+    def test_close_flushes_pending_entries(self, db_path):
+        """测试关闭时写完剩余记录，关闭后仍可同步写入"""
+        logger = AuditLogger(db_path=db_path, flush_interval=10)
+        logger.log(AuditAction.USER_LOGIN, user_id="alice")
+        logger.close()
+        logger.log(AuditAction.USER_LOGOUT, user_id="alice")
+
+        reopened = AuditLogger(db_path=db_path)
+        try:
+            actions = {log.action for log in reopened.query(user_id="alice")}
+        finally:
+            reopened.close()
+        assert actions == {AuditAction.USER_LOGIN, AuditAction.USER_LOGOUT}
+
+    def test_flush_racing_close_returns(self, db_path):
+        """测试 flush 与 close 并发时不会挂起"""
+        for _ in range(20):
+            logger = AuditLogger(db_path=db_path, flush_interval=0.01)
+            logger.log(AuditAction.USER_LOGIN, user_id="frank")
+            flushers = [threading.Thread(target=logger.flush) for _ in range(4)]
+            for thread in flushers:
+                thread.start()
+            logger.close()
+            for thread in flushers:
+                thread.join(timeout=5)
+                assert not thread.is_alive()
+
+    def test_unencodable_details_fail_in_caller(self, db_path):
+        """测试 details 无法 JSON 编码时在调用方报错，写线程不受影响"""
+        logger = AuditLogger(db_path=db_path, flush_interval=0.01)
+
+        with pytest.raises(TypeError):
+            logger.log(AuditAction.USER_LOGIN, user_id="heidi", details={"at": datetime.now()})
+        logger.log(AuditAction.USER_LOGOUT, user_id="heidi")
+
+        flusher = threading.Thread(target=logger.flush)
+        flusher.start()
+        flusher.join(timeout=5)
+        assert not flusher.is_alive()
+        assert [log.action for log in logger.query(user_id="heidi")] == [AuditAction.USER_LOGOUT]
+        logger.close()
+
+    def test_writer_survives_unexpected_errors(self, db_path):
+        """测试批次处理抛出非数据库异常时写线程继续运行，批次转入溢出文件后补写"""
+        logger = AuditLogger(db_path=db_path, flush_interval=0.01)
+
+        def broken_write(conn, rows):
+            raise RuntimeError("boom")
+
+        logger._write_with_retry = broken_write
+        logger.log(AuditAction.USER_LOGIN, user_id="ivan")
+        logger.flush()
+        del logger._write_with_retry
+
+        assert logger._writer.is_alive()
+
+        logger.log(AuditAction.USER_LOGOUT, user_id="ivan")
+        actions = {log.action for log in logger.query(user_id="ivan")}
+        assert actions == {AuditAction.USER_LOGIN, AuditAction.USER_LOGOUT}
+        logger.close()
+
+    def test_failed_batch_spilled_and_replayed(self, db_path, monkeypatch):
+        """测试写入失败的批次不会丢失，之后补写进数据库"""
+        monkeypatch.setattr(audit_module, "RETRY_BACKOFF", 0)
+        logger = AuditLogger(db_path=db_path, flush_interval=0.01)
+        write_batch = logger._write_batch
+
+        def failing_write(conn, entries):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        logger._write_batch = failing_write
+        logger.log(AuditAction.TOKEN_TRANSFER, user_id="grace")
+        logger.flush()
+        assert logger.spill_path.exists()
+
+        logger._write_batch = write_batch
+        logger.log(AuditAction.TOKEN_REWARD, user_id="grace")
+        actions = {log.action for log in logger.query(user_id="grace")}
+        logger.close()
+
+        assert actions == {AuditAction.TOKEN_TRANSFER, AuditAction.TOKEN_REWARD}
+        assert not logger.spill_path.exists()
+
+    def test_entries_partitioned_by_day(self, audit_logger, db_path):
+        """测试按天分区写入与按时间范围查询"""
+        yesterday = datetime.now() - timedelta(days=1)
+        audit_logger._write_now([AuditLog(yesterday, AuditAction.NODE_STOP, "bob", "node", "n1")])
+        audit_logger.log(AuditAction.NODE_ACTIVATE, user_id="bob")
+
+        audit_logger.flush()
+        assert f"{PARTITION_PREFIX}{yesterday:%Y%m%d}" in _tables(db_path)
+
+        today_only = audit_logger.query(
+            user_id="bob", start_time=datetime.combine(date.today(), datetime.min.time())
+        )
+        assert [log.action for log in today_only] == [AuditAction.NODE_ACTIVATE]
+        assert len(audit_logger.query(user_id="bob")) == 2
+        assert len(audit_logger.query(user_id="bob", limit=1)) == 1
+
+    def test_purge_expired_partitions(self, db_path):
+        """测试删除超过保留天数的分区"""
+        old = datetime.now() - timedelta(days=30)
+        archive = AuditLogger(db_path=db_path)
+        archive._write_now([AuditLog(old, AuditAction.USER_LOGIN, "carol", "user", "carol")])
+        archive.close()
+
+        logger = AuditLogger(db_path=db_path, retention_days=7)
+        try:
+            assert logger.purge_expired() == [f"{PARTITION_PREFIX}{old:%Y%m%d}"]
+            assert logger.query(user_id="carol") == []
+        finally:
+            logger.close()
+
+    def test_writer_applies_retention(self, db_path):
+        """测试写线程每天自动清理一次过期分区"""
+        old = datetime.now() - timedelta(days=30)
+        archive = AuditLogger(db_path=db_path)
+        archive._write_now([AuditLog(old, AuditAction.USER_LOGIN, "erin", "user", "erin")])
+        archive.close()
+
+        logger = AuditLogger(db_path=db_path, retention_days=7)
+        try:
+            logger.log(AuditAction.USER_LOGIN, user_id="erin")
+            assert len(logger.query(user_id="erin")) == 1
+            assert f"{PARTITION_PREFIX}{old:%Y%m%d}" not in _tables(db_path)
+        finally:
+            logger.close()
+
+    def test_reads_legacy_table(self, db_path):
+        """测试仍可查询旧版未分区表中的记录"""
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(f"""
+                CREATE TABLE {LEGACY_TABLE} (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL, action TEXT NOT NULL, user_id TEXT NOT NULL,
+                    resource_type TEXT NOT NULL, resource_id TEXT NOT NULL,
+                    details TEXT, ip_address TEXT, user_agent TEXT
+                )
+            """)
+            conn.execute(
+                f"INSERT INTO {LEGACY_TABLE} (timestamp, action, user_id, resource_type, "
+                "resource_id, details) VALUES (?, ?, ?, ?, ?, ?)",
+                ("2024-01-01T00:00:00", "user:register", "dave", "user", "dave", "{}"),
+            )
+
+        logger = AuditLogger(db_path=db_path)
+        try:
+            logger.log(AuditAction.USER_LOGIN, user_id="dave")
+            logs = logger.query(user_id="dave")
+        finally:
+            logger.close()
+
+        assert [log.action for log in logs] == [AuditAction.USER_LOGIN, AuditAction.USER_REGISTER]
@@ -2,15 +2,18 @@
 Tests for Bandwidth Limiting.
 """
 
+import asyncio
 import time
 
 from legacy.p2p_network.bandwidth import (
     BandwidthConfig,
     BandwidthManager,
+    BandwidthUnavailableError,
     ConnectionStats,
     TokenBucket,
     TrafficPriority,
 )
+from legacy.p2p_network.websocket_pool import WebSocketConnectionPool
 
 
 class TestTokenBucket:
@@ -46,7 +49,7 @@ class TestTokenBucket:
         """Test token refill."""
         bucket = TokenBucket(capacity=100, refill_rate=100.0)
         bucket.tokens = 0
-        bucket.last_refill = time.time() - 1.0
+        bucket.last_refill = time.monotonic() - 1.0
 
         bucket.refill()
 
@@ -56,7 +59,7 @@ class TestTokenBucket:
         """Test refill doesn't exceed capacity."""
         bucket = TokenBucket(capacity=100, refill_rate=1000.0)
         bucket.tokens = 90
-        bucket.last_refill = time.time() - 10.0
+        bucket.last_refill = time.monotonic() - 10.0
 
         bucket.refill()
 
@@ -196,6 +199,134 @@ class TestBandwidthManager:
         assert "conn-001" not in manager._connections
 
 
+class TestBandwidthAcquire:
+    """Test async pacing via BandwidthManager.acquire."""
+
+    def _manager(self, rate: float = 10000.0, capacity: int = 1000) -> BandwidthManager:
+        return BandwidthManager(
+            BandwidthConfig(token_refill_rate=rate, max_bucket_size=capacity, burst_size=capacity)
+        )
+
+    def test_fast_path(self):
+        """Test acquire returns immediately when tokens are available."""
+        manager = self._manager()
+        manager.upload_bucket.tokens = 1000
+
+        asyncio.run(manager.acquire(400))
+
+        assert manager.upload_bucket.tokens < 700
+        assert manager._stats["acquire_waits"] == 0
+
+    def test_waits_for_refill(self):
+        """Test acquire sleeps until enough tokens have refilled."""
+        manager = self._manager(rate=10000.0)
+
+        async def run():
+            start = time.monotonic()
+            await manager.acquire(500)
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+
+        assert elapsed >= 0.04
+        assert manager._stats["acquire_waits"] == 1
+
+    def test_oversized_message_is_paced(self):
+        """Test messages larger than the bucket are admitted once it is full."""
+        manager = self._manager(rate=100000.0, capacity=1000)
+        manager.upload_bucket.tokens = 1000
+
+        asyncio.run(manager.acquire(5000))
+
+        assert manager.upload_bucket.tokens < 0
+
+    def test_weighted_fair_order(self):
+        """Test higher priority flows get a larger share of queued bandwidth."""
+        manager = self._manager(rate=20000.0)
+        order = []
+
+        async def send(conn_id: str, priority: TrafficPriority):
+            await manager.acquire(100, priority, connection_id=conn_id)
+            order.append(conn_id)
+
+        async def run():
+            # Start empty so every send queues, however long setup took
+            manager.upload_bucket.tokens = 0.0
+            manager.upload_bucket.last_refill = time.monotonic()
+            await asyncio.gather(
+                *(send("low", TrafficPriority.LOW) for _ in range(4)),
+                *(send("high", TrafficPriority.HIGH) for _ in range(4)),
+            )
+
+        asyncio.run(run())
+
+        assert order[:4].count("high") >= 3
+        assert sorted(order) == ["high"] * 4 + ["low"] * 4
+
+    def test_cancelled_waiter_skipped(self):
+        """Test a cancelled acquire does not consume tokens."""
+        manager = self._manager(rate=10000.0)
+
+        async def run():
+            task = asyncio.create_task(manager.acquire(900))
+            await asyncio.sleep(0)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await manager.acquire(50)
+
+        asyncio.run(run())
+
+        assert manager.get_stats()["waiting"]["NORMAL"] == 0
+
+    def test_zero_refill_rate_fails_waiters(self):
+        """Test queued acquires fail instead of hanging when no tokens will come."""
+        manager = self._manager(rate=0.0)
+
+        async def run():
+            return await asyncio.gather(
+                manager.acquire(100), manager.acquire(200), return_exceptions=True
+            )
+
+        results = asyncio.run(asyncio.wait_for(run(), timeout=1.0))
+
+        assert all(isinstance(r, BandwidthUnavailableError) for r in results)
+        assert manager.get_stats()["waiting"]["NORMAL"] == 0
+
+    def test_pool_send_is_paced(self):
+        """Test WebSocketConnectionPool.send_message acquires bandwidth."""
+        manager = self._manager(rate=10000.0)
+        pool = WebSocketConnectionPool(bandwidth_manager=manager)
+
+        async def run():
+            conn = await pool.get_connection("peer", ("127.0.0.1", 9000))
+            start = time.monotonic()
+            sent = await pool.send_message(conn.connection_id, b"x" * 300)
+            return sent, time.monotonic() - start
+
+        sent, elapsed = asyncio.run(run())
+
+        assert sent is True
+        assert elapsed >= 0.02
+        assert manager._stats["total_bytes_sent"] == 300
+
+    def test_pool_registers_connections(self):
+        """Test pooled connections get a per-connection bucket until closed."""
+        manager = self._manager(rate=10000.0)
+        pool = WebSocketConnectionPool(bandwidth_manager=manager)
+
+        async def run():
+            conn = await pool.get_connection("peer", ("127.0.0.1", 9000))
+            assert conn.connection_id in manager._connection_buckets
+            await pool.send_message(conn.connection_id, b"x" * 100)
+            assert manager.get_connection_stats(conn.connection_id).bytes_sent == 100
+            await pool.close_connection(conn.connection_id)
+            return conn.connection_id
+
+        conn_id = asyncio.run(run())
+
+        assert conn_id not in manager._connection_buckets
+
+
 class TestTrafficPriority:
     """Test TrafficPriority enum."""
 
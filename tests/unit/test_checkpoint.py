@@ -0,0 +1,94 @@
+"""Tests for binary, incremental checkpoint storage."""
+
+import json
+
+import pytest
+
+from legacy.checkpoint import CheckpointData, CheckpointManager, CheckpointStorage
+
+
+def _save(storage, checkpoint_id, state, **kwargs):
+    return storage.save(
+        CheckpointData(checkpoint_id=checkpoint_id, task_id="task", stage="s", state=state),
+        **kwargs,
+    )
+
+
+class TestCheckpointStorage:
+    def test_roundtrip(self, tmp_path):
+        manager = CheckpointManager(CheckpointStorage(tmp_path))
+        manager.create_checkpoint(
+            "task", "load", state=[1, "two", b"\x03"], variables={"step": 4}, checkpoint_id="c1"
+        )
+
+        restored = manager.restore("task")
+
+        assert restored.state == [1, "two", b"\x03"]
+        assert restored.variables == {"step": 4}
+        assert restored.stage == "load"
+
+    def test_delta_stores_only_changed_entries(self, tmp_path):
+        storage = CheckpointStorage(tmp_path)
+        big = list(range(10_000))
+        full = _save(storage, "c1", {"big": big, "step": 1, "gone": True})
+        delta = _save(storage, "c2", {"step": 2, "big": big, "new": "x"})
+
+        assert full.metadata["kind"] == "full"
+        assert delta.metadata == {"format": "binary", "kind": "delta", "base": "c1"}
+        assert delta.size_bytes < full.size_bytes // 10
+
+        state = storage.load("task", "c2").state
+        assert list(state) == ["step", "big", "new"]
+        assert state["big"] == big
+        assert state["step"] == 2
+
+    def test_large_change_writes_new_base(self, tmp_path):
+        storage = CheckpointStorage(tmp_path)
+        _save(storage, "c1", {"data": list(range(1000)), "step": 1})
+        rebased = _save(storage, "c2", {"data": list(range(1000, 2000)), "step": 2})
+        delta = _save(storage, "c3", {"data": list(range(1000, 2000)), "step": 3})
+
+        assert rebased.metadata["kind"] == "full"
+        assert delta.metadata["base"] == "c2"
+
+    def test_cleanup_keeps_bases_of_kept_deltas(self, tmp_path):
+        storage = CheckpointStorage(tmp_path)
+        big = list(range(1000))
+        for i in range(5):
+            _save(storage, f"c{i}", {"big": big, "step": i}, keep_count=2)
+
+        kept = {c.checkpoint_id for c in storage.list_checkpoints("task")}
+
+        assert kept == {"c0", "c3", "c4"}
+        assert storage.load("task", "c4").state == {"big": big, "step": 4}
+
+    def test_async_writes_snapshot_state(self, tmp_path):
+        storage = CheckpointStorage(tmp_path, async_writes=True)
+        data = bytearray(b"a" * 1000)
+        _save(storage, "c1", {"data": data})
+        data[:] = b"b" * 1000
+
+        assert storage.load("task", "c1").state["data"] == b"a" * 1000
+        storage.close()
+        assert not [p for p in (tmp_path / "task").iterdir() if p.name.startswith(".")]
+
+    def test_loads_json_checkpoints(self, tmp_path):
+        storage = CheckpointStorage(tmp_path)
+        legacy = {"checkpoint_id": "old", "task_id": "task", "stage": "s", "state": {"i": 1}}
+        (tmp_path / "task").mkdir()
+        (tmp_path / "task" / "old.ckpt").write_text(json.dumps(legacy))
+
+        assert storage.load("task", "old").state == {"i": 1}
+
+    def test_numpy_state_is_memory_mapped(self, tmp_path):
+        np = pytest.importorskip("numpy")
+        storage = CheckpointStorage(tmp_path, mmap_threshold=0)
+        weights = np.arange(100_000, dtype=np.float64)
+        _save(storage, "c1", {"weights": weights, "step": 1})
+
+        restored = storage.load("task", "c1").state["weights"]
+
+        assert np.array_equal(restored, weights)
+        assert restored.ctypes.data % 64 == 0
+        restored[0] = -1.0
+        assert storage.load("task", "c1").state["weights"][0] == 0.0
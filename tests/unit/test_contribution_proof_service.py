@@ -9,6 +9,7 @@
 
 import os
 import sys
+import tempfile
 import time
 import unittest
 
@@ -17,6 +18,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from src.core.services.contribution_proof_service import (
     ContributionProof,
     ContributionProofService,
+    ContributionProofStore,
     ResourceMetrics,
 )
 
@@ -619,5 +621,149 @@ class TestSecretKeyManagement(unittest.TestCase):
         self.assertTrue(service2.verify_proof(proof))
 
 
+class TestNodeProofIndex(unittest.TestCase):
+    """测试节点证明索引与聚合统计"""
+
+    def test_out_of_order_timestamps(self):
+        service = ContributionProofService(secret_key="k")
+        template = service.generate_proof(
+            node_address="node2", task_id="t0", resource_metrics=ResourceMetrics()
+        ).to_dict()
+        for ts in (3.0, 1.0, 2.0, 1.5):
+            service._index_proof(
+                ContributionProof.from_dict(
+                    {**template, "proof_id": f"p{ts}", "node_address": "node1", "timestamp": ts}
+                )
+            )
+
+        timestamps = [p.timestamp for p in service.get_node_proofs("node1", limit=3)]
+        self.assertEqual(timestamps, [3.0, 2.0, 1.5])
+
+    def test_stats_track_verification_once(self):
+        service = ContributionProofService(secret_key="k")
+        proof = service.generate_proof(
+            node_address="node1", task_id="t1", resource_metrics=ResourceMetrics(cpu_seconds=10)
+        )
+
+        service.add_verification(proof.proof_id, "v1")
+        service.add_verification(proof.proof_id, "v2")
+
+        stats = service.get_stats()
+        self.assertEqual(stats["verified_proofs"], 1)
+        self.assertEqual(stats["unverified_proofs"], 0)
+        self.assertAlmostEqual(stats["total_contribution"], proof.contribution_score)
+
+
+class TestContributionProofStore(unittest.TestCase):
+    """测试贡献证明持久化"""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmpdir.name, "proofs.db")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_reload_restores_proofs_and_verifications(self):
+        service = ContributionProofService(
+            secret_key="k", store=ContributionProofStore(self.db_path, batch_size=2)
+        )
+        proofs = [
+            service.generate_proof(
+                node_address="node1",
+                task_id=f"t{i}",
+                resource_metrics=ResourceMetrics(cpu_seconds=i + 1),
+            )
+            for i in range(3)
+        ]
+        service.add_verification(proofs[0].proof_id, "verifier")
+        service.close()
+
+        reloaded = ContributionProofService(
+            secret_key="k", store=ContributionProofStore(self.db_path)
+        )
+        try:
+            self.assertEqual(reloaded.get_stats(), service.get_stats())
+            restored = reloaded.get_proof(proofs[0].proof_id)
+            self.assertTrue(restored.verified)
+            self.assertEqual(restored.verifier_address, "verifier")
+            self.assertTrue(reloaded.verify_proof_by_id(proofs[2].proof_id))
+            self.assertEqual(
+                [p.proof_id for p in reloaded.get_node_proofs("node1")],
+                [p.proof_id for p in service.get_node_proofs("node1")],
+            )
+        finally:
+            reloaded.close()
+
+    def test_writes_are_batched(self):
+        store = ContributionProofStore(self.db_path, batch_size=10)
+        service = ContributionProofService(secret_key="k", store=store)
+        service.generate_proof(
+            node_address="node1", task_id="t1", resource_metrics=ResourceMetrics()
+        )
+
+        count = store._conn.execute("SELECT COUNT(*) FROM contribution_proofs").fetchone()[0]
+        self.assertEqual(count, 0)
+
+        service.flush()
+        count = store._conn.execute("SELECT COUNT(*) FROM contribution_proofs").fetchone()[0]
+        self.assertEqual(count, 1)
+        service.close()
+
+    def test_store_requires_stable_key(self):
+        store = ContributionProofStore(self.db_path)
+        env = ContributionProofService.SECRET_KEY_ENV
+        saved = os.environ.pop(env, None)
+        try:
+            with self.assertRaises(ValueError):
+                ContributionProofService(store=store)
+
+            os.environ[env] = "from-env"
+            service = ContributionProofService(store=store)
+            proof = service.generate_proof(
+                node_address="node1", task_id="t1", resource_metrics=ResourceMetrics()
+            )
+            service.close()
+
+            reloaded = ContributionProofService(store=ContributionProofStore(self.db_path))
+            self.assertTrue(reloaded.verify_proof_by_id(proof.proof_id))
+            reloaded.close()
+        finally:
+            os.environ.pop(env, None)
+            if saved is not None:
+                os.environ[env] = saved
+
+
+class TestBatchVerification(unittest.TestCase):
+    """测试批量验证"""
+
+    def _make_proofs(self, service, count):
+        return [
+            service.generate_proof(
+                node_address=f"node{i % 3}", task_id=f"t{i}", resource_metrics=ResourceMetrics()
+            )
+            for i in range(count)
+        ]
+
+    def test_inline_results_keep_order(self):
+        service = ContributionProofService(secret_key="k")
+        proofs = self._make_proofs(service, 5)
+        proofs[1].contribution_score += 1
+        proofs[3].signature = None
+
+        self.assertEqual(service.verify_proofs(proofs), [True, False, True, False, True])
+
+    def test_process_pool_matches_inline(self):
+        service = ContributionProofService(secret_key="k")
+        service.PARALLEL_VERIFY_THRESHOLD = 10
+        service.VERIFY_CHUNK_SIZE = 4
+        proofs = self._make_proofs(service, 12)
+        proofs[5].signature = "0" * 64
+
+        results = service.verify_proofs(proofs, max_workers=2)
+
+        self.assertEqual(results, [i != 5 for i in range(12)])
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
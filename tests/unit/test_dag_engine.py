@@ -2,6 +2,8 @@
 Tests for DAG Execution Engine.
 """
 
+import asyncio
+
 import pytest
 
 from legacy.distributed_task_v2.dag_engine import (
@@ -14,6 +16,8 @@ from legacy.distributed_task_v2.dag_engine import (
     TaskChunk,
     TaskStatus,
 )
+from legacy.distributed_task_v2.fault_tolerance import SpeculationConfig
+from legacy.resource_estimator import ChunkSizer
 
 
 class TestTaskChunk:
@@ -185,6 +189,40 @@ class TestDAGBuilder:
         assert task.stages[1].dependencies == ["map"]
         assert task.stages[1].dependency_type == DependencyType.WIDE
 
+    def test_chunk_sizes_from_measured_runtimes(self):
+        """Test stages with runtime history are cut to the target chunk runtime."""
+        sizer = ChunkSizer(target_seconds=1.0)
+        sizer.record("map", 10, 0.2)
+
+        task = (
+            DAGBuilder("task-003", "Sized", chunk_sizer=sizer)
+            .add_map_stage("map", "code", data=list(range(120)), partition_count=2)
+            .add_map_stage("other", "code", data=list(range(120)), partition_count=2)
+            .build()
+        )
+
+        assert [len(c.data) for c in task.stages[0].chunks] == [50, 50, 20]
+        assert [len(c.data) for c in task.stages[1].chunks] == [60, 60]
+
+    def test_narrow_children_follow_sized_parent(self):
+        """Test learned sizes keep chunk counts equal along narrow links."""
+        sizer = ChunkSizer(target_seconds=1.0)
+        sizer.record("map", 10, 0.2)
+        sizer.record("filter", 10, 1.0)
+
+        task = (
+            DAGBuilder("task-004", "Sized chain", chunk_sizer=sizer)
+            .add_map_stage("map", "code", data=list(range(120)), partition_count=2)
+            .add_stage(
+                "filter", "F", "code", data=list(range(10)), dependencies=["map"], partition_count=2
+            )
+            .build()
+        )
+        graph, _, _ = DAGExecutionEngine()._build_chunk_graph(task)
+
+        assert [len(c.data) for c in task.stages[1].chunks] == [4, 3, 3]
+        assert graph.get_dependencies("filter-chunk-2") == {"map-chunk-2"}
+
 
 class TestDAGExecutionEngine:
     """Test DAGExecutionEngine class."""
@@ -294,3 +332,225 @@ class TestDAGExecutionEngine:
 
         assert success is True
         assert task.status == TaskStatus.COMPLETED
+
+
+class TestPipelinedExecution:
+    """Test pipelined, critical-path ordered chunk execution."""
+
+    @staticmethod
+    def _engine(log, **kwargs):
+        async def submit(code, data):
+            name, units = data[0]
+            log.append(("start", name))
+            await asyncio.sleep(units * 0.01)
+            log.append(("end", name))
+            return name
+
+        async def check_status(task_id):
+            return "completed", task_id
+
+        return DAGExecutionEngine(submit_func=submit, check_status_func=check_status, **kwargs)
+
+    def test_narrow_dependency_links_partitions(self):
+        """Test narrow stages depend partition-wise, wide stages on everything."""
+        task = (
+            DAGBuilder("task-001", "Test")
+            .add_stage("a", "A", "code", data=[1, 2], partition_count=2)
+            .add_stage("b", "B", "code", data=[3, 4], dependencies=["a"], partition_count=2)
+            .add_stage(
+                "c",
+                "C",
+                "code",
+                data=[5, 6],
+                dependencies=["b"],
+                dependency_type=DependencyType.WIDE,
+                partition_count=2,
+            )
+            .build()
+        )
+
+        graph, _, _ = DAGExecutionEngine()._build_chunk_graph(task)
+
+        assert graph.get_dependencies("b-chunk-1") == {"a-chunk-1"}
+        assert graph.get_dependencies("c-chunk-0") == {"b-chunk-0", "b-chunk-1"}
+
+    @pytest.mark.asyncio
+    async def test_downstream_chunk_starts_before_stage_finishes(self):
+        """Test a partition moves on without waiting for a straggler."""
+        log = []
+        engine = self._engine(log)
+        task = (
+            DAGBuilder("task-001", "Test")
+            .add_stage("a", "A", "code", data=[("a0", 1), ("a1", 20)], partition_count=2)
+            .add_stage(
+                "b", "B", "code", data=[("b0", 1), ("b1", 1)], dependencies=["a"], partition_count=2
+            )
+            .build()
+        )
+        engine.submit_task(task)
+
+        assert await engine.execute_task("task-001") is True
+        assert log.index(("start", "b0")) < log.index(("end", "a1"))
+
+    @pytest.mark.asyncio
+    async def test_chunk_runtimes_recorded(self):
+        """Test completed list chunks feed the shared chunk sizer."""
+        sizer = ChunkSizer()
+        engine = self._engine([], chunk_sizer=sizer)
+        task = (
+            DAGBuilder("task-001", "Test")
+            .add_stage("a", "A", "code", data=[("a0", 1), ("a1", 2)], partition_count=2)
+            .build()
+        )
+        engine.submit_task(task)
+
+        assert await engine.execute_task("task-001") is True
+        assert sizer.estimator.get_statistics("a")["success_count"] == 2
+        assert sizer.items_per_chunk("a") is not None
+
+    @pytest.mark.asyncio
+    async def test_ready_chunks_ordered_by_critical_path(self):
+        """Test the chunk heading the longest chain is dispatched first."""
+        log = []
+        engine = self._engine(log, max_concurrent_chunks=1, chunk_cost_func=lambda c: c.data[0][1])
+        task = (
+            DAGBuilder("task-001", "Test")
+            .add_stage("short", "Short", "code", data=[("short", 1)], partition_count=1)
+            .add_stage("long", "Long", "code", data=[("long", 1)], partition_count=1)
+            .add_stage(
+                "tail", "Tail", "code", data=[("tail", 5)], dependencies=["long"], partition_count=1
+            )
+            .build()
+        )
+        engine.submit_task(task)
+
+        assert await engine.execute_task("task-001") is True
+        assert [name for event, name in log if event == "start"][0] == "long"
+
+    @pytest.mark.asyncio
+    async def test_unknown_stage_dependency_fails(self):
+        """Test an unknown stage dependency fails instead of hanging."""
+        engine = DAGExecutionEngine()
+        task = DAGTask(
+            task_id="task-001",
+            name="Test",
+            stages=[Stage("s1", "Stage 1", "code", dependencies=["missing"])],
+        )
+        engine.submit_task(task)
+
+        assert await engine.execute_task("task-001") is False
+        assert "missing" in task.error
+
+    def test_makespan_benchmark(self):
+        """Test pipelining shortens makespan on the synthetic DAG."""
+        from legacy.benchmark import DAGMakespanBenchmark
+
+        makespans = {}
+        for mode in DAGMakespanBenchmark.MODES:
+            result = DAGMakespanBenchmark(mode=mode, iterations=1).run()
+            assert result.success, result.error
+            makespans[mode] = result.metadata["makespan_units"]
+
+        assert makespans["pipelined"] < makespans["barrier"]
+
+
+class TestSpeculativeExecution:
+    """Test straggler backups in the execution engine."""
+
+    @staticmethod
+    def _engine(durations, budget_fraction=0.25):
+        """Chunks whose first attempt lands on a slow node; backups run fast."""
+        submitted = []
+        cancelled = []
+        finish_at = {}
+
+        async def submit(code, data, exclude_nodes=None):
+            name = data[0]
+            task_id = f"{name}-{len(submitted)}"
+            node = "fast" if exclude_nodes else "slow"
+            submitted.append((task_id, node, exclude_nodes))
+            delay = 0.02 if exclude_nodes else durations[name]
+            finish_at[task_id] = (asyncio.get_running_loop().time() + delay, node)
+            return task_id
+
+        async def check_status(task_id):
+            deadline, node = finish_at[task_id]
+            if asyncio.get_running_loop().time() >= deadline:
+                return "completed", task_id, node
+            return "running", None, node
+
+        async def cancel(task_id):
+            cancelled.append(task_id)
+
+        engine = DAGExecutionEngine(
+            submit_func=submit,
+            check_status_func=check_status,
+            cancel_func=cancel,
+            speculation=SpeculationConfig(
+                quantile=0.5, multiplier=2.0, budget_fraction=budget_fraction, check_interval=0.01
+            ),
+        )
+        engine.STATUS_POLL_INTERVAL = 0.005
+        task = (
+            DAGBuilder("task-001", "Test")
+            .add_stage("s", "S", "code", data=list(durations), partition_count=len(durations))
+            .build()
+        )
+        engine.submit_task(task)
+        return engine, task, submitted, cancelled
+
+    @pytest.mark.asyncio
+    async def test_backup_wins_and_primary_cancelled(self):
+        """Test a straggler gets a backup on another node and the loser is deleted."""
+        durations = {"a": 0.02, "b": 0.02, "c": 0.02, "d": 5.0}
+        engine, task, submitted, cancelled = self._engine(durations)
+
+        assert await engine.execute_task("task-001") is True
+
+        backups = [s for s in submitted if s[2]]
+        assert backups == [(backups[0][0], "fast", ["slow"])]
+        assert task.stages[0].chunks[3].result == backups[0][0]
+        assert cancelled == ["d-3"]
+
+        stats = engine.get_stats()
+        assert stats["speculative_launched"] == 1
+        assert stats["speculative_wins"] == 1
+        assert stats["speculative_cancelled"] == 1
+        assert stats["speculative_saved_seconds"] >= 0
+        assert stats["speculative_wasted_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_state_released_after_task(self):
+        """Test per-stage samples and budgets are dropped once the task ends."""
+        durations = {"a": 0.02, "b": 0.02, "c": 0.02, "d": 5.0}
+        engine, _, _, _ = self._engine(durations)
+
+        assert await engine.execute_task("task-001") is True
+
+        detector = engine.straggler_detector
+        assert dict(detector.task_durations) == {}
+        assert detector.task_start_times == {}
+        assert dict(engine._speculation_used) == {}
+
+    @pytest.mark.asyncio
+    async def test_stage_budget_limits_backups(self):
+        """Test no more backups than the stage budget allows."""
+        durations = {"a": 0.02, "b": 0.02, "c": 0.02, "d": 0.5, "e": 0.5, "f": 0.02}
+        engine, _, submitted, _ = self._engine(durations, budget_fraction=0.1)
+
+        assert await engine.execute_task("task-001") is True
+
+        assert engine.get_stats()["speculative_launched"] == 1
+        assert sum(1 for s in submitted if s[2]) == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        """Test speculation can be switched off."""
+        durations = {"a": 0.02, "b": 0.02, "c": 0.02, "d": 0.2}
+        engine, _, submitted, _ = self._engine(durations)
+        engine.speculation = SpeculationConfig(enabled=False)
+
+        assert await engine.execute_task("task-001") is True
+
+        assert all(s[2] is None for s in submitted)
+        assert engine.get_stats()["speculative_launched"] == 0
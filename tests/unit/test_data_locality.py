@@ -145,6 +145,56 @@ class TestDataLocalityManager:
 
         assert best == "node-001"
 
+    def test_reverse_indexes_follow_registration(self):
+        """Test node and rack indexes stay in sync."""
+        manager = DataLocalityManager()
+        manager.register_data("data-001", "node-001")
+        manager.register_node("node-001", rack_id="rack-1")
+        manager.register_node("node-002", rack_id="rack-1")
+
+        assert manager.get_node_data("node-001") == {"data-001"}
+        assert manager.get_rack_data("rack-1") == {"data-001"}
+        assert "data-001" in manager.nodes["node-001"].available_data
+
+        manager.register_data("data-001", "node-001", size_bytes=10)
+        assert manager.get_data_nodes("data-001") == ["node-001"]
+        assert manager.get_data_size("data-001") == 10
+
+        manager.unregister_node("node-001")
+        assert manager.get_rack_data("rack-1") == set()
+        assert "data-001" not in manager.data_locations
+
+    def test_rack_local_score(self):
+        """Test rack-local and remote levels, including unregistered holders."""
+        manager = DataLocalityManager()
+        manager.register_node("node-001", rack_id="rack-1")
+        manager.register_node("node-002", rack_id="rack-1")
+        manager.register_data("data-001", "node-002")
+        manager.register_data("data-002", "node-009")
+
+        assert manager.calculate_locality_score("node-001", ["data-001"]).level == (
+            LocalityLevel.RACK_LOCAL
+        )
+        assert manager.calculate_locality_score("node-001", ["data-002"]).level == (
+            LocalityLevel.ANY
+        )
+
+    def test_record_placement_counts_bytes(self):
+        """Test bytes moved and hit rates are reported."""
+        manager = DataLocalityManager()
+        manager.register_node("node-001", rack_id="rack-1")
+        manager.register_node("node-002", rack_id="rack-1")
+        manager.register_data("data-001", "node-001", size_bytes=100)
+
+        manager.record_placement("node-001", ["data-001"])
+        manager.record_placement("node-002", ["data-001"])
+
+        stats = manager.get_stats()
+        assert stats["data_read_local"] == 100
+        assert stats["data_transferred"] == 100
+        assert stats["locality_hit_rate"] == 0.5
+        assert stats["rack_locality_hit_rate"] == 1.0
+
     def test_get_stats(self):
         """Test getting statistics."""
         manager = DataLocalityManager()
@@ -0,0 +1,409 @@
+"""
+Tests for DHT replication and hash rings.
+"""
+
+import asyncio
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from legacy.p2p_network.bandwidth import BandwidthConfig, BandwidthManager
+from legacy.p2p_network.dht_replication import (
+    ConsistentHashRing,
+    DHTReplicationManager,
+    JumpHashRing,
+    MerkleTree,
+    RendezvousHashRing,
+    hash64,
+    jump_consistent_hash,
+)
+
+
+class FakeNetwork:
+    """Routes replication messages between in-process managers."""
+
+    def __init__(self):
+        self.managers: dict[str, DHTReplicationManager] = {}
+        self.messages: list[tuple[str, dict]] = []
+
+    def add(self, node_id: str, **kwargs) -> DHTReplicationManager:
+        manager = DHTReplicationManager(
+            node_id, send_func=self.send, find_nodes_func=self.find_nodes, **kwargs
+        )
+        self.managers[node_id] = manager
+        return manager
+
+    async def send(self, node_id: str, message: dict):
+        self.messages.append((node_id, message))
+        return await self.managers[node_id].handle_message(message)
+
+    async def find_nodes(self, key: str, count: int = 3):
+        return [SimpleNamespace(node_id=node_id) for node_id in list(self.managers)[:count]]
+
+    def frames(self, message_type: str) -> list[tuple[str, dict]]:
+        return [m for m in self.messages if m[1]["type"] == message_type]
+
+
+def _linear_lookup(ring: ConsistentHashRing, key: str) -> str:
+    hash_key = ring._hash(key)
+    for ring_key in sorted(ring.ring):
+        if hash_key <= ring_key:
+            return ring.ring[ring_key]
+    return ring.ring[min(ring.ring)]
+
+
+class TestHash64:
+    """Test the 64-bit key hash."""
+
+    def test_stable_and_bounded(self):
+        assert hash64("abc") == hash64("abc")
+        assert hash64("abc") != hash64("abd")
+        assert 0 <= hash64("abc") < 2**64
+
+
+class TestJumpConsistentHash:
+    """Test the jump consistent hash function."""
+
+    def test_range(self):
+        for key in range(1000):
+            assert 0 <= jump_consistent_hash(key, 7) < 7
+
+    def test_single_bucket(self):
+        assert jump_consistent_hash(12345, 1) == 0
+
+    def test_invalid_buckets(self):
+        with pytest.raises(ValueError):
+            jump_consistent_hash(1, 0)
+
+    def test_minimal_movement_on_growth(self):
+        keys = [hash64(f"k{i}") for i in range(5000)]
+        moved = sum(1 for k in keys if jump_consistent_hash(k, 10) != jump_consistent_hash(k, 11))
+
+        assert moved < 5000 * 0.15
+        for k in keys:
+            before, after = jump_consistent_hash(k, 10), jump_consistent_hash(k, 11)
+            assert after == before or after == 10
+
+
+class TestReplicationHandlers:
+    """Test two nodes exchanging replication messages through ``handle_message``."""
+
+    def test_two_nodes_replicate_and_sync(self):
+        network = FakeNetwork()
+        alice = network.add("alice", replication_factor=2)
+        bob = network.add("bob", replication_factor=2)
+
+        async def run():
+            await alice.store("job", {"state": "queued"})
+            await alice._process_pending_replications()
+            await alice._process_pending_replications()
+            replicated = await bob.get("job")
+
+            await bob.delete("job")
+            await alice._anti_entropy("bob")
+            await alice._process_pending_replications()
+            restored = await bob.get("job")
+
+            unknown = await bob.handle_message({"type": "store_replica"})
+            return replicated, restored, unknown
+
+        replicated, restored, unknown = asyncio.run(run())
+
+        assert replicated == {"state": "queued"}
+        assert restored == {"state": "queued"}
+        assert unknown is None
+        assert [n for n, _ in network.frames("merkle_sync")] == ["bob"]
+        assert bob.local_storage["job"].original_publisher == "alice"
+
+
+class TestConsistentHashRing:
+    """Test ConsistentHashRing class."""
+
+    def test_empty_ring(self):
+        ring = ConsistentHashRing()
+
+        assert ring.get_node("key") is None
+        assert ring.get_nodes("key") == []
+
+    def test_sorted_keys_maintained(self):
+        ring = ConsistentHashRing(virtual_nodes=20)
+        for i in range(10):
+            ring.add_node(f"node{i}")
+
+        assert ring.sorted_keys == sorted(ring.ring)
+        assert len(ring.sorted_keys) == len(ring.ring)
+
+        ring.remove_node("node3")
+
+        assert ring.sorted_keys == sorted(ring.ring)
+        assert "node3" not in ring.ring.values()
+
+    def test_add_node_twice_is_noop(self):
+        ring = ConsistentHashRing(virtual_nodes=10)
+        ring.add_node("a")
+        ring.add_node("a")
+
+        assert len(ring.sorted_keys) == 10
+
+    def test_lookup_matches_linear_scan(self):
+        ring = ConsistentHashRing(virtual_nodes=30)
+        for i in range(8):
+            ring.add_node(f"node{i}")
+
+        for i in range(500):
+            key = f"key{i}"
+            assert ring.get_node(key) == _linear_lookup(ring, key)
+
+    def test_get_nodes_distinct(self):
+        ring = ConsistentHashRing(virtual_nodes=30)
+        for i in range(5):
+            ring.add_node(f"node{i}")
+
+        nodes = ring.get_nodes("some-key", count=3)
+
+        assert len(nodes) == 3
+        assert len(set(nodes)) == 3
+        assert nodes[0] == ring.get_node("some-key")
+
+    def test_get_nodes_more_than_available(self):
+        ring = ConsistentHashRing(virtual_nodes=10)
+        ring.add_node("a")
+        ring.add_node("b")
+
+        assert sorted(ring.get_nodes("k", count=5)) == ["a", "b"]
+
+    def test_remove_only_moves_removed_keys(self):
+        ring = ConsistentHashRing(virtual_nodes=50)
+        for i in range(6):
+            ring.add_node(f"node{i}")
+        before = {f"k{i}": ring.get_node(f"k{i}") for i in range(1000)}
+
+        ring.remove_node("node2")
+
+        for key, owner in before.items():
+            if owner != "node2":
+                assert ring.get_node(key) == owner
+
+
+class TestJumpHashRing:
+    """Test JumpHashRing class."""
+
+    def test_balance(self):
+        ring = JumpHashRing([f"node{i}" for i in range(10)])
+        counts = Counter(ring.get_node(f"k{i}") for i in range(10000))
+
+        assert len(counts) == 10
+        assert max(counts.values()) < 1000 * 1.2
+
+    def test_get_nodes(self):
+        ring = JumpHashRing(["a", "b", "c", "d"])
+        nodes = ring.get_nodes("key", count=3)
+
+        assert len(set(nodes)) == 3
+        assert nodes[0] == ring.get_node("key")
+
+    def test_remove_node(self):
+        ring = JumpHashRing(["a", "b", "c", "d"])
+        ring.remove_node("b")
+
+        assert ring.nodes == ["a", "d", "c"]
+        assert ring.get_node("key") in {"a", "c", "d"}
+
+    def test_empty(self):
+        ring = JumpHashRing()
+
+        assert ring.get_node("key") is None
+        assert ring.get_nodes("key") == []
+
+
+class TestRendezvousHashRing:
+    """Test RendezvousHashRing class."""
+
+    def test_get_nodes_ordered_by_score(self):
+        ring = RendezvousHashRing(["a", "b", "c", "d"])
+        nodes = ring.get_nodes("key", count=2)
+
+        assert len(nodes) == 2
+        assert nodes[0] == ring.get_node("key")
+
+    def test_remove_only_moves_removed_keys(self):
+        ring = RendezvousHashRing([f"node{i}" for i in range(6)])
+        before = {f"k{i}": ring.get_node(f"k{i}") for i in range(1000)}
+
+        ring.remove_node("node4")
+
+        for key, owner in before.items():
+            if owner != "node4":
+                assert ring.get_node(key) == owner
+
+    def test_empty(self):
+        ring = RendezvousHashRing()
+
+        assert ring.get_node("key") is None
+        assert ring.get_nodes("key") == []
+
+
+class TestMerkleTree:
+    """Test MerkleTree class."""
+
+    def test_identical_entries_same_root(self):
+        entries = [(f"k{i}", 1, "c") for i in range(50)]
+        a = MerkleTree.from_entries(entries)
+        b = MerkleTree.from_entries(list(reversed(entries)))
+
+        assert a.root == b.root
+        assert a.diff(b.leaves) == []
+
+    def test_diff_finds_changed_bucket(self):
+        entries = [(f"k{i}", 1, "c") for i in range(50)]
+        a = MerkleTree.from_entries(entries)
+        b = MerkleTree.from_entries(entries[:-1] + [("k49", 2, "c")])
+
+        assert a.root != b.root
+        assert a.diff(b.leaves) == [MerkleTree.bucket_of("k49")]
+
+    def test_diff_mismatched_size(self):
+        tree = MerkleTree.from_entries([], bucket_count=4)
+
+        assert tree.diff(["x"]) == [0, 1, 2, 3]
+
+
+class TestDHTReplicationManager:
+    """Test batched, delta-based replication."""
+
+    def _setup(self, **kwargs):
+        network = FakeNetwork()
+        origin = network.add("origin", **kwargs)
+        network.add("peer1")
+        network.add("peer2")
+        return network, origin
+
+    def test_replicas_batched_per_node(self):
+        network, origin = self._setup()
+
+        async def run():
+            for i in range(10):
+                await origin.store(f"k{i}", {"n": i})
+            await origin._process_pending_replications()
+            await origin._process_pending_replications()
+
+        asyncio.run(run())
+
+        frames = network.frames("store_replica_batch")
+        assert sorted(node for node, _ in frames) == ["peer1", "peer2"]
+        assert all(len(msg["replicas"]) == 10 for _, msg in frames)
+        assert asyncio.run(network.managers["peer1"].get("k3")) == {"n": 3}
+        assert origin.local_storage["k3"].replicas == ["peer1", "peer2"]
+        assert origin.pending_replications == {}
+
+    def test_frames_split_at_max_batch_size(self):
+        network, origin = self._setup()
+        origin.MAX_BATCH_SIZE = 4
+
+        async def run():
+            for i in range(10):
+                await origin.store(f"k{i}", i)
+            await origin._process_pending_replications()
+
+        asyncio.run(run())
+
+        sizes = [
+            len(m["replicas"]) for n, m in network.frames("store_replica_batch") if n == "peer1"
+        ]
+        assert sizes == [4, 4, 2]
+
+    def test_version_only_bumps_on_change(self):
+        network, origin = self._setup()
+
+        async def run():
+            await origin.store("k", "a")
+            await origin.store("k", "a")
+            assert origin.local_storage["k"].version == 1
+            await origin.store("k", "b")
+            assert origin.local_storage["k"].version == 2
+
+        asyncio.run(run())
+
+    def test_refresh_skips_unchanged_replicas(self):
+        network, origin = self._setup()
+
+        async def run():
+            await origin.store("k", "a")
+            await origin._process_pending_replications()
+            await origin._process_pending_replications()
+            network.messages.clear()
+
+            origin.local_storage["k"].last_refresh = 0
+            await origin._refresh_values()
+            await origin._process_pending_replications()
+
+        asyncio.run(run())
+
+        assert network.frames("store_replica_batch") == []
+        assert origin.get_stats()["refresh_skipped"] == 2
+
+    def test_anti_entropy_resends_lost_keys(self):
+        network, origin = self._setup()
+
+        async def run():
+            for i in range(20):
+                await origin.store(f"k{i}", i)
+            await origin._process_pending_replications()
+            await origin._process_pending_replications()
+
+            await network.managers["peer1"].delete("k7")
+            network.messages.clear()
+
+            await origin._anti_entropy("peer1")
+            await origin._anti_entropy("peer2")
+            await origin._process_pending_replications()
+
+        asyncio.run(run())
+
+        frames = network.frames("store_replica_batch")
+        assert [n for n, _ in frames] == ["peer1"]
+        resent = {r["key"] for r in frames[0][1]["replicas"]}
+        assert "k7" in resent
+        assert len(resent) < 20
+        assert asyncio.run(network.managers["peer1"].get("k7")) == 7
+
+    def test_anti_entropy_marks_buckets_synced(self):
+        network, origin = self._setup()
+
+        bucket = MerkleTree.bucket_of("gone")
+        neighbour = next(f"k{i}" for i in range(10_000) if MerkleTree.bucket_of(f"k{i}") == bucket)
+
+        async def run():
+            await origin.store("gone", 0)
+            await origin.store(neighbour, 1)
+            await origin._process_pending_replications()
+            await origin._process_pending_replications()
+
+            # peer1 keeps a key the origin no longer has; re-sending cannot fix that
+            await origin.delete("gone")
+            network.messages.clear()
+
+            for _ in range(3):
+                await origin._anti_entropy("peer1")
+                await origin._process_pending_replications()
+                await origin._process_pending_replications()
+
+        asyncio.run(run())
+
+        assert len(network.frames("merkle_sync")) == 3
+        assert [n for n, _ in network.frames("store_replica_batch")] == ["peer1"]
+
+    def test_bandwidth_defers_frames(self):
+        manager = BandwidthManager(BandwidthConfig(token_refill_rate=0.0))
+        network, origin = self._setup(bandwidth_manager=manager)
+
+        async def run():
+            await origin.store("k", "a")
+            await origin._process_pending_replications()
+
+        asyncio.run(run())
+
+        assert network.frames("store_replica_batch") == []
+        assert origin.get_stats()["bandwidth_deferred"] == 2
+        assert "k" in origin.pending_replications
@@ -6,10 +6,12 @@
 
 import shutil
 import tempfile
+from unittest.mock import Mock
 
 import pytest
 
 from src.core.entities import Node, Task
+from src.infrastructure.external.scheduler_client import SchedulerClient
 from src.infrastructure.repositories import (
     FileUserRepository,
     InMemoryNodeRepository,
@@ -165,5 +167,106 @@ class TestMemoryCache:
         assert stats["misses"] == 1
 
 
+class TestSchedulerClientBatchStatus:
+    """SchedulerClient 批量状态查询测试"""
+
+    def setup_method(self):
+        self.client = SchedulerClient("http://scheduler")
+        self.client._session = Mock()
+
+    @staticmethod
+    def _response(status_code, body=None, etag=None):
+        response = Mock(status_code=status_code, text="")
+        response.json.return_value = body
+        response.headers = {"ETag": etag} if etag else {}
+        return response
+
+    def test_single_request_for_all_tasks(self):
+        """测试一次请求获取全部状态"""
+        statuses = {"1": {"status": "completed"}, "2": None}
+        self.client._session.post.return_value = self._response(200, {"statuses": statuses})
+
+        success, data = self.client.get_task_statuses(["2", "1", "1"])
+
+        assert success is True
+        assert data == statuses
+        self.client._session.post.assert_called_once()
+        assert self.client._session.post.call_args.kwargs["json"] == {"task_ids": ["1", "2"]}
+
+    def test_not_modified_reuses_cached_statuses(self):
+        """测试 304 时复用上次结果"""
+        statuses = {"1": {"status": "pending"}}
+        self.client._session.post.side_effect = [
+            self._response(200, {"statuses": statuses}, etag='"v1"'),
+            self._response(304),
+        ]
+
+        self.client.get_task_statuses(["1"])
+        success, data = self.client.get_task_statuses(["1"])
+
+        assert success is True
+        assert data == statuses
+        second_call = self.client._session.post.call_args_list[1]
+        assert second_call.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+    def test_falls_back_without_batch_endpoint(self):
+        """测试调度器不支持批量接口时逐个查询"""
+        self.client._session.post.return_value = self._response(404)
+        self.client._session.get.return_value = self._response(200, {"status": "running"})
+
+        success, data = self.client.get_task_statuses(["7"])
+
+        assert success is True
+        assert data == {"7": {"status": "running"}}
+
+
+class TestSchedulerClientResults:
+    """SchedulerClient 结果分页测试"""
+
+    def setup_method(self):
+        self.client = SchedulerClient("http://scheduler")
+        self.client._session = Mock()
+
+    @staticmethod
+    def _page(results, has_more, next_cursor, watermark):
+        response = Mock(status_code=200, text="")
+        response.json.return_value = {
+            "results": results,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
+            "watermark": watermark,
+        }
+        return response
+
+    def test_fetch_results_since_follows_cursor(self):
+        """测试增量拉取按游标翻页并返回新水位线"""
+        self.client._session.get.side_effect = [
+            self._page([{"task_id": 1}], True, 1, 10.0),
+            self._page([{"task_id": 2}], False, 2, 11.0),
+        ]
+
+        success, data = self.client.fetch_results_since(since=5.0, page_size=1)
+
+        assert success is True
+        assert data == {"results": [{"task_id": 1}, {"task_id": 2}], "watermark": 11.0}
+        params = [c.kwargs["params"] for c in self.client._session.get.call_args_list]
+        assert params == [
+            {"cursor": 0, "limit": 1, "since": 5.0},
+            {"cursor": 1, "limit": 1, "since": 5.0},
+        ]
+
+    def test_stream_results_parses_ndjson(self):
+        """测试 NDJSON 流式导出逐行解析"""
+        response = Mock()
+        response.iter_lines.return_value = [b'{"task_id": 1}', b"", b'{"task_id": 2}']
+        self.client._session.get.return_value.__enter__ = Mock(return_value=response)
+        self.client._session.get.return_value.__exit__ = Mock(return_value=False)
+
+        rows = list(self.client.stream_results(fields=["task_id"]))
+
+        assert rows == [{"task_id": 1}, {"task_id": 2}]
+        assert self.client._session.get.call_args.kwargs["params"] == {"fields": "task_id"}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
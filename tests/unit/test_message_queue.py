@@ -0,0 +1,228 @@
+"""
+Tests for the message queue backends.
+"""
+
+import threading
+import time
+
+import pytest
+
+from legacy.message_queue import (
+    MemoryQueueBackend,
+    Message,
+    MessageQueue,
+    MessageStatus,
+    SegmentLogBackend,
+)
+
+
+class TestMemoryQueueBackend:
+    """Test FIFO topic queues and batch operations."""
+
+    def test_fifo_per_topic(self):
+        backend = MemoryQueueBackend()
+        for i in range(3):
+            backend.publish(Message(topic="a", payload=i))
+        backend.publish(Message(topic="b", payload="x"))
+
+        assert [backend.consume("a").payload for _ in range(3)] == [0, 1, 2]
+        assert backend.consume("a") is None
+        assert backend.consume("b").payload == "x"
+
+    def test_publish_many_respects_max_size(self):
+        backend = MemoryQueueBackend(max_size=3)
+
+        published = backend.publish_many([Message(topic="t", payload=i) for i in range(5)])
+
+        assert published == 3
+        assert backend.get_stats().total_published == 3
+        assert [m.payload for m in backend.get_pending("t")] == [0, 1, 2]
+
+    def test_consume_batch(self):
+        backend = MemoryQueueBackend()
+        backend.publish_many([Message(topic="t", payload=i) for i in range(5)])
+
+        first = backend.consume_batch("t", 3)
+        rest = backend.consume_batch("t", 10)
+
+        assert [m.payload for m in first] == [0, 1, 2]
+        assert [m.payload for m in rest] == [3, 4]
+        assert all(m.status == MessageStatus.DELIVERED for m in first + rest)
+        assert backend.consume_batch("t", 10) == []
+        assert backend.get_stats().total_delivered == 5
+
+    def test_consume_batch_waits_for_publish(self):
+        backend = MemoryQueueBackend()
+        timer = threading.Timer(0.05, backend.publish, args=(Message(topic="t", payload=1),))
+        timer.start()
+
+        messages = backend.consume_batch("t", 10, timeout=2.0)
+        timer.join()
+
+        assert [m.payload for m in messages] == [1]
+
+    def test_each_message_wakes_one_consumer(self):
+        backend = MemoryQueueBackend()
+        received = []
+        lock = threading.Lock()
+
+        def consumer():
+            message = backend.consume("t", timeout=2.0)
+            with lock:
+                received.append(message)
+
+        threads = [threading.Thread(target=consumer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        backend.publish_many([Message(topic="t", payload=i) for i in range(4)])
+        for thread in threads:
+            thread.join()
+
+        assert sorted(m.payload for m in received) == [0, 1, 2, 3]
+
+
+class TestSegmentLogBackend:
+    """Test the durable segment log backend."""
+
+    def test_roundtrip_payload_types(self, tmp_path):
+        backend = SegmentLogBackend(tmp_path)
+        backend.publish(Message(topic="t", payload={"n": 1}, headers={"k": "v"}, priority=3))
+        backend.publish(Message(topic="t", payload=b"\x00raw bytes"))
+
+        structured, raw = backend.consume_batch("t", 10)
+
+        assert structured.payload == {"n": 1}
+        assert structured.headers == {"k": "v"}
+        assert structured.priority == 3
+        assert structured.status == MessageStatus.DELIVERED
+        assert isinstance(raw.payload, memoryview)
+        assert bytes(raw.payload) == b"\x00raw bytes"
+        backend.close()
+
+    def test_raw_payloads_are_read_only(self, tmp_path):
+        backend = SegmentLogBackend(tmp_path)
+        backend.publish(Message(topic="t", payload=b"Hello"))
+
+        message = backend.consume("t")
+        with pytest.raises(TypeError):
+            message.payload[0] = ord("J")
+        backend.close()
+
+        reopened = SegmentLogBackend(tmp_path)
+        assert bytes(reopened.consume("t").payload) == b"Hello"
+        reopened.close()
+
+    def test_unacked_messages_redelivered_after_restart(self, tmp_path):
+        backend = SegmentLogBackend(tmp_path)
+        backend.publish_many([Message(topic="t", payload=i) for i in range(5)])
+        delivered = backend.consume_batch("t", 3)
+        backend.acknowledge(delivered[0].id)
+        backend.acknowledge(delivered[2].id)
+        backend.close()
+
+        reopened = SegmentLogBackend(tmp_path)
+        redelivered = reopened.consume_batch("t", 10)
+
+        # Offset 1 was never acked, so the committed offset stops there.
+        assert [m.payload for m in redelivered] == [1, 2, 3, 4]
+        assert reopened.get_stats().pending_messages == 4
+        reopened.close()
+
+    def test_consumer_groups_are_independent(self, tmp_path):
+        backend = SegmentLogBackend(tmp_path)
+        backend.publish_many([Message(topic="t", payload=i) for i in range(3)])
+
+        first = backend.consume_batch("t", 10)
+        other = backend.consume_batch("t", 10, group="audit")
+
+        assert [m.payload for m in first] == [0, 1, 2]
+        assert [m.payload for m in other] == [0, 1, 2]
+        assert backend.consume("t") is None
+        backend.close()
+
+    def test_acknowledgements_are_per_group(self, tmp_path):
+        backend = SegmentLogBackend(tmp_path)
+        backend.publish(Message(topic="t", payload="x"))
+        message = backend.consume("t")
+        audited = backend.consume("t", group="audit")
+
+        assert backend.acknowledge(message.id)
+        assert not backend.acknowledge(message.id)
+        assert backend.acknowledge(audited.id, group="audit")
+        backend.close()
+
+        reopened = SegmentLogBackend(tmp_path)
+        assert reopened.consume("t") is None
+        assert reopened.consume("t", group="audit") is None
+        reopened.close()
+
+    def test_segments_roll_and_retention(self, tmp_path):
+        backend = SegmentLogBackend(tmp_path, segment_bytes=4096, retention_bytes=8192)
+        payload = b"x" * 1000
+        backend.publish_many([Message(topic="t", payload=payload) for _ in range(40)])
+
+        segments = sorted((tmp_path / "topics" / "t").glob("*.log"))
+        assert 1 < len(segments) <= 3
+
+        messages = backend.consume_batch("t", 100)
+        assert 0 < len(messages) < 40
+        assert all(bytes(m.payload) == payload for m in messages)
+        backend.close()
+
+    def test_retention_keeps_uncommitted_segments(self, tmp_path):
+        backend = SegmentLogBackend(tmp_path, segment_bytes=4096, retention_bytes=8192)
+        payload = b"x" * 1000
+        backend.publish(Message(topic="t", payload=payload))
+        first = backend.consume("t", group="slow")
+        backend.publish_many([Message(topic="t", payload=payload) for _ in range(39)])
+
+        assert backend._topics["t"].start_offset == 0
+        assert backend.consume("t", group="late").id == first.id
+
+        backend.acknowledge(first.id, group="slow")
+        for message in backend.consume_batch("t", 100, group="slow"):
+            backend.acknowledge(message.id, group="slow")
+        backend.consume_batch("t", 100, group="late")
+        backend.close()
+
+        # "late" never acknowledged offset 0, so nothing may be removed yet
+        reopened = SegmentLogBackend(tmp_path, segment_bytes=4096, retention_bytes=8192)
+        assert reopened.enforce_retention() == 0
+        reopened.close()
+
+        (tmp_path / "offsets" / "late.json").unlink()
+        reopened = SegmentLogBackend(tmp_path, segment_bytes=4096, retention_bytes=8192)
+        assert reopened.enforce_retention() > 0
+        reopened.close()
+
+    def test_recovers_unindexed_records(self, tmp_path):
+        backend = SegmentLogBackend(tmp_path)
+        backend.publish_many([Message(topic="t", payload=i) for i in range(3)])
+        backend.flush()
+        segment = backend._topics["t"].segments[0]
+        # Simulate a crash where the index never reached disk.
+        segment.index[:] = bytes(len(segment.index))
+        backend.close()
+
+        reopened = SegmentLogBackend(tmp_path)
+        assert [m.payload for m in reopened.consume_batch("t", 10)] == [0, 1, 2]
+        reopened.publish(Message(topic="t", payload=3))
+        assert reopened.consume("t").payload == 3
+        reopened.close()
+
+    def test_message_queue_integration(self, tmp_path):
+        backend = SegmentLogBackend(tmp_path)
+        queue = MessageQueue(backend=backend)
+        received = []
+        queue.subscribe("events", received.append)
+        queue.start_consumers(["events"])
+
+        queue.publish("events", {"value": 42})
+        deadline = time.time() + 2
+        while not received and time.time() < deadline:
+            time.sleep(0.01)
+        queue.stop_consumers()
+
+        assert received[0].payload == {"value": 42}
+        assert backend.get_stats().total_acknowledged == 1
+        backend.close()
@@ -0,0 +1,198 @@
+"""
+Tests for Monitoring and Metrics Collection.
+"""
+
+import threading
+
+import pytest
+
+from legacy.monitoring import (
+    Counter,
+    Gauge,
+    Histogram,
+    LatencyHistogram,
+    MetricsRegistry,
+    SystemMonitor,
+)
+
+
+def _run_threads(target, count: int = 4):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class TestCounter:
+    """Test sharded Counter."""
+
+    def test_inc(self):
+        counter = Counter("c")
+        counter.inc()
+        counter.inc(5)
+
+        assert counter.get() == 6
+
+    def test_negative_rejected(self):
+        with pytest.raises(ValueError):
+            Counter("c").inc(-1)
+
+    def test_concurrent_increments_merged(self):
+        """Test shards from many (exited) threads are merged on collect."""
+        counter = Counter("c")
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        _run_threads(work, count=8)
+
+        assert counter.get() == 8000
+        assert counter.collect()[0].value == 8000
+        assert counter._shards._cells == []
+
+
+class TestHistogram:
+    """Test Histogram bucketing."""
+
+    def test_bucket_boundaries(self):
+        histogram = Histogram("h", buckets=(1.0, 2.0, 5.0))
+        for value in (0.5, 1.0, 1.5, 2.0, 4.0, 10.0):
+            histogram.observe(value)
+
+        samples = {s.labels.get("le"): s.value for s in histogram.collect() if "le" in s.labels}
+
+        assert samples == {"1.0": 2, "2.0": 4, "5.0": 5, "+Inf": 6}
+        assert histogram._count == 6
+        assert histogram._sum == pytest.approx(19.0)
+
+    def test_concurrent_observe(self):
+        histogram = Histogram("h", buckets=(1.0,))
+
+        def work():
+            for _ in range(500):
+                histogram.observe(0.5)
+
+        _run_threads(work)
+
+        assert histogram._counts == [2000, 0]
+
+
+class TestLatencyHistogram:
+    """Test LatencyHistogram quantile estimation."""
+
+    def test_quantile_relative_error(self):
+        latency = LatencyHistogram("lat")
+        values = [i / 1_000_000 for i in range(1, 10001)]
+        for value in values:
+            latency.observe(value)
+
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * len(values)) - 1]
+            assert latency.quantile(q) == pytest.approx(exact, rel=0.05)
+
+    def test_zero_and_empty(self):
+        latency = LatencyHistogram("lat")
+
+        assert latency.quantile(0.5) == 0.0
+
+        latency.observe(0.0)
+        latency.observe(0.0)
+        latency.observe(1.0)
+
+        assert latency.quantile(0.5) == 0.0
+        assert latency.quantile(0.99) == pytest.approx(1.0)
+
+    def test_concurrent_observe_merged(self):
+        """Test per-thread buckets survive their threads exiting."""
+        latency = LatencyHistogram("lat")
+
+        def work():
+            for _ in range(500):
+                latency.observe(0.001)
+
+        _run_threads(work)
+        latency.observe(0.0)
+
+        for _ in range(2):
+            buckets, _, count, zero_count = latency.snapshot()
+            assert sum(buckets.values()) == 2000
+            assert (count, zero_count) == (2001, 1)
+        assert len(latency._shards._cells) == 1
+
+    def test_collect_summary(self):
+        latency = LatencyHistogram("lat")
+        latency.observe(0.25)
+
+        samples = latency.collect()
+        quantiles = [s for s in samples if "quantile" in s.labels]
+
+        assert len(quantiles) == len(LatencyHistogram.QUANTILES)
+        assert samples[-1].name == "lat_count"
+        assert samples[-1].value == 1
+
+
+class TestMetricsRegistry:
+    """Test MetricsRegistry export and caching."""
+
+    def test_export_prometheus(self):
+        registry = MetricsRegistry(namespace="t")
+        registry.counter("tasks_total", "Tasks").inc(3)
+        registry.gauge("nodes", "Nodes").set(2)
+        registry.histogram("duration_seconds", "Duration", buckets=(1.0,)).observe(0.5)
+        registry.latency_histogram("lookup_seconds", "Lookup").observe(0.001)
+
+        output = registry.export_prometheus()
+
+        assert "# TYPE t_tasks_total counter" in output
+        assert "t_tasks_total 3.0" in output
+        assert "# TYPE t_nodes gauge" in output
+        assert "# TYPE t_duration_seconds histogram" in output
+        assert 't_duration_seconds_bucket{le="+Inf"} 1.0' in output
+        assert "# TYPE t_lookup_seconds summary" in output
+        assert output.count("# HELP t_duration_seconds") == 1
+
+    def test_export_cached_until_change(self):
+        registry = MetricsRegistry(namespace="t")
+        counter = registry.counter("c")
+
+        first = registry.export_prometheus()
+        assert registry.export_prometheus() is first
+
+        counter.inc()
+        second = registry.export_prometheus()
+        assert second is not first
+        assert "t_c 1.0" in second
+
+    def test_export_rate_limited_by_ttl(self):
+        registry = MetricsRegistry(namespace="t", cache_ttl_ms=60_000)
+        counter = registry.counter("c")
+
+        first = registry.export_prometheus()
+        counter.inc()
+
+        assert registry.export_prometheus() is first
+
+    def test_register_invalidates_cache(self):
+        registry = MetricsRegistry(namespace="t", cache_ttl_ms=60_000)
+        registry.export_prometheus()
+
+        registry.register(Gauge("t_new"))
+
+        assert "t_new" in registry.export_prometheus()
+
+
+class TestSystemMonitor:
+    """Test SystemMonitor hot path latency."""
+
+    def test_hot_path_latency(self):
+        monitor = SystemMonitor(MetricsRegistry(namespace="t"))
+        monitor.record_hot_path_latency("get_task_for_node", 0.002)
+        monitor.record_hot_path_latency("unknown", 1.0)
+
+        stats = monitor.get_stats()
+
+        assert stats["latency"]["get_task_for_node"]["p50"] == pytest.approx(0.002, rel=0.05)
+        assert stats["latency"]["complete_task"]["p50"] == 0.0
+        assert "t_get_task_for_node_seconds_count" in monitor.export_prometheus()
@@ -4,17 +4,29 @@
 测试 SQLite 和 Redis 仓储实现
 """
 
+import uuid
+from datetime import datetime, timedelta
+
 import pytest
 
 from src.core.entities import Node, NodeStatus, Task, TaskStatus
 from src.infrastructure.repositories import (
     InMemoryNodeRepository,
     InMemoryTaskRepository,
+    RedisNodeRepository,
+    RedisTaskRepository,
     SQLiteNodeRepository,
     SQLiteTaskRepository,
 )
 
 
+def _fake_redis_client():
+    """fakeredis客户端（Lua脚本需要lupa），不可用时跳过"""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.FakeAsyncRedis()
+
+
 class TestSQLiteNodeRepository:
     """SQLiteNodeRepository测试"""
 
@@ -188,6 +200,138 @@ class TestSQLiteTaskRepository:
         assert len(tasks) == 2
 
 
+class TestRedisTaskRepository:
+    """RedisTaskRepository测试（fakeredis）"""
+
+    @pytest.fixture
+    async def repo(self):
+        repository = RedisTaskRepository(key_prefix=f"test:{uuid.uuid4().hex[:8]}:task:")
+        repository._client = _fake_redis_client()
+        yield repository
+        await repository.close()
+
+    @staticmethod
+    def _task(task_id: str, minutes: int, **kwargs) -> Task:
+        created_at = datetime(2024, 1, 1) + timedelta(minutes=minutes)
+        return Task(task_id=task_id, code="test", created_at=created_at, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_list_all_newest_first(self, repo):
+        for i in range(5):
+            await repo.save(self._task(f"t{i}", minutes=i))
+
+        tasks = await repo.list_all(limit=3)
+        assert [t.task_id for t in tasks] == ["t4", "t3", "t2"]
+
+    @pytest.mark.asyncio
+    async def test_cursor_pagination(self, repo):
+        for i in range(7):
+            await repo.save(self._task(f"t{i}", minutes=i, user_id="user1"))
+        await repo.save(self._task("other", minutes=10, user_id="user2"))
+
+        seen = []
+        cursor = None
+        while True:
+            tasks, cursor = await repo.page_by_user("user1", limit=3, cursor=cursor)
+            seen.extend(t.task_id for t in tasks)
+            if cursor is None:
+                break
+
+        assert seen == [f"t{i}" for i in range(6, -1, -1)]
+
+    @pytest.mark.asyncio
+    async def test_cursor_survives_deleted_anchor(self, repo):
+        for i in range(4):
+            await repo.save(self._task(f"t{i}", minutes=i))
+
+        first, cursor = await repo.page_all(limit=2)
+        await repo.delete(first[-1].task_id)
+        rest, _ = await repo.page_all(limit=2, cursor=cursor)
+
+        assert [t.task_id for t in rest] == ["t1", "t0"]
+
+    @pytest.mark.asyncio
+    async def test_update_moves_status_index(self, repo):
+        task = self._task("t1", minutes=0)
+        await repo.save(task)
+
+        task.status = TaskStatus.RUNNING
+        await repo.update(task)
+
+        assert await repo.list_by_status(TaskStatus.PENDING) == []
+        running = await repo.list_by_status(TaskStatus.RUNNING)
+        assert [t.task_id for t in running] == ["t1"]
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_pruned(self, repo):
+        await repo.save(self._task("t1", minutes=0))
+        await repo.save(self._task("t2", minutes=1))
+        await repo._client.delete(f"{repo.key_prefix}t2")
+
+        tasks = await repo.list_all()
+        assert [t.task_id for t in tasks] == ["t1"]
+        assert await repo._client.zcard(repo._index_key("all")) == 1
+
+
+class TestRedisNodeRepository:
+    """RedisNodeRepository测试（fakeredis）"""
+
+    @pytest.fixture
+    async def repo(self):
+        repository = RedisNodeRepository(key_prefix=f"test:{uuid.uuid4().hex[:8]}:node:")
+        repository._client = _fake_redis_client()
+        yield repository
+        await repository.close()
+
+    @pytest.mark.asyncio
+    async def test_list_online_and_idle(self, repo):
+        await repo.save(Node(node_id="node_001", status=NodeStatus.ONLINE))
+        await repo.save(Node(node_id="node_002", status=NodeStatus.IDLE, is_idle=True))
+        await repo.save(Node(node_id="node_003", status=NodeStatus.OFFLINE))
+
+        online = await repo.list_online()
+        idle = await repo.list_idle()
+        assert {n.node_id for n in online} == {"node_001", "node_002"}
+        assert [n.node_id for n in idle] == ["node_002"]
+
+    @pytest.mark.asyncio
+    async def test_going_offline_leaves_online_index(self, repo):
+        node = Node(node_id="node_001", status=NodeStatus.IDLE, is_idle=True)
+        await repo.save(node)
+
+        node.go_offline()
+        await repo.update(node)
+
+        assert await repo.list_online() == []
+        offline = await repo.list_by_status(NodeStatus.OFFLINE)
+        assert [n.node_id for n in offline] == ["node_001"]
+
+    @pytest.mark.asyncio
+    async def test_offset_pagination(self, repo):
+        base = datetime(2024, 1, 1)
+        for i in range(5):
+            await repo.save(
+                Node(
+                    node_id=f"node_{i}",
+                    status=NodeStatus.ONLINE,
+                    registered_at=base + timedelta(minutes=i),
+                )
+            )
+
+        page = await repo.list_all(limit=2, offset=1)
+        assert [n.node_id for n in page] == ["node_3", "node_2"]
+        with pytest.raises(ValueError):
+            await repo.list_all(limit=0)
+
+    @pytest.mark.asyncio
+    async def test_delete_node(self, repo):
+        await repo.save(Node(node_id="node_001", status=NodeStatus.ONLINE))
+
+        assert await repo.delete("node_001") is True
+        assert await repo.delete("node_001") is False
+        assert await repo.list_online() == []
+
+
 class TestInMemoryNodeRepositoryAsync:
     """InMemoryNodeRepository同步接口测试（兼容性）"""
 
@@ -0,0 +1,255 @@
+"""
+Tests for RedisStorage.
+
+Runs against a real server when REDIS_URL is set, otherwise against
+fakeredis (Lua scripting needs the ``lupa`` package). Skipped when
+neither is available.
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+
+from legacy.storage import NodeInfo, NodeStatus, RedisStorage, TaskInfo, TaskStatus
+
+
+def _make_storage() -> RedisStorage:
+    prefix = f"test:{uuid.uuid4().hex[:8]}:"
+    redis_url = os.environ.get("REDIS_URL")
+    if redis_url:
+        pytest.importorskip("redis")
+        return RedisStorage(redis_url, key_prefix=prefix)
+
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    storage = RedisStorage(key_prefix=prefix)
+    storage._client = fakeredis.FakeAsyncRedis()
+    return storage
+
+
+async def _add_node(storage: RedisStorage, node_id: str, cpu: float, memory: int):
+    await storage.store_node(
+        NodeInfo(
+            node_id=node_id,
+            status=NodeStatus.ONLINE_AVAILABLE,
+            available_resources={"cpu": cpu, "memory": memory},
+        )
+    )
+
+
+class TestResourceClass:
+    """Test resource class bucketing (no server required)."""
+
+    def test_rounds_down_to_powers_of_two(self):
+        assert RedisStorage.resource_class({"cpu": 1.0, "memory": 512}) == "1:512"
+        assert RedisStorage.resource_class({"cpu": 1.5, "memory": 600}) == "1:512"
+        assert RedisStorage.resource_class({"cpu": 5, "memory": 1000}) == "4:512"
+        assert RedisStorage.resource_class({"cpu": 0.1, "memory": 10}) == "0:0"
+
+    def test_defaults(self):
+        assert RedisStorage.resource_class({}) == "1:512"
+
+
+class TestRedisTaskClaim:
+    """Test atomic task claiming."""
+
+    def test_claim_marks_assigned(self):
+        storage = _make_storage()
+
+        async def run():
+            await _add_node(storage, "node-1", cpu=4, memory=8192)
+            await storage.store_task(TaskInfo(task_id=0, code="x = 1"))
+
+            task = await storage.get_pending_task_for_node("node-1")
+            stored = await storage.get_task(task.task_id)
+            again = await storage.get_pending_task_for_node("node-1")
+            return task, stored, again
+
+        task, stored, again = asyncio.run(run())
+
+        assert task.status == TaskStatus.ASSIGNED
+        assert task.assigned_node == "node-1"
+        assert stored.status == TaskStatus.ASSIGNED
+        assert again is None
+
+    def test_resource_fit_and_fifo(self):
+        storage = _make_storage()
+
+        async def run():
+            await _add_node(storage, "small", cpu=1, memory=1024)
+            big = TaskInfo(task_id=0, code="big", resources={"cpu": 4, "memory": 4096})
+            first = TaskInfo(task_id=0, code="first", created_at=1.0)
+            second = TaskInfo(task_id=0, code="second", created_at=2.0)
+            for task in (big, second, first):
+                await storage.store_task(task)
+
+            claimed = [await storage.get_pending_task_for_node("small") for _ in range(3)]
+            return [t.code if t else None for t in claimed]
+
+        assert asyncio.run(run()) == ["first", "second", None]
+
+    def test_non_power_of_two_requirements(self):
+        storage = _make_storage()
+
+        async def run():
+            await _add_node(storage, "three", cpu=3, memory=1000)
+            await _add_node(storage, "six", cpu=6, memory=8192)
+            for code, cpu, memory in (("cpu3", 3, 512), ("mem600", 1, 600), ("cpu5", 5, 512)):
+                await storage.store_task(
+                    TaskInfo(task_id=0, code=code, resources={"cpu": cpu, "memory": memory})
+                )
+
+            claims = {}
+            for node_id in ("three", "three", "three", "six"):
+                task = await storage.get_pending_task_for_node(node_id)
+                claims.setdefault(node_id, []).append(task.code if task else None)
+            return claims
+
+        claims = asyncio.run(run())
+
+        assert claims == {"three": ["cpu3", "mem600", None], "six": ["cpu5"]}
+
+    def test_skips_tasks_too_large_within_class(self):
+        storage = _make_storage()
+
+        async def run():
+            await _add_node(storage, "six", cpu=6, memory=8192)
+            too_big = TaskInfo(
+                task_id=0, code="cpu7", resources={"cpu": 7, "memory": 512}, created_at=1.0
+            )
+            fits = TaskInfo(
+                task_id=0, code="cpu5", resources={"cpu": 5, "memory": 512}, created_at=2.0
+            )
+            await storage.store_task(too_big)
+            await storage.store_task(fits)
+
+            first = await storage.get_pending_task_for_node("six")
+            second = await storage.get_pending_task_for_node("six")
+            remaining = await storage.get_task(too_big.task_id)
+            return first, second, remaining
+
+        first, second, remaining = asyncio.run(run())
+
+        assert first.code == "cpu5"
+        assert second is None
+        assert remaining.status == TaskStatus.PENDING
+
+    def test_concurrent_claims_unique(self):
+        storage = _make_storage()
+
+        async def run():
+            for i in range(5):
+                await _add_node(storage, f"node-{i}", cpu=8, memory=16384)
+            for _ in range(20):
+                await storage.store_task(TaskInfo(task_id=0, code="work"))
+
+            claims = await asyncio.gather(
+                *(storage.get_pending_task_for_node(f"node-{i % 5}") for i in range(30))
+            )
+            return [t.task_id for t in claims if t is not None]
+
+        claimed = asyncio.run(run())
+
+        assert len(claimed) == 20
+        assert len(set(claimed)) == 20
+
+    def test_scan_is_bounded_per_script_call(self):
+        storage = _make_storage()
+        storage.CLAIM_SCAN_BATCH = 2
+        calls = []
+
+        async def run():
+            await _add_node(storage, "six", cpu=6, memory=8192)
+            for i in range(5):
+                await storage.store_task(
+                    TaskInfo(
+                        task_id=0, code=f"big{i}", resources={"cpu": 7, "memory": 512}, created_at=i
+                    )
+                )
+            await storage.store_task(
+                TaskInfo(task_id=0, code="fits", resources={"cpu": 5, "memory": 512}, created_at=9)
+            )
+
+            script = await storage._get_claim_script()
+
+            async def counted(**kwargs):
+                calls.append(kwargs["args"][4])
+                return await script(**kwargs)
+
+            storage._claim_script = counted
+            return await storage.get_pending_task_for_node("six")
+
+        task = asyncio.run(run())
+
+        assert task.code == "fits"
+        assert len(calls) == 3
+
+    def test_claim_keeps_other_fields(self):
+        storage = _make_storage()
+        created_at = 1712345678.123456789
+
+        async def run():
+            await _add_node(storage, "node-1", cpu=4, memory=8192)
+            task = TaskInfo(task_id=0, code="x", created_at=created_at, user_id="u")
+            await storage.store_task(task)
+            await storage.get_pending_task_for_node("node-1")
+            return await storage.get_task(task.task_id)
+
+        stored = asyncio.run(run())
+
+        assert stored.created_at == created_at
+        assert stored.user_id == "u"
+        assert stored.status == TaskStatus.ASSIGNED
+
+    def test_update_retries_after_concurrent_claim(self):
+        storage = _make_storage()
+
+        async def run():
+            await _add_node(storage, "node-1", cpu=4, memory=8192)
+            task = TaskInfo(task_id=0, code="x")
+            await storage.store_task(task)
+
+            client = await storage._get_client()
+            make_pipeline = client.pipeline
+            reads = []
+
+            def pipeline(*args, **kwargs):
+                pipe = make_pipeline(*args, **kwargs)
+                read = pipe.hgetall
+
+                async def hgetall(key):
+                    fields = await read(key)
+                    reads.append(key)
+                    if len(reads) == 1:
+                        # A claim lands between the read and the write
+                        await storage.get_pending_task_for_node("node-1")
+                    return fields
+
+                pipe.hgetall = hgetall
+                return pipe
+
+            client.pipeline = pipeline
+            await storage.update_task(task.task_id, {"error": "late"})
+            client.pipeline = make_pipeline
+            return await storage.get_task(task.task_id), len(reads)
+
+        stored, reads = asyncio.run(run())
+
+        assert reads == 2
+        assert stored.error == "late"
+        assert stored.status == TaskStatus.ASSIGNED
+        assert stored.assigned_node == "node-1"
+
+    def test_completed_task_leaves_queue(self):
+        storage = _make_storage()
+
+        async def run():
+            await _add_node(storage, "node-1", cpu=4, memory=8192)
+            task = TaskInfo(task_id=0, code="x")
+            await storage.store_task(task)
+            await storage.update_task(task.task_id, {"status": TaskStatus.COMPLETED})
+            return await storage.get_pending_task_for_node("node-1")
+
+        assert asyncio.run(run()) is None
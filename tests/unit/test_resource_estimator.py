@@ -0,0 +1,135 @@
+"""Tests for the incremental resource estimator."""
+
+import random
+
+import pytest
+
+from legacy.resource_estimator import (
+    LinearRegressionEstimator,
+    P2Quantile,
+    PercentileEstimator,
+    ResourceEstimator,
+    RunningRegression,
+    TaskMetrics,
+)
+
+
+def _run(task_type, size, duration, memory=128.0, cpu=1.0, success=True, node_id=None):
+    return TaskMetrics(
+        task_type=task_type,
+        input_size=size,
+        actual_cpu=cpu,
+        actual_memory=memory,
+        actual_disk=0.0,
+        actual_network=0.0,
+        actual_duration=duration,
+        success=success,
+        node_id=node_id,
+    )
+
+
+class TestRunningRegression:
+    def test_matches_batch_least_squares(self):
+        rng = random.Random(1)
+        points = [(x, 3.0 * x + 7.0 + rng.uniform(-1, 1)) for x in range(1, 200)]
+        model = RunningRegression()
+        for x, y in points:
+            model.add(x, {"y": y})
+
+        slope, intercept = LinearRegressionEstimator()._linear_regression(
+            [x for x, _ in points], [y for _, y in points]
+        )
+        fit = model.fit("y")
+        assert fit[0] == pytest.approx(slope)
+        assert fit[1] == pytest.approx(intercept)
+
+    def test_decay_forgets_old_regime(self):
+        model = RunningRegression(decay=0.9)
+        for x in range(1, 100):
+            model.add(x, {"y": 10.0 * x})
+        for x in range(1, 100):
+            model.add(x, {"y": 2.0 * x})
+
+        assert model.fit("y")[0] == pytest.approx(2.0, rel=0.01)
+
+    def test_equal_inputs_have_no_fit(self):
+        model = RunningRegression()
+        model.add(5, {"y": 1.0})
+        model.add(5, {"y": 3.0})
+
+        assert model.fit("y") is None
+        assert model.mean("y") == 2.0
+
+
+class TestP2Quantile:
+    def test_tracks_p90(self):
+        rng = random.Random(2)
+        values = [rng.expovariate(1.0) for _ in range(20000)]
+        sketch = P2Quantile(0.9)
+        for v in values:
+            sketch.add(v)
+
+        exact = sorted(values)[int(len(values) * 0.9)]
+        assert sketch.value() == pytest.approx(exact, rel=0.05)
+
+    def test_exact_for_few_samples(self):
+        sketch = P2Quantile(0.9)
+        for v in (5, 1, 3):
+            sketch.add(v)
+
+        assert sketch.value() == 5
+
+
+class TestResourceEstimator:
+    def test_linear_estimate_from_streaming_state(self):
+        estimator = ResourceEstimator()
+        for size in range(10, 110, 10):
+            estimator.record(_run("sort", size, 2.0 * size, memory=64.0 + size))
+        estimator.record(_run("sort", 1000, 0.0, success=False))
+
+        estimate = estimator.estimate("sort", 200)
+
+        assert estimate.estimated_duration_seconds == pytest.approx(400.0, rel=0.01)
+        assert estimate.memory_mb == pytest.approx(264.0, rel=0.01)
+        assert estimate.based_on_samples == 10
+
+    def test_history_bounded(self):
+        estimator = ResourceEstimator(max_history=5)
+        for i in range(20):
+            estimator.record(_run("t", i, 1.0))
+
+        assert estimator.get_statistics("t")["total_count"] == 5
+
+    def test_percentile_uses_similar_sizes(self):
+        estimator = ResourceEstimator(strategy=PercentileEstimator(90))
+        for i in range(50):
+            estimator.record(_run("t", 10, 1.0 + i % 10))
+            estimator.record(_run("t", 1000, 100.0 + i % 10))
+
+        assert estimator.estimate("t", 12).estimated_duration_seconds <= 10
+        assert estimator.estimate("t", 900).estimated_duration_seconds >= 100
+        assert estimator.estimate("t", 100_000).based_on_samples == 100
+
+    def test_state_survives_restart(self, tmp_path):
+        path = tmp_path / "estimator.json"
+        first = ResourceEstimator(state_path=path, save_every=1000)
+        for size in (10, 20, 30):
+            first.record(_run("t", size, size / 10, node_id="n1"))
+        first.save_state()
+
+        second = ResourceEstimator(state_path=path)
+
+        assert second.estimate("t", 40).estimated_duration_seconds == pytest.approx(
+            first.estimate("t", 40).estimated_duration_seconds
+        )
+        assert second.duration_model("t", "n1") == pytest.approx((0.1, 0.0), abs=1e-9)
+
+    def test_periodic_save(self, tmp_path):
+        path = tmp_path / "state" / "estimator.json"
+        estimator = ResourceEstimator(strategy=PercentileEstimator(), state_path=path, save_every=2)
+        estimator.record(_run("t", 1, 1.0))
+        assert not path.exists()
+        estimator.record(_run("t", 1, 3.0))
+
+        restored = ResourceEstimator(strategy=PercentileEstimator(), state_path=path)
+        assert restored.estimate("t", 1).estimated_duration_seconds == 3.0
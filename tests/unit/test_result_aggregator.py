@@ -0,0 +1,158 @@
+"""Tests for streaming result aggregation."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from legacy.result_aggregator import (
+    AggregationStatus,
+    AverageAggregator,
+    FirstAggregator,
+    GroupByAggregator,
+    ListAggregator,
+    MaxAggregator,
+    MergeAggregator,
+    ReduceAggregator,
+    ResultAggregator,
+    SumAggregator,
+    TaskResult,
+    tree_reduce,
+)
+
+
+def _feed(strategy, values, total=None, **kwargs):
+    aggregator = ResultAggregator(strategy, **kwargs)
+    aggregator.create_aggregation("agg", total if total is not None else len(values))
+    agg = None
+    for i, value in enumerate(values):
+        success = not isinstance(value, Exception)
+        agg = aggregator.add_result(
+            "agg", TaskResult(task_id=str(i), value=value, success=success, error="boom")
+        )
+    return aggregator, agg
+
+
+class TestStreamingAggregators:
+    def test_sum_and_average_fold_on_arrival(self):
+        _, agg = _feed(SumAggregator(), [1, 2, ValueError(), 4])
+        assert agg.status == AggregationStatus.COMPLETED
+        assert agg.result == 7
+
+        _, agg = _feed(AverageAggregator(), [1.0, 2.0, 6.0])
+        assert agg.result == 3.0
+
+    def test_partial_result_before_completion(self):
+        aggregator, agg = _feed(SumAggregator(), [1, 2], total=5, partial_aggregation=True)
+
+        assert agg.status == AggregationStatus.PARTIAL
+        assert agg.result == 3
+        assert aggregator.get_partial_result("agg") == 3
+
+    def test_first_completes_on_first_success(self):
+        _, agg = _feed(FirstAggregator(), [ValueError(), "x"], total=10)
+
+        assert agg.status == AggregationStatus.COMPLETED
+        assert agg.result == "x"
+
+    def test_group_by_and_batch_aggregate_agree(self):
+        strategy = GroupByAggregator(lambda v: v % 2)
+        _, agg = _feed(strategy, [1, 2, 3, 4])
+        batch = strategy.aggregate([TaskResult(task_id=str(v), value=v) for v in [1, 2, 3, 4]])
+
+        assert agg.result == batch == {1: [1, 3], 0: [2, 4]}
+
+    def test_deep_merge_leaves_inputs_untouched(self):
+        first = {"a": {"x": 1}}
+        second = {"a": {"y": 2}}
+        _, agg = _feed(MergeAggregator(), [first, second])
+
+        assert agg.result == {"a": {"x": 1, "y": 2}}
+        assert first == {"a": {"x": 1}}
+
+    def test_returned_results_do_not_change(self):
+        aggregator = ResultAggregator(ListAggregator())
+        aggregator.create_aggregation("agg", 2)
+        first = aggregator.add_result("agg", TaskResult(task_id="0", value=1)).result
+        aggregator.add_result("agg", TaskResult(task_id="1", value=2))
+        assert first == [1]
+
+        merge = ResultAggregator(MergeAggregator())
+        merge.create_aggregation("agg", 2)
+        merged = merge.add_result("agg", TaskResult(task_id="0", value={"a": {"x": 1}})).result
+        grouped = GroupByAggregator(lambda v: v % 2)
+        by_parity = ResultAggregator(grouped, partial_aggregation=True)
+        by_parity.create_aggregation("agg", 3)
+        by_parity.add_result("agg", TaskResult(task_id="0", value=1))
+        groups = by_parity.get_partial_result("agg")
+
+        merge.add_result("agg", TaskResult(task_id="1", value={"a": {"y": 2}}))
+        by_parity.add_result("agg", TaskResult(task_id="1", value=3))
+        assert merged == {"a": {"x": 1}}
+        assert groups == {1: [1]}
+
+    def test_type_error_fails_aggregation(self):
+        _, agg = _feed(SumAggregator(), [1, "x"])
+
+        assert agg.status == AggregationStatus.FAILED
+
+
+class TestTreeReduce:
+    def test_tree_mode_preserves_order(self):
+        values = [str(i % 10) for i in range(1000)]
+        calls = []
+
+        def concat(a, b):
+            calls.append((len(a), len(b)))
+            return a + b
+
+        _, agg = _feed(ReduceAggregator(concat, tree=True), values)
+
+        assert agg.result == "".join(values)
+        # Partials are combined in balanced pairs: no combine joins a long run to one value
+        assert max(a for a, b in calls if b == 1) == 1
+
+    def test_tree_mode_with_initial(self):
+        _, agg = _feed(ReduceAggregator(lambda a, b: a + b, initial=100, tree=True), [1, 2, 3])
+
+        assert agg.result == 106
+
+    def test_batch_tree_reduce_on_executor(self):
+        values = list(range(10_001))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            strategy = ReduceAggregator(lambda a, b: a + b, tree=True, executor=executor)
+            result = strategy.aggregate([TaskResult(task_id="t", value=v) for v in values])
+
+        assert result == sum(values)
+        assert tree_reduce(["a", "b", "c"], lambda a, b: a + b) == "abc"
+        with pytest.raises(ValueError):
+            tree_reduce([], lambda a, b: a + b)
+
+
+class TestNumpyResults:
+    def test_arrays_combined_elementwise_without_touching_inputs(self):
+        np = pytest.importorskip("numpy")
+        chunks = [np.arange(4, dtype=float) * i for i in range(1, 4)]
+        originals = [c.copy() for c in chunks]
+
+        _, total = _feed(SumAggregator(), chunks)
+        _, peak = _feed(MaxAggregator(), chunks)
+        _, mean = _feed(AverageAggregator(), chunks)
+
+        assert np.array_equal(total.result, np.arange(4) * 6.0)
+        assert np.array_equal(peak.result, np.arange(4) * 3.0)
+        assert np.array_equal(mean.result, np.arange(4) * 2.0)
+        assert all(np.array_equal(c, o) for c, o in zip(chunks, originals))
+
+    def test_partial_array_results_are_snapshots(self):
+        np = pytest.importorskip("numpy")
+        chunks = [np.array([1, 2]) * i for i in (1, 1, 1)]
+
+        for strategy in (SumAggregator(), MaxAggregator()):
+            aggregator = ResultAggregator(strategy, partial_aggregation=True)
+            aggregator.create_aggregation("agg", 3)
+            aggregator.add_result("agg", TaskResult(task_id="0", value=chunks[0]))
+            partial = aggregator.add_result("agg", TaskResult(task_id="1", value=chunks[1])).result
+            kept = partial.copy()
+            aggregator.add_result("agg", TaskResult(task_id="2", value=chunks[2] * 5))
+
+            assert np.array_equal(partial, kept)
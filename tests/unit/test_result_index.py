@@ -0,0 +1,77 @@
+"""Tests for the completion-ordered result index."""
+
+from types import SimpleNamespace
+
+from legacy.storage.result_index import CompletionIndex
+
+
+def _task(task_id, completed_at=0.0):
+    return SimpleNamespace(
+        task_id=task_id,
+        result=f"r{task_id}",
+        result_digest=None,
+        result_size=None,
+        completed_at=completed_at,
+        assigned_node=None,
+        user_id=None,
+    )
+
+
+def _ids(page):
+    return [r["task_id"] for r in page["results"]]
+
+
+class TestCompletionIndex:
+    def test_pages_by_cursor_and_watermark(self):
+        index = CompletionIndex()
+        tasks = {i: _task(i) for i in range(5)}
+        for i in range(5):
+            index.record(i, 10.0)
+
+        first = index.page(tasks, limit=2, fields=("task_id",))
+        rest = index.page(tasks, cursor=first["next_cursor"])
+
+        assert first["results"] == [{"task_id": 0}, {"task_id": 1}]
+        assert first["has_more"] is True
+        assert _ids(rest) == [2, 3, 4]
+        assert rest["has_more"] is False
+        assert index.page(tasks, since=rest["watermark"])["results"] == []
+
+    def test_completing_again_moves_to_end(self):
+        index = CompletionIndex()
+        tasks = {i: _task(i) for i in range(3)}
+        for i in range(3):
+            index.record(i, float(i))
+        watermark = index.page(tasks)["watermark"]
+
+        index.record(0, 1.0)
+
+        assert len(index) == 3
+        assert _ids(index.page(tasks)) == [1, 2, 0]
+        assert _ids(index.page(tasks, since=watermark)) == [0]
+
+    def test_discard_keeps_cursors_valid(self):
+        index = CompletionIndex()
+        tasks = {i: _task(i) for i in range(4)}
+        for i in range(4):
+            index.record(i, float(i))
+        first = index.page(tasks, limit=2)
+
+        index.discard(0)
+        index.discard(2)
+
+        assert _ids(index.page(tasks, cursor=first["next_cursor"])) == [3]
+        assert 0 not in index
+
+    def test_prunes_tasks_that_left_the_storage(self):
+        index = CompletionIndex()
+        tasks = {i: _task(i) for i in range(3)}
+        for i in range(3):
+            index.record(i, float(i))
+        del tasks[1]
+
+        page = index.page(tasks)
+
+        assert _ids(page) == [0, 2]
+        assert page["has_more"] is False
+        assert len(index) == 2
@@ -0,0 +1,100 @@
+"""Tests for submission-side result memoization."""
+
+import itertools
+import time
+
+from legacy.scheduler.result_memo import ResultMemoizer
+
+
+class _Tasks:
+    """Records create_task callbacks the way the scheduler storage would."""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self.enqueued = {}
+
+    def __call__(self, enqueue: bool) -> int:
+        task_id = next(self._ids)
+        self.enqueued[task_id] = enqueue
+        return task_id
+
+
+class TestResultMemoizer:
+    def setup_method(self):
+        self.memo = ResultMemoizer(max_entries=2, ttl=60, runtime_version="python3.11")
+        self.tasks = _Tasks()
+        self.key = self.memo.make_key("print(1)", {"cpu": 1.0, "memory": 512})
+
+    def test_key_covers_code_resources_and_runtime(self):
+        assert self.key == self.memo.make_key("print(1)", {"memory": 512, "cpu": 1.0})
+        assert self.key != self.memo.make_key("print(2)", {"cpu": 1.0, "memory": 512})
+        assert self.key != self.memo.make_key("print(1)", {"cpu": 2.0, "memory": 512})
+        other_runtime = ResultMemoizer(runtime_version="python3.12")
+        assert self.key != other_runtime.make_key("print(1)", {"cpu": 1.0, "memory": 512})
+
+    def test_miss_then_hit(self):
+        first = self.memo.submit(self.key, self.tasks)
+        assert first.outcome == "miss"
+        assert self.tasks.enqueued[first.task_id] is True
+
+        assert self.memo.complete(first.task_id, "d" * 64, 10, cpu_seconds=4.0) == []
+
+        second = self.memo.submit(self.key, self.tasks)
+        assert second.outcome == "hit"
+        assert second.entry.digest == "d" * 64
+        assert self.tasks.enqueued[second.task_id] is False
+
+        stats = self.memo.stats()
+        assert stats["hits"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert stats["saved_cpu_seconds"] == 4.0
+
+    def test_concurrent_submissions_coalesced(self):
+        leader = self.memo.submit(self.key, self.tasks)
+        followers = [self.memo.submit(self.key, self.tasks) for _ in range(3)]
+
+        assert all(f.outcome == "coalesced" for f in followers)
+        assert all(f.leader_id == leader.task_id for f in followers)
+        assert not any(self.tasks.enqueued[f.task_id] for f in followers)
+        assert self.memo.is_leader(leader.task_id)
+        assert not self.memo.is_leader(followers[0].task_id)
+
+        waiting = self.memo.complete(leader.task_id, "d" * 64, 10, cpu_seconds=2.0)
+
+        assert waiting == [f.task_id for f in followers]
+        assert self.memo.stats()["saved_cpu_seconds"] == 6.0
+        assert self.memo.stats()["inflight"] == 0
+
+    def test_abandoned_leader_hands_over(self):
+        leader = self.memo.submit(self.key, self.tasks)
+        follower = self.memo.submit(self.key, self.tasks)
+
+        assert self.memo.abandon(leader.task_id) == follower.task_id
+        assert self.memo.is_leader(follower.task_id)
+        assert self.memo.abandon(follower.task_id) is None
+        assert self.memo.stats()["inflight"] == 0
+
+    def test_entries_expire_and_are_bounded(self):
+        for i in range(3):
+            key = self.memo.make_key(f"print({i})", None)
+            decision = self.memo.submit(key, self.tasks)
+            self.memo.complete(decision.task_id, "d" * 64, 1, cpu_seconds=1.0)
+        assert self.memo.stats()["entries"] == 2
+
+        key = self.memo.make_key("print(2)", None)
+        self.memo._entries[key].stored_at = time.time() - 120
+        assert self.memo.submit(key, self.tasks).outcome == "miss"
+
+    def test_invalid_entry_dropped_and_becomes_leader(self):
+        first = self.memo.submit(self.key, self.tasks)
+        self.memo.complete(first.task_id, "d" * 64, 10, cpu_seconds=1.0)
+
+        retry = self.memo.submit(self.key, self.tasks, is_valid=lambda entry: False)
+        follower = self.memo.submit(self.key, self.tasks, is_valid=lambda entry: True)
+
+        assert retry.outcome == "miss"
+        assert self.tasks.enqueued[retry.task_id] is True
+        assert self.memo.is_leader(retry.task_id)
+        assert follower.outcome == "coalesced"
+        assert follower.leader_id == retry.task_id
+        assert self.memo.stats()["hits"] == 0
@@ -0,0 +1,80 @@
+"""Tests for the content-addressed result store."""
+
+import hashlib
+
+import pytest
+
+from legacy.storage.result_store import ResultRef, ResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(tmp_path / "results", cache_size=2)
+
+
+def _blobs(store):
+    return list(store.directory.rglob("*.z"))
+
+
+class TestResultStore:
+    def test_put_and_get_roundtrip(self, store):
+        ref = store.put("hello world")
+
+        assert ref == ResultRef(hashlib.sha256(b"hello world").hexdigest(), 11)
+        assert store.get(ref.digest) == b"hello world"
+        assert store.get_text(ref.digest) == "hello world"
+        assert store.exists(ref.digest)
+
+    def test_identical_bodies_deduplicated(self, store):
+        first = store.put("same output" * 100)
+        second = store.put(b"same output" * 100)
+
+        assert first == second
+        assert len(_blobs(store)) == 1
+        stats = store.stats()
+        assert stats["puts"] == 2
+        assert stats["dedup_hits"] == 1
+
+    def test_bodies_compressed_on_disk(self, store):
+        body = "x" * 100_000
+        ref = store.put(body)
+
+        blob = _blobs(store)[0]
+        assert blob.stat().st_size < ref.size // 10
+        assert store.stats()["bytes_written"] == blob.stat().st_size
+
+    def test_put_stream_matches_put(self, store):
+        chunks = [b"part-%d;" % i for i in range(1000)]
+        ref = store.put_stream(chunks)
+
+        assert ref == store.put(b"".join(chunks))
+        assert b"".join(store.iter_chunks(ref.digest, chunk_size=64)) == b"".join(chunks)
+        assert len(_blobs(store)) == 1
+
+    def test_aborted_writer_leaves_nothing(self, store):
+        with store.writer() as writer:
+            writer.write(b"partial")
+
+        assert _blobs(store) == []
+        assert list(store.directory.iterdir()) == []
+
+    def test_unknown_or_invalid_digest(self, store):
+        assert store.get("0" * 64) is None
+        assert store.get("../../etc/passwd") is None
+        assert store.iter_chunks("not-a-digest") is None
+        assert not store.exists("0" * 64)
+
+    def test_read_cache_is_bounded(self, store):
+        refs = [store.put(f"body {i}") for i in range(5)]
+        for ref in refs:
+            store.get(ref.digest)
+
+        assert store.stats()["cached_bodies"] == 2
+
+    def test_shared_directory_across_instances(self, tmp_path):
+        ref = ResultStore(tmp_path).put("shared")
+        other = ResultStore(tmp_path)
+
+        assert other.get_text(ref.digest) == "shared"
+        other.put("shared")
+        assert other.stats()["dedup_hits"] == 1
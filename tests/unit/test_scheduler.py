@@ -1,17 +1,27 @@
 """Unit tests for scheduler module."""
 
+import asyncio
+import json
 import os
 import sys
+import tempfile
 import unittest
+from datetime import datetime
+from unittest import mock
+
+from fastapi import HTTPException
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from legacy.scheduler import simple_server
+from legacy.scheduler.result_memo import ResultMemoizer
 from legacy.scheduler.simple_server import (
     NodeHeartbeat,
     NodeRegistration,
     OptimizedMemoryStorage,
     TaskSubmission,
 )
+from legacy.storage.result_store import ResultStore
 
 
 def get_sample_task():
@@ -22,6 +32,27 @@ def get_sample_task():
     }
 
 
+def make_storage(test_case):
+    """Memory storage whose result bodies go to a per-test temp directory."""
+    result_dir = tempfile.TemporaryDirectory()
+    test_case.addCleanup(result_dir.cleanup)
+    return OptimizedMemoryStorage(result_store=ResultStore(result_dir.name))
+
+
+class FakeStreamRequest:
+    """Minimal request with just ``headers`` and ``stream()``."""
+
+    def __init__(self, chunks, headers=None):
+        self.chunks = chunks
+        self.headers = headers or {}
+        self.consumed = False
+
+    async def stream(self):
+        self.consumed = True
+        for chunk in self.chunks:
+            yield chunk
+
+
 def get_sample_node_info():
     return NodeRegistration(
         node_id="node_001",
@@ -83,7 +114,7 @@ class TestOptimizedMemoryStorage(unittest.TestCase):
     """Tests for OptimizedMemoryStorage class."""
 
     def setUp(self):
-        self.storage = OptimizedMemoryStorage()
+        self.storage = make_storage(self)
         self.sample_task = get_sample_task()
         self.sample_node_info = get_sample_node_info()
 
@@ -116,6 +147,16 @@ class TestOptimizedMemoryStorage(unittest.TestCase):
         task = self.storage.get_task_status(99999)
         self.assertIsNone(task)
 
+    def test_batch_get(self):
+        task_id = self.storage.add_task(
+            code=self.sample_task["code"],
+            timeout=self.sample_task["timeout"],
+            resources=self.sample_task["resources"],
+        )
+        statuses = self.storage.batch_get([task_id, 99999])
+        self.assertEqual(statuses[0]["task_id"], task_id)
+        self.assertIsNone(statuses[1])
+
     def test_register_node(self):
         self.storage.register_node(self.sample_node_info)
         self.assertIn(self.sample_node_info.node_id, self.storage.nodes)
@@ -237,12 +278,161 @@ class TestOptimizedMemoryStorage(unittest.TestCase):
         results = self.storage.get_all_results()
         self.assertEqual(len(results), 1)
 
+    def test_results_stored_by_digest(self):
+        first = self.storage.add_task(code="print(1)")
+        second = self.storage.add_task(code="print(1)")
+        self.storage.complete_task(first, "same output")
+        self.storage.complete_task(second, "same output")
+
+        tasks = self.storage.tasks
+        self.assertIsNone(tasks[first].result)
+        self.assertEqual(tasks[first].result_digest, tasks[second].result_digest)
+        self.assertEqual(tasks[first].result_size, len("same output"))
+        self.assertEqual(self.storage.get_task_status(second)["result"], "same output")
+
+        page = self.storage.get_results_page(fields=("task_id", "result_size"))
+        self.assertEqual(page["results"][0], {"task_id": first, "result_size": 11})
+
+    def test_get_results_page(self):
+        task_ids = [self.storage.add_task(code=f"print({i})") for i in range(5)]
+        for task_id in task_ids:
+            self.storage.complete_task(task_id, f"result {task_id}")
+
+        page = self.storage.get_results_page(limit=2, fields=("task_id",))
+        self.assertEqual(page["results"], [{"task_id": task_ids[0]}, {"task_id": task_ids[1]}])
+        self.assertTrue(page["has_more"])
+
+        rest = self.storage.get_results_page(cursor=page["next_cursor"])
+        self.assertEqual([r["task_id"] for r in rest["results"]], task_ids[2:])
+        self.assertFalse(rest["has_more"])
+
+        new_task = self.storage.add_task(code="print('late')")
+        self.storage.complete_task(new_task, "late")
+        incremental = self.storage.get_results_page(since=rest["watermark"])
+        self.assertEqual([r["task_id"] for r in incremental["results"]], [new_task])
+
+
+class TestSubmitResultStream(unittest.TestCase):
+    """Tests for the streaming result upload endpoint."""
+
+    def setUp(self):
+        self.storage = make_storage(self)
+        patcher = mock.patch.object(simple_server, "storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self, task_id, request):
+        return asyncio.run(simple_server.submit_result_stream(task_id, request))
+
+    def test_streams_result(self):
+        task_id = self.storage.add_task(code="print(1)")
+
+        response = self.submit(task_id, FakeStreamRequest([b"big ", "result"]))
+
+        self.assertEqual(response["result"]["size"], len("big result"))
+        self.assertEqual(self.storage.get_task_status(task_id)["result"], "big result")
+        self.assertFalse(self.storage.can_complete(task_id))
+
+    def test_rejects_unknown_task_before_reading_body(self):
+        request = FakeStreamRequest([b"x"])
+
+        with self.assertRaises(HTTPException) as ctx:
+            self.submit(999, request)
+
+        self.assertEqual(ctx.exception.status_code, 404)
+        self.assertFalse(request.consumed)
+
+    def test_rejects_oversized_body(self):
+        task_id = self.storage.add_task(code="print(1)")
+        declared = FakeStreamRequest([b"x"], headers={"content-length": "11"})
+        undeclared = FakeStreamRequest([b"x" * 6, b"x" * 6])
+
+        with mock.patch.object(simple_server, "RESULT_STREAM_MAX_BYTES", 10):
+            for request in (declared, undeclared):
+                with self.assertRaises(HTTPException) as ctx:
+                    self.submit(task_id, request)
+                self.assertEqual(ctx.exception.status_code, 413)
+
+        self.assertFalse(declared.consumed)
+        self.assertTrue(self.storage.can_complete(task_id))
+        self.assertEqual(list(self.storage.result_store.directory.iterdir()), [])
+
+
+class TestStatusBatch(unittest.TestCase):
+    """Tests for the ETag-aware batch status endpoint."""
+
+    def setUp(self):
+        self.storage = make_storage(self)
+        patcher = mock.patch.object(simple_server, "storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fetch(self, task_ids, headers):
+        request = FakeStreamRequest([], headers=headers)
+        batch = simple_server.TaskStatusBatch(task_ids=task_ids)
+        return asyncio.run(simple_server.get_status_batch(batch, request))
+
+    def test_not_modified_keeps_vary(self):
+        task_id = self.storage.add_task(code="print(1)")
+        headers = {"accept": "application/json"}
+
+        first = self.fetch([task_id], headers)
+        second = self.fetch([task_id], {**headers, "if-none-match": first.headers["etag"]})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers["vary"], first.headers["vary"])
+
+    def test_json_uses_plain_datetimes(self):
+        request = FakeStreamRequest([], headers={"accept": "application/json"})
+        payload = {"created": datetime(2024, 1, 1, 12, 30)}
+
+        response = simple_server._negotiated_response(request, payload)
+
+        self.assertEqual(json.loads(response.body), {"created": "2024-01-01T12:30:00"})
+
+
+class TestMemoizedSubmission(unittest.TestCase):
+    """Tests for cached submissions through the scheduler storage."""
+
+    def setUp(self):
+        self.storage = make_storage(self)
+        self.memo = ResultMemoizer()
+        for name, value in (("storage", self.storage), ("result_memo", self.memo)):
+            patcher = mock.patch.object(simple_server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def submit(self):
+        return simple_server._submit_memoized(TaskSubmission(code="print(1)"))
+
+    def test_missing_blob_resubmits_as_leader(self):
+        first = self.submit()["task_id"]
+        self.storage.complete_task(first, "output")
+        simple_server._finish_memoized(first)
+        self.assertEqual(self.submit()["status"], "completed")
+
+        digest = self.storage.tasks[first].result_digest
+        self.storage.result_store._path(digest).unlink()
+        retry = self.submit()
+        follower = self.submit()
+
+        self.assertFalse(retry["cached"])
+        self.assertIn(retry["task_id"], self.storage.pending_tasks)
+        self.assertTrue(self.memo.is_leader(retry["task_id"]))
+        self.assertEqual(follower["status"], "submitted")
+        self.assertTrue(follower["cached"])
+
+        self.storage.complete_task(retry["task_id"], "output")
+        simple_server._finish_memoized(retry["task_id"])
+        self.assertEqual(self.storage.get_task_status(follower["task_id"])["result"], "output")
+
 
 class TestTaskMatching(unittest.TestCase):
     """Tests for task-node matching algorithm."""
 
     def setUp(self):
-        self.storage = OptimizedMemoryStorage()
+        self.storage = make_storage(self)
 
     def test_resource_match(self):
         node_id = "node_001"
@@ -287,7 +477,7 @@ class TestStatistics(unittest.TestCase):
     """Tests for storage statistics."""
 
     def setUp(self):
-        self.storage = OptimizedMemoryStorage()
+        self.storage = make_storage(self)
         self.sample_task = get_sample_task()
 
     def test_empty_stats(self):
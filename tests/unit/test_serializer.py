@@ -0,0 +1,189 @@
+"""Tests for the binary serializer and HTTP content negotiation."""
+
+import gzip
+import json
+import threading
+from array import array
+from enum import Enum
+from unittest.mock import Mock
+
+import pytest
+
+from serializer import BinarySerializer, DeserializationError, SerializationError, http
+
+
+@pytest.fixture
+def serializer():
+    return BinarySerializer()
+
+
+class TestBinarySerializer:
+    def test_roundtrip_nested(self, serializer):
+        obj = {
+            "none": None,
+            "flags": [True, False],
+            "int": -(2**40),
+            "float": 1.5,
+            "text": "héllo",
+            "blob": b"\x00\x01",
+            "nested": {"list": [1, "a", [2.0, None]], 1: "int key"},
+        }
+
+        assert serializer.deserialize(serializer.serialize(obj)) == obj
+
+    def test_homogeneous_lists_are_packed(self, serializer):
+        floats = [i / 3 for i in range(100)]
+        ints = list(range(-50, 50))
+
+        assert len(serializer.serialize(floats)) == 5 + 8 * 100
+        assert serializer.deserialize(serializer.serialize(floats)) == floats
+        assert serializer.deserialize(serializer.serialize(ints)) == ints
+
+    def test_packed_list_falls_back(self, serializer):
+        mixed = [1, 2, 3, 4, 5, 6, 7, 8.0]
+        huge = [2**70] + [1] * 10
+
+        assert serializer.deserialize(serializer.serialize(mixed)) == mixed
+        with pytest.raises(SerializationError):
+            serializer.serialize(huge)
+
+    def test_packed_lists_can_be_disabled(self):
+        ints = list(range(20))
+
+        data = BinarySerializer(packed_lists=False).serialize(ints)
+
+        assert data[0] == BinarySerializer.TYPE_LIST
+        assert BinarySerializer().deserialize(data) == ints
+
+    def test_str_subclasses_encode_their_value(self, serializer):
+        class Color(str, Enum):
+            RED = "red"
+
+        assert serializer.deserialize(serializer.serialize({Color.RED: [Color.RED]})) == {
+            "red": ["red"]
+        }
+
+    def test_typed_arrays(self, serializer):
+        values = array("d", [0.5, 1.5, 2.5])
+        counts = array("H", [1, 2, 65535])
+
+        restored = serializer.deserialize(serializer.serialize({"v": values, "c": counts}))
+
+        assert restored == {"v": values, "c": counts}
+        assert restored["c"].typecode == "H"
+
+    def test_zero_copy_bytes(self):
+        data = BinarySerializer().serialize({"blob": b"payload"})
+
+        blob = BinarySerializer(zero_copy=True).deserialize(data)["blob"]
+
+        assert isinstance(blob, memoryview)
+        assert blob.obj is data
+        assert blob == b"payload"
+
+    def test_numpy_arrays(self, serializer):
+        np = pytest.importorskip("numpy")
+        matrix = np.arange(12, dtype=np.float32).reshape(3, 4)
+        data = serializer.serialize({"m": matrix, "mask": matrix > 5})
+
+        copied = serializer.deserialize(data)
+        viewed = BinarySerializer(zero_copy=True).deserialize(data)
+
+        for restored in (copied, viewed):
+            assert restored["m"].dtype == np.float32
+            assert np.array_equal(restored["m"], matrix)
+            assert np.array_equal(restored["mask"], matrix > 5)
+        assert copied["m"].flags.writeable
+        assert not viewed["m"].flags.writeable
+
+    def test_serialize_into_appends(self, serializer):
+        out = bytearray(b"prefix")
+
+        written = serializer.serialize_into([1, 2], out)
+
+        assert written == len(out) - len(b"prefix")
+        assert serializer.deserialize(memoryview(out)[len(b"prefix") :]) == [1, 2]
+        with pytest.raises(SerializationError):
+            serializer.serialize_into([1, object()], out)
+        assert len(out) == len(b"prefix") + written
+
+    def test_truncated_input(self, serializer):
+        data = serializer.serialize({"text": "abcdef", "values": list(range(20))})
+
+        with pytest.raises(DeserializationError):
+            serializer.deserialize(data[: len(data) // 2])
+
+    def test_shared_across_threads(self, serializer):
+        errors = []
+
+        def worker(n):
+            obj = {"n": n, "values": [float(n)] * 50}
+            for _ in range(200):
+                if serializer.deserialize(serializer.serialize(obj)) != obj:
+                    errors.append(n)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+
+
+class TestHttpNegotiation:
+    def test_json_by_default(self):
+        for accept in (None, "", "*/*", "text/html, */*;q=0.8", "application/json"):
+            assert http.negotiate(accept).content_type == "application/json"
+
+    def test_msgpack_when_preferred(self):
+        pytest.importorskip("msgpack")
+
+        assert http.negotiate("application/json;q=0.5, application/msgpack").content_type == (
+            "application/msgpack"
+        )
+        assert http.negotiate("application/msgpack;q=0, application/json").content_type == (
+            "application/json"
+        )
+        assert http.request_headers()["Accept"].startswith("application/msgpack")
+
+        payload = {"results": [{"task_id": 1, "result": "ok"}]}
+        encoded = http.encode_response(payload, "application/msgpack")
+        assert encoded.content_type == "application/msgpack"
+        assert http.decode_body(encoded.body, encoded.content_type) == payload
+
+    def test_large_bodies_compressed(self):
+        payload = {"results": [{"task_id": i, "result": "x" * 20} for i in range(200)]}
+
+        encoded = http.encode_response(payload, None, "gzip, deflate")
+        small = http.encode_response({"ok": True}, None, "gzip")
+        identity = http.encode_response(payload, None, None)
+
+        assert encoded.content_encoding == "gzip"
+        assert encoded.headers["Content-Encoding"] == "gzip"
+        assert len(encoded.body) < len(identity.body) // 5
+        assert gzip.decompress(encoded.body) == identity.body
+        assert http.decode_body(encoded.body, encoded.content_type, "gzip") == payload
+        assert small.content_encoding is None
+
+    def test_json_dumps_hook(self):
+        payload = {"created": "2024-01-01T00:00:00", "results": ["x" * 20] * 100}
+
+        def dump(obj):
+            return json.dumps(obj).encode()
+
+        encoded = http.encode_response(payload, "application/json", "gzip", json_dumps=dump)
+
+        assert encoded.content_type == "application/json"
+        assert encoded.content_encoding == "gzip"
+        assert gzip.decompress(encoded.body) == dump(payload)
+
+    def test_decode_response_falls_back_to_json(self):
+        response = Mock(headers={"Content-Type": "application/json"})
+        response.json.return_value = {"task_id": 1}
+
+        assert http.decode_response(response) == {"task_id": 1}
+
+    def test_unknown_encoding_rejected(self):
+        with pytest.raises(DeserializationError):
+            http.decode_body(b"...", "application/json", "br")
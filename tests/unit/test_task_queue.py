@@ -0,0 +1,58 @@
+"""
+Tests for the in-memory task queue backend.
+"""
+
+from legacy.task_queue import MemoryQueueBackend, Task, TaskPriority, TaskQueue, TaskStatus
+
+
+class TestMemoryQueueBackend:
+    """Test heap ordering and batch operations."""
+
+    def test_priority_then_fifo(self):
+        backend = MemoryQueueBackend()
+        backend.enqueue(Task(name="low", priority=TaskPriority.LOW))
+        backend.enqueue(Task(name="normal-1"))
+        backend.enqueue(Task(name="critical", priority=TaskPriority.CRITICAL))
+        backend.enqueue(Task(name="normal-2"))
+
+        assert backend.peek().name == "critical"
+        order = [backend.dequeue().name for _ in range(4)]
+        assert order == ["critical", "normal-1", "normal-2", "low"]
+        assert backend.dequeue() is None
+
+    def test_enqueue_many_respects_max_size(self):
+        backend = MemoryQueueBackend(max_size=2)
+
+        enqueued = backend.enqueue_many([Task(name=f"t{i}") for i in range(4)])
+
+        assert enqueued == 2
+        assert backend.size() == 2
+
+    def test_dequeue_batch(self):
+        backend = MemoryQueueBackend()
+        backend.enqueue_many([Task(name=f"t{i}", priority=i) for i in range(5)])
+
+        tasks = backend.dequeue_batch(3)
+
+        assert [t.name for t in tasks] == ["t4", "t3", "t2"]
+        assert all(t.status == TaskStatus.RUNNING for t in tasks)
+        assert backend.size() == 2
+
+    def test_dequeue_timeout_returns_none(self):
+        backend = MemoryQueueBackend()
+
+        assert backend.dequeue(timeout=0.01) is None
+        assert backend.dequeue_batch(5, timeout=0.01) == []
+
+
+class TestTaskQueueEnqueueMany:
+    """Test TaskQueue batch enqueue."""
+
+    def test_stats_and_order(self):
+        queue = TaskQueue()
+
+        tasks = queue.enqueue_many("job", [1, 2, 3])
+
+        assert [t.payload for t in tasks] == [1, 2, 3]
+        assert queue.get_stats().total_enqueued == 3
+        assert [queue.dequeue().payload for _ in range(3)] == [1, 2, 3]
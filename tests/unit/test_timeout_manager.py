@@ -0,0 +1,255 @@
+"""
+Tests for Timeout Manager.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from legacy.timeout_manager import (
+    DeadlineScheduler,
+    PoolExhaustedError,
+    TimeoutAction,
+    TimeoutError,
+    TimeoutExecutor,
+    TimeoutManager,
+    TimeoutState,
+    timeout,
+)
+
+
+class TestDeadlineScheduler:
+    """Test DeadlineScheduler class."""
+
+    def test_fires_in_deadline_order(self):
+        """Test callbacks fire in deadline order on one thread."""
+        scheduler = DeadlineScheduler()
+        fired = []
+        threads = set()
+        done = threading.Event()
+
+        def record(name):
+            fired.append(name)
+            threads.add(threading.current_thread().name)
+            if len(fired) == 3:
+                done.set()
+
+        scheduler.schedule(0.06, record, "c")
+        scheduler.schedule(0.02, record, "a")
+        scheduler.schedule(0.04, record, "b")
+
+        assert done.wait(2.0)
+        assert fired == ["a", "b", "c"]
+        assert len(threads) == 1
+
+    def test_cancel(self):
+        """Test cancelled callbacks never fire."""
+        scheduler = DeadlineScheduler()
+        fired = []
+
+        handle = scheduler.schedule(0.02, fired.append, "x")
+
+        assert scheduler.cancel(handle) is True
+        assert scheduler.cancel(handle) is False
+        time.sleep(0.05)
+        assert fired == []
+        assert scheduler.pending() == 0
+
+    def test_compaction(self):
+        """Test heap is compacted when most entries are cancelled."""
+        scheduler = DeadlineScheduler()
+        handles = [scheduler.schedule(60, lambda: None) for _ in range(200)]
+
+        for handle in handles[:150]:
+            scheduler.cancel(handle)
+
+        assert len(scheduler._heap) < 200
+        assert scheduler.pending() == 50
+
+
+class TestTimeoutManager:
+    """Test TimeoutManager class."""
+
+    def test_timeout_triggers_callback(self):
+        """Test an expired timeout fires its callback."""
+        manager = TimeoutManager()
+        triggered = threading.Event()
+
+        context = manager.register(0.02, callback=lambda ctx: triggered.set())
+        manager.start(context.timeout_id)
+
+        assert triggered.wait(2.0)
+        assert context.state == TimeoutState.TIMEOUT
+        assert manager.get_stats().triggered_timeouts == 1
+
+    def test_complete_disarms_timer(self):
+        """Test completing a timeout cancels its deadline."""
+        manager = TimeoutManager(scheduler=DeadlineScheduler())
+
+        context = manager.register(5.0)
+        manager.start(context.timeout_id)
+        manager.complete(context.timeout_id, "ok")
+
+        assert context.state == TimeoutState.COMPLETED
+        assert manager._scheduler.pending() == 0
+
+    def test_avg_execution_time_window(self):
+        """Test running average over the last EXECUTION_WINDOW completions."""
+        manager = TimeoutManager()
+
+        for i in range(150):
+            manager._record_execution_time(float(i))
+
+        assert manager.get_stats().avg_execution_time == pytest.approx(sum(range(50, 150)) / 100)
+
+    def test_clear_completed(self):
+        """Test only finished contexts past max age are removed."""
+        manager = TimeoutManager()
+
+        done = manager.register(5.0)
+        manager.start(done.timeout_id)
+        manager.complete(done.timeout_id)
+        running = manager.register(5.0)
+        manager.start(running.timeout_id)
+
+        time.sleep(0.01)
+
+        assert manager.clear_completed(max_age_seconds=3600) == 0
+        assert manager.clear_completed(max_age_seconds=0) == 1
+        assert manager.get_context(done.timeout_id) is None
+        assert manager.get_context(running.timeout_id) is not None
+        assert len(manager._finished) == 0
+
+        manager.cancel(running.timeout_id)
+
+
+class TestTimeoutExecutor:
+    """Test TimeoutExecutor class."""
+
+    def test_execute_returns_result(self):
+        executor = TimeoutExecutor(default_timeout=1.0)
+
+        assert executor.execute(lambda x: x * 2, 21) == 42
+        assert executor.get_stats().completed_timeouts == 1
+
+    def test_execute_propagates_error(self):
+        executor = TimeoutExecutor(default_timeout=1.0)
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            executor.execute(fail)
+
+    def test_execute_timeout_raises(self):
+        executor = TimeoutExecutor(default_timeout=0.05)
+
+        with pytest.raises(TimeoutError):
+            executor.execute(time.sleep, 0.3)
+
+        assert executor.get_stats().triggered_timeouts == 1
+
+    def test_execute_timeout_returns_default(self):
+        executor = TimeoutExecutor(
+            default_timeout=0.05, action=TimeoutAction.RETURN_DEFAULT, default_value="late"
+        )
+
+        assert executor.execute(time.sleep, 0.3) == "late"
+
+    def test_bounded_pool(self):
+        """Test calls reuse a bounded set of worker threads."""
+        executor = TimeoutExecutor(default_timeout=1.0, max_workers=2)
+        names = set()
+
+        for _ in range(20):
+            executor.execute(lambda: names.add(threading.current_thread().name))
+
+        executor.shutdown(wait=True)
+        assert len(names) <= 2
+
+    def test_hung_calls_do_not_starve_pool(self):
+        """Test calls still run once every worker is held by a timed-out call."""
+        executor = TimeoutExecutor(default_timeout=0.05, max_workers=2)
+        release = threading.Event()
+
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                executor.execute(release.wait)
+
+        assert executor.pool_stats()["stranded_workers"] == 2
+        assert executor.pool_stats()["saturated"]
+        assert executor.execute(lambda: "ran") == "ran"
+        assert executor.pool_stats()["overflow_calls"] == 1
+
+        release.set()
+        deadline = time.monotonic() + 1.0
+        while executor.pool_stats()["stranded_workers"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert executor.pool_stats()["stranded_workers"] == 0
+        assert executor.execute(lambda: "pooled") == "pooled"
+        assert executor.pool_stats()["overflow_calls"] == 1
+        executor.shutdown(wait=True)
+
+    def test_overflow_threads_are_capped(self):
+        """Test a saturated pool rejects calls once its overflow threads are taken."""
+        executor = TimeoutExecutor(default_timeout=0.05, max_workers=1)
+        release = threading.Event()
+
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                executor.execute(release.wait)
+
+        assert executor.pool_stats()["overflow_threads"] == 1
+        with pytest.raises(PoolExhaustedError):
+            executor.execute(lambda: "rejected")
+        assert executor.pool_stats()["rejected_calls"] == 1
+
+        release.set()
+        deadline = time.monotonic() + 1.0
+        while executor.pool_stats()["overflow_threads"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert executor.execute(lambda: "ran") == "ran"
+        executor.shutdown(wait=True)
+
+    def test_timeout_handled_once(self):
+        """Test the timeout callback fires once per timed-out call."""
+        calls = []
+        executor = TimeoutExecutor(default_timeout=0.05, on_timeout=calls.append, max_workers=1)
+
+        with pytest.raises(TimeoutError):
+            executor.execute(time.sleep, 0.2)
+        time.sleep(0.1)
+
+        assert len(calls) == 1
+        assert executor.get_stats().triggered_timeouts == 1
+        executor.shutdown(wait=True)
+
+    def test_execute_async(self):
+        executor = TimeoutExecutor(default_timeout=1.0)
+
+        async def double(x):
+            await asyncio.sleep(0)
+            return x * 2
+
+        assert asyncio.run(executor.execute_async(double, 4)) == 8
+        assert executor.get_stats().completed_timeouts == 1
+
+    def test_execute_async_timeout(self):
+        executor = TimeoutExecutor(default_timeout=0.02)
+
+        with pytest.raises(TimeoutError):
+            asyncio.run(executor.execute_async(asyncio.sleep, 1))
+
+        assert executor.get_stats().triggered_timeouts == 1
+
+    def test_decorator_async(self):
+        @timeout(0.02, action=TimeoutAction.RETURN_DEFAULT, default="slow")
+        async def slow():
+            await asyncio.sleep(1)
+
+        assert asyncio.run(slow()) == "slow"
+        assert slow.timeout_stats().triggered_timeouts == 1
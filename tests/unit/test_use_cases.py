@@ -8,8 +8,10 @@ from unittest.mock import Mock
 
 import pytest
 
+from src.core.entities import Task, TaskStatus
 from src.core.use_cases.auth.login_use_case import LoginRequest, LoginUseCase
 from src.core.use_cases.auth.register_use_case import RegisterRequest, RegisterUseCase
+from src.core.use_cases.task.monitor_task_use_case import MonitorTaskRequest, MonitorTaskUseCase
 from src.core.use_cases.task.submit_task_use_case import SubmitTaskRequest, SubmitTaskUseCase
 
 
@@ -148,5 +150,45 @@ class TestSubmitTaskUseCase:
         assert "失败" in response.message
 
 
+class TestMonitorTaskUseCase:
+    """监控任务用例测试"""
+
+    def setup_method(self):
+        self.mock_repo = Mock()
+        self.mock_scheduler = Mock()
+        self.use_case = MonitorTaskUseCase(self.mock_repo, self.mock_scheduler)
+
+    def test_batch_status_and_changed_only_updates(self):
+        """测试一次批量查询，且仅更新状态变化的任务"""
+        tasks = [
+            Task(task_id="1", code="a", status=TaskStatus.PENDING),
+            Task(task_id="2", code="b", status=TaskStatus.RUNNING),
+            Task(task_id="3", code="c", status=TaskStatus.PENDING),
+        ]
+        self.mock_repo.list_all.return_value = tasks
+        self.mock_scheduler.get_task_statuses.return_value = (
+            True,
+            {"1": {"status": "completed"}, "2": {"status": "running"}, "3": None},
+        )
+
+        response = self.use_case.execute(MonitorTaskRequest())
+
+        assert response.success is True
+        self.mock_scheduler.get_task_statuses.assert_called_once_with(["1", "2", "3"])
+        self.mock_scheduler.get_task_status.assert_not_called()
+        self.mock_repo.update.assert_called_once_with(tasks[0])
+        assert [t["status"] for t in response.tasks] == ["completed", "running", "pending"]
+
+    def test_scheduler_unavailable_keeps_local_status(self):
+        """测试调度器不可用时保留本地状态"""
+        self.mock_repo.list_by_user.return_value = [Task(task_id="1", code="a")]
+        self.mock_scheduler.get_task_statuses.return_value = (False, {"error": "offline"})
+
+        response = self.use_case.execute(MonitorTaskRequest(user_id="u1"))
+
+        assert response.tasks[0]["status"] == "pending"
+        self.mock_repo.update.assert_not_called()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,207 @@
+"""
+Tests for the workflow engine.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from legacy.workflow import (
+    DefaultExecutor,
+    TaskGroup,
+    TaskNode,
+    TaskNodeType,
+    TaskResult,
+    Workflow,
+    WorkflowExecutor,
+    WorkflowStatus,
+)
+
+
+class SleepExecutor(WorkflowExecutor):
+    """Executor whose tasks sleep for task["duration"] seconds."""
+
+    def __init__(self):
+        self.started = {}
+
+    async def execute(self, node):
+        self.started[node.node_id] = time.monotonic()
+        await asyncio.sleep(node.task.get("duration", 0))
+        if node.task.get("fail"):
+            return TaskResult(task_id=node.node_id, success=False, error="boom")
+        return TaskResult(task_id=node.node_id, success=True, result=node.node_id)
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+
+    def json(self):
+        return self._payload
+
+
+class FakeScheduler:
+    """Blocking session stand-in: tasks finish after a fixed delay."""
+
+    def __init__(self, delay=0.05, batch=True):
+        self.delay = delay
+        self.batch = batch
+        self.lock = threading.Lock()
+        self.submitted = {}
+        self.calls = []
+
+    def post(self, url, json=None, timeout=None, **kwargs):
+        path = url.split("://", 1)[1].split("/", 1)[1]
+        with self.lock:
+            self.calls.append(path)
+            if path == "submit":
+                task_id = len(self.submitted) + 1
+                self.submitted[task_id] = time.monotonic()
+                return FakeResponse(200, {"task_id": task_id})
+        if not self.batch:
+            return FakeResponse(404)
+        return FakeResponse(
+            200, {"statuses": {str(tid): self._status(tid) for tid in json["task_ids"]}}
+        )
+
+    def get(self, url, timeout=None, **kwargs):
+        task_id = int(url.rsplit("/", 1)[1])
+        with self.lock:
+            self.calls.append("status")
+        return FakeResponse(200, self._status(task_id))
+
+    def _status(self, task_id):
+        done = time.monotonic() - self.submitted[task_id] >= self.delay
+        return {"status": "completed" if done else "running", "result": f"r{task_id}"}
+
+    def close(self):
+        pass
+
+
+def _executor(scheduler, **kwargs):
+    executor = DefaultExecutor(poll_interval=0.01, max_poll_interval=0.02, **kwargs)
+    executor._session = scheduler
+    return executor
+
+
+class TestWorkflow:
+    """Test dependency-driven workflow execution."""
+
+    @pytest.mark.asyncio
+    async def test_node_starts_when_own_dependencies_finish(self):
+        """A dependent of a fast branch does not wait for a slow sibling."""
+        executor = SleepExecutor()
+        workflow = Workflow(executor)
+        workflow.add_task("fast", {"duration": 0.01})
+        workflow.add_task("slow", {"duration": 0.3})
+        workflow.add_task("after_fast", {"duration": 0.01}, depends_on=["fast"])
+
+        start = time.monotonic()
+        results = await workflow.execute()
+
+        assert workflow.status == WorkflowStatus.COMPLETED
+        assert set(results) == {"fast", "slow", "after_fast"}
+        assert executor.started["after_fast"] - start < 0.2
+
+    @pytest.mark.asyncio
+    async def test_dependency_results_passed_down(self):
+        """Test dependent tasks receive upstream results."""
+        workflow = Workflow(SleepExecutor())
+        workflow.add_task("a", {})
+        workflow.add_task("b", {})
+        workflow.add_task("join", {}, depends_on=["a", "b"])
+
+        await workflow.execute()
+
+        assert workflow.nodes["join"].task["dep_results"] == {"a": "a", "b": "b"}
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_downstream(self):
+        """Test failure cancels all transitive dependents."""
+        workflow = Workflow(SleepExecutor())
+        workflow.add_task("a", {"fail": True})
+        workflow.add_task("b", {}, depends_on=["a"])
+        workflow.add_task("c", {}, depends_on=["b"])
+        workflow.add_task("other", {})
+
+        results = await workflow.execute()
+
+        assert workflow.status == WorkflowStatus.FAILED
+        assert workflow.nodes["b"].status == WorkflowStatus.CANCELLED
+        assert workflow.nodes["c"].status == WorkflowStatus.CANCELLED
+        assert results["other"].success
+
+    @pytest.mark.asyncio
+    async def test_unknown_dependency_rejected(self):
+        """Test unknown dependencies are reported."""
+        workflow = Workflow(SleepExecutor())
+        workflow.add_task("a", {}, depends_on=["missing"])
+
+        with pytest.raises(ValueError):
+            await workflow.execute()
+
+
+class TestDefaultExecutor:
+    """Test the scheduler-backed executor."""
+
+    @pytest.mark.asyncio
+    async def test_group_runs_concurrently_with_batched_polls(self):
+        """Tasks overlap and share one status request per poll."""
+        scheduler = FakeScheduler(delay=0.1)
+        executor = _executor(scheduler)
+        group = TaskGroup([{"code": f"result = {i}"} for i in range(20)], executor=executor)
+
+        start = time.monotonic()
+        results = await group.execute()
+        elapsed = time.monotonic() - start
+        executor.close()
+
+        assert all(r.success for r in results)
+        assert elapsed < 1.0
+        assert "status" not in scheduler.calls
+        assert scheduler.calls.count("status/batch") < 20
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """Test no more than max_concurrency tasks are submitted at once."""
+        scheduler = FakeScheduler(delay=0.05)
+        executor = _executor(scheduler, max_concurrency=2)
+        group = TaskGroup([{"code": "pass"} for _ in range(6)], executor=executor)
+
+        await group.execute()
+        executor.close()
+
+        submits = sorted(scheduler.submitted.values())
+        assert submits[2] - submits[0] >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_per_task_status(self):
+        """Test schedulers without the batch endpoint still work."""
+        scheduler = FakeScheduler(delay=0.02, batch=False)
+        executor = _executor(scheduler)
+        node = TaskNode(node_id="n1", node_type=TaskNodeType.TASK, task={"code": "pass"})
+
+        result = await executor.execute(node)
+        executor.close()
+
+        assert result.success
+        assert result.result == "r1"
+        assert "status" in scheduler.calls
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        """Test tasks that never finish time out."""
+        scheduler = FakeScheduler(delay=60)
+        executor = _executor(scheduler)
+        node = TaskNode(
+            node_id="n1", node_type=TaskNodeType.TASK, task={"code": "pass", "timeout": 0.05}
+        )
+
+        result = await executor.execute(node)
+        executor.close()
+
+        assert not result.success
+        assert "Timeout" in result.error